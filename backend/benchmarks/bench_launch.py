@@ -0,0 +1,140 @@
+"""
+Launcher throughput comparison
+
+Starts the API with the development launch (python main.py: one process,
+reload=DEBUG) and with the production launcher (python serve.py), drives
+each with keep-alive HTTP/1.1 clients for a fixed time, and reports
+requests per second with p50/p99 latency:
+
+    python benchmarks/bench_launch.py --path /health --connections 64 --duration 10
+
+Each server is started on --port through the API_PORT environment
+variable and stopped with SIGTERM before the next one starts.
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+LAUNCHES = {
+    "main.py": [sys.executable, "main.py"],
+    "serve.py": [sys.executable, "serve.py"],
+}
+
+
+def wait_for_port(host: str, port: int, timeout: float) -> bool:
+    """Poll until the server accepts connections"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+async def client(host: str, port: int, request: bytes, stop_at: float, latencies: list, errors: list):
+    """One keep-alive connection sending requests back to back until stop_at"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            
+            length = 0
+            status = await reader.readline()
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            
+            if not status.startswith(b"HTTP/1.1 2"):
+                errors.append(status)
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        writer.close()
+
+
+async def drive(host: str, port: int, path: str, connections: int, duration: float):
+    """Run `connections` clients for `duration` seconds"""
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: identity\r\n\r\n".encode()
+    latencies, errors = [], []
+    stop_at = time.perf_counter() + duration
+    await asyncio.gather(*(client(host, port, request, stop_at, latencies, errors) for _ in range(connections)))
+    return latencies, errors
+
+
+def run_launch(label: str, args) -> dict:
+    """Start one launch, load it, stop it"""
+    env = dict(os.environ, API_PORT=str(args.port), API_HOST=args.host)
+    process = subprocess.Popen(
+        LAUNCHES[label], cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        if not wait_for_port(args.host, args.port, args.startup_timeout):
+            raise RuntimeError(f"{label} did not start listening on {args.host}:{args.port}")
+        time.sleep(args.settle)
+        asyncio.run(drive(args.host, args.port, args.path, args.connections, 1.0))  # warm-up
+        latencies, errors = asyncio.run(drive(args.host, args.port, args.path, args.connections, args.duration))
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / args.duration,
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare main.py and serve.py throughput")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind/connect address")
+    parser.add_argument("--port", type=int, default=8765, help="Port both launches listen on")
+    parser.add_argument("--path", default="/health", help="GET path to load")
+    parser.add_argument("--connections", type=int, default=64, help="Concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per launch")
+    parser.add_argument("--settle", type=float, default=3.0, help="Seconds to wait after the port opens (workers, lifespan)")
+    parser.add_argument("--startup-timeout", type=float, default=60.0, help="Seconds to wait for the port")
+    parser.add_argument("--only", choices=sorted(LAUNCHES), help="Run a single launch")
+    args = parser.parse_args()
+    
+    print(f"\n{'='*60}")
+    print(f"🏭 LAUNCHER THROUGHPUT (GET {args.path}, {args.connections} connections, {args.duration:.0f}s)")
+    print(f"{'='*60}\n")
+    
+    results = {}
+    for label in ([args.only] if args.only else LAUNCHES):
+        results[label] = result = run_launch(label, args)
+        print(f"   {label:<10} {result['rps']:>10,.0f} req/s   p50 {result['p50']:7.2f} ms   "
+              f"p99 {result['p99']:7.2f} ms   errors {result['errors']}")
+    
+    if len(results) == 2:
+        print(f"\n   serve.py / main.py throughput: {results['serve.py']['rps'] / results['main.py']['rps']:.2f}x")
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Metrics instrumentation overhead
+
+Measures what the Prometheus instrumentation adds on the two hot paths,
+with everything else identical:
+
+- GraphQL: a query returning --rows Service objects from an async
+  resolver, on a schema without extensions and on one with
+  InstrumentedSchema plus resolver timing (no I/O, so this is the worst case)
+- Neo4j: RETURN 1 against a local stand-in Bolt server, read in full with
+  session.run() and with run_statement() on an instrumented pool
+
+    python benchmarks/bench_metrics_overhead.py --rows 50 --repeats 2000
+
+The target is under 2% on each path. The stand-in answers in well under a
+millisecond from inside this process, so for Neo4j the added microseconds
+are judged against --statement-ms, a realistic statement round trip to
+the database server, rather than against the stand-in itself.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("NEO4J_URI", "bolt://127.0.0.1:7687")
+os.environ.setdefault("NEO4J_USERNAME", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "password")
+
+import strawberry
+
+from graphql_api.types import Service
+from graphql_api.extensions import InstrumentedSchema, instrument_resolvers
+from config.neo4j_config import open_driver
+from monitoring.metrics import instrument_pool
+from repositories.statements import run_statement
+from bench_neo4j_startup import StandInBolt, start_servers
+
+
+QUERY = "query ActiveServices { activeServices { serviceId serviceName pricePerHour rating createdAt } }"
+
+
+def build_schema(rows: int, instrumented: bool) -> strawberry.Schema:
+    """A fresh Query type each time, so resolver timing is only on one schema"""
+    services = [
+        Service(
+            service_id=f"svc-{i}", vehicle_id=f"veh-{i}", provider_uid=f"uid-{i}",
+            service_name=f"Crane rental {i}", service_category="Crane",
+            price_per_hour=4500.0 + i, rating=4.5, is_active=True,
+            created_at="2025-01-01T00:00:00", updated_at="2025-01-01T00:00:00",
+        )
+        for i in range(rows)
+    ]
+
+    @strawberry.type
+    class Query:
+        @strawberry.field
+        async def active_services(self) -> List[Service]:
+            return services
+
+    if instrumented:
+        instrument_resolvers(Query)
+        return InstrumentedSchema(query=Query)
+    return strawberry.Schema(query=Query)
+
+
+def compare(label: str, plain, instrumented, repeats: int) -> tuple:
+    """
+    Time both variants call by call, alternating so that drift (GC, CPU
+    frequency, the stand-in server sharing the GIL) hits both equally;
+    print the overhead of the instrumented one and return both medians in µs
+    """
+    plain_samples, instrumented_samples = [], []
+    for i in range(repeats * 2):
+        fn, samples = (plain, plain_samples) if i % 2 == 0 else (instrumented, instrumented_samples)
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    base, measured = statistics.median(plain_samples), statistics.median(instrumented_samples)
+    overhead = (measured - base) / base * 100
+    print(f"   {label:<26} plain {base:9.1f} µs   instrumented {measured:9.1f} µs   overhead {overhead:+6.2f}%")
+    return base, measured
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark metrics instrumentation overhead")
+    parser.add_argument("--rows", type=int, default=50, help="Services returned by the GraphQL query")
+    parser.add_argument("--repeats", type=int, default=2000, help="Calls per round")
+    parser.add_argument("--statement-ms", type=float, default=5.0, help="Typical statement round trip to the real server")
+    args = parser.parse_args()
+
+    print(f"\n{'='*60}")
+    print(f"📈 METRICS OVERHEAD (target < 2%)")
+    print(f"{'='*60}\n")
+
+    loop = asyncio.new_event_loop()
+    plain_schema = build_schema(args.rows, instrumented=False)
+    instrumented_schema = build_schema(args.rows, instrumented=True)
+    assert loop.run_until_complete(plain_schema.execute(QUERY)).data == loop.run_until_complete(instrumented_schema.execute(QUERY)).data
+    base, measured = compare(
+        f"GraphQL ({args.rows} rows)",
+        lambda: loop.run_until_complete(plain_schema.execute(QUERY)),
+        lambda: loop.run_until_complete(instrumented_schema.execute(QUERY)),
+        args.repeats,
+    )
+    graphql = (measured - base) / base * 100
+
+    server = StandInBolt("ok")
+    start_servers([server])
+    uri = f"bolt://127.0.0.1:{server.port}"
+    plain_driver, instrumented_driver = open_driver(uri), open_driver(uri)
+    instrument_pool(instrumented_driver)
+
+    def plain_statement():
+        with plain_driver.session() as session:
+            result = session.run("RETURN 1 AS test")
+            list(result)
+            result.consume()
+
+    def instrumented_statement():
+        with instrumented_driver.session() as session:
+            run_statement(session, "bench.return_one", "RETURN 1 AS test")
+
+    base, measured = compare("Neo4j RETURN 1 (stand-in)", plain_statement, instrumented_statement, args.repeats)
+    neo4j = (measured - base) / (args.statement_ms * 1000) * 100
+    print(f"   {'':<26} +{measured - base:.1f} µs per statement = {neo4j:+.2f}% of a {args.statement_ms:g} ms statement")
+
+    plain_driver.close()
+    instrumented_driver.close()
+
+    worst = max(graphql, neo4j)
+    print(f"\n   {'✅' if worst < 2 else '❌'} worst overhead {worst:+.2f}%\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
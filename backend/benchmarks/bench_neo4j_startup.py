@@ -0,0 +1,206 @@
+"""
+Neo4j cold-start benchmark
+
+Runs get_neo4j_driver()'s connection logic against local stand-in Bolt
+servers, so the numbers do not depend on Neo4j Aura or the network:
+
+- hang: accepts TCP but never answers the handshake (a blocked or paused
+  instance); for neo4j:// the driver keeps retrying routing until its
+  connection acquisition timeout (60s), the worst case for a bad scheme
+- slow: answers after --slow-delay seconds
+- good: answers immediately
+
+The configured URI hangs, as it does when its scheme is broken. Three
+strategies connect with the same candidate list:
+
+- sequential: one scheme after the other (the previous behaviour, without
+  its extra raw-socket probe)
+- race: every scheme at once, first healthy driver wins
+- head start: the configured URI alone for its head start, then the race
+  (what get_neo4j_driver() does, so a weaker fallback scheme never wins
+  against a configured URI that works)
+
+    python benchmarks/bench_neo4j_startup.py --timeout 5 --repeats 3
+
+Attempts that lose the race keep running in the background, so the script
+only exits once the hanging one gives up.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import struct
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Stand-in credentials when no .env is present
+os.environ.setdefault("NEO4J_URI", "bolt://127.0.0.1:7687")
+os.environ.setdefault("NEO4J_USERNAME", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "password")
+
+from config.settings import settings
+from config.neo4j_config import open_driver, connect_first
+
+
+BOLT_MAGIC = b"\x60\x60\xb0\x17"
+BOLT_VERSION = b"\x00\x00\x00\x05"  # Bolt 5.0: credentials in HELLO, no LOGON
+
+HELLO, GOODBYE, RUN, PULL, ROUTE = 0x01, 0x02, 0x10, 0x3F, 0x66
+SUCCESS, RECORD = 0x70, 0x71
+
+
+def pack(value) -> bytes:
+    """PackStream encoding of the few types the stand-in sends"""
+    if value is None:
+        return b"\xc0"
+    if value is True:
+        return b"\xc3"
+    if value is False:
+        return b"\xc2"
+    if isinstance(value, int):
+        if -16 <= value < 128:
+            return struct.pack(">b", value)
+        return b"\xcb" + struct.pack(">q", value)
+    if isinstance(value, str):
+        data = value.encode("utf-8")
+        if len(data) < 16:
+            return bytes([0x80 + len(data)]) + data
+        return b"\xd0" + bytes([len(data)]) + data
+    if isinstance(value, list):
+        return bytes([0x90 + len(value)]) + b"".join(pack(item) for item in value)
+    if isinstance(value, dict):
+        return bytes([0xA0 + len(value)]) + b"".join(pack(k) + pack(v) for k, v in value.items())
+    raise TypeError(f"Cannot pack {type(value).__name__}")
+
+
+def message(tag: int, *fields) -> bytes:
+    """One chunked Bolt message"""
+    body = bytes([0xB0 + len(fields), tag]) + b"".join(pack(field) for field in fields)
+    return struct.pack(">H", len(body)) + body + b"\x00\x00"
+
+
+class StandInBolt:
+    """Minimal Bolt 5.0 server: HELLO, ROUTE, RUN/PULL of RETURN 1, RESET"""
+    
+    def __init__(self, mode: str, delay: float = 0.0):
+        self.mode = mode
+        self.delay = delay
+        self.port = None
+        self.connections = 0
+    
+    async def read_message(self, reader) -> int:
+        data = b""
+        while True:
+            size = struct.unpack(">H", await reader.readexactly(2))[0]
+            if size == 0:
+                return data[1]
+            data += await reader.readexactly(size)
+    
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            if (await reader.readexactly(20))[:4] != BOLT_MAGIC:
+                return
+            if self.mode == "hang":
+                await asyncio.sleep(3600)
+            await asyncio.sleep(self.delay)
+            writer.write(BOLT_VERSION)
+            
+            address = f"127.0.0.1:{self.port}"
+            while True:
+                tag = await self.read_message(reader)
+                if tag == GOODBYE:
+                    break
+                if tag == HELLO:
+                    writer.write(message(SUCCESS, {"server": "Neo4j/5.26.0", "connection_id": f"bolt-{self.connections}"}))
+                elif tag == ROUTE:
+                    servers = [{"addresses": [address], "role": role} for role in ("ROUTE", "READ", "WRITE")]
+                    writer.write(message(SUCCESS, {"rt": {"ttl": 300, "db": "neo4j", "servers": servers}}))
+                elif tag == RUN:
+                    writer.write(message(SUCCESS, {"fields": ["test"], "t_first": 0}))
+                elif tag == PULL:
+                    writer.write(message(RECORD, [1]))
+                    writer.write(message(SUCCESS, {"type": "r", "t_last": 0, "db": "neo4j"}))
+                else:
+                    writer.write(message(SUCCESS, {}))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+def start_servers(servers):
+    """Serve every stand-in from one background event loop"""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    
+    async def serve():
+        for server in servers:
+            listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+            server.port = listener.sockets[0].getsockname()[1]
+        ready.set()
+    
+    threading.Thread(target=lambda: (loop.run_until_complete(serve()), loop.run_forever()), daemon=True).start()
+    ready.wait()
+
+
+def sequential(uris):
+    """Try each URI in turn (the previous get_neo4j_driver loop)"""
+    last_error = None
+    for uri in uris:
+        try:
+            return open_driver(uri), uri
+        except Exception as e:
+            last_error = e
+    raise last_error
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Neo4j connection scheme selection")
+    parser.add_argument("--timeout", type=float, default=5.0, help="NEO4J_CONNECTION_TIMEOUT for the run")
+    parser.add_argument("--slow-delay", type=float, default=0.5, help="Handshake delay of the slow stand-in")
+    parser.add_argument("--head-start", type=float, default=2.0, help="Head start of the configured URI")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed connections per strategy")
+    args = parser.parse_args()
+    
+    settings.NEO4J_CONNECTION_TIMEOUT = args.timeout
+    hang, slow, good = StandInBolt("hang"), StandInBolt("ok", args.slow_delay), StandInBolt("ok")
+    start_servers([hang, slow, good])
+    
+    uris = [
+        f"neo4j://127.0.0.1:{hang.port}",
+        f"bolt://127.0.0.1:{slow.port}",
+        f"neo4j://127.0.0.1:{good.port}",
+    ]
+    strategies = [
+        ("sequential", lambda: sequential(uris)),
+        ("race", lambda: connect_first(uris)),
+        ("head start", lambda: connect_first(uris, head_start=args.head_start)),
+    ]
+    
+    print(f"\n{'='*60}")
+    print(f"🔌 NEO4J COLD START ({len(uris)} schemes, first one hangs, timeout {args.timeout:.0f}s)")
+    print(f"{'='*60}\n")
+    
+    for label, connect in strategies:
+        samples, winners = [], set()
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            driver, uri = connect()
+            samples.append(time.perf_counter() - start)
+            winners.add(uri.split(":")[-1] == str(good.port) and "good" or "slow")
+            driver.close()
+        print(f"   {label:<12} median {statistics.median(samples) * 1000:9.1f} ms   "
+              f"max {max(samples) * 1000:9.1f} ms   winner {'/'.join(sorted(winners))}")
+    
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Node model benchmark
+
+Compares the slotted node models against the same classes without
+__slots__ (one __dict__ per instance, as before): memory per 100k
+instances, construction rate and to_dict() rate:
+
+    python benchmarks/bench_node_models.py --instances 100000
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.user import SeekerNode, ProviderNode, ServiceNode, VehicleNode
+
+
+def unslotted(cls):
+    """Same __init__ and to_dict, but a plain class with a per-instance __dict__"""
+    return type(f"Unslotted{cls.__name__}", (), {"__init__": cls.__init__, "to_dict": cls.to_dict})
+
+
+def constructor_kwargs(model, i: int):
+    """Constructor kwargs for model, varied by i"""
+    return {
+        SeekerNode: dict(uid=f"seeker-{i}", email=f"s{i}@example.com", full_name=f"Seeker {i}", phone="+923001234567", address="Lahore"),
+        ProviderNode: dict(uid=f"provider-{i}", email=f"p{i}@example.com", full_name=f"Provider {i}", phone="+923001234567", business_name=f"Business {i}", business_type="crane", city="Karachi"),
+        VehicleNode: dict(vehicle_id=f"vehicle-{i}", provider_uid=f"provider-{i}", name="Crane", vehicle_type="Crane", make="XCMG", model="QY25K", year=2019, registration_number=f"LEA-{i}"),
+        ServiceNode: dict(service_id=f"service-{i}", vehicle_id=f"vehicle-{i}", provider_uid=f"provider-{i}", service_name="Crane rental", service_category="Crane", price_per_hour=4500.0, availability_mask=[16777215] * 7),
+    }[model]
+
+
+def measure_rate(fn, count: int) -> float:
+    """Calls per second of fn(i) for i in range(count)"""
+    start = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark slotted vs dict-based node models")
+    parser.add_argument("--instances", type=int, default=100000, help="Instances per measurement")
+    args = parser.parse_args()
+    
+    print(f"\n{'='*60}")
+    print(f"🧱 NODE MODEL BENCHMARK ({args.instances} instances)")
+    print(f"{'='*60}\n")
+    print(f"   {'model':<14} {'variant':<10} {'MB/100k':>9} {'new/s':>11} {'to_dict/s':>11}")
+    
+    for model in (SeekerNode, ProviderNode, VehicleNode, ServiceNode):
+        kwargs = [constructor_kwargs(model, i) for i in range(args.instances)]
+        for variant, cls in (("dict", unslotted(model)), ("slots", model)):
+            gc.collect()
+            tracemalloc.start()
+            base = tracemalloc.get_traced_memory()[0]
+            held = [cls(**item) for item in kwargs]
+            per_instance = (tracemalloc.get_traced_memory()[0] - base) / args.instances
+            tracemalloc.stop()
+            
+            create_rate = measure_rate(lambda i: cls(**kwargs[i]), args.instances)
+            dict_rate = measure_rate(lambda i: held[i].to_dict(), args.instances)
+            print(f"   {model.__name__:<14} {variant:<10} {per_instance * 100000 / 1e6:>9.1f} {create_rate:>11,.0f} {dict_rate:>11,.0f}")
+            del held
+    
+    print("\n   MB/100k includes the instances' own attribute values (timestamps, masks)\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
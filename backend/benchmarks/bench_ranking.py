@@ -0,0 +1,117 @@
+"""
+Ranking stage benchmark
+
+Scores synthetic service candidates with RankingService and reports the
+time spent per stage (column extraction, scoring, top-K selection) against
+a plain Python sort baseline. Runs without Neo4j:
+
+    python benchmarks/bench_ranking.py --candidates 10000 --top-k 50
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ranking_service import RankingService, DEFAULT_WEIGHTS, _build_columns
+
+
+def make_candidates(count: int, seed: int):
+    """Generate candidate dictionaries shaped like get_ranking_candidates()"""
+    rng = random.Random(seed)
+    now = time.time()
+    candidates = []
+    for i in range(count):
+        rating_count = rng.choice([0, 0, 1, 3, 8, 25, 120])
+        rating_sum = sum(rng.randint(1, 5) for _ in range(rating_count))
+        candidates.append({
+            "service": {
+                "service_id": f"svc-{i}",
+                "rating": round(rating_sum / rating_count, 2) if rating_count else 0.0,
+                "rating_sum": float(rating_sum),
+                "rating_count": rating_count,
+                "price_per_hour": rng.choice([None, rng.uniform(800, 25000)]),
+            },
+            "distance_km": round(rng.uniform(0, 50), 2),
+            "provider_verified": rng.random() < 0.3,
+            "touched_epoch": now - rng.uniform(0, 365 * 86400),
+        })
+    return candidates
+
+
+def python_baseline(candidates, top_k, now):
+    """Same weighted score in pure Python with a full sort, for comparison"""
+    prices = [c["service"]["price_per_hour"] for c in candidates if c["service"]["price_per_hour"] is not None]
+    low, high = min(prices), max(prices)
+    top_volume = max(c["service"]["rating_count"] for c in candidates) or 1
+    import math
+    scored = []
+    for c in candidates:
+        s = c["service"]
+        price = 0.5 if s["price_per_hour"] is None else 1 - (s["price_per_hour"] - low) / (high - low)
+        count = s["rating_count"] or (1 if s["rating"] > 0 else 0)
+        total = s["rating_sum"] if s["rating_count"] else s["rating"]
+        score = (
+            DEFAULT_WEIGHTS["distance"] * (1 - c["distance_km"] / 50)
+            + DEFAULT_WEIGHTS["rating"] * ((total + 15) / (count + 5) / 5)
+            + DEFAULT_WEIGHTS["reviews"] * (math.log1p(s["rating_count"]) / math.log1p(top_volume))
+            + DEFAULT_WEIGHTS["price"] * price
+            + DEFAULT_WEIGHTS["freshness"] * 0.5 ** ((now - c["touched_epoch"]) / 86400 / 30)
+            + DEFAULT_WEIGHTS["verified"] * (1.0 if c["provider_verified"] else 0.0)
+        )
+        scored.append((score, c))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return scored[:top_k]
+
+
+def timed(fn, repeats):
+    """Run fn `repeats` times and return per-run milliseconds"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label, samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"   {label:<24} median {statistics.median(samples):8.3f} ms   p95 {p95:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the service ranking stage")
+    parser.add_argument("--candidates", type=int, default=10000, help="Candidate pool size")
+    parser.add_argument("--top-k", type=int, default=50, help="Results returned")
+    parser.add_argument("--repeats", type=int, default=50, help="Timed runs per stage")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for candidates")
+    args = parser.parse_args()
+    
+    candidates = make_candidates(args.candidates, args.seed)
+    ranker = RankingService()
+    now = time.time()
+    
+    print(f"\n{'='*60}")
+    print(f"🏁 RANKING BENCHMARK")
+    print(f"   Candidates: {args.candidates}  Top-K: {args.top_k}  Repeats: {args.repeats}")
+    print(f"{'='*60}\n")
+    
+    report("build columns", timed(lambda: _build_columns(candidates), args.repeats))
+    report("score (numpy)", timed(lambda: ranker.score(candidates, radius_km=50, now=now), args.repeats))
+    report("rank top-K (numpy)", timed(lambda: ranker.rank(candidates, args.top_k, radius_km=50, now=now), args.repeats))
+    report("python sort baseline", timed(lambda: python_baseline(candidates, args.top_k, now), args.repeats))
+    
+    ranked = ranker.rank(candidates, args.top_k, radius_km=50, now=now)
+    baseline = python_baseline(candidates, args.top_k, now)
+    overlap = len({c["service"]["service_id"] for c in ranked} & {c["service"]["service_id"] for _, c in baseline})
+    print(f"\n   Top-{args.top_k} overlap with baseline: {overlap}/{args.top_k}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
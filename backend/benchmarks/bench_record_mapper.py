@@ -0,0 +1,168 @@
+"""
+Record mapper microbenchmark
+
+Converts 1k Neo4j-shaped rows (DateTime timestamps) into GraphQL objects
+with the shared RecordMapper and with the conversion code it replaced
+(per-row iso_format blocks plus Service(**data) / hand-built Provider(...)):
+
+    python benchmarks/bench_record_mapper.py --rows 1000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from neo4j.time import DateTime
+
+from graphql_api.types import Service, Provider
+from models.record_mapper import get_mapper
+
+
+def make_rows(count: int, seed: int):
+    """Service and provider property maps as Neo4j returns them"""
+    rng = random.Random(seed)
+    services, providers = [], []
+    for i in range(count):
+        created = DateTime(2024, rng.randint(1, 12), rng.randint(1, 28), rng.randint(0, 23), 0, 0)
+        services.append({
+            "service_id": f"svc-{i}",
+            "vehicle_id": f"veh-{i}",
+            "provider_uid": f"uid-{i % 200}",
+            "service_name": f"Crane rental {i}",
+            "service_category": "Crane",
+            "description": "Well maintained machine with experienced operator",
+            "price_per_hour": round(rng.uniform(800, 25000), 2),
+            "service_area": rng.choice(["Lahore", "Karachi", "Islamabad", "Multan"]),
+            "rating": round(rng.uniform(0, 5), 2),
+            "is_active": True,
+            "created_at": created,
+            "updated_at": created,
+        })
+        providers.append({
+            "uid": f"uid-{i}",
+            "email": f"provider{i}@example.com",
+            "full_name": f"Provider {i}",
+            "phone": "+923001234567",
+            "user_type": "provider",
+            "business_name": f"Business {i}",
+            "business_type": rng.choice(["harvester", "sand_truck", "brick_truck", "crane"]),
+            "city": "Lahore",
+            "rating": round(rng.uniform(0, 5), 2),
+            "rating_count": rng.randint(0, 50),
+            "is_verified": rng.random() < 0.3,
+            "created_at": created,
+            "updated_at": created,
+        })
+    return services, providers
+
+
+def legacy_service_dict(row):
+    """The removed per-row conversion"""
+    service_data = dict(row)
+    if service_data.get('created_at'):
+        if hasattr(service_data['created_at'], 'iso_format'):
+            service_data['created_at'] = service_data['created_at'].iso_format()
+        elif hasattr(service_data['created_at'], 'isoformat'):
+            service_data['created_at'] = service_data['created_at'].isoformat()
+    if service_data.get('updated_at'):
+        if hasattr(service_data['updated_at'], 'iso_format'):
+            service_data['updated_at'] = service_data['updated_at'].iso_format()
+        elif hasattr(service_data['updated_at'], 'isoformat'):
+            service_data['updated_at'] = service_data['updated_at'].isoformat()
+    return service_data
+
+
+def legacy_service(row):
+    return Service(**legacy_service_dict(row))
+
+
+def legacy_provider(row):
+    """The removed hand-built Provider constructor"""
+    user_data = dict(row)
+    for field in ('created_at', 'updated_at'):
+        if hasattr(user_data[field], 'iso_format'):
+            user_data[field] = user_data[field].iso_format()
+    return Provider(
+        uid=user_data['uid'],
+        email=user_data['email'],
+        full_name=user_data['full_name'],
+        phone=user_data['phone'],
+        user_type=user_data['user_type'],
+        business_name=user_data.get('business_name'),
+        business_type=user_data.get('business_type'),
+        service_type=user_data.get('service_type'),
+        cnic_number=user_data.get('cnic_number'),
+        address=user_data.get('address'),
+        city=user_data.get('city'),
+        province=user_data.get('province'),
+        years_experience=user_data.get('years_experience'),
+        description=user_data.get('description'),
+        profile_image=user_data.get('profile_image'),
+        cnic_front_image=user_data.get('cnic_front_image'),
+        cnic_back_image=user_data.get('cnic_back_image'),
+        license_image=user_data.get('license_image'),
+        license_number=user_data.get('license_number'),
+        is_verified=user_data.get('is_verified', False),
+        documents_uploaded=user_data.get('documents_uploaded', False),
+        verification_status=user_data.get('verification_status', 'pending'),
+        rating=user_data.get('rating'),
+        rating_count=user_data.get('rating_count', 0),
+        total_bookings=user_data.get('total_bookings', 0),
+        created_at=user_data['created_at'],
+        updated_at=user_data['updated_at']
+    )
+
+
+def timed(fn, repeats):
+    """Run fn `repeats` times and return per-run milliseconds"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark record -> GraphQL object mapping")
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per run")
+    parser.add_argument("--repeats", type=int, default=50, help="Timed runs per variant")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+    
+    services, providers = make_rows(args.rows, args.seed)
+    service_mapper = get_mapper("Service", Service)
+    provider_mapper = get_mapper("Provider", Provider)
+    
+    # Same objects either way
+    assert legacy_service(services[0]) == service_mapper.to_object(services[0])
+    assert legacy_provider(providers[0]) == provider_mapper.to_object(providers[0])
+    
+    print(f"\n{'='*60}")
+    print(f"🗺️  RECORD MAPPER BENCHMARK ({args.rows} rows)")
+    print(f"{'='*60}\n")
+    
+    cases = [
+        ("Service legacy", lambda: [legacy_service(row) for row in services]),
+        ("Service mapper", lambda: service_mapper.to_objects(services)),
+        ("Provider legacy", lambda: [legacy_provider(row) for row in providers]),
+        ("Provider mapper", lambda: provider_mapper.to_objects(providers)),
+        ("Service dict legacy", lambda: [legacy_service_dict(row) for row in services]),
+        ("Service dict mapper", lambda: [service_mapper.to_dict(row) for row in services]),
+    ]
+    for label, fn in cases:
+        samples = timed(fn, args.repeats)
+        median = statistics.median(samples)
+        print(f"   {label:<22} median {median:8.3f} ms   {median * 1000 / args.rows:6.2f} µs/row")
+    
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+"""
+Repository benchmark suite
+
+Seeds a local, disposable Neo4j (a stand-in for Aura, e.g.
+`docker run -p 7687:7687 -e NEO4J_AUTH=neo4j/benchmark neo4j:5`) with a
+generated marketplace graph at each --scales size, then times every
+UserRepository / VehicleRepository method at p50/p95/p99:
+
+    python benchmarks/bench_repositories.py --uri bolt://localhost:7687 --password benchmark \\
+        --scales 1000,10000,100000
+
+A scale of N seeds N x the --ratios of seekers and providers (by default N
+seekers and N/10 providers, whose fleets add about 2.2 vehicles and 2.8
+services per provider; see datagen/marketplace.py).
+Results go to benchmarks/results/repositories.json unless --output is given.
+
+Comparing against a stored baseline (exit status 1 on a regression):
+
+    python benchmarks/bench_repositories.py ... --baseline benchmarks/baselines/repositories.json
+    python benchmarks/bench_repositories.py --compare new.json --baseline old.json
+
+The database is wiped before each scale, so non-local URIs are refused
+unless --allow-remote is given.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Any, List, Optional
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset import Volume, load, wipe
+from datagen import CITIES, BUSINESS_TYPES, seeker_uid, provider_uid, vehicle_id, service_id, seeker_email
+
+
+DEFAULT_RATIOS = {"seekers": 1.0, "providers": 0.1}
+
+
+class Case:
+    """One timed repository method"""
+    
+    __slots__ = ("name", "call", "setup", "write")
+    
+    def __init__(self, name: str, call: Callable[[random.Random], Any], setup: Optional[Callable[[random.Random], Any]] = None, write: bool = False):
+        self.name = name
+        self.call = call
+        self.setup = setup
+        self.write = write
+
+
+def neo4j_duplicate(driver) -> Callable[[str, int], str]:
+    """Duplicate-vehicle hook for build_cases: copies a vehicle in Neo4j, returns its owner's uid"""
+    def duplicate(original_id: str, n: int) -> str:
+        with driver.session() as session:
+            return session.run("""
+            MATCH (p:Provider)-[:OWNS]->(v:Vehicle {vehicle_id: $vehicle_id})
+            CREATE (d:Vehicle) SET d = properties(v), d.vehicle_id = v.vehicle_id + '-dup-' + $n
+            CREATE (p)-[:OWNS]->(d)
+            RETURN p.uid AS uid
+            """, vehicle_id=original_id, n=str(n)).single()["uid"]
+    return duplicate
+
+
+def build_cases(volume: Volume, users, vehicles, duplicate: Callable[[str, int], str]) -> List[Case]:
+    """
+    Every benchmarked method, each called with a random existing node
+    
+    Writes only touch generated nodes; remove_duplicate_vehicles gets a
+    fresh duplicate (created untimed in its setup by `duplicate`) before
+    every call and may delete the original instead, so it runs last.
+    
+    Args:
+        volume: Seeded dataset
+        users: UserRepository or another UserStore
+        vehicles: VehicleRepository or another VehicleStore
+        duplicate: Copies a vehicle (id, sequence number) and returns its owner's uid
+    """
+    def seeker(rng):
+        return seeker_uid(rng.randrange(volume.seekers))
+    
+    def provider(rng):
+        return provider_uid(rng.randrange(volume.providers))
+    
+    def vehicle(rng):
+        return vehicle_id(rng.randrange(volume.vehicles))
+    
+    def service(rng):
+        return service_id(rng.randrange(volume.services))
+    
+    def city(rng):
+        return CITIES[rng.randrange(len(CITIES))]
+    
+    def nearby(rng):
+        _, _, latitude, longitude = city(rng)[:4]
+        return users.get_nearby_services(latitude, longitude, radius_km=25)
+    
+    def ranking_candidates(rng):
+        _, _, latitude, longitude = city(rng)[:4]
+        return users.get_ranking_candidates(latitude=latitude, longitude=longitude, radius_km=50)
+    
+    duplicate_owner: Dict[str, Any] = {"created": 0}
+    
+    def add_duplicate(rng):
+        duplicate_owner["created"] += 1
+        duplicate_owner["uid"] = duplicate(vehicle_id(rng.randrange(volume.vehicles)), duplicate_owner["created"])
+    
+    return [
+        Case("UserRepository.get_user_by_uid", lambda rng: users.get_user_by_uid(rng.choice([seeker, provider])(rng))),
+        Case("UserRepository.get_user_by_email", lambda rng: users.get_user_by_email(seeker_email(rng.randrange(volume.seekers)))),
+        Case("UserRepository.user_exists", lambda rng: users.user_exists(uid=seeker(rng))),
+        Case("UserRepository.get_all_seekers", lambda rng: users.get_all_seekers(limit=100, skip=rng.randrange(max(1, volume.seekers - 100)))),
+        Case("UserRepository.get_all_providers", lambda rng: users.get_all_providers(limit=100, skip=rng.randrange(max(1, volume.providers - 100)))),
+        Case("UserRepository.search_providers", lambda rng: users.search_providers(business_type=rng.choice(list(BUSINESS_TYPES)), min_rating=3.0)),
+        Case("UserRepository.get_provider_vehicles", lambda rng: users.get_provider_vehicles(provider(rng))),
+        Case("UserRepository.get_vehicle_by_id", lambda rng: users.get_vehicle_by_id(vehicle(rng))),
+        Case("UserRepository.get_vehicle_services", lambda rng: users.get_vehicle_services(vehicle(rng))),
+        Case("UserRepository.get_provider_services", lambda rng: users.get_provider_services(provider(rng))),
+        Case("UserRepository.get_service_by_id", lambda rng: users.get_service_by_id(service(rng))),
+        Case("UserRepository.get_active_services", lambda rng: users.get_active_services()),
+        Case("UserRepository.get_active_services.category", lambda rng: users.get_active_services(
+            category=rng.choice(list(BUSINESS_TYPES.values()))["category"], service_area=city(rng)[0])),
+        Case("UserRepository.get_active_services_by_provider", lambda rng: users.get_active_services_by_provider(provider(rng))),
+        Case("UserRepository.get_nearby_services", nearby),
+        Case("UserRepository.get_ranking_candidates", ranking_candidates),
+        Case("UserRepository.get_similar_seekers", lambda rng: users.get_similar_seekers(seeker(rng))),
+        Case("UserRepository.update_seeker_profile", lambda rng: users.update_seeker_profile(
+            seeker(rng), {"bio": f"benchmark {rng.random()}"}), write=True),
+        Case("UserRepository.create_seeker_similarity_relationships", lambda rng: users.create_seeker_similarity_relationships(seeker(rng)), write=True),
+        Case("VehicleRepository.get_provider_vehicles", lambda rng: vehicles.get_provider_vehicles(provider(rng))),
+        Case("VehicleRepository.get_vehicle_by_id", lambda rng: vehicles.get_vehicle_by_id(vehicle(rng))),
+        Case("VehicleRepository.check_vehicle_availability", lambda rng: vehicles.check_vehicle_availability(vehicle(rng))),
+        Case("VehicleRepository.update_vehicle_availability", lambda rng: vehicles.update_vehicle_availability(
+            vehicle(rng), rng.random() < 0.9), write=True),
+        Case("VehicleRepository.remove_duplicate_vehicles", lambda rng: vehicles.remove_duplicate_vehicles(
+            duplicate_owner["uid"]), setup=add_duplicate, write=True),
+    ]
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted samples"""
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def run_case(case: Case, repeats: int, seed: int) -> Dict[str, float]:
+    """Time `repeats` calls (after two untimed warm-up calls); milliseconds"""
+    rng = random.Random(f"{seed}:{case.name}")
+    samples = []
+    for i in range(repeats + 2):
+        if case.setup is not None:
+            case.setup(rng)
+        start = time.perf_counter()
+        case.call(rng)
+        elapsed = (time.perf_counter() - start) * 1000
+        if i >= 2:
+            samples.append(elapsed)
+    samples.sort()
+    return {
+        "calls": len(samples),
+        "p50_ms": round(percentile(samples, 0.50), 3),
+        "p95_ms": round(percentile(samples, 0.95), 3),
+        "p99_ms": round(percentile(samples, 0.99), 3),
+        "mean_ms": round(sum(samples) / len(samples), 3),
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> int:
+    """
+    Print p50/p95 changes per scale and method against the baseline
+    
+    Returns:
+        int: Number of regressions (p50 or p95 slower by more than tolerance)
+    """
+    regressions = 0
+    print(f"\n{'='*60}")
+    print(f"📊 COMPARISON WITH BASELINE ({baseline['meta'].get('created_at', '?')}, tolerance {tolerance:.0%})")
+    print(f"{'='*60}")
+    for scale, result in current["scales"].items():
+        base_methods = baseline["scales"].get(scale, {}).get("methods")
+        if not base_methods:
+            print(f"\n   scale {scale}: not in baseline")
+            continue
+        print(f"\n   scale {scale}")
+        for method, stats in result["methods"].items():
+            base = base_methods.get(method)
+            if base is None:
+                print(f"   {'':2} {method:<58} new")
+                continue
+            changes = {key: stats[key] / base[key] - 1 if base[key] else 0.0 for key in ("p50_ms", "p95_ms")}
+            regressed = any(change > tolerance for change in changes.values())
+            regressions += regressed
+            print(f"   {'❌' if regressed else '  '} {method:<58} p50 {base['p50_ms']:9.2f} -> {stats['p50_ms']:9.2f} ms ({changes['p50_ms']:+6.1%})"
+                  f"   p95 {base['p95_ms']:9.2f} -> {stats['p95_ms']:9.2f} ms ({changes['p95_ms']:+6.1%})")
+    print(f"\n   {'❌' if regressions else '✅'} {regressions} regressions\n")
+    return regressions
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark repository methods on seeded datasets")
+    parser.add_argument("--uri", default=os.environ.get("BENCH_NEO4J_URI", "bolt://localhost:7687"), help="Disposable local Neo4j")
+    parser.add_argument("--user", default=os.environ.get("BENCH_NEO4J_USERNAME", "neo4j"))
+    parser.add_argument("--password", default=os.environ.get("BENCH_NEO4J_PASSWORD", "benchmark"))
+    parser.add_argument("--scales", default="1000,10000", help="Comma-separated dataset scales")
+    parser.add_argument("--ratios", default=",".join(f"{kind}={ratio}" for kind, ratio in DEFAULT_RATIOS.items()),
+                        help="Nodes of each kind per unit of scale")
+    parser.add_argument("--repeats", type=int, default=100, help="Timed calls per read method")
+    parser.add_argument("--write-repeats", type=int, default=20, help="Timed calls per write method")
+    parser.add_argument("--seed", type=int, default=42, help="Dataset and call-sequence seed")
+    parser.add_argument("--only", help="Comma-separated substrings; time matching methods only")
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "repositories.json"),
+                        help="Results JSON file")
+    parser.add_argument("--baseline", help="Baseline results JSON to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before a change counts as a regression")
+    parser.add_argument("--compare", metavar="RESULTS", help="Compare a saved results file with --baseline, without running")
+    parser.add_argument("--allow-remote", action="store_true", help="Allow a non-local URI (its data is deleted)")
+    args = parser.parse_args()
+    
+    if args.compare:
+        if not args.baseline:
+            parser.error("--compare needs --baseline")
+        with open(args.compare) as current, open(args.baseline) as baseline:
+            return 1 if compare(json.load(current), json.load(baseline), args.tolerance) else 0
+    
+    if urlparse(args.uri).hostname not in ("localhost", "127.0.0.1", "::1") and not args.allow_remote:
+        parser.error(f"{args.uri} is not local and would be wiped; pass --allow-remote if it is disposable")
+    
+    # The repositories connect through settings
+    os.environ["NEO4J_URI"] = args.uri
+    os.environ["NEO4J_USERNAME"] = args.user
+    os.environ["NEO4J_PASSWORD"] = args.password
+    from config.neo4j_config import get_neo4j_driver, close_neo4j_driver
+    from repositories.user_repository import UserRepository
+    from repositories.vehicle_repository import VehicleRepository
+    
+    ratios = dict(DEFAULT_RATIOS)
+    for pair in filter(None, args.ratios.split(",")):
+        kind, _, ratio = pair.partition("=")
+        ratios[kind.strip()] = float(ratio)
+    scales = [int(scale) for scale in args.scales.split(",")]
+    only = [part.strip() for part in args.only.split(",")] if args.only else None
+    
+    driver = get_neo4j_driver()
+    results = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "neo4j": driver.get_server_info().agent,
+            "seed": args.seed,
+            "repeats": args.repeats,
+            "write_repeats": args.write_repeats,
+            "ratios": ratios,
+        },
+        "scales": {},
+    }
+    
+    print(f"\n{'='*60}")
+    print(f"🏋️  REPOSITORY BENCHMARK")
+    print(f"   Neo4j: {args.uri} ({results['meta']['neo4j']})")
+    print(f"   Scales: {scales}  Repeats: {args.repeats} reads / {args.write_repeats} writes")
+    print(f"{'='*60}")
+    
+    for scale in scales:
+        volume = Volume.from_scale(scale, ratios)
+        start = time.perf_counter()
+        wipe(driver)
+        created = load(driver, volume, seed=args.seed)
+        load_seconds = time.perf_counter() - start
+        print(f"\n   scale {scale}: seeded {created} in {load_seconds:.1f}s")
+        
+        methods = {}
+        for case in build_cases(volume, UserRepository(), VehicleRepository(), neo4j_duplicate(driver)):
+            if only and not any(part in case.name for part in only):
+                continue
+            # The repositories print a banner per call
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                stats = run_case(case, args.write_repeats if case.write else args.repeats, args.seed)
+            methods[case.name] = stats
+            print(f"   {case.name:<60} p50 {stats['p50_ms']:9.2f}   p95 {stats['p95_ms']:9.2f}   p99 {stats['p99_ms']:9.2f} ms")
+        
+        results["scales"][str(scale)] = {"volume": volume.to_dict(), "load_seconds": round(load_seconds, 2), "methods": methods}
+    
+    close_neo4j_driver()
+    
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2)
+    print(f"\n   Results written to {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            return 1 if compare(results, json.load(baseline), args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
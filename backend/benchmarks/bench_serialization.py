@@ -0,0 +1,104 @@
+"""
+Response serialization benchmark
+
+Encodes GraphQL-shaped responses (lists of services with Neo4j DateTime
+timestamps) with the stdlib json module and with the orjson encoder used by
+ORJSONGraphQLRouter / ORJSONResponse, and reports time and size per payload:
+
+    python benchmarks/bench_serialization.py --rows 10 100 1000 5000
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from neo4j.time import DateTime
+
+from graphql_api.serialization import dumps
+
+
+CATEGORIES = ["Excavator", "Crane", "Loader", "Bulldozer", "Dump Truck"]
+CITIES = ["Lahore", "Karachi", "Islamabad", "Rawalpindi", "Faisalabad", "Multan"]
+
+
+def stdlib_default(value):
+    """What the code did before: convert Neo4j values by hand"""
+    if hasattr(value, "iso_format"):
+        return value.iso_format()
+    return str(value)
+
+
+def make_response(rows: int, seed: int):
+    """GraphQL response with `rows` services, timestamps left as Neo4j DateTime"""
+    rng = random.Random(seed)
+    services = []
+    for i in range(rows):
+        created = DateTime(2024, rng.randint(1, 12), rng.randint(1, 28), rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 59))
+        services.append({
+            "serviceId": f"svc-{i}",
+            "providerUid": f"uid-{rng.randint(1, rows // 5 + 1)}",
+            "serviceName": f"{rng.choice(CATEGORIES)} rental {i}",
+            "serviceCategory": rng.choice(CATEGORIES),
+            "description": "Well maintained machine with experienced operator. " * 2,
+            "pricePerHour": round(rng.uniform(800, 25000), 2),
+            "pricePerDay": round(rng.uniform(6000, 180000), 2),
+            "serviceArea": rng.choice(CITIES),
+            "latitude": round(rng.uniform(24.8, 34.0), 6),
+            "longitude": round(rng.uniform(67.0, 74.4), 6),
+            "availabilityMask": [rng.randint(0, (1 << 24) - 1) for _ in range(7)],
+            "rating": round(rng.uniform(0, 5), 2),
+            "totalBookings": rng.randint(0, 400),
+            "isActive": True,
+            "createdAt": created,
+            "updatedAt": created,
+        })
+    return {"data": {"activeServices": services}}
+
+
+def timed(fn, repeats):
+    """Run fn `repeats` times and return per-run milliseconds"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark json vs orjson response encoding")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 100, 1000, 5000], help="Services per response")
+    parser.add_argument("--repeats", type=int, default=30, help="Timed runs per encoder")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+    
+    print(f"\n{'='*60}")
+    print(f"🧾 SERIALIZATION BENCHMARK")
+    print(f"{'='*60}\n")
+    print(f"   {'rows':>6} {'json ms':>10} {'orjson ms':>10} {'speedup':>8} {'bytes':>10}")
+    
+    for rows in args.rows:
+        response = make_response(rows, args.seed)
+        
+        stdlib = timed(lambda: json.dumps(response, default=stdlib_default).encode("utf-8"), args.repeats)
+        fast = timed(lambda: dumps(response), args.repeats)
+        
+        # Both encoders must produce the same document
+        assert json.loads(dumps(response)) == json.loads(json.dumps(response, default=stdlib_default))
+        
+        json_ms = statistics.median(stdlib)
+        orjson_ms = statistics.median(fast)
+        print(f"   {rows:>6} {json_ms:>10.3f} {orjson_ms:>10.3f} {json_ms / orjson_ms:>7.1f}x {len(dumps(response)):>10}")
+    
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
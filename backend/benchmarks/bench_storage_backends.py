@@ -0,0 +1,180 @@
+"""
+Storage backend benchmark
+What the graph database costs over the embedded engine, per repository method
+
+Seeds the same generated marketplace graph (same --seed) into a local,
+disposable Neo4j and into an embedded graph on a temporary SQLite file,
+then times bench_repositories' cases against UserRepository /
+VehicleRepository and EmbeddedUserRepository / EmbeddedVehicleRepository:
+
+    python benchmarks/bench_storage_backends.py --uri bolt://localhost:7687 --password benchmark \\
+        --scales 1000,10000
+
+    # Embedded engine only (no Neo4j needed)
+    python benchmarks/bench_storage_backends.py --embedded-only --scales 1000,10000,100000
+
+The table shows p50/p95 per backend and the Neo4j / embedded p50 ratio.
+Results go to benchmarks/results/storage_backends.json unless --output is
+given. The Neo4j database is wiped before each scale, so non-local URIs
+are refused unless --allow-remote is given.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Any, Optional
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset import Volume, load, load_embedded, wipe
+from bench_repositories import DEFAULT_RATIOS, build_cases, neo4j_duplicate, run_case, git_commit
+
+
+def embedded_duplicate(graph) -> Callable[[str, int], str]:
+    """Duplicate-vehicle hook for build_cases on the embedded graph"""
+    def duplicate(original_id: str, n: int) -> str:
+        with graph.transaction():
+            original = graph.node("Vehicle", original_id)
+            owner = graph.owner[original_id]
+            copy = graph.create("Vehicle", dict(original, vehicle_id=f"{original_id}-dup-{n}"))
+            graph.relate("OWNS", owner, copy["vehicle_id"])
+        return owner
+    return duplicate
+
+
+def time_cases(cases, args, only) -> Dict[str, Dict[str, float]]:
+    methods = {}
+    for case in cases:
+        if only and not any(part in case.name for part in only):
+            continue
+        # The repositories print a banner per call
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            methods[case.name] = run_case(case, args.write_repeats if case.write else args.repeats, args.seed)
+    return methods
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare repository latency on Neo4j and on the embedded engine")
+    parser.add_argument("--uri", default=os.environ.get("BENCH_NEO4J_URI", "bolt://localhost:7687"), help="Disposable local Neo4j")
+    parser.add_argument("--user", default=os.environ.get("BENCH_NEO4J_USERNAME", "neo4j"))
+    parser.add_argument("--password", default=os.environ.get("BENCH_NEO4J_PASSWORD", "benchmark"))
+    parser.add_argument("--embedded-only", action="store_true", help="Benchmark the embedded engine alone")
+    parser.add_argument("--scales", default="1000,10000", help="Comma-separated dataset scales")
+    parser.add_argument("--repeats", type=int, default=100, help="Timed calls per read method")
+    parser.add_argument("--write-repeats", type=int, default=20, help="Timed calls per write method")
+    parser.add_argument("--seed", type=int, default=42, help="Dataset and call-sequence seed")
+    parser.add_argument("--only", help="Comma-separated substrings; time matching methods only")
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "storage_backends.json"),
+                        help="Results JSON file")
+    parser.add_argument("--allow-remote", action="store_true", help="Allow a non-local URI (its data is deleted)")
+    args = parser.parse_args()
+    
+    use_neo4j = not args.embedded_only
+    if use_neo4j and urlparse(args.uri).hostname not in ("localhost", "127.0.0.1", "::1") and not args.allow_remote:
+        parser.error(f"{args.uri} is not local and would be wiped; pass --allow-remote if it is disposable")
+    
+    # Settings need a Neo4j URI even when only the embedded engine runs
+    os.environ["NEO4J_URI"] = args.uri
+    os.environ["NEO4J_USERNAME"] = args.user
+    os.environ["NEO4J_PASSWORD"] = args.password
+    from repositories.embedded_graph import EmbeddedGraph
+    from repositories.embedded_repository import EmbeddedUserRepository, EmbeddedVehicleRepository
+    
+    driver = None
+    if use_neo4j:
+        from config.neo4j_config import get_neo4j_driver
+        from repositories.user_repository import UserRepository
+        from repositories.vehicle_repository import VehicleRepository
+        driver = get_neo4j_driver()
+    
+    scales = [int(scale) for scale in args.scales.split(",")]
+    only = [part.strip() for part in args.only.split(",")] if args.only else None
+    results = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "neo4j": driver.get_server_info().agent if driver else None,
+            "seed": args.seed,
+            "repeats": args.repeats,
+            "write_repeats": args.write_repeats,
+        },
+        "scales": {},
+    }
+    
+    print(f"\n{'='*60}")
+    print(f"🏋️  STORAGE BACKEND BENCHMARK")
+    print(f"   Neo4j: {args.uri + ' (' + results['meta']['neo4j'] + ')' if driver else 'skipped'}")
+    print(f"   Scales: {scales}  Repeats: {args.repeats} reads / {args.write_repeats} writes")
+    print(f"{'='*60}")
+    
+    for scale in scales:
+        scale_result: Dict[str, Any] = {}
+        backends: Dict[str, Dict[str, Dict[str, float]]] = {}
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bench.sqlite")
+            graph = EmbeddedGraph(path)
+            volume = Volume.from_scale(scale, DEFAULT_RATIOS)
+            start = time.perf_counter()
+            created = load_embedded(graph, volume, seed=args.seed)
+            scale_result["embedded_load_seconds"] = round(time.perf_counter() - start, 2)
+            graph.close()
+            
+            # Startup cost of the embedded engine: reading the file back into memory
+            start = time.perf_counter()
+            graph = EmbeddedGraph(path)
+            scale_result["embedded_open_seconds"] = round(time.perf_counter() - start, 2)
+            scale_result["embedded_file_mb"] = round(os.path.getsize(path) / 1e6, 1)
+            print(f"\n   scale {scale}: {created}")
+            print(f"   embedded: seeded in {scale_result['embedded_load_seconds']}s, "
+                  f"reopened in {scale_result['embedded_open_seconds']}s, {scale_result['embedded_file_mb']} MB")
+            
+            cases = build_cases(volume, EmbeddedUserRepository(graph), EmbeddedVehicleRepository(graph), embedded_duplicate(graph))
+            backends["embedded"] = time_cases(cases, args, only)
+            graph.close()
+        
+        if driver is not None:
+            neo4j_volume = Volume.from_scale(scale, DEFAULT_RATIOS)
+            start = time.perf_counter()
+            wipe(driver)
+            load(driver, neo4j_volume, seed=args.seed)
+            scale_result["neo4j_load_seconds"] = round(time.perf_counter() - start, 2)
+            print(f"   neo4j: seeded in {scale_result['neo4j_load_seconds']}s")
+            
+            cases = build_cases(neo4j_volume, UserRepository(), VehicleRepository(), neo4j_duplicate(driver))
+            backends["neo4j"] = time_cases(cases, args, only)
+        
+        print(f"\n   {'method':<58} {'embedded p50/p95':>20} {'neo4j p50/p95':>20} {'ratio':>8}")
+        for method, embedded in backends["embedded"].items():
+            neo4j: Optional[Dict[str, float]] = backends.get("neo4j", {}).get(method)
+            line = f"   {method:<58} {embedded['p50_ms']:9.3f} {embedded['p95_ms']:9.3f} ms"
+            if neo4j is not None:
+                ratio = neo4j["p50_ms"] / embedded["p50_ms"] if embedded["p50_ms"] else float("inf")
+                line += f" {neo4j['p50_ms']:9.2f} {neo4j['p95_ms']:9.2f} ms {ratio:7.1f}x"
+            print(line)
+        
+        scale_result["volume"] = volume.to_dict()
+        scale_result["methods"] = backends
+        results["scales"][str(scale)] = scale_result
+    
+    if driver is not None:
+        from config.neo4j_config import close_neo4j_driver
+        close_neo4j_driver()
+    
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2)
+    print(f"\n   Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
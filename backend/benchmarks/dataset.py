@@ -0,0 +1,78 @@
+"""
+Benchmark dataset
+Seeded marketplace graphs for the repository benchmarks
+
+The graph comes from datagen, the generator behind generate_data.py, so
+the benchmarks run on production-shaped data: city clusters, skewed fleet
+sizes, sparse ratings. IDs are positional ("seeker-0000042"), so a
+benchmark can pick random existing nodes from the Volume alone, without
+reading them back.
+"""
+
+from typing import Dict, Any
+
+from datagen import MarketplaceSpec, generate, Neo4jWriter, EmbeddedWriter
+
+
+class Volume:
+    """Number of nodes of each kind in one dataset"""
+    
+    __slots__ = ("seekers", "providers", "vehicles", "services", "duplicate_rate")
+    
+    def __init__(self, seekers: int, providers: int, duplicate_rate: float = 0.02):
+        self.seekers = seekers
+        self.providers = max(1, providers)
+        # Follow from the generated fleets; known once load() has run
+        self.vehicles = 0
+        self.services = 0
+        self.duplicate_rate = duplicate_rate
+    
+    @classmethod
+    def from_scale(cls, scale: int, ratios: Dict[str, float]) -> "Volume":
+        """Volume with seekers and providers a ratio of `scale`"""
+        return cls(seekers=int(scale * ratios["seekers"]), providers=int(scale * ratios["providers"]))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+def wipe(driver) -> None:
+    """Delete every node and relationship (only ever on a disposable database)"""
+    with driver.session() as session:
+        session.run("MATCH (n) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS").consume()
+
+
+def load(driver, volume: Volume, seed: int = 42, batch_size: int = 5000) -> Dict[str, int]:
+    """
+    Create indexes, then generate and write the volume's graph
+    
+    Fills in volume.vehicles and volume.services.
+    
+    Returns:
+        dict: Nodes created per label
+    """
+    spec = MarketplaceSpec(volume.seekers, volume.providers, seed=seed, duplicate_rate=volume.duplicate_rate)
+    with Neo4jWriter(driver, batch_size=batch_size) as writer:
+        writer.create_indexes()
+        for label, row in generate(spec):
+            writer.write(label, row)
+    volume.vehicles = writer.counts["Vehicle"]
+    volume.services = writer.counts["Service"]
+    return dict(writer.counts)
+
+
+def load_embedded(graph, volume: Volume, seed: int = 42, batch_size: int = 5000) -> Dict[str, int]:
+    """
+    Generate and write the volume's graph into an EmbeddedGraph (the same
+    graph load() writes to Neo4j for the same seed)
+    
+    Returns:
+        dict: Nodes created per label
+    """
+    spec = MarketplaceSpec(volume.seekers, volume.providers, seed=seed, duplicate_rate=volume.duplicate_rate)
+    with EmbeddedWriter(graph, batch_size=batch_size) as writer:
+        for label, row in generate(spec):
+            writer.write(label, row)
+    volume.vehicles = writer.counts["Vehicle"]
+    volume.services = writer.counts["Service"]
+    return dict(writer.counts)
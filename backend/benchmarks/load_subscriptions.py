@@ -0,0 +1,134 @@
+"""
+Subscription fan-out load test
+
+Opens --subscribers idle subscriptions on the in-process event broker (as
+WebSocket clients would hold them), then measures memory per subscriber,
+the cost of a targeted publish with everyone else idle, and a broadcast
+that reaches every subscriber:
+
+    python benchmarks/load_subscriptions.py --subscribers 10000
+
+--schema runs every subscription through the Strawberry schema
+(schema.subscribe) instead of the raw broker, to include resolver overhead.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.event_broker import (
+    EventBroker, MemoryBackend, topic_key, publish_profile_updated, publish_service_changed,
+    SERVICE_CHANGED, PROFILE_UPDATED
+)
+import services.event_broker as event_broker_module
+
+
+PROFILE_SUBSCRIPTION = "subscription ($uid: String!) { profileUpdated(uid: $uid) { uid changedFields } }"
+SERVICE_SUBSCRIPTION = "subscription { serviceChanged { action serviceId } }"
+
+
+async def consume(stream, received: list, done: asyncio.Event, expected: int):
+    async for _ in stream:
+        received[0] += 1
+        if received[0] >= expected:
+            done.set()
+
+
+def open_stream(broker: EventBroker, index: int, use_schema: bool):
+    """Subscriber i watches its own profile; every 10th also watches all services"""
+    if use_schema:
+        from graphql_api.schema import schema
+        if index % 10 == 0:
+            return schema.subscribe(SERVICE_SUBSCRIPTION)
+        return schema.subscribe(PROFILE_SUBSCRIPTION, variable_values={"uid": f"user-{index}"})
+    if index % 10 == 0:
+        return broker.subscribe(topic_key(SERVICE_CHANGED, None, None))
+    return broker.subscribe(topic_key(PROFILE_UPDATED, f"user-{index}"))
+
+
+async def run(subscribers: int, rounds: int, use_schema: bool):
+    broker = EventBroker(MemoryBackend(), queue_size=64)
+    event_broker_module._broker = broker
+    await broker.start()
+
+    broadcast_receivers = len(range(0, subscribers, 10))
+    received = [0]
+    done = asyncio.Event()
+
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    start = time.perf_counter()
+
+    streams = []
+    for i in range(subscribers):
+        stream = open_stream(broker, i, use_schema)
+        if use_schema:
+            stream = await stream
+        streams.append(stream)
+    tasks = [asyncio.create_task(consume(stream, received, done, broadcast_receivers)) for stream in streams]
+    # Let every consumer reach its first await so it is registered
+    while broker.subscriber_count < subscribers:
+        await asyncio.sleep(0.01)
+
+    subscribe_seconds = time.perf_counter() - start
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in snapshot.compare_to(baseline, "filename"))
+
+    print(f"\n{'='*60}")
+    print(f"📡 SUBSCRIPTION LOAD TEST ({'schema' if use_schema else 'broker'})")
+    print(f"   Subscribers: {subscribers}  Broadcast receivers: {broadcast_receivers}")
+    print(f"{'='*60}\n")
+    print(f"   Subscribe all:           {subscribe_seconds * 1000:10.1f} ms")
+    print(f"   Memory per subscriber:   {allocated / subscribers / 1024:10.2f} KiB")
+
+    # Targeted: one profile subscriber out of N idle ones
+    targeted = []
+    for r in range(rounds):
+        uid = f"user-{(r * 7919) % subscribers or 1}"
+        t0 = time.perf_counter()
+        await publish_profile_updated(uid, "seeker", ["full_name"])
+        targeted.append((time.perf_counter() - t0) * 1000)
+    await asyncio.sleep(0)
+    print(f"   Targeted publish:        {statistics.median(targeted):10.3f} ms median")
+
+    # Broadcast: every 10th subscriber receives, measured until all have
+    broadcast = []
+    for _ in range(rounds):
+        received[0] = 0
+        done.clear()
+        t0 = time.perf_counter()
+        await publish_service_changed("updated", {
+            "service_id": "svc-1", "provider_uid": "p-1",
+            "service_category": "Crane", "service_area": "Lahore",
+        })
+        await asyncio.wait_for(done.wait(), timeout=30)
+        broadcast.append((time.perf_counter() - t0) * 1000)
+    print(f"   Broadcast (all receivers):{statistics.median(broadcast):9.3f} ms median")
+    print(f"   Broker stats:            {broker.stats}\n")
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await broker.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test GraphQL subscription fan-out")
+    parser.add_argument("--subscribers", type=int, default=10000, help="Idle subscribers to open")
+    parser.add_argument("--rounds", type=int, default=20, help="Publishes per measurement")
+    parser.add_argument("--schema", action="store_true", help="Subscribe through the Strawberry schema")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.subscribers, args.rounds, args.schema))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
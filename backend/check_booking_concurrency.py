@@ -0,0 +1,86 @@
+"""
+Check that parallel reservations of the same vehicle can't double-book
+
+Fires --workers concurrent reserve() calls for one overlapping time range
+(each with its own repository, as separate requests would) and verifies
+exactly one succeeds. Test bookings are cancelled afterwards:
+
+    python check_booking_concurrency.py --vehicle-id <id> --seeker-uid <uid> [--workers 20]
+"""
+
+import argparse
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from models.user import BookingNode
+from repositories.booking_repository import BookingRepository, BookingConflictError
+
+
+def attempt(vehicle_id: str, seeker_uid: str, start: datetime, end: datetime):
+    """One reservation attempt; returns the booking or the exception"""
+    booking = BookingNode(
+        booking_id=str(uuid.uuid4()),
+        vehicle_id=vehicle_id,
+        seeker_uid=seeker_uid,
+        start_time=start,
+        end_time=end,
+        notes="check_booking_concurrency"
+    )
+    try:
+        return BookingRepository().reserve(booking)
+    except Exception as e:
+        return e
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Verify reserve() under parallel requests")
+    parser.add_argument("--vehicle-id", required=True, help="Existing vehicle to book")
+    parser.add_argument("--seeker-uid", required=True, help="Existing seeker to book as")
+    parser.add_argument("--workers", type=int, default=20, help="Parallel reservations (default: 20)")
+    args = parser.parse_args()
+    
+    # A far-future window that won't collide with real bookings
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) + timedelta(days=3650)
+    
+    print("\n" + "="*60)
+    print("🔍 CHECKING BOOKING CONCURRENCY")
+    print(f"   Vehicle: {args.vehicle_id}  Workers: {args.workers}")
+    print("="*60 + "\n")
+    
+    # Staggered overlapping windows: every pair overlaps, so only one may win
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(
+                attempt, args.vehicle_id, args.seeker_uid,
+                start + timedelta(minutes=i), start + timedelta(hours=2, minutes=i)
+            )
+            for i in range(args.workers)
+        ]
+        outcomes = [future.result() for future in futures]
+    
+    winners = [outcome for outcome in outcomes if isinstance(outcome, dict)]
+    conflicts = [outcome for outcome in outcomes if isinstance(outcome, BookingConflictError)]
+    errors = [outcome for outcome in outcomes if isinstance(outcome, Exception) and outcome not in conflicts]
+    
+    print(f"Confirmed: {len(winners)}")
+    print(f"Rejected as conflicts: {len(conflicts)}")
+    print(f"Other errors: {len(errors)}")
+    for error in errors[:5]:
+        print(f"   {type(error).__name__}: {error}")
+    
+    booking_repo = BookingRepository()
+    for booking in winners:
+        booking_repo.cancel_booking(booking["booking_id"], args.seeker_uid)
+    
+    if len(winners) == 1 and not errors:
+        print("\n✅ Exactly one reservation won\n")
+        return 0
+    print("\n❌ Expected exactly one confirmed reservation\n")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
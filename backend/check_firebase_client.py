@@ -0,0 +1,195 @@
+"""
+Check the async Firebase client's loop behaviour, retries and circuit breaker
+
+Runs AsyncFirebase (config.firebase_async) against simulated Admin SDK
+calls, so no credentials or network are needed:
+
+- loop: --calls concurrent 200 ms blocking calls while a ticker measures how
+  late the event loop wakes up (it must stay responsive)
+- retries: a call that is unreachable twice, then succeeds
+- refusal: a refused request is raised at once and does not trip the breaker
+- breaker: a dead Firebase opens the circuit, calls then fail fast, and one
+  trial call after the reset period closes it again
+- timeout: attempts queued behind busy threads are dropped, not run late
+
+    python check_firebase_client.py [--calls 40]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+os.environ.setdefault("NEO4J_USERNAME", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "unused")
+
+from config.firebase_async import AsyncFirebase, CircuitBreaker, FirebaseUnavailableError
+
+
+def blocking(seconds: float):
+    """A simulated SDK call holding its thread for `seconds`"""
+    def call():
+        time.sleep(seconds)
+        return "ok"
+    return call
+
+
+class Flaky:
+    """Simulated SDK call failing with `error` for the first `failures` calls"""
+    
+    def __init__(self, failures: int, error: Exception):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+        self._lock = threading.Lock()
+    
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            if self.calls <= self.failures:
+                raise self.error
+        return "ok"
+
+
+async def max_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Largest delay, in seconds, between when the ticker should wake and when it did"""
+    lag = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = max(lag, time.perf_counter() - start - interval)
+    return lag
+
+
+async def check_loop(calls: int, failures: list) -> None:
+    client = AsyncFirebase(max_workers=8, timeout=30.0, retry_delay=0.01)
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(max_loop_lag(stop))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(client._call("simulated", blocking(0.2)) for _ in range(calls)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    lag = await ticker
+    client.shutdown()
+    
+    expected = -(-calls // client.max_workers) * 0.2
+    print(f"   loop: {calls} blocking calls in {elapsed:.2f}s (8 threads, ideal {expected:.2f}s), "
+          f"max loop lag {lag * 1000:.1f} ms")
+    if results.count("ok") != calls:
+        failures.append("loop: not every call returned")
+    if lag > 0.05:
+        failures.append(f"loop: event loop blocked for {lag * 1000:.0f} ms")
+
+
+async def check_retries(failures: list) -> None:
+    client = AsyncFirebase(max_retries=3, retry_delay=0.01)
+    flaky = Flaky(2, ConnectionError("Connection aborted"))
+    result = await client._call("simulated", flaky)
+    client.shutdown()
+    print(f"   retries: {result!r} after {flaky.calls} attempts, circuit {client.breaker.state}")
+    if result != "ok" or flaky.calls != 3:
+        failures.append("retries: expected success on the third attempt")
+
+
+async def check_refusal(failures: list) -> None:
+    client = AsyncFirebase(max_retries=3, retry_delay=0.01, breaker=CircuitBreaker(threshold=1, reset_timeout=60))
+    refused = Flaky(1, ValueError("EMAIL_EXISTS"))
+    try:
+        await client._call("simulated", refused)
+        failures.append("refusal: no error raised")
+    except ValueError:
+        pass
+    client.shutdown()
+    print(f"   refusal: raised after {refused.calls} attempt, circuit {client.breaker.state}")
+    if refused.calls != 1 or client.breaker.state != CircuitBreaker.CLOSED:
+        failures.append("refusal: was retried or tripped the breaker")
+
+
+async def check_breaker(failures: list) -> None:
+    breaker = CircuitBreaker(threshold=3, reset_timeout=0.3)
+    client = AsyncFirebase(max_retries=3, retry_delay=0.01, breaker=breaker)
+    dead = Flaky(10 ** 6, ConnectionError("Connection refused"))
+    
+    try:
+        await client._call("simulated", dead)
+    except FirebaseUnavailableError:
+        pass
+    attempts = dead.calls
+    
+    start = time.perf_counter()
+    try:
+        await client._call("simulated", dead)
+        failures.append("breaker: open circuit let a call through")
+    except FirebaseUnavailableError as e:
+        rejected_in = time.perf_counter() - start
+        print(f"   breaker: open after {attempts} attempts; next call rejected in {rejected_in * 1000:.2f} ms ({e})")
+    if dead.calls != attempts:
+        failures.append("breaker: open circuit reached the SDK")
+    
+    await asyncio.sleep(0.35)
+    state = breaker.state
+    result = await client._call("simulated", lambda: "ok")
+    client.shutdown()
+    print(f"   breaker: {state} after the reset period; trial call {result!r}, circuit {breaker.state}")
+    if state != CircuitBreaker.HALF_OPEN or breaker.state != CircuitBreaker.CLOSED:
+        failures.append("breaker: did not recover through half-open")
+
+
+async def check_timeout(failures: list) -> None:
+    client = AsyncFirebase(max_workers=1, timeout=0.1, max_retries=1)
+    ran = []
+    
+    async def call(name: str, seconds: float):
+        def work():
+            ran.append(name)
+            time.sleep(seconds)
+        try:
+            await client._call("simulated", work)
+        except FirebaseUnavailableError:
+            pass
+    
+    # The first call holds the only thread past the timeout; the second never gets it
+    await asyncio.gather(call("first", 0.3), call("queued", 0.0))
+    await asyncio.sleep(0.3)
+    client.shutdown()
+    print(f"   timeout: calls that ran: {ran}")
+    if ran != ["first"]:
+        failures.append("timeout: a timed-out queued call still ran")
+
+
+async def run(calls: int) -> list:
+    failures = []
+    await check_loop(calls, failures)
+    await check_retries(failures)
+    await check_refusal(failures)
+    await check_breaker(failures)
+    await check_timeout(failures)
+    return failures
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Check the async Firebase client against simulated calls")
+    parser.add_argument("--calls", type=int, default=40, help="Concurrent blocking calls in the loop check (default: 40)")
+    args = parser.parse_args()
+    
+    print("\n" + "="*60)
+    print("🔍 CHECKING ASYNC FIREBASE CLIENT (simulated Admin SDK calls)")
+    print("="*60 + "\n")
+    
+    failures = asyncio.run(run(args.calls))
+    
+    print()
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+    print("✅ Event loop stayed responsive; retries, breaker and timeouts behaved")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+"""
+Check the rate limiting middleware: bursts and 429s with Retry-After,
+refill, GraphQL cost weighting, oversized bodies, uid vs IP keys, bounded
+background token verification, a store shared between workers, failing
+open, and the per-request overhead
+
+Drives RateLimitMiddleware (middleware.rate_limit) directly over ASGI,
+in front of an app that only counts the requests it receives, so no
+server or database is needed:
+
+    python check_rate_limit.py [--requests 20000]
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import sys
+import time
+from urllib.parse import urlencode
+
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+os.environ.setdefault("NEO4J_USERNAME", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "unused")
+os.environ["SESSION_TOKENS"] = "true"
+os.environ.setdefault("SECRET_KEY", "check-rate-limit-secret-0123456789abcdef")
+os.environ["SESSION_DENY_LIST_PATH"] = ":memory:"
+
+from middleware.rate_limit import RateLimitMiddleware, MemoryBucketStore, BucketStore, IdentityCache, OperationCosts, MAX_INSPECTED_BODY
+from services.session_tokens import get_session_tokens
+
+
+CHEAP = "query Me { me { uid } }"
+NEARBY = "{ nearbyServices(latitude: 31.5, longitude: 74.3) { id } }"
+
+
+class CountingApp:
+    """Downstream app: answers 200 and counts what got through"""
+    
+    def __init__(self):
+        self.requests = 0
+    
+    async def __call__(self, scope, receive, send):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+        self.requests += 1
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": body or b"{}"})
+
+
+class BrokenStore(BucketStore):
+    async def take(self, key, cost, rate, burst):
+        raise ConnectionError("Connection refused")
+
+
+async def post(app, query: str, ip: str = "10.0.0.1", token: str = None, query_string: bytes = b"") -> dict:
+    """POST a GraphQL request through the middleware; returns status, headers and body"""
+    body = json.dumps({"query": query}).encode()
+    headers = [(b"content-type", b"application/json")]
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    scope = {"type": "http", "method": "POST", "path": "/graphql", "query_string": query_string,
+             "headers": headers, "client": (ip, 50000)}
+    messages = [{"type": "http.request", "body": body[:10], "more_body": True},
+                {"type": "http.request", "body": body[10:], "more_body": False}]
+    response = {"body": b""}
+    
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+    
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {key.decode(): value.decode() for key, value in message["headers"]}
+        else:
+            response["body"] += message.get("body", b"")
+    
+    await app(scope, receive, send)
+    return response
+
+
+async def until_limited(app, query: str, **kwargs) -> tuple:
+    """(requests admitted before the first 429, that 429 response)"""
+    for admitted in range(10 ** 6):
+        response = await post(app, query, **kwargs)
+        if response["status"] == 429:
+            return admitted, response
+    raise AssertionError("never limited")
+
+
+async def check_burst(failures: list) -> None:
+    downstream = CountingApp()
+    app = RateLimitMiddleware(downstream, MemoryBucketStore(), rate=20.0, burst=10.0)
+    admitted, limited = await until_limited(app, CHEAP)
+    retry_after = limited["headers"].get("retry-after")
+    error = json.loads(limited["body"])["errors"][0]
+    print(f"   burst: {admitted} cheap requests admitted, then 429 (Retry-After {retry_after}, "
+          f"{error['extensions']['code']}); downstream saw {downstream.requests}")
+    if admitted != 10 or downstream.requests != 10 or retry_after != "1":
+        failures.append("burst: wrong number admitted or no Retry-After")
+    
+    await asyncio.sleep(0.25)
+    refilled, _ = await until_limited(app, CHEAP)
+    print(f"   refill: {refilled} admitted after 0.25 s at 20/s")
+    if refilled not in (4, 5, 6):
+        failures.append(f"refill: expected about 5 requests after 0.25 s, got {refilled}")
+    
+    echoed = await post(RateLimitMiddleware(CountingApp(), MemoryBucketStore()), CHEAP)
+    if json.loads(echoed["body"]) != {"query": CHEAP} or "x-ratelimit-remaining" not in echoed["headers"]:
+        failures.append("replay: the app did not receive the full request body, or no rate limit headers")
+
+
+async def check_costs(failures: list) -> None:
+    costs = OperationCosts()
+    cases = {
+        "me": (CHEAP, 1.0),
+        "nearbyServices": (NEARBY, 5.0),
+        "named as something cheap": ("query Cheap { nearbyServices(latitude: 1, longitude: 2) { id } }", 5.0),
+        "aliased twice": ("{ a: nearbyServices(latitude: 1, longitude: 2) { id } b: nearbyServices(latitude: 3, longitude: 4) { id } }", 10.0),
+        "through a fragment": ("query { ...Q } fragment Q on Query { searchServices(query: \"crane\") { id } me { uid } }", 6.0),
+        "not GraphQL": ("{ nearbyServices(", 1.0),
+    }
+    for case, (query, expected) in cases.items():
+        cost = costs.request_cost("POST", b"", json.dumps({"query": query}).encode())
+        print(f"   cost {case}: {cost:g}")
+        if cost != expected:
+            failures.append(f"cost: {case} cost {cost:g}, expected {expected:g}")
+    
+    # GET is priced from the query string and POST from the body only, as the endpoint reads them
+    aliased = cases["aliased twice"][0]
+    over_get = costs.request_cost("GET", urlencode({"query": aliased}).encode(), None)
+    post_with_query_string = costs.request_cost("POST", b"x=1", json.dumps({"query": aliased}).encode())
+    post_with_query_in_url = costs.request_cost("POST", urlencode({"query": CHEAP}).encode(), json.dumps({"query": aliased}).encode())
+    print(f"   cost aliased twice over GET: {over_get:g}; POST to ?x=1: {post_with_query_string:g}; "
+          f"POST with a cheap query in the URL: {post_with_query_in_url:g}")
+    if (over_get, post_with_query_string, post_with_query_in_url) != (10.0, 10.0, 10.0):
+        failures.append("cost: a query string changed the price of a POST, or GET was not priced")
+    
+    app = RateLimitMiddleware(CountingApp(), MemoryBucketStore(), rate=0.001, burst=50.0)
+    cheap, _ = await until_limited(app, CHEAP, ip="10.0.0.2")
+    nearby, _ = await until_limited(app, NEARBY, ip="10.0.0.3")
+    nearby_with_query_string, _ = await until_limited(app, NEARBY, ip="10.0.0.4", query_string=b"x=1")
+    print(f"   weighting: a 50-unit bucket admits {cheap} cheap queries or {nearby} nearbyServices "
+          f"({nearby_with_query_string} when posted to /graphql?x=1)")
+    if (cheap, nearby, nearby_with_query_string) != (50, 10, 10):
+        failures.append("weighting: nearbyServices not charged its cost")
+
+
+async def check_oversized(failures: list) -> None:
+    # A body past MAX_INSPECTED_BODY cannot be priced: it costs the whole burst
+    padded = json.dumps({"query": CHEAP, "variables": {"pad": "x" * (4 * MAX_INSPECTED_BODY)}}).encode()
+    chunks = [padded[i:i + 16384] for i in range(0, len(padded), 16384)]
+    downstream = CountingApp()
+    app = RateLimitMiddleware(downstream, MemoryBucketStore(), rate=0.001, burst=50.0)
+    statuses, received = [], []
+    for declared in (True, False):
+        messages = [{"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1} for i, chunk in enumerate(chunks)]
+        headers = [(b"content-type", b"application/json")]
+        if declared:
+            headers.append((b"content-length", str(len(padded)).encode()))
+        scope = {"type": "http", "method": "POST", "path": "/graphql", "query_string": b"",
+                 "headers": headers, "client": ("10.0.6.1" if declared else "10.0.6.2", 50000)}
+        response = {"body": b""}
+        
+        async def receive():
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+        
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            else:
+                response["body"] += message.get("body", b"")
+        
+        await app(scope, receive, send)
+        statuses.append(response["status"])
+        received.append(response["body"] == padded)
+        second = await post(app, CHEAP, ip=scope["client"][0])
+        statuses.append(second["status"])
+    print(f"   oversized: {len(padded)} byte bodies (with/without Content-Length) -> {statuses[0]}, {statuses[2]}; "
+          f"the next request -> {statuses[1]}, {statuses[3]}; app got the whole body: {all(received)}")
+    if statuses != [200, 429, 200, 429]:
+        failures.append("oversized: an unpriceable body was not charged the whole burst")
+    if not all(received):
+        failures.append("oversized: the app did not receive the whole body")
+    
+    # Reading stops at the limit; the rest is left for the app
+    messages = [{"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1} for i, chunk in enumerate(chunks)]
+    
+    async def receive_chunk():
+        return messages.pop(0)
+    
+    read = await RateLimitMiddleware._read_body(receive_chunk)
+    print(f"   oversized: the middleware read {len(read)} of {len(chunks)} body chunks")
+    if len(read) >= len(chunks):
+        failures.append("oversized: the whole body was buffered before pricing")
+
+
+async def check_keys(failures: list) -> None:
+    app = RateLimitMiddleware(CountingApp(), MemoryBucketStore(), rate=0.001, burst=5.0)
+    first_ip, _ = await until_limited(app, CHEAP, ip="10.0.1.1")
+    second_ip, _ = await until_limited(app, CHEAP, ip="10.0.1.2")
+    print(f"   ip keys: {first_ip} and {second_ip} admitted from two addresses")
+    if (first_ip, second_ip) != (5, 5):
+        failures.append("ip keys: addresses share a bucket")
+    
+    # One user on two networks (wifi, then mobile data) has one budget once the token is verified
+    token = get_session_tokens().issue("uid-rate", "seeker")["access_token"]
+    await post(app, CHEAP, ip="10.0.2.1", token=token)  # Keyed by IP; verification starts
+    await asyncio.sleep(0.01)
+    on_wifi, _ = await until_limited(app, CHEAP, ip="10.0.2.1", token=token)
+    on_mobile = (await post(app, CHEAP, ip="10.0.3.1", token=token))["status"]
+    print(f"   uid key: {on_wifi} admitted on one address; the same uid on another address -> {on_mobile}")
+    if on_wifi != 5 or on_mobile != 429:
+        failures.append("uid key: the verified uid was not used as the key")
+    
+    forged = token[:-4] + ("AAAA" if not token.endswith("AAAA") else "BBBB")
+    await post(app, CHEAP, ip="10.0.4.1", token=forged)
+    await asyncio.sleep(0.01)
+    forged_status = (await post(app, CHEAP, ip="10.0.4.1", token=forged))["status"]
+    print(f"   forged token: keyed by address, request -> {forged_status}")
+    if forged_status != 200:
+        failures.append("forged token: charged to the uid it claims")
+
+
+async def check_verification(failures: list) -> None:
+    from config.firebase_async import get_async_firebase
+    token = get_session_tokens().issue("uid-verify", "seeker")["access_token"]
+    
+    # Only JWTs are queued, and no more than max_pending at once
+    identities = IdentityCache(max_entries=10, max_pending=3)
+    for garbage in ("not-a-token", "a.b.c", "x" * 4000):
+        identities.verify_later(identities.digest(garbage), garbage)
+    not_queued = len(identities._pending)
+    forged = [token[:-6] + f"{i:06d}" for i in range(50)]
+    for candidate in forged:
+        identities.verify_later(identities.digest(candidate), candidate)
+    queued = len(identities._pending)
+    print(f"   verification: {not_queued} of 3 non-JWT tokens queued; {queued} of {len(forged)} new tokens queued (cap 3)")
+    if not_queued != 0 or queued != 3:
+        failures.append("verification: non-JWT tokens queued, or the pending cap not applied")
+    
+    # Failed tokens cannot push verified uids out
+    await asyncio.sleep(0.01)
+    identities.verify_later(identities.digest(token), token)
+    await asyncio.sleep(0.01)
+    for candidate in forged:
+        identities.verify_later(identities.digest(candidate), candidate)
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.01)
+    known, uid = identities.lookup(identities.digest(token))
+    print(f"   verification: after {len(forged)} forged tokens the verified uid is still known: {uid == 'uid-verify'}")
+    if uid != "uid-verify":
+        failures.append("verification: failed tokens evicted a verified uid")
+    
+    # Firebase ID tokens go through the cache's own client, not the one requests wait on
+    header = base64.urlsafe_b64encode(json.dumps({"alg": "RS256", "kid": "k"}).encode()).decode().rstrip("=")
+    id_token = f"{header}.e30.c2ln"
+    identities.verify_later(identities.digest(id_token), id_token)
+    await asyncio.sleep(0.05)
+    separate = identities._firebase is not None and identities._firebase is not get_async_firebase()
+    print(f"   verification: ID token verified on a separate client: {separate}; "
+          f"request-facing executor started: {get_async_firebase()._executor is not None}")
+    if not separate or get_async_firebase()._executor is not None:
+        failures.append("verification: background lookups shared the request-facing Firebase executor")
+    identities.close()
+
+
+async def check_shared_store(failures: list) -> None:
+    # Two workers' middleware over one store, as RedisBucketStore gives every worker
+    store = MemoryBucketStore()
+    worker_a = RateLimitMiddleware(CountingApp(), store, rate=0.001, burst=10.0)
+    worker_b = RateLimitMiddleware(CountingApp(), store, rate=0.001, burst=10.0)
+    admitted = 0
+    for i in range(40):
+        response = await post(worker_a if i % 2 else worker_b, CHEAP, ip="10.0.5.1")
+        admitted += response["status"] == 200
+    print(f"   shared store: {admitted} of 40 requests admitted across two workers (burst 10)")
+    if admitted != 10:
+        failures.append("shared store: workers did not share the budget")
+    
+    downstream = CountingApp()
+    broken = RateLimitMiddleware(downstream, BrokenStore())
+    statuses = {(await post(broken, CHEAP))["status"] for _ in range(5)}
+    print(f"   store down: requests answered {statuses}, downstream saw {downstream.requests}")
+    if statuses != {200} or downstream.requests != 5:
+        failures.append("store down: requests were turned away")
+
+
+async def check_overhead(requests: int, failures: list) -> None:
+    plain = CountingApp()
+    limited = RateLimitMiddleware(CountingApp(), MemoryBucketStore(), rate=10 ** 9, burst=10 ** 9)
+    timings = {}
+    for name, app in (("without", plain), ("with", limited)):
+        start = time.perf_counter()
+        for i in range(requests):
+            await post(app, NEARBY, ip=f"10.1.{i % 200}.{i % 250}")
+        timings[name] = (time.perf_counter() - start) / requests
+    overhead = (timings["with"] - timings["without"]) * 1e6
+    print(f"   overhead: {overhead:.1f} µs per request ({requests} requests from 1000 client addresses)")
+    if overhead > 200:
+        failures.append(f"overhead: {overhead:.0f} µs per request")
+
+
+async def run(requests: int) -> list:
+    failures = []
+    await check_burst(failures)
+    await check_costs(failures)
+    await check_oversized(failures)
+    await check_keys(failures)
+    await check_verification(failures)
+    await check_shared_store(failures)
+    await check_overhead(requests, failures)
+    return failures
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Check the rate limiting middleware")
+    parser.add_argument("--requests", type=int, default=20000, help="Requests in the overhead measurement (default: 20000)")
+    args = parser.parse_args()
+    
+    print("\n" + "="*60)
+    print("🔍 CHECKING RATE LIMITING")
+    print("="*60 + "\n")
+    
+    failures = asyncio.run(run(args.requests))
+    
+    print()
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+    print("✅ Buckets, costs, keys and the shared store behaved")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Check the registration outbox: retries through a store outage, idempotent
+creation, giving up, and leases shared between server workers
+
+Runs RegistrationWorker (services.registration_outbox) against a temporary
+outbox file. The outage is a real one: the user store is Neo4j at a port
+nothing listens on. Once the store is "back" it is the embedded backend on
+a temporary file, so no database server is needed:
+
+    python check_registration_outbox.py [--registrations 20]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import uuid
+
+os.environ["NEO4J_URI"] = "bolt://127.0.0.1:1"
+os.environ.setdefault("NEO4J_USERNAME", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "unused")
+
+from config.settings import settings
+from models.user import UserType, SeekerNode, ProviderNode
+from repositories.backend import get_user_repository
+from repositories.embedded_graph import close_embedded_graph
+from services.registration_outbox import RegistrationOutbox, RegistrationWorker, PENDING, FAILED
+
+
+def new_profile(i: int):
+    uid = f"outbox-{uuid.uuid4().hex[:12]}"
+    if i % 2:
+        return uid, UserType.PROVIDER, ProviderNode(uid=uid, email=f"{uid}@example.com", full_name=f"Provider {i}",
+                                                    phone="+920000000000", business_name=f"Haulage {i}")
+    return uid, UserType.SEEKER, SeekerNode(uid=uid, email=f"{uid}@example.com", full_name=f"Seeker {i}",
+                                            phone="+920000000000")
+
+
+def quietly(call, *args, **kwargs):
+    """Run a repository call without its banners"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return call(*args, **kwargs)
+
+
+async def run(registrations: int, directory: str) -> list:
+    failures = []
+    outbox = RegistrationOutbox(os.path.join(directory, "outbox.sqlite"))
+    worker = RegistrationWorker(outbox, interval=5.0, max_attempts=5)
+    
+    # Outage: every attempt fails and is rescheduled, nothing is lost
+    settings.STORAGE_BACKEND = "neo4j"
+    queued = [new_profile(i) for i in range(registrations)]
+    for uid, user_type, node in queued:
+        outbox.add(uid, user_type.value, node.to_dict())
+    claimed = await quietly_async(worker.process_due)
+    stats = outbox.stats()
+    print(f"   outage: {claimed} attempts failed, outbox {stats}")
+    if stats["pending"] != registrations or any(outbox.get(uid)["attempts"] != 1 for uid, _, _ in queued):
+        failures.append("outage: registrations were lost or not rescheduled")
+    if await quietly_async(worker.process_due) != 0:
+        failures.append("outage: rescheduled registrations were retried before their backoff")
+    
+    # Recovery: the store is back; flush (as login does) ignores the backoff
+    settings.STORAGE_BACKEND = "embedded"
+    settings.EMBEDDED_DB_PATH = os.path.join(directory, "graph.sqlite")
+    created = [await quietly_async(worker.flush, uid) for uid, _, _ in queued]
+    user_repo = get_user_repository()
+    stored = [quietly(user_repo.get_user_by_uid, uid) for uid, _, _ in queued]
+    print(f"   recovery: {created.count(True)}/{registrations} profiles created, outbox {outbox.stats()}")
+    if not all(created) or None in stored or outbox.stats()["pending"]:
+        failures.append("recovery: not every profile was created")
+    if any(user["email"] != node.email for user, (_, _, node) in zip(stored, queued)):
+        failures.append("recovery: stored profile does not match the registration")
+    
+    # Idempotence: the node already exists (an attempt committed but its answer was lost)
+    uid, user_type, node = new_profile(0)
+    quietly(user_repo.create_seeker, node)
+    outbox.add(uid, user_type.value, node.to_dict())
+    await quietly_async(worker.process_due)
+    copies = len([seeker for seeker in quietly(user_repo.get_all_seekers, limit=10 ** 6) if seeker["uid"] == uid])
+    print(f"   idempotence: {copies} node(s) for a registration processed after its node existed")
+    if copies != 1 or outbox.get(uid) is not None:
+        failures.append("idempotence: duplicate node or row left behind")
+    
+    # Giving up: an outage longer than max_attempts marks the row failed; retry_failed requeues it
+    settings.STORAGE_BACKEND = "neo4j"
+    uid, user_type, node = new_profile(1)
+    outbox.add(uid, user_type.value, node.to_dict())
+    for _ in range(worker.max_attempts):
+        await quietly_async(worker.flush, uid)
+    record = outbox.get(uid)
+    requeued = outbox.retry_failed()
+    print(f"   give up: status {record['status']} after {record['attempts']} attempts; {requeued} requeued")
+    if record["status"] != FAILED or requeued != 1 or outbox.get(uid)["status"] != PENDING:
+        failures.append("give up: failed row not kept or not requeued")
+    outbox.complete(uid)
+    
+    # Two server workers on one file never claim the same registration
+    second = RegistrationOutbox(outbox.path)
+    for uid, user_type, node in (new_profile(i) for i in range(registrations)):
+        outbox.add(uid, user_type.value, node.to_dict())
+    first_claim = {record["uid"] for record in outbox.claim(limit=registrations // 2)}
+    second_claim = {record["uid"] for record in second.claim(limit=registrations)}
+    print(f"   leases: worker A claimed {len(first_claim)}, worker B {len(second_claim)}, overlap {len(first_claim & second_claim)}")
+    if first_claim & second_claim or len(first_claim | second_claim) != registrations:
+        failures.append("leases: a registration was claimed twice or not at all")
+    
+    second.close()
+    outbox.close()
+    close_embedded_graph()
+    return failures
+
+
+async def quietly_async(call, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return await call(*args)
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Check the registration outbox worker")
+    parser.add_argument("--registrations", type=int, default=20, help="Registrations per scenario (default: 20)")
+    args = parser.parse_args()
+    
+    print("\n" + "="*60)
+    print("🔍 CHECKING REGISTRATION OUTBOX")
+    print("="*60 + "\n")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        failures = asyncio.run(run(args.registrations, directory))
+    
+    print()
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+    print("✅ Registrations survived the outage, were created once, and were never claimed twice")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+Check API session tokens: local verification cost, expiry, tampering,
+rotation, revocation, deny-list compaction, a deny-list file shared by
+workers and kept across restarts, and replication between hosts
+
+Exercises services.session_tokens directly; no Firebase or Neo4j needed:
+
+    python check_session_tokens.py [--iterations 20000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+os.environ.setdefault("NEO4J_USERNAME", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "unused")
+os.environ["SESSION_TOKENS"] = "true"
+os.environ.setdefault("SECRET_KEY", "check-session-tokens-secret-0123456789abcdef")
+os.environ["SESSION_DENY_LIST_PATH"] = ":memory:"
+
+import jwt
+
+import services.session_tokens as session_tokens
+from services.event_broker import EventBroker, MemoryBackend
+from services.session_tokens import SessionTokens, SessionTokenError, DenyList, ACCESS, REFRESH
+
+
+def rejected(call, *args) -> str:
+    """The SessionTokenError message a call raises, or '' when it succeeds"""
+    try:
+        call(*args)
+    except SessionTokenError as e:
+        return str(e)
+    return ""
+
+
+def check_latency(tokens: SessionTokens, iterations: int, failures: list) -> None:
+    pair = tokens.issue("uid-latency", "seeker")
+    # A realistic deny-list: many revoked sessions
+    for i in range(10000):
+        tokens.deny_list.deny(f"revoked-{i}", time.time() + 3600)
+    
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        tokens.verify(pair["access_token"], ACCESS)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    p50 = samples[len(samples) // 2] * 1e6
+    p99 = samples[int(len(samples) * 0.99)] * 1e6
+    print(f"   verify: p50 {p50:.1f} µs, p99 {p99:.1f} µs over {iterations} calls "
+          f"({len(tokens.deny_list)} deny-list entries, token {len(pair['access_token'])} bytes)")
+    if p50 > 500:
+        failures.append(f"verify: p50 {p50:.0f} µs is not local-verification fast")
+
+
+def check_validation(tokens: SessionTokens, failures: list) -> None:
+    pair = tokens.issue("uid-1", "provider")
+    claims = tokens.verify(pair["access_token"])
+    if claims["sub"] != "uid-1" or claims["user_type"] != "provider":
+        failures.append("claims: uid/user_type not carried")
+    
+    header, payload, signature = pair["access_token"].split(".")
+    tampered = f"{header}.{payload}.{signature[:-2]}{'AA' if signature[-2:] != 'AA' else 'BB'}"
+    other_key = SessionTokens("another-secret", tokens.algorithm).issue("uid-1", "provider")["access_token"]
+    expired = SessionTokens(tokens.secret, tokens.algorithm, access_ttl=-1).issue("uid-1", "provider")["access_token"]
+    cases = {
+        "tampered signature": rejected(tokens.verify, tampered),
+        "other secret": rejected(tokens.verify, other_key),
+        "expired": rejected(tokens.verify, expired),
+        "refresh used as access": rejected(tokens.verify, pair["refresh_token"], ACCESS),
+        "access used as refresh": rejected(tokens.verify, pair["access_token"], REFRESH),
+    }
+    for case, message in cases.items():
+        print(f"   rejects {case}: {message or 'ACCEPTED'}")
+        if not message:
+            failures.append(f"validation: accepted a token with {case}")
+    
+    # Tokens signed with another algorithm (Firebase ID tokens use RS256) go to Firebase
+    firebase_like = jwt.encode({"sub": "uid-1"}, "k" * 32, algorithm="HS512" if tokens.algorithm != "HS512" else "HS384")
+    if not session_tokens.is_session_token(pair["access_token"]) or session_tokens.is_session_token(firebase_like):
+        failures.append("is_session_token: told session and other tokens apart wrongly")
+
+
+def check_revocation(tokens: SessionTokens, failures: list) -> None:
+    pair = tokens.issue("uid-2", "seeker")
+    claims, rotated = tokens.rotate(pair["refresh_token"])
+    reused = rejected(tokens.rotate, pair["refresh_token"])
+    print(f"   rotation: new pair issued; old refresh token -> {reused or 'ACCEPTED'}")
+    if not reused or rejected(tokens.verify, rotated["refresh_token"], REFRESH):
+        failures.append("rotation: old refresh token reusable or new one rejected")
+    
+    tokens.revoke(rotated["access_token"])
+    if not rejected(tokens.verify, rotated["access_token"]) or rejected(tokens.verify, pair["access_token"]):
+        failures.append("revoke: wrong token denied")
+    
+    other_session = tokens.issue("uid-2", "seeker")
+    tokens.revoke_user("uid-2")
+    if not rejected(tokens.verify, other_session["access_token"]) or not rejected(tokens.verify, other_session["refresh_token"], REFRESH):
+        failures.append("revoke_user: a session of the user survived")
+    print("   revocation: single token and all of a user's sessions denied")
+
+
+def check_compaction(failures: list) -> None:
+    deny_list = DenyList()
+    now = time.time()
+    for i in range(5000):
+        deny_list.deny(f"short-{i}", now + 0.1)
+    deny_list.deny("long", now + 3600)
+    deny_list.deny_user("uid-old", now, now + 0.1)
+    before = len(deny_list)
+    time.sleep(0.15)
+    deny_list._next_purge = 0.0
+    deny_list.deny("trigger", now + 3600)
+    print(f"   compaction: {before} entries -> {len(deny_list)} once the short-lived tokens expired")
+    if len(deny_list) != 2:
+        failures.append("compaction: expired deny-list entries were kept")
+
+
+def check_shared_file(failures: list) -> None:
+    # Two workers of one host open the same deny-list file; a restart reopens it
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "deny_list.sqlite")
+        worker_a = SessionTokens(os.environ["SECRET_KEY"], deny_list=DenyList(path))
+        worker_b = SessionTokens(os.environ["SECRET_KEY"], deny_list=DenyList(path))
+        pair = worker_a.issue("uid-6", "seeker")
+        worker_a.revoke(pair["access_token"])
+        worker_a.revoke_user("uid-7")
+        user_token = worker_a._encode("uid-7", "seeker", ACCESS, int(time.time()) - 5, 60)
+        on_b = bool(rejected(worker_b.verify, pair["access_token"])) and bool(rejected(worker_b.verify, user_token))
+        
+        # Both workers receive the same refresh token at once: one rotation wins
+        refresh = worker_a.issue("uid-8", "seeker")["refresh_token"]
+        rotations = [not rejected(worker.rotate, refresh) for worker in (worker_a, worker_b)]
+        
+        worker_a.deny_list.close()
+        worker_b.deny_list.close()
+        restarted = SessionTokens(os.environ["SECRET_KEY"], deny_list=DenyList(path))
+        after_restart = bool(rejected(restarted.verify, pair["access_token"])) and bool(rejected(restarted.verify, user_token))
+        restarted.deny_list.close()
+    
+    print(f"   shared file: revocations seen by the other worker: {on_b}, after a restart: {after_restart}; "
+          f"a refresh token presented to both workers rotated {sum(rotations)} time(s)")
+    if not on_b:
+        failures.append("shared file: a revocation did not reach the other worker")
+    if not after_restart:
+        failures.append("shared file: revocations were lost on restart")
+    if sum(rotations) != 1:
+        failures.append("shared file: a refresh token was rotated more than once")
+
+
+async def check_replication(failures: list) -> None:
+    # Two hosts' token services sharing one broker, as with EVENT_BROKER_BACKEND=redis
+    broker = EventBroker(MemoryBackend())
+    session_tokens._tokens = None
+    session_tokens.get_event_broker = lambda: broker
+    worker_a = session_tokens.get_session_tokens()
+    worker_b = SessionTokens(worker_a.secret, worker_a.algorithm)
+    
+    async def replicate_into(tokens: SessionTokens):
+        from services.event_broker import topic_key, SESSION_REVOKED
+        async for entry in broker.subscribe(topic_key(SESSION_REVOKED)):
+            tokens.apply(entry)
+    
+    listener = asyncio.create_task(replicate_into(worker_b))
+    await asyncio.sleep(0)
+    
+    pair = worker_a.issue("uid-3", "seeker")
+    await session_tokens.publish_revocation(worker_a.revoke(pair["access_token"]))
+    await session_tokens.publish_revocation(worker_a.revoke_user("uid-4"))
+    await asyncio.sleep(0.01)
+    listener.cancel()
+    
+    user_token = SessionTokens(worker_a.secret, worker_a.algorithm)._encode("uid-4", "seeker", ACCESS, int(time.time()) - 5, 60)
+    denied_on_b = bool(rejected(worker_b.verify, pair["access_token"])) and bool(rejected(worker_b.verify, user_token))
+    print(f"   replication: revocations made on worker A {'are' if denied_on_b else 'are NOT'} enforced on worker B")
+    if not denied_on_b:
+        failures.append("replication: revocation did not reach the other worker")
+    
+    authenticated = await session_tokens.authenticate(worker_a.issue("uid-5", "provider")["access_token"])
+    print(f"   authenticate: {authenticated}")
+    if authenticated["uid"] != "uid-5" or authenticated["user_type"] != "provider":
+        failures.append("authenticate: session token not recognised")
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Check API session tokens")
+    parser.add_argument("--iterations", type=int, default=20000, help="Timed verify() calls (default: 20000)")
+    args = parser.parse_args()
+    
+    print("\n" + "="*60)
+    print("🔍 CHECKING SESSION TOKENS")
+    print("="*60 + "\n")
+    
+    failures = []
+    tokens = SessionTokens(os.environ["SECRET_KEY"], "HS256", access_ttl=900, refresh_ttl=30 * 86400)
+    check_latency(tokens, args.iterations, failures)
+    check_validation(SessionTokens(os.environ["SECRET_KEY"]), failures)
+    check_revocation(SessionTokens(os.environ["SECRET_KEY"]), failures)
+    check_compaction(failures)
+    check_shared_file(failures)
+    asyncio.run(check_replication(failures))
+    
+    print()
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+    print("✅ Session tokens verify locally, expire, rotate and revoke as expected")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
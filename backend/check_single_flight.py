@@ -0,0 +1,200 @@
+"""
+Check single-flight reads: N identical concurrent activeServices or
+nearbyServices requests run one query, different arguments do not share,
+nothing is cached between calls, errors are shared once, and a cancelled
+caller does not cancel the others' query
+
+Executes the GraphQL schema against the embedded backend, seeded with a
+generated marketplace on a temporary file. The repository methods are
+wrapped to count their executions and to hold each query for --latency ms,
+standing in for the Aura round trip, so no database server is needed:
+
+    python check_single_flight.py [--callers 50] [--latency 50]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import io
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+os.environ.setdefault("NEO4J_USERNAME", "neo4j")
+os.environ.setdefault("NEO4J_PASSWORD", "unused")
+os.environ["STORAGE_BACKEND"] = "embedded"
+
+from config.settings import settings
+from datagen import MarketplaceSpec, EmbeddedWriter, generate
+from graphql_api.schema import schema
+from repositories.embedded_graph import get_embedded_graph, close_embedded_graph
+from repositories.embedded_repository import EmbeddedUserRepository
+from services.single_flight import get_single_flight
+
+
+class QueryCounter:
+    """Counts executions of a repository method and holds each for `latency` seconds"""
+    
+    def __init__(self, method_name: str, latency: float):
+        self.method_name = method_name
+        self.latency = latency
+        self.queries = 0
+        self.fail_next = False
+        self._lock = threading.Lock()
+        self._original = getattr(EmbeddedUserRepository, method_name)
+        counter = self
+        
+        @functools.wraps(self._original)
+        def counted(repo, **kwargs):
+            with counter._lock:
+                counter.queries += 1
+                fail, counter.fail_next = counter.fail_next, False
+            time.sleep(counter.latency)
+            if fail:
+                raise ConnectionError("Connection reset by peer")
+            return counter._original(repo, **kwargs)
+        
+        setattr(EmbeddedUserRepository, method_name, counted)
+    
+    def take(self) -> int:
+        queries, self.queries = self.queries, 0
+        return queries
+
+
+async def execute(query: str):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return await schema.execute(query)
+
+
+async def concurrently(queries: list) -> tuple:
+    """(results, wall seconds) of executing the documents all at once"""
+    # One redirect around them all: overlapping ones would restore stdout out of order
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = await asyncio.gather(*(schema.execute(query) for query in queries))
+    return results, time.perf_counter() - start
+
+
+def seed(directory: str, users: int) -> dict:
+    settings.EMBEDDED_DB_PATH = os.path.join(directory, "graph.sqlite")
+    with contextlib.redirect_stdout(io.StringIO()):
+        writer = EmbeddedWriter(get_embedded_graph())
+        for label, row in generate(MarketplaceSpec.from_scale(users)):
+            writer.write(label, row)
+        writer.close()
+        service = EmbeddedUserRepository().get_active_services(limit=1)[0]
+    return service
+
+
+async def run(callers: int, latency: float, directory: str) -> list:
+    failures = []
+    # The injected failure below is expected; keep its traceback out of the report
+    logging.getLogger("strawberry.execution").setLevel(logging.CRITICAL)
+    service = seed(directory, 2000)
+    category, area = service["service_category"], service["service_area"]
+    active = QueryCounter("get_active_services", latency)
+    nearby = QueryCounter("get_nearby_services", latency)
+    
+    def active_query(category=category, area=area, extra=""):
+        return f'{{ activeServices(category: "{category}", serviceArea: "{area}"{extra}) {{ serviceId serviceName rating }} }}'
+    
+    # N identical reads, one query
+    results, elapsed = await concurrently([active_query()] * callers)
+    queries = active.take()
+    same = all(result.data == results[0].data and not result.errors for result in results)
+    print(f"   activeServices: {callers} concurrent callers -> {queries} query in {elapsed * 1000:.0f} ms; "
+          f"{len(results[0].data['activeServices'])} services, identical results: {same}")
+    if queries != 1 or not same:
+        failures.append("activeServices: identical concurrent calls were not coalesced")
+    
+    nearby_query = '{ nearbyServices(latitude: 31.52, longitude: 74.35, radiusKm: 200) { serviceId distanceKm } }'
+    results, elapsed = await concurrently([nearby_query] * callers)
+    queries = nearby.take()
+    print(f"   nearbyServices: {callers} concurrent callers -> {queries} query in {elapsed * 1000:.0f} ms")
+    if queries != 1 or any(result.errors for result in results):
+        failures.append("nearbyServices: identical concurrent calls were not coalesced")
+    
+    # Spelling that selects the same rows shares; different filters do not
+    await concurrently([active_query(), active_query(extra=", limit: 50"), active_query(extra=", minRating: null")])
+    equivalent = active.take()
+    await concurrently([active_query(), active_query(category="Other"), active_query(extra=", limit: 5")])
+    different = active.take()
+    print(f"   keys: 3 spellings of one read -> {equivalent} query; 3 different reads -> {different} queries")
+    if equivalent != 1 or different != 3:
+        failures.append("keys: normalization merged different reads or split equal ones")
+    
+    # Not a cache: calls that do not overlap each run their own query
+    for _ in range(3):
+        await execute(active_query())
+    sequential = active.take()
+    print(f"   sequential: 3 calls one after another -> {sequential} queries")
+    if sequential != 3:
+        failures.append("sequential: results were reused after the query finished")
+    
+    # One failure, shared once; the next call queries again
+    active.fail_next = True
+    results, _ = await concurrently([active_query()] * 10)
+    failed = sum(1 for result in results if result.errors)
+    retried = await execute(active_query())
+    print(f"   errors: a failed query failed its {failed} callers with {active.take() - 1} query; next call ok: {not retried.errors}")
+    if failed != 10 or retried.errors:
+        failures.append("errors: failure not shared, or cached past the query")
+    
+    # A caller giving up (client disconnect) leaves the query running for the others
+    repo = EmbeddedUserRepository()
+    single_flight = get_single_flight()
+    with contextlib.redirect_stdout(io.StringIO()):
+        first = asyncio.create_task(single_flight.do(repo.get_active_services, category=category, limit=5))
+        second = asyncio.create_task(single_flight.do(repo.get_active_services, category=category, limit=5))
+        await asyncio.sleep(latency / 2)
+        first.cancel()
+        shared = await second
+    print(f"   cancel: first caller cancelled, second still got {len(shared)} services from {active.take()} query")
+    if not shared:
+        failures.append("cancel: cancelling one caller failed the others")
+    
+    # Without coalescing, every caller runs its own query (on the event loop, one after another)
+    settings.SINGLE_FLIGHT_READS = False
+    _, uncoalesced = await concurrently([active_query()] * min(callers, 20))
+    settings.SINGLE_FLIGHT_READS = True
+    _, coalesced = await concurrently([active_query()] * min(callers, 20))
+    print(f"   latency: {min(callers, 20)} callers take {uncoalesced * 1000:.0f} ms uncoalesced, {coalesced * 1000:.0f} ms coalesced")
+    
+    stats = single_flight.stats()
+    for operation, entry in stats.items():
+        print(f"   stats {operation}: {entry['calls']} calls, {entry['executions']} queries, ratio {entry['coalescing_ratio']}")
+    
+    close_embedded_graph()
+    return failures
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Check single-flight coalescing of identical reads")
+    parser.add_argument("--callers", type=int, default=50, help="Concurrent identical requests (default: 50)")
+    parser.add_argument("--latency", type=float, default=50.0, help="Milliseconds each query is held, like a database round trip (default: 50)")
+    args = parser.parse_args()
+    
+    print("\n" + "="*60)
+    print("🔍 CHECKING SINGLE-FLIGHT READS")
+    print("="*60 + "\n")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        failures = asyncio.run(run(args.callers, args.latency / 1000, directory))
+    
+    print()
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+    print("✅ Identical concurrent reads ran one query each")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Check the slow-query log against the configured Neo4j database
+
+Runs get_nearby_services and get_active_services with the threshold at
+0 ms, so every statement counts as slow, waits for the PROFILE captures
+and prints the top offenders with their plans:
+
+    python check_slow_queries.py [--lat 31.5204 --lon 74.3587 --radius 50]
+
+The entries are also appended to SLOW_QUERY_LOG_PATH.
+"""
+
+import argparse
+import sys
+import time
+
+from monitoring.slow_queries import get_slow_query_log
+from repositories.user_repository import UserRepository
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Capture slow-query entries and plans")
+    parser.add_argument("--lat", type=float, default=31.5204, help="Latitude (default: Lahore)")
+    parser.add_argument("--lon", type=float, default=74.3587, help="Longitude (default: Lahore)")
+    parser.add_argument("--radius", type=float, default=50, help="Radius in km")
+    parser.add_argument("--wait", type=float, default=10, help="Seconds to wait for the plan captures")
+    args = parser.parse_args()
+    
+    slow_log = get_slow_query_log()
+    slow_log.threshold = 0
+    slow_log.profile_interval = 0
+    
+    repo = UserRepository()
+    nearby = repo.get_nearby_services(args.lat, args.lon, radius_km=args.radius)
+    active = repo.get_active_services()
+    print(f"   nearby services: {len(nearby)}, active services: {len(active)}")
+    
+    # Plans are captured in a background thread
+    deadline = time.monotonic() + args.wait
+    while time.monotonic() < deadline and any(offender["plan"] is None for offender in slow_log.top_offenders()):
+        time.sleep(0.2)
+    
+    offenders = slow_log.top_offenders()
+    print(f"\n{'='*60}")
+    print(f"🐢 SLOW QUERY LOG (threshold 0 ms)")
+    print(f"{'='*60}")
+    for offender in offenders:
+        print(f"\n   {offender['statement']}")
+        print(f"   {offender['max_ms']:.1f} ms wall, "
+              f"{offender['mean_available_after_ms']:.0f} ms available after, "
+              f"{offender['mean_consumed_after_ms']:.0f} ms consumed after, "
+              f"db hits {offender['db_hits']}, fingerprint {offender['last_fingerprint']}")
+        for line in offender["plan"] or ["(plan not captured)"]:
+            print(f"      {line}")
+    
+    captured = all(offender["plan"] for offender in offenders)
+    print(f"\n{'✅' if offenders and captured else '❌'} {len(offenders)} statements logged, plans {'captured' if captured else 'missing'}\n")
+    return 0 if offenders and captured else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,372 @@
+"""
+Check that the embedded storage backend behaves like the Neo4j one
+
+Runs one behavior suite (users, similarity, vehicles, services, the
+seeker-facing queries and the deletes) against EmbeddedUserRepository /
+EmbeddedVehicleRepository on a temporary SQLite file and, with --neo4j,
+against UserRepository / VehicleRepository. Each step's expectations are
+asserted on every backend, then the two result logs must match step for
+step. The embedded graph is finally reopened from disk and compared with
+the in-memory one:
+
+    python check_storage_parity.py                 # embedded only
+    python check_storage_parity.py --neo4j         # also the Neo4j in .env
+
+--neo4j wipes the database first (the seeker-facing queries see every
+service in it), so it refuses a non-local URI unless --allow-remote is given.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+from urllib.parse import urlparse
+
+from models.availability import window_mask
+from models.record_mapper import to_iso
+from models.user import SeekerNode, ProviderNode, VehicleNode, ServiceNode
+
+
+BASE_TIME = datetime(2025, 1, 1, 8, 0, 0)
+
+# Set from the clock at write time; only their presence is compared
+VOLATILE_FIELDS = {"updated_at"}
+
+LAHORE = (31.5204, 74.3587)
+
+
+def at(minutes: int) -> datetime:
+    return BASE_TIME + timedelta(minutes=minutes)
+
+
+def normalize(value: Any) -> Any:
+    """Comparable form of a repository result: temporals as ISO text, volatile fields masked"""
+    if isinstance(value, dict):
+        return {
+            key: ("<set>" if key in VOLATILE_FIELDS else normalize(item))
+            for key, item in sorted(value.items())
+        }
+    if isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+    if isinstance(value, str) or value is None or isinstance(value, (bool, int, float)):
+        return value
+    return to_iso(value)
+
+
+def ids(rows: List[Dict[str, Any]], key: str = "service_id") -> List[str]:
+    return [row[key] for row in rows]
+
+
+class Suite:
+    """One run of the behavior suite against a pair of repositories"""
+    
+    def __init__(self, user_repo, vehicle_repo):
+        self.user_repo = user_repo
+        self.vehicle_repo = vehicle_repo
+        self.log: List[Tuple[str, Any]] = []
+        self.failures: List[str] = []
+    
+    def step(self, name: str, call: Callable[[], Any], expect: Callable[[Any], bool] = None, keep: Callable[[Any], Any] = None):
+        """Run one call, check its expectation and log what is compared across backends"""
+        try:
+            result = call()
+        except Exception as e:
+            result = e
+        if expect is not None:
+            try:
+                passed = expect(result)
+            except Exception:
+                passed = False
+            if not passed:
+                self.failures.append(f"{name}: unexpected result {result!r:.300}")
+        logged = f"raised {type(result).__name__}" if isinstance(result, Exception) else normalize(keep(result) if keep else result)
+        self.log.append((name, logged))
+        return result
+    
+    def seed(self) -> None:
+        users, repo = self.user_repo, self.vehicle_repo
+        seekers = [
+            SeekerNode(uid="parity-seeker-1", email="seeker1@parity.test", full_name="Ali Raza", phone="+920000000001",
+                       address="Gulberg, Lahore", service_categories='["Construction", "Agriculture"]',
+                       primary_purpose="Home building", urgency="within_week", created_at=at(1), updated_at=at(1)),
+            SeekerNode(uid="parity-seeker-2", email="seeker2@parity.test", full_name="Sara Khan", phone="+920000000002",
+                       address="Gulberg, Lahore, Punjab", service_categories='["Construction"]',
+                       primary_purpose="Home building", urgency="immediate", created_at=at(2), updated_at=at(2)),
+            SeekerNode(uid="parity-seeker-3", email="seeker3@parity.test", full_name="Usman Tariq", phone="+920000000003",
+                       address="Clifton, Karachi", service_categories='["Agriculture"]',
+                       primary_purpose="Harvest", urgency="within_week", created_at=at(3), updated_at=at(3)),
+        ]
+        providers = [
+            ProviderNode(uid="parity-provider-1", email="provider1@parity.test", full_name="Bilal Ahmed", phone="+920000000011",
+                         business_type="crane", is_verified=True, rating=4.5, total_bookings=10, created_at=at(4), updated_at=at(4)),
+            ProviderNode(uid="parity-provider-2", email="provider2@parity.test", full_name="Hamza Iqbal", phone="+920000000012",
+                         business_type="crane", rating=3.0, total_bookings=40, created_at=at(5), updated_at=at(5)),
+            ProviderNode(uid="parity-provider-3", email="provider3@parity.test", full_name="Zain Ali", phone="+920000000013",
+                         business_type="harvester", rating=3.0, total_bookings=5, created_at=at(6), updated_at=at(6)),
+        ]
+        for seeker in seekers:
+            self.step(f"create_seeker {seeker.uid}", lambda s=seeker: users.create_seeker(s),
+                      lambda r: r["name"] == r["full_name"] and "bio" not in r)
+        for provider in providers:
+            self.step(f"create_provider {provider.uid}", lambda p=provider: users.create_provider(p),
+                      lambda r: r["user_type"] == "provider")
+        
+        vehicles = [
+            VehicleNode(vehicle_id="parity-vehicle-1", provider_uid="parity-provider-1", name="Crane 1", vehicle_type="Crane",
+                        make="Tadano", model="GR-500", year=2019, registration_number="LEA-1", created_at=at(7), updated_at=at(7)),
+            VehicleNode(vehicle_id="parity-vehicle-2", provider_uid="parity-provider-1", name="Crane 2", vehicle_type="Crane",
+                        make="Tadano", model="GR-700", year=2021, registration_number="LEA-2", created_at=at(8), updated_at=at(8)),
+            VehicleNode(vehicle_id="parity-vehicle-3", provider_uid="parity-provider-2", name="Harvester", vehicle_type="Harvester",
+                        make="Claas", model="Lexion", year=2018, registration_number="LEB-3", created_at=at(9), updated_at=at(9)),
+        ]
+        for vehicle in vehicles:
+            self.step(f"create_vehicle {vehicle.vehicle_id}", lambda v=vehicle: users.create_vehicle(v),
+                      lambda r: r["vehicle_id"].startswith("parity-vehicle"))
+        self.step("create_vehicle for a missing provider", lambda: users.create_vehicle(VehicleNode(
+            vehicle_id="parity-vehicle-x", provider_uid="parity-nobody", name="x", vehicle_type="Crane",
+            make="x", model="x", year=2000, registration_number="X")), lambda r: r is None)
+        
+        weekdays = [window_mask(0, 8, 20)[0]] * 6 + [0]
+        services = [
+            ServiceNode(service_id="parity-service-1", vehicle_id="parity-vehicle-1", provider_uid="parity-provider-1",
+                        service_name="Lifting", service_category="Crane", service_area="Lahore", latitude=31.5204,
+                        longitude=74.3587, rating=4.8, availability_mask=weekdays, created_at=at(10), updated_at=at(10)),
+            ServiceNode(service_id="parity-service-2", vehicle_id="parity-vehicle-2", provider_uid="parity-provider-1",
+                        service_name="Heavy lifting", service_category="Crane", service_area="Lahore", latitude=31.55,
+                        longitude=74.34, rating=4.1, is_active=False, created_at=at(11), updated_at=at(11)),
+            ServiceNode(service_id="parity-service-3", vehicle_id="parity-vehicle-3", provider_uid="parity-provider-2",
+                        service_name="Harvesting", service_category="Harvester", service_area="Lahore", latitude=31.70,
+                        longitude=74.20, rating=3.2, created_at=at(12), updated_at=at(12)),
+            ServiceNode(service_id="parity-service-4", vehicle_id="parity-vehicle-3", provider_uid="parity-provider-2",
+                        service_name="Crane in Karachi", service_category="Crane", service_area="Karachi", latitude=24.86,
+                        longitude=67.01, created_at=at(13), updated_at=at(13)),
+            ServiceNode(service_id="parity-service-5", vehicle_id="parity-vehicle-1", provider_uid="parity-provider-1",
+                        service_name="Legacy schedule", service_category="Crane", service_area="Lahore",
+                        available_days="Monday-Saturday", available_hours="8 AM - 8 PM", rating=2.0,
+                        created_at=at(14), updated_at=at(14)),
+            ServiceNode(service_id="parity-service-6", vehicle_id="parity-vehicle-1", provider_uid="parity-provider-1",
+                        service_name="Unparseable schedule", service_category="Crane", service_area="Multan",
+                        available_days="sometimes", rating=1.0, created_at=at(15), updated_at=at(15)),
+        ]
+        for service in services:
+            self.step(f"create_service {service.service_id}", lambda s=service: users.create_service(s),
+                      lambda r: r["service_id"].startswith("parity-service"))
+        # A stored null removes the property: service 4 has no rating at all
+        self.step("update_service rating null", lambda: users.update_service("parity-service-4", {"rating": None}),
+                  lambda r: "rating" not in r)
+        # Service 5 goes back to the legacy strings only, for backfill_availability_masks
+        self.step("update_service mask null", lambda: users.update_service("parity-service-5", {"availability_mask": None}),
+                  lambda r: "availability_mask" not in r)
+    
+    def run(self) -> None:
+        users, repo = self.user_repo, self.vehicle_repo
+        self.seed()
+        
+        # Users
+        self.step("get_user_by_uid seeker", lambda: users.get_user_by_uid("parity-seeker-1"), lambda r: r["labels"] == ["Seeker"])
+        self.step("get_user_by_uid provider", lambda: users.get_user_by_uid("parity-provider-1"), lambda r: r["labels"] == ["Provider"])
+        self.step("get_user_by_uid missing", lambda: users.get_user_by_uid("parity-nobody"), lambda r: r is None)
+        self.step("get_user_by_email", lambda: users.get_user_by_email("provider2@parity.test"), lambda r: r["uid"] == "parity-provider-2")
+        self.step("user_exists uid", lambda: users.user_exists(uid="parity-seeker-2"), lambda r: r is True)
+        self.step("user_exists email", lambda: users.user_exists(email="seeker3@parity.test"), lambda r: r is True)
+        self.step("user_exists missing", lambda: users.user_exists(email="nobody@parity.test"), lambda r: r is False)
+        self.step("get_all_seekers page", lambda: users.get_all_seekers(limit=2, skip=1),
+                  lambda r: ids(r, "uid") == ["parity-seeker-2", "parity-seeker-1"])
+        self.step("get_all_providers", lambda: users.get_all_providers(),
+                  lambda r: ids(r, "uid") == ["parity-provider-3", "parity-provider-2", "parity-provider-1"])
+        self.step("search_providers min_rating", lambda: users.search_providers(min_rating=3.0),
+                  lambda r: ids(r, "uid") == ["parity-provider-1", "parity-provider-2", "parity-provider-3"])
+        self.step("search_providers verified crane", lambda: users.search_providers(business_type="crane", is_verified=True),
+                  lambda r: ids(r, "uid") == ["parity-provider-1"])
+        
+        # Vehicles and services by owner
+        self.step("get_provider_vehicles", lambda: users.get_provider_vehicles("parity-provider-1"),
+                  lambda r: ids(r, "vehicle_id") == ["parity-vehicle-2", "parity-vehicle-1"])
+        self.step("get_vehicle_by_id", lambda: users.get_vehicle_by_id("parity-vehicle-3"), lambda r: r["make"] == "Claas")
+        self.step("get_vehicle_services", lambda: users.get_vehicle_services("parity-vehicle-3"),
+                  lambda r: ids(r) == ["parity-service-4", "parity-service-3"])
+        self.step("get_provider_services", lambda: users.get_provider_services("parity-provider-1"),
+                  lambda r: ids(r) == ["parity-service-6", "parity-service-5", "parity-service-2", "parity-service-1"])
+        self.step("get_service_by_id", lambda: users.get_service_by_id("parity-service-3"), lambda r: r["rating"] == 3.2)
+        
+        # Seeker-facing queries
+        self.step("backfill_availability_masks", lambda: users.backfill_availability_masks(batch_size=2),
+                  lambda r: r == {"updated": 1, "unparsed": 4})
+        self.step("get_active_services", lambda: users.get_active_services(),
+                  lambda r: ids(r) == ["parity-service-4", "parity-service-1", "parity-service-3", "parity-service-5", "parity-service-6"])
+        self.step("get_active_services category", lambda: users.get_active_services(category="Crane", limit=2),
+                  lambda r: ids(r) == ["parity-service-4", "parity-service-1"])
+        self.step("get_active_services area and rating", lambda: users.get_active_services(service_area="Lahore", min_rating=3.0),
+                  lambda r: ids(r) == ["parity-service-1", "parity-service-3"])
+        self.step("get_active_services available_during", lambda: users.get_active_services(available_during=window_mask(2, 9, 12)),
+                  lambda r: "parity-service-1" in ids(r) and "parity-service-6" not in ids(r))
+        self.step("get_active_services_by_provider", lambda: users.get_active_services_by_provider("parity-provider-2"),
+                  lambda r: ids(r) == ["parity-service-4", "parity-service-3"])
+        self.step("get_nearby_services", lambda: users.get_nearby_services(*LAHORE, radius_km=30),
+                  lambda r: ids(r) == ["parity-service-1", "parity-service-3"] and r[0]["distance_km"] == 0.0)
+        self.step("get_nearby_services category", lambda: users.get_nearby_services(*LAHORE, radius_km=1500, service_category="Crane"),
+                  lambda r: ids(r) == ["parity-service-1", "parity-service-4"])
+        self.step("get_ranking_candidates", lambda: users.get_ranking_candidates(),
+                  lambda r: ids([c["service"] for c in r])[0] == "parity-service-4" and r[1]["provider_verified"] is True)
+        self.step("get_ranking_candidates geo", lambda: users.get_ranking_candidates(latitude=LAHORE[0], longitude=LAHORE[1], radius_km=30, limit=1),
+                  lambda r: len(r) == 1 and r[0]["distance_km"] == 0.0 and r[0]["touched_epoch"] is not None)
+        self.step("get_ranking_candidates geo without radius", lambda: users.get_ranking_candidates(latitude=24.86, longitude=67.01),
+                  lambda r: ids([c["service"] for c in r]) == ["parity-service-4", "parity-service-1", "parity-service-3"])
+        
+        # Similarity
+        self.step("create_seeker_similarity_relationships", lambda: users.create_seeker_similarity_relationships("parity-seeker-1"),
+                  lambda r: r["relationships_created"] == 5,
+                  keep=lambda r: {**r, "similar_seekers": sorted(r["similar_seekers"], key=lambda s: (s["uid"], s["similarity"]))})
+        self.step("create_seeker_similarity_relationships missing", lambda: users.create_seeker_similarity_relationships("parity-nobody"),
+                  lambda r: r["relationships_created"] == 0)
+        self.step("get_similar_seekers", lambda: users.get_similar_seekers("parity-seeker-1"),
+                  lambda r: [(s["uid"], s["similarity_score"]) for s in r] == [("parity-seeker-2", 4), ("parity-seeker-3", 2)],
+                  keep=lambda r: [{**s, "relationship_types": sorted(s["relationship_types"])} for s in r])
+        
+        # Updates
+        self.step("update_seeker", lambda: users.update_seeker("parity-seeker-2", {"bio": "Builds houses"}),
+                  lambda r: r["bio"] == "Builds houses" and isinstance(r["updated_at"], str))
+        self.step("update_seeker nothing", lambda: users.update_seeker("parity-seeker-2", {}), lambda r: r is None)
+        self.step("update_provider missing", lambda: users.update_provider("parity-nobody", {"bio": "x"}), lambda r: r is None)
+        self.step("update_provider_profile", lambda: users.update_provider_profile("parity-provider-2", {"full_name": "Hamza I.", "city": "Lahore"}),
+                  lambda r: r["name"] == "Hamza I." and r["city"] == "Lahore")
+        self.step("update_seeker_profile removes", lambda: users.update_seeker_profile("parity-seeker-3", {"address": None}),
+                  lambda r: "address" not in r and r["name"] == "Usman Tariq")
+        self.step("update_vehicle", lambda: users.update_vehicle("parity-vehicle-2", {"capacity": "70 tons"}),
+                  lambda r: r["capacity"] == "70 tons")
+        self.step("update_service deactivate", lambda: users.update_service("parity-service-1", {"is_active": False}),
+                  lambda r: r["is_active"] is False)
+        self.step("get_nearby_services after deactivate", lambda: users.get_nearby_services(*LAHORE, radius_km=30),
+                  lambda r: ids(r) == ["parity-service-3"])
+        
+        # VehicleRepository
+        self.step("VehicleRepository.create_vehicle missing provider",
+                  lambda: repo.create_vehicle("parity-nobody", "Crane", "X-1", "M"), lambda r: isinstance(r, Exception))
+        created = [
+            self.step(f"VehicleRepository.create_vehicle {n}", lambda: repo.create_vehicle("parity-provider-3", "Harvester", "LEC-9", "Lexion"),
+                      lambda r: r["name"] == "Harvester" and r["year"] == 0 and r["is_available"] is True,
+                      keep=lambda r: {key: value for key, value in r.items() if key not in ("vehicle_id", "created_at")})
+            for n in (1, 2)
+        ]
+        self.step("VehicleRepository.get_provider_vehicles", lambda: repo.get_provider_vehicles("parity-provider-3"),
+                  lambda r: len(r) == 2, keep=len)
+        self.step("VehicleRepository.remove_duplicate_vehicles", lambda: repo.remove_duplicate_vehicles("parity-provider-3"),
+                  lambda r: r == 1)
+        self.step("VehicleRepository.get_vehicle_by_id", lambda: repo.get_vehicle_by_id("parity-vehicle-3"),
+                  lambda r: r["registration_number"] == "LEB-3")
+        self.step("VehicleRepository.update_vehicle", lambda: repo.update_vehicle("parity-vehicle-3", {"condition": "Fair"}),
+                  lambda r: r["condition"] == "Fair")
+        self.step("VehicleRepository.check_vehicle_availability", lambda: repo.check_vehicle_availability("parity-vehicle-3"),
+                  lambda r: r is True)
+        self.step("VehicleRepository.update_vehicle_availability", lambda: repo.update_vehicle_availability("parity-vehicle-3", False),
+                  lambda r: r is True)
+        self.step("VehicleRepository.check_vehicle_availability off", lambda: repo.check_vehicle_availability("parity-vehicle-3"),
+                  lambda r: r is False)
+        self.step("VehicleRepository.check_vehicle_availability missing", lambda: repo.check_vehicle_availability("parity-nobody"),
+                  lambda r: r is False)
+        
+        # Deletes
+        self.step("delete_service", lambda: users.delete_service("parity-service-6"), lambda r: r is True)
+        self.step("delete_service again", lambda: users.delete_service("parity-service-6"), lambda r: r is False)
+        self.step("delete_vehicle cascades", lambda: users.delete_vehicle("parity-vehicle-1"), lambda r: r is True)
+        self.step("services of the deleted vehicle", lambda: users.get_provider_services("parity-provider-1"),
+                  lambda r: ids(r) == ["parity-service-2"])
+        self.step("VehicleRepository.delete_vehicle keeps services", lambda: repo.delete_vehicle("parity-vehicle-3"), lambda r: r is True)
+        self.step("orphaned service", lambda: users.get_service_by_id("parity-service-3"), lambda r: r is not None)
+        self.step("orphaned service has no vehicle", lambda: users.get_vehicle_services("parity-vehicle-3"), lambda r: r == [])
+        self.step("delete_user", lambda: users.delete_user("parity-seeker-2"), lambda r: r is True)
+        self.step("similar seekers after delete", lambda: users.get_similar_seekers("parity-seeker-1"),
+                  lambda r: ids(r, "uid") == ["parity-seeker-3"],
+                  keep=lambda r: [{**s, "relationship_types": sorted(s["relationship_types"])} for s in r])
+        self.step("delete_user missing", lambda: users.delete_user("parity-seeker-2"), lambda r: r is False)
+
+
+def snapshot(graph) -> Dict[str, Any]:
+    """Nodes and relationship indexes of an embedded graph, for the persistence check"""
+    def index(entries):
+        # Emptied entries stay in memory but are not read back from disk
+        return {str(key): sorted(value) for key, value in entries.items() if value}
+    
+    return normalize({
+        "nodes": graph.nodes,
+        "owns": index(graph.owns),
+        "offers": index(graph.offers),
+        "provides": index(graph.provides),
+        "similar": {key: value for key, value in graph.similar.items() if value},
+        "active": index(graph.active),
+    })
+
+
+def report(name: str, suite: Suite) -> bool:
+    print(f"   {name}: {len(suite.log)} steps, {len(suite.failures)} failed expectations")
+    for failure in suite.failures:
+        print(f"      ❌ {failure}")
+    return not suite.failures
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Run the repository behavior suite on both storage backends")
+    parser.add_argument("--neo4j", action="store_true", help="Also run against the Neo4j in .env (wiped first)")
+    parser.add_argument("--allow-remote", action="store_true", help="Allow --neo4j to wipe a non-local database")
+    args = parser.parse_args()
+    
+    from repositories.embedded_graph import EmbeddedGraph
+    from repositories.embedded_repository import EmbeddedUserRepository, EmbeddedVehicleRepository
+    
+    print(f"\n{'='*60}")
+    print(f"🔍 CHECKING STORAGE BACKEND PARITY")
+    print(f"   Backends: embedded{' + neo4j' if args.neo4j else ''}")
+    print(f"{'='*60}\n")
+    
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "parity.sqlite")
+        graph = EmbeddedGraph(path)
+        embedded = Suite(EmbeddedUserRepository(graph), EmbeddedVehicleRepository(graph))
+        embedded.run()
+        ok = report("embedded", embedded) and ok
+        
+        in_memory = snapshot(graph)
+        graph.close()
+        reopened = EmbeddedGraph(path)
+        persisted = snapshot(reopened) == in_memory
+        reopened.close()
+        print(f"   {'✅' if persisted else '❌'} reopened SQLite file {'matches' if persisted else 'differs from'} the in-memory graph")
+        ok = persisted and ok
+    
+    if args.neo4j:
+        from config.settings import settings
+        from config.neo4j_config import get_neo4j_driver, close_neo4j_driver
+        from repositories.user_repository import UserRepository
+        from repositories.vehicle_repository import VehicleRepository
+        
+        if urlparse(settings.NEO4J_URI).hostname not in ("localhost", "127.0.0.1", "::1") and not args.allow_remote:
+            parser.error(f"{settings.NEO4J_URI} is not local; pass --allow-remote to wipe it for the suite")
+        try:
+            with get_neo4j_driver().session() as session:
+                session.run("MATCH (n) DETACH DELETE n").consume()
+            neo4j = Suite(UserRepository(), VehicleRepository())
+            neo4j.run()
+            ok = report("neo4j", neo4j) and ok
+            
+            differences = [
+                (left[0], left[1], right[1])
+                for left, right in zip(embedded.log, neo4j.log)
+                if left != right
+            ]
+            for step, left, right in differences:
+                print(f"      ❌ {step}\n         embedded: {left!r:.300}\n         neo4j:    {right!r:.300}")
+            print(f"   {'✅' if not differences else '❌'} {len(embedded.log) - len(differences)}/{len(embedded.log)} steps returned the same result")
+            ok = not differences and ok
+        finally:
+            close_neo4j_driver()
+    
+    print(f"\n{'✅ Backends agree' if ok else '❌ Parity check failed'}\n")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
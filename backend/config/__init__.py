@@ -4,12 +4,18 @@ Configuration package initialization
 
 from .settings import settings
 from .firebase import initialize_firebase, get_firebase_auth
-from .neo4j_config import get_neo4j_driver, close_neo4j_driver
+from .firebase_async import get_async_firebase, FirebaseUnavailableError
+from .neo4j_config import get_neo4j_driver, close_neo4j_driver, current_neo4j_driver, pool_stats, add_driver_listener
 
 __all__ = [
     "settings",
     "initialize_firebase",
     "get_firebase_auth",
+    "get_async_firebase",
+    "FirebaseUnavailableError",
     "get_neo4j_driver",
     "close_neo4j_driver",
+    "current_neo4j_driver",
+    "pool_stats",
+    "add_driver_listener",
 ]
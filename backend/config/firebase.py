@@ -3,23 +3,45 @@ Firebase Admin SDK Configuration
 """
 
 import firebase_admin
-from firebase_admin import credentials, auth
+from firebase_admin import credentials, auth, exceptions, _token_gen
 import os
 from .settings import settings
+from monitoring.metrics import count_firebase_call
+from monitoring.tracing import traced
 
 
 _firebase_app = None
+_inherited_app = None
+
+
+def _reset_after_fork():
+    """
+    Drop the app inherited from the parent process
+    
+    Its HTTP sessions and token cache belong to the parent; the child
+    deletes it and initializes its own app on first use.
+    """
+    global _firebase_app, _inherited_app
+    _inherited_app, _firebase_app = _firebase_app, None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
 
 
 def initialize_firebase():
     """
     Initialize Firebase Admin SDK with service account credentials
     """
-    global _firebase_app
+    global _firebase_app, _inherited_app
     
     if _firebase_app is not None:
         return _firebase_app
     
+    if _inherited_app is not None:
+        firebase_admin.delete_app(_inherited_app)
+        _inherited_app = None
+    
     try:
         # Check if credentials file exists
         creds_path = settings.FIREBASE_CREDENTIALS_PATH
@@ -41,6 +63,22 @@ def initialize_firebase():
         raise
 
 
+def is_firebase_initialized() -> bool:
+    """Whether this process has a Firebase app (without initializing one)"""
+    return _firebase_app is not None
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Whether a failed Admin SDK call means Firebase was unreachable (worth
+    retrying) rather than a refused request (email exists, invalid token...)
+    """
+    if isinstance(error, (exceptions.UnavailableError, exceptions.DeadlineExceededError, ConnectionError, TimeoutError)):
+        return True
+    error_msg = str(error)
+    return "Connection" in error_msg or "aborted" in error_msg or "timeout" in error_msg.lower()
+
+
 def get_firebase_auth():
     """
     Get Firebase Auth instance
@@ -50,6 +88,24 @@ def get_firebase_auth():
     return auth
 
 
+def new_user_fields(email: str, password: str, display_name: str = None, phone: str = None) -> dict:
+    """Keyword arguments of auth.create_user for a new email/password account"""
+    user_data = {
+        "email": email,
+        "password": password,
+        "email_verified": True,  # Auto-verify email for better UX
+        "disabled": False,  # Ensure account is enabled
+    }
+    
+    if display_name:
+        user_data["display_name"] = display_name
+    if phone:
+        user_data["phone_number"] = phone
+    return user_data
+
+
+@count_firebase_call("create_user")
+@traced("firebase.create_user")
 def create_user(email: str, password: str, display_name: str = None, phone: str = None):
     """
     Create a new Firebase user with email/password authentication enabled
@@ -69,17 +125,7 @@ def create_user(email: str, password: str, display_name: str = None, phone: str
     
     for attempt in range(max_retries):
         try:
-            user_data = {
-                "email": email,
-                "password": password,
-                "email_verified": True,  # Auto-verify email for better UX
-                "disabled": False,  # Ensure account is enabled
-            }
-            
-            if display_name:
-                user_data["display_name"] = display_name
-            if phone:
-                user_data["phone_number"] = phone
+            user_data = new_user_fields(email, password, display_name, phone)
             
             print(f"🔄 Creating Firebase user (attempt {attempt + 1}/{max_retries})...")
             user = auth.create_user(**user_data)
@@ -96,7 +142,7 @@ def create_user(email: str, password: str, display_name: str = None, phone: str
             print(f"❌ Firebase creation attempt {attempt + 1} failed: {error_msg}")
             
             # Check if it's a network/connection issue
-            if "Connection" in error_msg or "aborted" in error_msg or "timeout" in error_msg.lower():
+            if is_transient_error(e):
                 if attempt < max_retries - 1:
                     print(f"⏳ Retrying in {retry_delay} seconds...")
                     time.sleep(retry_delay)
@@ -111,6 +157,8 @@ def create_user(email: str, password: str, display_name: str = None, phone: str
     raise Exception("Failed to create Firebase user after multiple attempts")
 
 
+@count_firebase_call("verify_token")
+@traced("firebase.verify_token")
 def verify_token(id_token: str):
     """
     Verify Firebase ID token
@@ -128,6 +176,29 @@ def verify_token(id_token: str):
         raise Exception(f"Invalid token: {str(e)}")
 
 
+def refresh_id_token_keys() -> str:
+    """
+    Refetch the ID token public keys into the cache verify_token reads
+    
+    The Admin SDK keeps the keys in an HTTP cache that honours their
+    Cache-Control max-age. Fetching through that same transport with
+    no-cache replaces the entry early, instead of leaving the refetch to
+    the first verification after it expires.
+    
+    Returns:
+        str: Cache-Control header of the new keys
+    """
+    if _firebase_app is None:
+        raise Exception("Firebase is not initialized")
+    verifier = auth._get_client(_firebase_app)._token_verifier
+    response = verifier.request(_token_gen.ID_TOKEN_CERT_URI, headers={"Cache-Control": "no-cache"})
+    if response.status != 200:
+        raise Exception(f"HTTP {response.status}")
+    return response.headers.get("Cache-Control", "")
+
+
+@count_firebase_call("get_user_by_uid")
+@traced("firebase.get_user_by_uid")
 def get_user_by_uid(uid: str):
     """
     Get user by Firebase UID
@@ -145,6 +216,8 @@ def get_user_by_uid(uid: str):
         raise Exception(f"User not found: {str(e)}")
 
 
+@count_firebase_call("get_user_by_email")
+@traced("firebase.get_user_by_email")
 def get_user_by_email(email: str):
     """
     Get user by email
@@ -162,6 +235,8 @@ def get_user_by_email(email: str):
         raise Exception(f"User not found: {str(e)}")
 
 
+@count_firebase_call("update_user")
+@traced("firebase.update_user")
 def update_user(uid: str, **kwargs):
     """
     Update user properties
@@ -180,6 +255,8 @@ def update_user(uid: str, **kwargs):
         raise Exception(f"Failed to update user: {str(e)}")
 
 
+@count_firebase_call("delete_user")
+@traced("firebase.delete_user")
 def delete_user(uid: str):
     """
     Delete user
@@ -193,6 +270,8 @@ def delete_user(uid: str):
         raise Exception(f"Failed to delete user: {str(e)}")
 
 
+@count_firebase_call("create_custom_token")
+@traced("firebase.create_custom_token")
 def create_custom_token(uid: str, additional_claims: dict = None):
     """
     Create custom token for user with retry logic
@@ -218,7 +297,7 @@ def create_custom_token(uid: str, additional_claims: dict = None):
             error_msg = str(e)
             print(f"❌ Token generation attempt {attempt + 1} failed: {error_msg}")
             
-            if "Connection" in error_msg or "aborted" in error_msg or "timeout" in error_msg.lower():
+            if is_transient_error(e):
                 if attempt < max_retries - 1:
                     print(f"⏳ Retrying in {retry_delay} seconds...")
                     time.sleep(retry_delay)
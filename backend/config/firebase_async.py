@@ -0,0 +1,380 @@
+"""
+Async Firebase Admin client
+Awaitable Admin SDK calls that never block the event loop
+
+The Admin SDK is synchronous: user management goes over HTTP and token
+verification/signing is CPU work. AsyncFirebase runs every call on its own
+bounded thread pool (FIREBASE_MAX_WORKERS threads, sharing the SDK's pooled
+HTTP session) and awaits the result:
+
+- attempts that find Firebase unreachable are retried with exponential
+  backoff and jitter (asyncio.sleep, so the loop keeps serving requests);
+  refused requests (email exists, invalid token...) are not retried
+- each attempt times out after FIREBASE_CALL_TIMEOUT seconds, waiting for
+  a free thread included; an attempt still queued when it times out is
+  dropped instead of running late
+- a circuit breaker opens after FIREBASE_BREAKER_THRESHOLD consecutive
+  unreachable attempts and fails calls immediately for
+  FIREBASE_BREAKER_RESET seconds, then lets one trial call through
+- every call is counted and timed (haulistry_firebase_call_seconds)
+
+Refused requests raise the same messages as the synchronous wrappers in
+config.firebase; FirebaseUnavailableError means Firebase could not be
+reached (circuit open, timeout or every retry failed).
+"""
+
+import asyncio
+import contextvars
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from firebase_admin import auth
+
+from .settings import settings
+from .firebase import is_transient_error, new_user_fields
+from monitoring.metrics import FIREBASE_CIRCUIT_STATE, FIREBASE_INFLIGHT, record_firebase_call
+from monitoring.tracing import traced
+
+
+class FirebaseUnavailableError(Exception):
+    """Firebase could not be reached: the circuit is open, or every attempt failed"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+    
+    closed: calls pass; `threshold` consecutive failures open the circuit.
+    open: calls are rejected until `reset_timeout` seconds have passed.
+    half_open: one trial call passes; its success closes the circuit and
+    its failure opens it again.
+    """
+    
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    
+    _GAUGE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+    
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+    
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+    
+    def retry_after(self) -> float:
+        """Seconds until the next trial call is let through (0 unless open)"""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+    
+    def allow(self) -> bool:
+        """Whether a call may go ahead now; claims the trial call when half-open"""
+        with self._lock:
+            if self._state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._set_state(self.HALF_OPEN)
+            if self._state == self.HALF_OPEN:
+                if self._trial_running:
+                    return False
+                self._trial_running = True
+            return True
+    
+    def record_success(self) -> None:
+        """Firebase answered (refusals included)"""
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+            self._set_state(self.CLOSED)
+    
+    def record_failure(self) -> None:
+        """Firebase was unreachable or too slow"""
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._state == self.HALF_OPEN or self._failures >= self.threshold:
+                self._opened_at = self._clock()
+                self._set_state(self.OPEN)
+    
+    def release(self) -> None:
+        """An allowed call ended without an answer either way (e.g. cancelled)"""
+        with self._lock:
+            self._trial_running = False
+    
+    def _set_state(self, state: str) -> None:
+        if state != self._state:
+            print(f"{'✅' if state == self.CLOSED else '⚠️ '} Firebase circuit {self._state} -> {state}")
+        self._state = state
+        FIREBASE_CIRCUIT_STATE.set(self._GAUGE_VALUES[state])
+
+
+class AsyncFirebase:
+    """Awaitable Firebase Admin calls on a bounded executor, with retries and a circuit breaker"""
+    
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        retry_delay: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.max_workers = max_workers or settings.FIREBASE_MAX_WORKERS
+        self.timeout = timeout or settings.FIREBASE_CALL_TIMEOUT
+        self.max_retries = max(1, max_retries or settings.FIREBASE_MAX_RETRIES)
+        self.retry_delay = settings.FIREBASE_RETRY_DELAY if retry_delay is None else retry_delay
+        self.breaker = breaker or CircuitBreaker(settings.FIREBASE_BREAKER_THRESHOLD, settings.FIREBASE_BREAKER_RESET)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="firebase")
+        return self._executor
+    
+    def shutdown(self) -> None:
+        """Drop queued calls and stop the threads once running calls finish"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+    
+    async def _attempt(self, operation: str, func: Callable, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        """
+        One attempt on the executor, bounded by the call timeout
+        
+        The span is started in the worker thread, under the caller's context,
+        so it nests inside the resolver's span.
+        """
+        context = contextvars.copy_context()
+        future = self._get_executor().submit(context.run, traced(f"firebase.{operation}")(func), *args, **kwargs)
+        FIREBASE_INFLIGHT.inc()
+        future.add_done_callback(lambda _: FIREBASE_INFLIGHT.dec())
+        # Cancelling the wrapper (timeout) also cancels the call if it has not started
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+    
+    async def _call(self, operation: str, func: Callable, *args, idempotent: bool = True, **kwargs) -> Any:
+        """
+        Run one Admin SDK call with retries, the breaker and metrics
+        
+        Args:
+            operation: Metric/span name, e.g. "verify_token"
+            func: The synchronous SDK function
+            idempotent: False when an attempt that timed out may still
+                complete (user creation), so it is not retried
+        
+        Returns:
+            The SDK function's result
+        
+        Raises:
+            FirebaseUnavailableError: If Firebase could not be reached
+            Exception: The SDK's own error when Firebase refused the request
+        """
+        start = time.perf_counter()
+        outcome = "error"
+        last_error = None
+        try:
+            for attempt in range(self.max_retries):
+                if not self.breaker.allow():
+                    outcome = "rejected"
+                    raise FirebaseUnavailableError(
+                        f"Authentication service is temporarily unavailable. "
+                        f"Please try again in {max(1, round(self.breaker.retry_after()))} seconds."
+                    )
+                
+                try:
+                    result = await self._attempt(operation, func, args, kwargs)
+                except asyncio.TimeoutError:
+                    self.breaker.record_failure()
+                    last_error = f"no answer within {self.timeout:.1f}s"
+                    if not idempotent:
+                        break
+                except Exception as e:
+                    if not is_transient_error(e):
+                        # Firebase answered, it just said no
+                        self.breaker.record_success()
+                        raise
+                    self.breaker.record_failure()
+                    last_error = str(e)
+                except BaseException:
+                    self.breaker.release()
+                    raise
+                else:
+                    self.breaker.record_success()
+                    outcome = "success"
+                    return result
+                
+                if attempt < self.max_retries - 1:
+                    delay = self.retry_delay * 2 ** attempt
+                    print(f"⏳ Firebase {operation} attempt {attempt + 1}/{self.max_retries} failed ({last_error}), "
+                          f"retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+            
+            outcome = "unavailable"
+            print(f"❌ Firebase {operation} failed: {last_error}")
+            raise FirebaseUnavailableError(
+                "Could not reach the authentication service. Please check your internet connection and try again."
+            )
+        finally:
+            record_firebase_call(operation, outcome, time.perf_counter() - start)
+    
+    async def create_user(self, email: str, password: str, display_name: str = None, phone: str = None):
+        """
+        Create a new Firebase user with email/password authentication enabled
+        
+        Args:
+            email: User's email address
+            password: User's password
+            display_name: User's display name (optional)
+            phone: User's phone number (optional)
+        
+        Returns:
+            UserRecord: Firebase user record
+        """
+        try:
+            user = await self._call(
+                "create_user", auth.create_user, idempotent=False,
+                **new_user_fields(email, password, display_name, phone)
+            )
+        except FirebaseUnavailableError:
+            raise
+        except Exception as e:
+            raise Exception(f"Failed to create Firebase user: {str(e)}")
+        
+        print(f"✅ Firebase user created: {user.uid} ({user.email})")
+        return user
+    
+    async def verify_token(self, id_token: str) -> Dict[str, Any]:
+        """
+        Verify Firebase ID token
+        
+        Args:
+            id_token: Firebase ID token
+        
+        Returns:
+            dict: Decoded token with user information
+        """
+        try:
+            return await self._call("verify_token", auth.verify_id_token, id_token)
+        except FirebaseUnavailableError:
+            raise
+        except Exception as e:
+            raise Exception(f"Invalid token: {str(e)}")
+    
+    async def get_user_by_uid(self, uid: str):
+        """
+        Get user by Firebase UID
+        
+        Returns:
+            UserRecord: Firebase user record
+        """
+        try:
+            return await self._call("get_user_by_uid", auth.get_user, uid)
+        except FirebaseUnavailableError:
+            raise
+        except Exception as e:
+            raise Exception(f"User not found: {str(e)}")
+    
+    async def get_user_by_email(self, email: str):
+        """
+        Get user by email
+        
+        Returns:
+            UserRecord: Firebase user record
+        """
+        try:
+            return await self._call("get_user_by_email", auth.get_user_by_email, email)
+        except FirebaseUnavailableError:
+            raise
+        except Exception as e:
+            raise Exception(f"User not found: {str(e)}")
+    
+    async def update_user(self, uid: str, **kwargs):
+        """
+        Update user properties
+        
+        Returns:
+            UserRecord: Updated user record
+        """
+        try:
+            return await self._call("update_user", auth.update_user, uid, **kwargs)
+        except FirebaseUnavailableError:
+            raise
+        except Exception as e:
+            raise Exception(f"Failed to update user: {str(e)}")
+    
+    async def delete_user(self, uid: str) -> None:
+        """Delete user"""
+        try:
+            await self._call("delete_user", auth.delete_user, uid)
+        except FirebaseUnavailableError:
+            raise
+        except Exception as e:
+            raise Exception(f"Failed to delete user: {str(e)}")
+    
+    async def create_custom_token(self, uid: str, additional_claims: dict = None):
+        """
+        Create custom token for user
+        
+        Args:
+            uid: Firebase user UID
+            additional_claims: Additional claims to include in token
+        
+        Returns:
+            bytes: Custom token
+        """
+        try:
+            return await self._call("create_custom_token", auth.create_custom_token, uid, additional_claims)
+        except FirebaseUnavailableError:
+            raise
+        except Exception as e:
+            raise Exception(f"Failed to create custom token: {str(e)}")
+
+
+_client: Optional[AsyncFirebase] = None
+_client_lock = threading.Lock()
+
+
+def get_async_firebase() -> AsyncFirebase:
+    """Get the process-wide async Firebase client (its threads start on first call)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = AsyncFirebase()
+    return _client
+
+
+def shutdown_async_firebase() -> None:
+    """Stop the client's executor"""
+    if _client is not None:
+        _client.shutdown()
+
+
+def _reset_after_fork():
+    # Executor threads and breaker state belong to the parent
+    global _client
+    _client = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -4,61 +4,194 @@ Neo4j Database Configuration
 
 from neo4j import GraphDatabase, Driver
 from neo4j.exceptions import ServiceUnavailable, AuthError
-from typing import Optional
-import socket
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed, wait
+from typing import Optional, List, Dict, Tuple, Any, Callable
+import os
+import threading
 import ssl
 import certifi
 from .settings import settings
 
 
 _neo4j_driver: Optional[Driver] = None
+_connect_lock = threading.Lock()
+_driver_listeners: List[Callable[[Driver], None]] = []
 
 
-def test_network_connectivity(uri: str) -> bool:
+def _reset_after_fork():
     """
-    Test basic network connectivity to Neo4j host
+    Forget a driver inherited from the parent process
+    
+    Pooled connections are sockets shared with the parent, so the child must
+    not use or close them; it opens its own pool on first use instead.
+    """
+    global _neo4j_driver, _connect_lock
+    _neo4j_driver = None
+    _connect_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def add_driver_listener(listener: Callable[[Driver], None]):
+    """
+    Call listener with every driver this process connects, now and after
+    reconnects (used to instrument the connection pool)
+    
+    Args:
+        listener: Callback receiving the new driver
+    """
+    _driver_listeners.append(listener)
+    if _neo4j_driver is not None:
+        listener(_neo4j_driver)
+
+
+def candidate_uris(configured: str) -> List[str]:
+    """
+    URIs to try for the configured one: itself first, then the schemes that
+    work around certificate (+ssc) and routing (bolt) problems on Neo4j Aura
+    
+    Args:
+        configured: NEO4J_URI from settings
+    
+    Returns:
+        list: Candidate URIs, configured URI first
+    """
+    uri_schemes = [configured]
+    
+    if "neo4j+ssc://" in configured:
+        # Already using +ssc, just try bolt as fallback
+        uri_schemes.append(configured.replace("neo4j+ssc://", "bolt+ssc://"))
+    elif "neo4j+s://" in configured:
+        # +ssc works with certificate issues, bolt with routing issues
+        uri_schemes.extend([
+            configured.replace("neo4j+s://", "neo4j+ssc://"),
+            configured.replace("neo4j+s://", "bolt+ssc://"),
+        ])
+    elif "bolt+s://" in configured:
+        uri_schemes.extend([
+            configured.replace("bolt+s://", "bolt+ssc://"),
+            configured.replace("bolt+s://", "neo4j+ssc://"),
+        ])
+    
+    return uri_schemes
+
+
+def open_driver(uri: str) -> Driver:
+    """
+    Create a driver for one URI and prove it can run a query
+    
+    RETURN 1 covers DNS, TCP, TLS, authentication and (for neo4j://)
+    routing in a single round trip, so no separate probe is needed.
     
     Args:
         uri: Neo4j connection URI
-        
+    
     Returns:
-        bool: True if host is reachable
+        Driver: Connected driver
+    
+    Raises:
+        AuthError: Credentials rejected
+        Exception: Any connection or routing failure
     """
+    driver = GraphDatabase.driver(
+        uri,
+        auth=(settings.NEO4J_USERNAME, settings.NEO4J_PASSWORD),
+        max_connection_lifetime=3600,
+        max_connection_pool_size=50,
+        connection_timeout=settings.NEO4J_CONNECTION_TIMEOUT,
+        user_agent="HaulistryApp/1.0"
+    )
     try:
-        # Parse host from URI - handle all Neo4j URI schemes
-        host = uri.replace("neo4j+ssc://", "").replace("neo4j+s://", "").replace("neo4j://", "") \
-                  .replace("bolt+ssc://", "").replace("bolt+s://", "").replace("bolt://", "") \
-                  .split(":")[0].split("/")[0]
-        
-        # Try DNS resolution
-        ip = socket.gethostbyname(host)
-        print(f"   🌐 DNS resolved: {host} -> {ip}")
-        
-        # Try TCP connection on port 7687
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(10)
-        result = sock.connect_ex((host, 7687))
-        sock.close()
+        with driver.session() as session:
+            session.run("RETURN 1 AS test").single()
+    except BaseException:
+        driver.close()
+        raise
+    return driver
+
+
+def _close_if_opened(future: Future):
+    """Close the driver of an attempt that lost the race"""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def connect_first(uris: List[str], head_start: float = 0.0) -> Tuple[Driver, str]:
+    """
+    Connect with the configured URI, racing the fallbacks only if it fails
+    or is slow
+    
+    The fallback schemes are weaker (+ssc skips the certificate check, bolt
+    skips routing), so they must never win against a configured URI that
+    works: the configured URI runs alone for head_start seconds, and the
+    fallbacks join only once it has failed or missed that deadline. From
+    then on every attempt runs concurrently, so a scheme that hangs until
+    its connection timeout does not delay the others. Attempts still running
+    when a winner is found are left to finish in the background and their
+    drivers are closed.
+    
+    Args:
+        uris: Candidate URIs, configured URI first (candidate_uris)
+        head_start: Seconds the configured URI runs before the fallbacks start
+    
+    Returns:
+        tuple: (driver, uri) of the attempt that connected
+    
+    Raises:
+        AuthError: Credentials rejected (every scheme would reject them)
+        Exception: Error of the configured URI's attempt when all failed
+    """
+    executor = ThreadPoolExecutor(max_workers=len(uris), thread_name_prefix="neo4j-connect")
+    futures: Dict[Future, str] = {}
+    errors: Dict[str, Exception] = {}
+    winner: Optional[Future] = None
+    
+    try:
+        print(f"   🔌 Attempting connection to: {uris[0]}")
+        first = executor.submit(open_driver, uris[0])
+        futures[first] = uris[0]
+        wait([first], timeout=head_start)
+        if first.done():
+            error = first.exception()
+            if error is None:
+                winner = first
+            elif isinstance(error, AuthError):
+                raise error
         
-        if result == 0:
-            print(f"   ✅ Network reachable: {host}:7687")
-            return True
-        else:
-            print(f"   ❌ Port 7687 not reachable (error: {result})")
-            return False
+        if winner is None:
+            for uri in uris:
+                if uri not in futures.values():
+                    print(f"   🔌 Attempting connection to: {uri}")
+                    futures[executor.submit(open_driver, uri)] = uri
             
-    except socket.gaierror:
-        print(f"   ❌ DNS resolution failed for {host}")
-        return False
-    except Exception as e:
-        print(f"   ⚠️  Network test error: {e}")
-        return False
+            for future in as_completed(futures):
+                uri = futures[future]
+                error = future.exception()
+                if error is None:
+                    winner = future
+                    break
+                if isinstance(error, AuthError):
+                    raise error
+                print(f"   ❌ Connection failed with {uri.split('://')[0]}://: {str(error)}")
+                errors[uri] = error
+    finally:
+        for future in futures:
+            if future is not winner:
+                future.add_done_callback(_close_if_opened)
+        executor.shutdown(wait=False)
+    
+    if winner is None:
+        raise errors.get(uris[0]) or next(iter(errors.values()), None) or ServiceUnavailable("Unable to connect to Neo4j Aura")
+    return winner.result(), futures[winner]
 
 
 def get_neo4j_driver() -> Driver:
     """
     Get Neo4j driver instance (singleton pattern) with automatic reconnection
-    Tries multiple connection strategies for Neo4j Aura
+    Falls back to the other URI schemes for Neo4j Aura only when the
+    configured one fails or is slow (connect_first)
     
     Returns:
         Driver: Neo4j driver instance
@@ -80,105 +213,92 @@ def get_neo4j_driver() -> Driver:
                 pass
             _neo4j_driver = None
     
-    if _neo4j_driver is None:
-        # Try different URI schemes if the primary one fails
-        uri_schemes = [
-            settings.NEO4J_URI,  # Try the configured URI first
-        ]
+    with _connect_lock:
+        # Another thread may have reconnected while this one waited
+        if _neo4j_driver is not None:
+            return _neo4j_driver
+        
+        configured = settings.NEO4J_URI
         
-        # Add alternative schemes if not already in the list
-        if "neo4j+ssc://" in settings.NEO4J_URI:
-            # Already using +ssc, just try bolt as fallback
-            bolt_uri = settings.NEO4J_URI.replace("neo4j+ssc://", "bolt+ssc://")
-            uri_schemes.append(bolt_uri)
-        elif "neo4j+s://" in settings.NEO4J_URI:
-            # Try +ssc version first (works with certificate issues), then bolt
-            ssc_uri = settings.NEO4J_URI.replace("neo4j+s://", "neo4j+ssc://")
-            bolt_uri = settings.NEO4J_URI.replace("neo4j+s://", "bolt+ssc://")
-            uri_schemes.extend([ssc_uri, bolt_uri])
-        elif "bolt+s://" in settings.NEO4J_URI:
-            neo4j_uri = settings.NEO4J_URI.replace("bolt+s://", "neo4j+ssc://")
-            bolt_ssc = settings.NEO4J_URI.replace("bolt+s://", "bolt+ssc://")
-            uri_schemes.extend([bolt_ssc, neo4j_uri])
+        try:
+            driver, uri = connect_first(candidate_uris(configured), head_start=settings.NEO4J_SCHEME_HEAD_START)
+        except AuthError as e:
+            print(f"❌ Neo4j authentication failed: {str(e)}")
+            print(f"💡 Check your credentials in .env file")
+            print(f"   Username: {settings.NEO4J_USERNAME}")
+            print(f"   Password: {'*' * len(settings.NEO4J_PASSWORD)}")
+            raise
+        except Exception:
+            print(f"\n❌ Failed to connect with any URI scheme")
+            print(f"💡 Troubleshooting steps:")
+            print(f"   1. Check Neo4j Aura Console: https://console.neo4j.io/")
+            print(f"   2. Verify instance {configured.split('://')[1].split('.')[0]} is RUNNING")
+            print(f"   3. Check if instance is PAUSED (resume it)")
+            print(f"   4. Verify credentials are correct")
+            print(f"   5. Check firewall settings")
+            raise
+        
+        print(f"✅ Neo4j connected successfully to {uri}")
         
-        last_error = None
+        # If we successfully connected with an alternative URI, update the message
+        if uri != configured:
+            print(f"   💡 Note: Connected using {uri.split('://')[0]}:// instead of configured scheme")
         
-        for uri in uri_schemes:
+        for listener in _driver_listeners:
             try:
-                print(f"   🔌 Attempting connection to: {uri}")
-                
-                # Test network connectivity first
-                if not test_network_connectivity(uri):
-                    print(f"   ⚠️  Network test failed, trying next scheme...")
-                    continue
-                
-                # Create driver for Neo4j Aura
-                _neo4j_driver = GraphDatabase.driver(
-                    uri,
-                    auth=(settings.NEO4J_USERNAME, settings.NEO4J_PASSWORD),
-                    max_connection_lifetime=3600,
-                    max_connection_pool_size=50,
-                    connection_timeout=30,
-                    user_agent="HaulistryApp/1.0"
-                )
-                
-                # Verify connection with a simple query
-                print("   🔍 Verifying connectivity...")
-                _neo4j_driver.verify_connectivity()
-                
-                # Test with actual query to ensure it's really working
-                with _neo4j_driver.session() as session:
-                    result = session.run("RETURN 1 as test")
-                    result.single()
-                
-                print(f"✅ Neo4j connected successfully to {uri}")
-                
-                # If we successfully connected with an alternative URI, update the message
-                if uri != settings.NEO4J_URI:
-                    print(f"   💡 Note: Connected using {uri.split('://')[0]}:// instead of configured scheme")
-                
-                return _neo4j_driver
-                
-            except ServiceUnavailable as e:
-                error_msg = str(e).lower()
-                print(f"   ❌ Connection failed with {uri.split('://')[0]}://: {str(e)}")
-                last_error = e
-                
-                if "routing" in error_msg:
-                    print(f"   💡 Routing error - trying alternative scheme...")
-                
-                # Try next scheme
-                continue
-                
-            except AuthError as e:
-                print(f"❌ Neo4j authentication failed: {str(e)}")
-                print(f"💡 Check your credentials in .env file")
-                print(f"   Username: {settings.NEO4J_USERNAME}")
-                print(f"   Password: {'*' * len(settings.NEO4J_PASSWORD)}")
-                raise  # Don't try other schemes for auth errors
-                
+                listener(driver)
             except Exception as e:
-                print(f"   ❌ Error with {uri.split('://')[0]}://: {str(e)}")
-                last_error = e
-                continue
+                print(f"⚠️  Neo4j driver listener failed: {str(e)}")
         
-        # If we get here, all schemes failed
-        print(f"\n❌ Failed to connect with any URI scheme")
-        print(f"💡 Troubleshooting steps:")
-        print(f"   1. Check Neo4j Aura Console: https://console.neo4j.io/")
-        print(f"   2. Verify instance {settings.NEO4J_URI.split('://')[1].split('.')[0]} is RUNNING")
-        print(f"   3. Check if instance is PAUSED (resume it)")
-        print(f"   4. Verify credentials are correct")
-        print(f"   5. Check firewall settings")
-        
-        if last_error:
-            raise last_error
-        else:
-            raise ServiceUnavailable("Unable to connect to Neo4j Aura")
+        _neo4j_driver = driver
+        return _neo4j_driver
+
+
+def current_neo4j_driver() -> Optional[Driver]:
+    """
+    The driver already created in this process, without verifying or
+    reconnecting it (health probes and metrics must not open connections)
     
+    Returns:
+        Driver: Current driver, or None before the first connection
+    """
     return _neo4j_driver
 
 
+def pool_stats(driver: Optional[Driver] = None) -> Dict[str, Any]:
+    """
+    Connection counts of a driver's pool, summed over server addresses
+    
+    Reads the neo4j 5.x pool internals; an empty dict means they were not
+    available (no driver yet, or a driver version with another layout).
+    
+    Args:
+        driver: Driver to inspect (defaults to the current driver)
+    
+    Returns:
+        dict: max_size (per address), in_use, idle and addresses
+    """
+    pool = getattr(driver or _neo4j_driver, "_pool", None)
+    connections = getattr(pool, "connections", None)
+    if connections is None:
+        return {}
+    
+    try:
+        snapshot = [list(address_connections) for address_connections in list(connections.values())]
+    except RuntimeError:
+        # Pool changed while copying; the next call gets a consistent view
+        return {}
+    
+    total = sum(len(address_connections) for address_connections in snapshot)
+    in_use = sum(connection.in_use for address_connections in snapshot for connection in address_connections)
+    return {
+        "max_size": pool.pool_config.max_connection_pool_size,
+        "in_use": in_use,
+        "idle": total - in_use,
+        "addresses": len(snapshot),
+    }
+
+
 def close_neo4j_driver():
     """
     Close Neo4j driver connection
@@ -14,9 +14,27 @@ class Settings(BaseSettings):
     NEO4J_USERNAME: str
     NEO4J_PASSWORD: str
     NEO4J_DATABASE: str = "neo4j"
+    NEO4J_CONNECTION_TIMEOUT: float = 30.0  # Seconds per connection attempt
+    NEO4J_SCHEME_HEAD_START: float = 2.0  # Seconds the configured URI runs alone before the weaker fallback schemes join
+    
+    # User / vehicle / service storage
+    STORAGE_BACKEND: str = "neo4j"  # neo4j, or embedded (in-memory indexes persisted to SQLite, single worker)
+    EMBEDDED_DB_PATH: str = "data/haulistry.sqlite"  # SQLite file of the embedded backend
     
     # Firebase Configuration
     FIREBASE_CREDENTIALS_PATH: str = "./firebase-credentials.json"
+    FIREBASE_MAX_WORKERS: int = 8  # Threads running awaited Admin SDK calls; keep within the SDK's 10 pooled HTTP connections
+    FIREBASE_CALL_TIMEOUT: float = 10.0  # Seconds per attempt, executor queueing included
+    FIREBASE_MAX_RETRIES: int = 3  # Attempts per call when Firebase is unreachable
+    FIREBASE_RETRY_DELAY: float = 0.5  # Seconds before the first retry; doubled per attempt, with jitter
+    FIREBASE_BREAKER_THRESHOLD: int = 5  # Consecutive unreachable attempts that open the circuit
+    FIREBASE_BREAKER_RESET: float = 30.0  # Seconds the circuit fails fast before one trial call
+    
+    # Registration
+    REGISTRATION_MODE: str = "sync"  # sync, or outbox (return after Firebase; a background worker creates the profile)
+    REGISTRATION_OUTBOX_PATH: str = "data/registration_outbox.sqlite"  # Pending profiles, shared by the workers of one host
+    REGISTRATION_OUTBOX_POLL_INTERVAL: float = 5.0  # Seconds between outbox passes (new signups are processed at once)
+    REGISTRATION_OUTBOX_MAX_ATTEMPTS: int = 20  # Failed attempts before a registration is marked failed
     
     # API Configuration
     API_HOST: str = "0.0.0.0"
@@ -40,6 +58,63 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "change-this-secret-key"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    SESSION_TOKENS: bool = False  # Issue API access/refresh tokens at login, verified locally instead of by Firebase
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    SESSION_DENY_LIST_PATH: str = "data/session_deny_list.sqlite"  # Revoked sessions, shared by the workers of one host and kept across restarts
+    
+    # Ranking
+    RANKING_CANDIDATE_LIMIT: int = 500  # Max candidates pulled from Neo4j before ranking
+    SINGLE_FLIGHT_READS: bool = True  # Identical concurrent active/nearby service reads share one query
+    
+    # Subscriptions event broker
+    EVENT_BROKER_BACKEND: str = "memory"  # memory (single worker) or redis (shared between workers)
+    EVENT_BROKER_REDIS_URL: str = "redis://localhost:6379/0"
+    EVENT_BROKER_QUEUE_SIZE: int = 64  # Pending events per subscriber before the oldest is dropped
+    
+    # Response compression
+    COMPRESSION_MIN_SIZE: int = 1024  # Bytes; smaller responses are sent uncompressed
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5  # Used only when the brotli package is installed
+    
+    # Production server (serve.py)
+    WORKERS: int = 0  # 0 = one worker per available CPU core
+    SERVER_BACKLOG: int = 2048  # Pending connections queued by the listening socket
+    KEEPALIVE_TIMEOUT: int = 75  # Seconds; keep above the load balancer's idle timeout
+    GRACEFUL_TIMEOUT: int = 30  # Seconds a stopping worker waits for in-flight requests
+    
+    # Rate limiting (token bucket per client, GraphQL requests weighted by root fields)
+    RATE_LIMIT_BACKEND: str = "none"  # none, memory (budget per worker) or redis (shared between workers)
+    RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_RATE: float = 10.0  # Cost units refilled per second per client
+    RATE_LIMIT_BURST: float = 100.0  # Bucket size; a request costing more takes the whole bucket
+    RATE_LIMIT_COSTS: str = ""  # Per-field cost overrides, e.g. "nearbyServices=8,login=10"
+    RATE_LIMIT_MAX_PENDING: int = 32  # Bearer tokens verified in the background at once; others stay keyed by IP meanwhile
+    RATE_LIMIT_VERIFY_WORKERS: int = 2  # Threads for those verifications, apart from FIREBASE_MAX_WORKERS
+    
+    # Health probing (/readyz)
+    HEALTH_PROBE_INTERVAL: float = 5.0  # Seconds between background dependency probes
+    HEALTH_PROBE_TIMEOUT: float = 3.0  # A probe slower than this counts as failed
+    
+    # Slow-query log
+    SLOW_QUERY_THRESHOLD_MS: float = 500.0  # Statements slower than this (wall time) are logged
+    SLOW_QUERY_LOG_PATH: str = "logs/slow_queries.log"  # JSON lines; empty to keep statistics only
+    SLOW_QUERY_LOG_MAX_BYTES: int = 10 * 1024 * 1024  # Rotated at this size
+    SLOW_QUERY_LOG_BACKUPS: int = 5
+    SLOW_QUERY_PROFILE: bool = True  # Capture PROFILE (reads) / EXPLAIN (writes) plans for slow statements
+    SLOW_QUERY_PROFILE_INTERVAL: float = 300.0  # Seconds between plan captures of the same statement
+    
+    # Tracing (OpenTelemetry)
+    TRACING_EXPORTER: str = "none"  # none, console or file
+    TRACING_FILE_PATH: str = "logs/traces.jsonl"  # File exporter output, one span per line
+    TRACING_SAMPLE_RATIO: float = 1.0  # Fraction of new traces recorded (0.0-1.0)
+    
+    # Administration
+    ADMIN_UIDS: str = ""  # Comma-separated Firebase UIDs allowed to run admin queries
+    
+    @property
+    def admin_uids_list(self) -> List[str]:
+        """Parse ADMIN_UIDS string into list"""
+        return [uid.strip() for uid in self.ADMIN_UIDS.split(",") if uid.strip()]
     
     # Logging
     LOG_LEVEL: str = "INFO"
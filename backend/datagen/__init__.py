@@ -0,0 +1,37 @@
+"""
+Synthetic data generation
+Seeded, production-shaped marketplace graphs for load tests and benchmarks
+"""
+
+from datagen.marketplace import (
+    MarketplaceSpec,
+    generate,
+    CITIES,
+    BUSINESS_TYPES,
+    SEEKER_CATEGORIES,
+    seeker_uid,
+    provider_uid,
+    vehicle_id,
+    service_id,
+    seeker_email,
+    provider_email,
+)
+from datagen.writers import Neo4jWriter, CsvWriter, EmbeddedWriter, INDEXES
+
+__all__ = [
+    "MarketplaceSpec",
+    "generate",
+    "CITIES",
+    "BUSINESS_TYPES",
+    "SEEKER_CATEGORIES",
+    "seeker_uid",
+    "provider_uid",
+    "vehicle_id",
+    "service_id",
+    "seeker_email",
+    "provider_email",
+    "Neo4jWriter",
+    "CsvWriter",
+    "EmbeddedWriter",
+    "INDEXES",
+]
@@ -0,0 +1,460 @@
+"""
+Synthetic marketplace graph
+Seeded, streaming generator of production-shaped Seeker / Provider / Vehicle / Service nodes
+
+generate() yields (label, row) pairs one node at a time, so memory stays
+flat from a thousand users to millions. A row is the node model's to_dict()
+(exactly the properties the repositories write), plus the `name` the
+repositories copy from full_name on users; datagen.writers batches rows
+into Neo4j or into CSV files for neo4j-admin import.
+
+Shape of the data:
+- Users live in fifteen Pakistani cities, weighted by population
+- A city's profile skews its providers' business types: harvesters around
+  the agricultural cities, cranes in the metros, trucks everywhere
+- Fleet sizes are Pareto distributed: most providers own one or two
+  vehicles, a few run fleets of dozens
+- Services sit a few kilometres around their city centre (harvesters
+  further out), are priced per business type with a log-normal spread, and
+  most have few or no ratings
+- Seekers keep their category preferences as JSON, in the app's shape
+- Sign-ups grow over time, so recent timestamps are more common
+
+The same spec always yields the same rows. Providers, seekers and images
+draw from separate random streams, so changing the seeker count (or
+turning images on) leaves every other row unchanged.
+"""
+
+import base64
+import json
+import random
+from bisect import bisect
+from datetime import datetime
+from itertools import accumulate
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+
+from models.availability import mask_from_legacy
+from models.user import SeekerNode, ProviderNode, VehicleNode, ServiceNode
+
+
+# (city, province, latitude, longitude, population in millions, registration prefix, profile)
+CITIES = [
+    ("Karachi", "Sindh", 24.8607, 67.0011, 16.0, "KHI", "metro"),
+    ("Lahore", "Punjab", 31.5204, 74.3587, 11.1, "LEA", "metro"),
+    ("Faisalabad", "Punjab", 31.4504, 73.1350, 3.2, "FDA", "agri"),
+    ("Rawalpindi", "Punjab", 33.5651, 73.0169, 2.1, "RIR", "mixed"),
+    ("Gujranwala", "Punjab", 32.1877, 74.1945, 2.0, "GAA", "mixed"),
+    ("Peshawar", "Khyber Pakhtunkhwa", 34.0151, 71.5249, 1.9, "PRA", "mixed"),
+    ("Multan", "Punjab", 30.1575, 71.5249, 1.9, "MNA", "agri"),
+    ("Hyderabad", "Sindh", 25.3960, 68.3578, 1.7, "HDA", "agri"),
+    ("Islamabad", "Islamabad Capital Territory", 33.6844, 73.0479, 1.0, "ICT", "metro"),
+    ("Quetta", "Balochistan", 30.1798, 66.9750, 1.0, "QTA", "mixed"),
+    ("Bahawalpur", "Punjab", 29.3544, 71.6911, 0.76, "BWP", "agri"),
+    ("Sargodha", "Punjab", 32.0836, 72.6711, 0.66, "SGA", "agri"),
+    ("Sialkot", "Punjab", 32.4945, 74.5229, 0.66, "SKT", "mixed"),
+    ("Sukkur", "Sindh", 27.7052, 68.8574, 0.5, "SKR", "agri"),
+    ("Larkana", "Sindh", 27.5570, 68.2264, 0.49, "LKA", "agri"),
+]
+
+BUSINESS_TYPES = {
+    "harvester": {
+        "category": "Harvester",
+        "makes": ["Claas", "John Deere", "Kubota", "New Holland"],
+        "capacities": ["90 HP", "120 HP", "180 HP"],
+        "services": ["Wheat Harvesting", "Rice Harvesting", "Corn Harvesting", "Custom Harvesting"],
+        "price_per_hour": 10000.0,
+        "price_per_service": None,
+        # Standard deviation of a service's distance from the city centre
+        "spread_km": 25.0,
+    },
+    "sand_truck": {
+        "category": "Sand Truck",
+        "makes": ["Hino", "Isuzu", "Nissan Diesel", "Master"],
+        "capacities": ["10 tons", "12 tons", "15 tons"],
+        "services": ["Sand Delivery", "Sand Supply per Trolley", "Construction Sand Hauling"],
+        "price_per_hour": 3000.0,
+        "price_per_service": 20000.0,
+        "spread_km": 6.0,
+    },
+    "brick_truck": {
+        "category": "Brick Truck",
+        "makes": ["Hino", "Isuzu", "Master", "Mazda"],
+        "capacities": ["3000 bricks", "5000 bricks", "8000 bricks"],
+        "services": ["Brick Delivery", "Brick Supply per Trolley", "Site Material Transport"],
+        "price_per_hour": 2500.0,
+        "price_per_service": 16000.0,
+        "spread_km": 6.0,
+    },
+    "crane": {
+        "category": "Crane",
+        "makes": ["Tadano", "Kato", "XCMG", "Zoomlion"],
+        "capacities": ["10 tons", "25 tons", "50 tons", "100 tons"],
+        "services": ["Heavy Lifting", "Construction Support", "Material Handling", "Equipment Installation"],
+        "price_per_hour": 6000.0,
+        "price_per_service": None,
+        "spread_km": 4.0,
+    },
+}
+
+# City profile -> weight of each business type, in BUSINESS_TYPES order
+PROFILE_BUSINESS_WEIGHTS = {
+    "metro": (0.05, 0.35, 0.35, 0.25),
+    "mixed": (0.20, 0.30, 0.35, 0.15),
+    "agri": (0.45, 0.20, 0.27, 0.08),
+}
+
+# Seeker preference categories and subcategories (as offered by the app)
+SEEKER_CATEGORIES = {
+    "Agriculture": ["Harvester Services", "Tractor Services", "Wheat Harvesting", "Rice Harvesting", "Sugarcane Harvesting"],
+    "Construction": ["Sand Trucks", "Brick Trucks", "Gravel Trucks", "Material Transport"],
+    "Logistics & Transport": ["Heavy Load Transport", "Equipment Transport", "Inter-city Transport", "Local Delivery"],
+    "Emergency Services": ["Crane Services", "Heavy Lifting", "Emergency Transport"],
+}
+
+# City profile -> weight of each seeker category, in SEEKER_CATEGORIES order
+PROFILE_CATEGORY_WEIGHTS = {
+    "metro": (0.10, 0.50, 0.25, 0.15),
+    "mixed": (0.25, 0.45, 0.20, 0.10),
+    "agri": (0.55, 0.30, 0.10, 0.05),
+}
+
+# Requirement quantity unit and range per seeker category
+CATEGORY_QUANTITIES = {
+    "Agriculture": ("acres", 5, 200),
+    "Construction": ("trolleys", 2, 60),
+    "Logistics & Transport": ("tons", 2, 40),
+    "Emergency Services": ("tons", 5, 100),
+}
+
+PURPOSES = {
+    "Agriculture": "Agricultural Operations",
+    "Construction": "Construction Projects",
+    "Logistics & Transport": "Business/Commercial Use",
+    "Emergency Services": "Emergency Needs",
+}
+OTHER_PURPOSE = "Personal/Individual Use"
+
+URGENCIES = ("immediate", "within_week", "within_month", "flexible")
+URGENCY_WEIGHTS = (0.15, 0.35, 0.25, 0.25)
+FREQUENCIES = ("one-time", "weekly", "monthly", "seasonal")
+DURATIONS = ("1 day", "3 days", "1 week", "1 month")
+
+# (weight, available_days, available_hours)
+SCHEDULES = [
+    (0.55, "Monday-Saturday", "8 AM - 8 PM"),
+    (0.25, "Everyday", "6 AM - 10 PM"),
+    (0.10, "24/7", "24 hours"),
+    (0.10, "Monday-Friday", "7 AM - 3 PM"),
+]
+
+FIRST_NAMES = [
+    "Muhammad", "Ahmed", "Ali", "Hassan", "Usman", "Bilal", "Imran", "Kashif", "Zahid", "Tariq",
+    "Asif", "Faisal", "Naveed", "Shahid", "Waqas", "Ayesha", "Fatima", "Sana", "Hina", "Amna",
+]
+LAST_NAMES = [
+    "Khan", "Ahmed", "Malik", "Butt", "Chaudhry", "Qureshi", "Sheikh", "Raza", "Hussain", "Iqbal",
+    "Javed", "Siddiqui", "Baloch", "Memon", "Abbasi",
+]
+AREAS = [
+    "Main Bazaar", "Saddar", "Cantt", "Model Town", "Satellite Town", "Industrial Area",
+    "GT Road", "Bypass Road", "Grain Market", "Railway Road", "Ring Road", "Canal Road",
+]
+
+# Fleet sizes follow a Pareto(FLEET_ALPHA) law, capped at MAX_FLEET
+FLEET_ALPHA = 1.6
+MAX_FLEET = 60
+
+KM_PER_DEGREE = 111.0
+
+# Sign-up window; fixed so that the data does not depend on the current date
+START = datetime(2023, 1, 1)
+END = datetime(2025, 6, 30)
+
+
+class MarketplaceSpec:
+    """What generate() produces"""
+    
+    __slots__ = ("seekers", "providers", "seed", "images", "image_bytes", "duplicate_rate")
+    
+    def __init__(
+        self,
+        seekers: int,
+        providers: int,
+        seed: int = 42,
+        images: bool = False,
+        image_bytes: int = 48 * 1024,
+        duplicate_rate: float = 0.0,
+    ):
+        """
+        Args:
+            seekers: Seeker count
+            providers: Provider count (vehicles and services follow from the fleet sizes)
+            seed: Random seed
+            images: Fill the image properties with base64 data URLs
+            image_bytes: Size of each image before base64 encoding
+            duplicate_rate: Share of fleet vehicles re-registered under an
+                earlier vehicle's registration number (what dedupe cleans up)
+        """
+        self.seekers = seekers
+        self.providers = providers
+        self.seed = seed
+        self.images = images
+        self.image_bytes = image_bytes
+        self.duplicate_rate = duplicate_rate
+    
+    @classmethod
+    def from_scale(cls, users: int, provider_share: float = 0.12, **kwargs) -> "MarketplaceSpec":
+        """Spec for `users` users, `provider_share` of them providers"""
+        providers = max(1, round(users * provider_share))
+        return cls(seekers=max(0, users - providers), providers=providers, **kwargs)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+def seeker_uid(index: int) -> str:
+    return f"seeker-{index:07d}"
+
+
+def provider_uid(index: int) -> str:
+    return f"provider-{index:07d}"
+
+
+def vehicle_id(index: int) -> str:
+    return f"vehicle-{index:07d}"
+
+
+def service_id(index: int) -> str:
+    return f"service-{index:07d}"
+
+
+def seeker_email(index: int) -> str:
+    return f"seeker.{index:07d}@haulistry.test"
+
+
+def provider_email(index: int) -> str:
+    return f"provider.{index:07d}@haulistry.test"
+
+
+_CITY_CUMULATIVE = list(accumulate(city[4] for city in CITIES))
+_BUSINESS_TYPE_NAMES = list(BUSINESS_TYPES)
+_BUSINESS_CUMULATIVE = {profile: list(accumulate(weights)) for profile, weights in PROFILE_BUSINESS_WEIGHTS.items()}
+_CATEGORY_NAMES = list(SEEKER_CATEGORIES)
+_CATEGORY_CUMULATIVE = {profile: list(accumulate(weights)) for profile, weights in PROFILE_CATEGORY_WEIGHTS.items()}
+_URGENCY_CUMULATIVE = list(accumulate(URGENCY_WEIGHTS))
+_SCHEDULE_CUMULATIVE = list(accumulate(schedule[0] for schedule in SCHEDULES))
+_SCHEDULE_MASKS = [mask_from_legacy(days, hours) for _, days, hours in SCHEDULES]
+
+
+def _pick(rng: random.Random, items: Sequence, cumulative: List[float]):
+    """Weighted choice (bisect over precomputed cumulative weights)"""
+    return items[min(len(items) - 1, bisect(cumulative, rng.random() * cumulative[-1]))]
+
+
+def _signup(rng: random.Random) -> datetime:
+    """Sign-up time, denser towards END (linear growth)"""
+    return (START + (END - START) * rng.random() ** 0.5).replace(microsecond=0)
+
+
+def _after(rng: random.Random, start: datetime) -> datetime:
+    """A time between start and END, usually soon after start"""
+    return (start + (END - start) * rng.random() ** 3).replace(microsecond=0)
+
+
+def _phone(rng: random.Random) -> str:
+    return f"+923{rng.randrange(50):02d}{rng.randrange(10000000):07d}"
+
+
+def _registration(plate: str, year: int, serial: int) -> str:
+    """Plate like "LEA-19-0421"; letters are appended past 10,000 vehicles to keep it unique"""
+    letters = ""
+    quotient = serial // 10000
+    while quotient:
+        quotient, remainder = divmod(quotient - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return f"{plate}-{year % 100:02d}-{serial % 10000:04d}{letters}"
+
+
+def _price(rng: random.Random, base: float, step: int = 100, spread: float = 0.3) -> float:
+    return float(max(step, round(base * rng.lognormvariate(0.0, spread) / step) * step))
+
+
+def _ratings(rng: random.Random) -> Tuple[float, int]:
+    """(rating_sum, rating_count): 40% unrated, a long tail of popular ones"""
+    if rng.random() < 0.4:
+        return 0.0, 0
+    count = min(500, int(rng.paretovariate(1.1)))
+    mean = min(5.0, max(1.0, rng.gauss(4.2, 0.5)))
+    return round(mean * count, 1), count
+
+
+def _image(rng: random.Random, size: int) -> str:
+    return "data:image/jpeg;base64," + base64.b64encode(rng.randbytes(size)).decode("ascii")
+
+
+def _user_row(node) -> Dict[str, Any]:
+    row = node.to_dict()
+    row["name"] = row["full_name"]
+    return row
+
+
+def _providers(spec: MarketplaceSpec) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Each provider, followed by its vehicles and their services"""
+    rng = random.Random(f"{spec.seed}/providers")
+    images = random.Random(f"{spec.seed}/provider-images")
+    vehicle_count = 0
+    service_count = 0
+    
+    def image() -> Optional[str]:
+        return _image(images, spec.image_bytes) if spec.images else None
+    
+    for i in range(spec.providers):
+        city, province, latitude, longitude, _, plate, profile = _pick(rng, CITIES, _CITY_CUMULATIVE)
+        business_type = _pick(rng, _BUSINESS_TYPE_NAMES, _BUSINESS_CUMULATIVE[profile])
+        business = BUSINESS_TYPES[business_type]
+        category = business["category"]
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        joined = _signup(rng)
+        
+        vehicles = []
+        services = []
+        registrations = []
+        for _ in range(min(MAX_FLEET, int(rng.paretovariate(FLEET_ALPHA)))):
+            added = _after(rng, joined)
+            if registrations and rng.random() < spec.duplicate_rate:
+                registration = rng.choice(registrations)
+            else:
+                registration = _registration(plate, added.year, vehicle_count)
+                registrations.append(registration)
+            make = rng.choice(business["makes"])
+            hourly = _price(rng, business["price_per_hour"])
+            vehicle = VehicleNode(
+                vehicle_id=vehicle_id(vehicle_count), provider_uid=provider_uid(i),
+                name=f"{make} {category}", vehicle_type=category,
+                make=make, model=f"{rng.choice('ABCDEFGHKLMRSTX')}{rng.randrange(100, 1000)}",
+                year=max(1990, min(2025, round(rng.gauss(2014, 6)))), registration_number=registration,
+                capacity=rng.choice(business["capacities"]),
+                condition=rng.choices(["Excellent", "Good", "Fair", "Average"], weights=[0.2, 0.5, 0.2, 0.1])[0],
+                vehicle_image=image(),
+                additional_images=json.dumps([image(), image()]) if spec.images else None,
+                has_insurance=rng.random() < 0.45, is_available=rng.random() < 0.9,
+                availability_mask=_SCHEDULE_MASKS[0], city=city, province=province,
+                price_per_hour=hourly, price_per_day=_price(rng, hourly * 7, 500) if rng.random() < 0.6 else None,
+                created_at=added, updated_at=added,
+            )
+            vehicles.append(vehicle)
+            
+            for _ in range(rng.choices((1, 2, 3), weights=(0.75, 0.2, 0.05))[0]):
+                schedule = _pick(rng, range(len(SCHEDULES)), _SCHEDULE_CUMULATIVE)
+                _, available_days, available_hours = SCHEDULES[schedule]
+                # Distance from the centre is normal per axis; longitude degrees shrink with latitude
+                spread = business["spread_km"] * (1 if rng.random() < 0.8 else 3) / KM_PER_DEGREE
+                rating_sum, rating_count = _ratings(rng)
+                listed = _after(rng, added)
+                per_trip = business["price_per_service"]
+                services.append(ServiceNode(
+                    service_id=service_id(service_count), vehicle_id=vehicle.vehicle_id, provider_uid=provider_uid(i),
+                    service_name=f"{rng.choice(business['services'])} - {city}", service_category=category,
+                    price_per_hour=_price(rng, hourly, spread=0.1), price_per_day=vehicle.price_per_day,
+                    price_per_service=_price(rng, per_trip, 500) if per_trip and rng.random() < 0.7 else None,
+                    description=f"{category} ({vehicle.capacity}) with operator in {city} and surroundings",
+                    service_area=city, min_booking_duration=rng.choice(["2 hours", "4 hours", "1 day"]),
+                    latitude=round(latitude + rng.gauss(0, spread), 6),
+                    longitude=round(longitude + rng.gauss(0, spread * 1.15), 6),
+                    full_address=f"{rng.choice(AREAS)}, {city}, {province}", city=city, province=province,
+                    service_images=json.dumps([image() for _ in range(rng.randint(1, 3))]) if spec.images else None,
+                    is_active=rng.random() < 0.85, available_days=available_days, available_hours=available_hours,
+                    availability_mask=_SCHEDULE_MASKS[schedule],
+                    operator_included=rng.random() < 0.9, fuel_included=rng.random() < 0.4,
+                    transportation_included=rng.random() < 0.3,
+                    total_bookings=int(rating_count * rng.uniform(1.0, 2.5)),
+                    rating=round(rating_sum / rating_count, 2) if rating_count else 0.0,
+                    rating_sum=rating_sum, rating_count=rating_count, created_at=listed, updated_at=listed,
+                ))
+                service_count += 1
+            vehicle_count += 1
+        
+        # Provider aggregates are those of its services, as the review flow maintains them
+        rating_sum = round(sum(service.rating_sum for service in services), 1)
+        rating_count = sum(service.rating_count for service in services)
+        verified = rng.random() < 0.35
+        uploaded = verified or rng.random() < 0.4
+        yield "Provider", _user_row(ProviderNode(
+            uid=provider_uid(i), email=provider_email(i), full_name=f"{first} {last}", phone=_phone(rng),
+            business_name=f"{last} {category} Services" if rng.random() < 0.5 else f"{city} {category} Rental",
+            business_type=business_type, service_type=category,
+            cnic_number=f"{rng.randrange(10000, 100000)}-{rng.randrange(1000000, 10000000)}-{rng.randint(1, 9)}",
+            address=f"{rng.randint(1, 400)} {rng.choice(AREAS)}, {city}", city=city, province=province,
+            years_experience=min(40, int(rng.expovariate(1 / 8))),
+            description=f"{category} services in {city}, {province}",
+            profile_image=image(), cnic_front_image=image() if uploaded else None,
+            cnic_back_image=image() if uploaded else None, license_image=image() if uploaded else None,
+            license_number=f"{plate}-{rng.randrange(100000, 1000000)}" if uploaded else None,
+            is_verified=verified, documents_uploaded=uploaded,
+            verification_status="approved" if verified else ("rejected" if uploaded and rng.random() < 0.1 else "pending"),
+            rating=round(rating_sum / rating_count, 2) if rating_count else 0.0,
+            rating_sum=rating_sum, rating_count=rating_count,
+            total_bookings=sum(service.total_bookings for service in services),
+            created_at=joined, updated_at=joined,
+        ))
+        for vehicle in vehicles:
+            yield "Vehicle", vehicle.to_dict()
+        for service in services:
+            yield "Service", service.to_dict()
+
+
+def _seekers(spec: MarketplaceSpec) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    rng = random.Random(f"{spec.seed}/seekers")
+    images = random.Random(f"{spec.seed}/seeker-images")
+    
+    for i in range(spec.seekers):
+        city, province, _, _, _, _, profile = _pick(rng, CITIES, _CITY_CUMULATIVE)
+        categories: List[str] = []
+        for _ in range(rng.choices((1, 2, 3), weights=(0.55, 0.35, 0.1))[0]):
+            category = _pick(rng, _CATEGORY_NAMES, _CATEGORY_CUMULATIVE[profile])
+            if category not in categories:
+                categories.append(category)
+        
+        requirements = {}
+        for category in categories:
+            unit, low, high = CATEGORY_QUANTITIES[category]
+            requirements[category] = {
+                "category": category,
+                "quantity": f"{rng.randint(low, high)} {unit}",
+                "duration": rng.choice(DURATIONS),
+                "frequency": rng.choice(FREQUENCIES),
+                "additionalDetails": {},
+            }
+        
+        joined = _signup(rng)
+        yield "Seeker", _user_row(SeekerNode(
+            uid=seeker_uid(i), email=seeker_email(i),
+            full_name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", phone=_phone(rng),
+            profile_image=_image(images, spec.image_bytes) if spec.images and rng.random() < 0.6 else None,
+            address=f"{rng.choice(AREAS)}, {city}, {province}",
+            gender=rng.choice(["male", "male", "male", "female"]),
+            service_categories=json.dumps(categories),
+            category_details=json.dumps({
+                category: rng.sample(SEEKER_CATEGORIES[category], rng.randint(1, 2)) for category in categories
+            }),
+            service_requirements=json.dumps(requirements),
+            primary_purpose=PURPOSES[categories[0]] if rng.random() < 0.7 else OTHER_PURPOSE,
+            urgency=_pick(rng, URGENCIES, _URGENCY_CUMULATIVE),
+            created_at=joined, updated_at=_after(rng, joined),
+        ))
+
+
+def generate(spec: MarketplaceSpec) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yield (label, row) for every node of the graph
+    
+    Each provider comes before its vehicles and each vehicle before its
+    services (rows carry provider_uid / vehicle_id, from which the writers
+    create OWNS, OFFERS and PROVIDES); seekers come last. IDs are
+    positional ("vehicle-0000042"), numbered in generation order.
+    
+    Args:
+        spec: Counts, seed and options
+    """
+    yield from _providers(spec)
+    yield from _seekers(spec)
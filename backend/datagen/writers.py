@@ -0,0 +1,289 @@
+"""
+Marketplace graph writers
+Store generate() rows in Neo4j with batched UNWIND, as CSV for neo4j-admin import,
+or in the embedded graph (STORAGE_BACKEND=embedded)
+
+The writers take rows one at a time through write(label, row) and
+finish with close(), which returns the node count per label. Relationships
+come from the rows' foreign keys (RELATIONSHIPS).
+"""
+
+import csv
+import os
+from typing import Dict, Any, List, Optional
+
+
+LABELS = ("Provider", "Vehicle", "Service", "Seeker")
+
+# Property identifying a node of each label
+KEYS = {"Seeker": "uid", "Provider": "uid", "Vehicle": "vehicle_id", "Service": "service_id"}
+
+# (type, start label, row property holding the start key, end label) for rows of the end label
+RELATIONSHIPS = [
+    ("OWNS", "Provider", "provider_uid", "Vehicle"),
+    ("OFFERS", "Provider", "provider_uid", "Service"),
+    ("PROVIDES", "Vehicle", "vehicle_id", "Service"),
+]
+
+# Labels whose nodes must exist before a batch of the label can be linked
+DEPENDENCIES = {"Seeker": (), "Provider": (), "Vehicle": ("Provider",), "Service": ("Provider", "Vehicle")}
+
+# Timestamps are stored as Neo4j datetimes, as the repositories do
+_TIMESTAMPS = "n.created_at = datetime(row.created_at), n.updated_at = datetime(row.updated_at)"
+
+# MERGE on the key makes a re-run with the same seed a no-op rather than a copy
+LOAD_QUERIES = {
+    "Provider": f"UNWIND $rows AS row MERGE (n:Provider {{uid: row.uid}}) SET n = row, {_TIMESTAMPS}",
+    "Seeker": f"UNWIND $rows AS row MERGE (n:Seeker {{uid: row.uid}}) SET n = row, {_TIMESTAMPS}",
+    "Vehicle": f"""
+        UNWIND $rows AS row
+        MATCH (p:Provider {{uid: row.provider_uid}})
+        MERGE (n:Vehicle {{vehicle_id: row.vehicle_id}})
+        SET n = row, {_TIMESTAMPS}
+        MERGE (p)-[:OWNS]->(n)
+    """,
+    "Service": f"""
+        UNWIND $rows AS row
+        MATCH (p:Provider {{uid: row.provider_uid}})
+        MATCH (v:Vehicle {{vehicle_id: row.vehicle_id}})
+        MERGE (n:Service {{service_id: row.service_id}})
+        SET n = row, {_TIMESTAMPS}
+        MERGE (p)-[:OFFERS]->(n)
+        MERGE (v)-[:PROVIDES]->(n)
+    """,
+}
+
+# Lookup indexes the loader's MERGE / MATCH and the repositories rely on
+INDEXES = [
+    "CREATE INDEX seeker_uid IF NOT EXISTS FOR (n:Seeker) ON (n.uid)",
+    "CREATE INDEX seeker_email IF NOT EXISTS FOR (n:Seeker) ON (n.email)",
+    "CREATE INDEX provider_uid IF NOT EXISTS FOR (n:Provider) ON (n.uid)",
+    "CREATE INDEX provider_email IF NOT EXISTS FOR (n:Provider) ON (n.email)",
+    "CREATE INDEX vehicle_id IF NOT EXISTS FOR (n:Vehicle) ON (n.vehicle_id)",
+    "CREATE INDEX service_id IF NOT EXISTS FOR (n:Service) ON (n.service_id)",
+]
+
+# neo4j-admin import column types of the non-string properties
+PROPERTY_TYPES = {
+    "years_experience": "long",
+    "year": "long",
+    "rating_count": "long",
+    "total_bookings": "long",
+    "rating": "double",
+    "rating_sum": "double",
+    "price_per_hour": "double",
+    "price_per_day": "double",
+    "price_per_service": "double",
+    "latitude": "double",
+    "longitude": "double",
+    "is_verified": "boolean",
+    "documents_uploaded": "boolean",
+    "has_insurance": "boolean",
+    "is_available": "boolean",
+    "is_active": "boolean",
+    "operator_included": "boolean",
+    "fuel_included": "boolean",
+    "transportation_included": "boolean",
+    "availability_mask": "long[]",
+    "created_at": "datetime",
+    "updated_at": "datetime",
+}
+
+CSV_FILES = {"Seeker": "seekers.csv", "Provider": "providers.csv", "Vehicle": "vehicles.csv", "Service": "services.csv"}
+
+
+class Neo4jWriter:
+    """Batched UNWIND writer; each batch is one write transaction"""
+    
+    def __init__(self, driver, batch_size: int = 5000, database: Optional[str] = None):
+        """
+        Args:
+            driver: Neo4j driver
+            batch_size: Rows per transaction
+            database: Target database (driver default if None)
+        """
+        self.driver = driver
+        self.batch_size = batch_size
+        self.session = driver.session(database=database) if database else driver.session()
+        self.pending: Dict[str, List[Dict[str, Any]]] = {label: [] for label in LABELS}
+        self.counts: Dict[str, int] = {label: 0 for label in LABELS}
+    
+    def create_indexes(self, timeout_seconds: int = 300) -> None:
+        """Create the lookup indexes and wait until they are online"""
+        for statement in INDEXES:
+            self.session.run(statement).consume()
+        self.session.run("CALL db.awaitIndexes($timeout)", timeout=timeout_seconds).consume()
+    
+    def write(self, label: str, row: Dict[str, Any]) -> None:
+        pending = self.pending[label]
+        pending.append(row)
+        if len(pending) >= self.batch_size:
+            self.flush(label)
+    
+    def flush(self, label: str) -> None:
+        """Write the label's pending rows, after those of the labels they link to"""
+        for dependency in DEPENDENCIES[label]:
+            self.flush(dependency)
+        rows = self.pending[label]
+        if not rows:
+            return
+        self.session.execute_write(lambda tx: tx.run(LOAD_QUERIES[label], rows=rows).consume())
+        self.counts[label] += len(rows)
+        self.pending[label] = []
+    
+    def close(self) -> Dict[str, int]:
+        """Flush everything and close the session; returns nodes written per label"""
+        for label in LABELS:
+            self.flush(label)
+        self.session.close()
+        return dict(self.counts)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.session.close()
+
+
+class CsvWriter:
+    """
+    One CSV file per label and per relationship type, with neo4j-admin headers
+    
+    Node files have a typed header (`uid:ID(Provider)`, `rating:double`,
+    `availability_mask:long[]`, ...); relationship files are
+    `:START_ID(Provider),:END_ID(Vehicle)`. Empty cells are absent
+    properties. import_command() gives the matching neo4j-admin call.
+    """
+    
+    def __init__(self, directory: str, array_delimiter: str = ";"):
+        self.directory = directory
+        self.array_delimiter = array_delimiter
+        os.makedirs(directory, exist_ok=True)
+        self.files = {}
+        self.writers = {}
+        self.columns: Dict[str, List[str]] = {}
+        self.counts: Dict[str, int] = {label: 0 for label in LABELS}
+    
+    def _open(self, name: str, header: List[str]):
+        handle = open(os.path.join(self.directory, name), "w", newline="", encoding="utf-8")
+        writer = csv.writer(handle)
+        writer.writerow(header)
+        self.files[name] = handle
+        self.writers[name] = writer
+        return writer
+    
+    def _header(self, label: str, row: Dict[str, Any]) -> List[str]:
+        header = []
+        for column in row:
+            if column == KEYS[label]:
+                header.append(f"{column}:ID({label})")
+            elif column in PROPERTY_TYPES:
+                header.append(f"{column}:{PROPERTY_TYPES[column]}")
+            else:
+                header.append(column)
+        return header
+    
+    def _cell(self, value: Any) -> Any:
+        if value is None:
+            return ""
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, list):
+            return self.array_delimiter.join(str(item) for item in value)
+        return value
+    
+    def write(self, label: str, row: Dict[str, Any]) -> None:
+        writer = self.writers.get(CSV_FILES[label])
+        if writer is None:
+            self.columns[label] = list(row)
+            writer = self._open(CSV_FILES[label], self._header(label, row))
+        writer.writerow([self._cell(row.get(column)) for column in self.columns[label]])
+        self.counts[label] += 1
+        
+        for rel_type, start_label, start_key, end_label in RELATIONSHIPS:
+            if end_label != label:
+                continue
+            name = f"{rel_type.lower()}.csv"
+            rel_writer = self.writers.get(name) or self._open(name, [f":START_ID({start_label})", f":END_ID({end_label})"])
+            rel_writer.writerow([row[start_key], row[KEYS[label]]])
+    
+    def close(self) -> Dict[str, int]:
+        for handle in self.files.values():
+            handle.close()
+        return dict(self.counts)
+    
+    def import_command(self, database: str = "neo4j") -> str:
+        """neo4j-admin (5.x) call importing the written files into an empty database"""
+        parts = ["neo4j-admin database import full", f"--array-delimiter='{self.array_delimiter}'"]
+        for label in LABELS:
+            if CSV_FILES[label] in self.files:
+                parts.append(f"--nodes={label}={os.path.join(self.directory, CSV_FILES[label])}")
+        for rel_type, _, _, _ in RELATIONSHIPS:
+            name = f"{rel_type.lower()}.csv"
+            if name in self.files:
+                parts.append(f"--relationships={rel_type}={os.path.join(self.directory, name)}")
+        parts.append(database)
+        return " \\\n    ".join(parts)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class EmbeddedWriter:
+    """Batched writer into an EmbeddedGraph; each batch is one SQLite transaction"""
+    
+    def __init__(self, graph, batch_size: int = 5000):
+        """
+        Args:
+            graph: repositories.embedded_graph.EmbeddedGraph
+            batch_size: Rows per transaction
+        """
+        self.graph = graph
+        self.batch_size = batch_size
+        self.pending: Dict[str, List[Dict[str, Any]]] = {label: [] for label in LABELS}
+        self.counts: Dict[str, int] = {label: 0 for label in LABELS}
+    
+    def write(self, label: str, row: Dict[str, Any]) -> None:
+        pending = self.pending[label]
+        pending.append(row)
+        if len(pending) >= self.batch_size:
+            self.flush(label)
+    
+    def flush(self, label: str) -> None:
+        """Write the label's pending rows, after those of the labels they link to"""
+        from repositories.embedded_graph import to_datetime
+        
+        for dependency in DEPENDENCIES[label]:
+            self.flush(dependency)
+        rows = self.pending[label]
+        if not rows:
+            return
+        links = []
+        for row in rows:
+            row["created_at"] = to_datetime(row.get("created_at"))
+            row["updated_at"] = to_datetime(row.get("updated_at"))
+            for rel_type, _, start_key, end_label in RELATIONSHIPS:
+                if end_label == label:
+                    links.append((rel_type, row[start_key], row[KEYS[label]]))
+        self.graph.insert_many(label, rows, links)
+        self.counts[label] += len(rows)
+        self.pending[label] = []
+    
+    def close(self) -> Dict[str, int]:
+        """Flush everything; returns nodes written per label"""
+        for label in LABELS:
+            self.flush(label)
+        return dict(self.counts)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
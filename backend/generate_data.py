@@ -0,0 +1,105 @@
+"""
+Generate a synthetic marketplace graph
+
+Production-shaped, seeded data for load tests (see datagen/marketplace.py
+for its shape). --scale is the number of users; vehicles and services
+follow from the providers' fleet sizes (about 2 and 3 per provider).
+
+    # 10,000 users with their vehicles and services, into the Neo4j in .env
+    python generate_data.py --scale 10000 --neo4j
+
+    # 1,000,000 users as CSV, then a bulk import into an empty database
+    python generate_data.py --scale 1000000 --csv import/
+    neo4j-admin database import full ...   (the exact command is printed)
+
+    # The same graph for STORAGE_BACKEND=embedded, into EMBEDDED_DB_PATH
+    python generate_data.py --scale 10000 --embedded
+
+Base64 images are left out unless --images is given. Writing to Neo4j
+refuses a non-local URI unless --allow-remote is given; the rows are
+MERGEd on their IDs, so running the same command twice changes nothing.
+"""
+
+import argparse
+import sys
+import time
+from urllib.parse import urlparse
+
+from datagen import MarketplaceSpec, generate, Neo4jWriter, CsvWriter, EmbeddedWriter
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Generate a synthetic marketplace graph")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--neo4j", action="store_true", help="Write to the Neo4j configured in .env with batched UNWIND")
+    target.add_argument("--csv", metavar="DIRECTORY", help="Write neo4j-admin import CSV files to DIRECTORY")
+    target.add_argument("--embedded", action="store_true", help="Write to the embedded graph at EMBEDDED_DB_PATH")
+    parser.add_argument("--scale", type=int, default=1000, help="Number of users (seekers + providers)")
+    parser.add_argument("--provider-share", type=float, default=0.12, help="Share of users who are providers")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed; the same seed gives the same graph")
+    parser.add_argument("--images", action="store_true", help="Include base64 profile, document, vehicle and service images")
+    parser.add_argument("--image-kb", type=int, default=48, help="Size of each generated image")
+    parser.add_argument("--duplicate-rate", type=float, default=0.0, help="Share of vehicles re-using a fleet mate's registration")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per UNWIND transaction")
+    parser.add_argument("--allow-remote", action="store_true", help="Allow --neo4j to write to a non-local database")
+    args = parser.parse_args()
+    
+    spec = MarketplaceSpec.from_scale(
+        args.scale, args.provider_share, seed=args.seed,
+        images=args.images, image_bytes=args.image_kb * 1024, duplicate_rate=args.duplicate_rate,
+    )
+    
+    if args.neo4j:
+        from config.settings import settings
+        from config.neo4j_config import get_neo4j_driver, close_neo4j_driver
+        
+        if urlparse(settings.NEO4J_URI).hostname not in ("localhost", "127.0.0.1", "::1") and not args.allow_remote:
+            parser.error(f"{settings.NEO4J_URI} is not local; pass --allow-remote to write generated data to it")
+        writer = Neo4jWriter(get_neo4j_driver(), batch_size=args.batch_size, database=settings.NEO4J_DATABASE)
+        destination = settings.NEO4J_URI
+    elif args.embedded:
+        from config.settings import settings
+        from repositories.embedded_graph import get_embedded_graph, close_embedded_graph
+        
+        writer = EmbeddedWriter(get_embedded_graph(), batch_size=args.batch_size)
+        destination = settings.EMBEDDED_DB_PATH
+    else:
+        writer = CsvWriter(args.csv)
+        destination = args.csv
+    
+    print(f"\n{'='*60}")
+    print(f"🧪 GENERATING MARKETPLACE GRAPH")
+    print(f"   Seekers: {spec.seekers}  Providers: {spec.providers}  Seed: {spec.seed}")
+    print(f"   Images: {'yes' if spec.images else 'no'}  Destination: {destination}")
+    print(f"{'='*60}\n")
+    
+    start = time.perf_counter()
+    try:
+        if args.neo4j:
+            writer.create_indexes()
+        for count, (label, row) in enumerate(generate(spec), 1):
+            writer.write(label, row)
+            if count % 100000 == 0:
+                print(f"   {count:>10,} nodes  ({count / (time.perf_counter() - start):,.0f}/s)")
+        counts = writer.close()
+    except Exception as e:
+        print(f"❌ Generation failed: {str(e)}")
+        return 1
+    finally:
+        if args.neo4j:
+            close_neo4j_driver()
+        elif args.embedded:
+            close_embedded_graph()
+    
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ {sum(counts.values()):,} nodes in {elapsed:.1f}s: " + ", ".join(f"{label} {n:,}" for label, n in counts.items()))
+    if args.neo4j:
+        print("   Run rebuild_facets.py to count the new services into the facet counters")
+    elif args.csv:
+        print(f"\n   Import into an empty, stopped database with:\n\n{writer.import_command()}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
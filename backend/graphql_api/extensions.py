@@ -0,0 +1,170 @@
+"""
+GraphQL instrumentation
+Prometheus histograms (monitoring.metrics) and tracing spans
+(monitoring.tracing) for operations and field resolvers
+
+Operations are handled by InstrumentedSchema around Schema.execute(). A
+SchemaExtension would also work, but any schema extension makes
+Strawberry build its extension runner on every request, which by itself
+cost about 4% of a 50-row query in benchmarks/bench_metrics_overhead.py.
+
+Resolvers are instrumented per field with ResolverInstrumentation, and
+only fields that have their own resolver (instrument_resolvers), so
+plain attribute fields on result objects run without any extra call.
+"""
+
+import re
+import time
+from typing import Any, Optional, Dict, Iterable
+
+import strawberry
+from graphql import ExecutionResult
+from strawberry.extensions import FieldExtension
+from strawberry.types.graphql import OperationType
+from opentelemetry.trace import Status, StatusCode
+
+from monitoring.metrics import GRAPHQL_OPERATION_SECONDS, GRAPHQL_RESOLVER_SECONDS
+from monitoring.tracing import tracer, tracing_enabled
+
+
+# Operation keyword (if any) and the first root field of a document
+_DOCUMENT_HEAD = re.compile(r"^\s*(?:(query|mutation|subscription)\b[^{]*)?\{\s*(?:\w+\s*:\s*)?(\w+)")
+
+
+def root_field_names(schema: strawberry.Schema) -> frozenset:
+    """Names of the schema's Query, Mutation and Subscription fields, as clients spell them"""
+    graphql_schema = schema._schema
+    names = set()
+    for root in (graphql_schema.query_type, graphql_schema.mutation_type, graphql_schema.subscription_type):
+        if root is not None:
+            names.update(root.fields)
+    return frozenset(names)
+
+
+# Operation label of documents whose first root field is not in the schema
+OTHER_OPERATION = "other"
+
+
+def operation_labels(query: Optional[str], root_fields: frozenset) -> tuple:
+    """
+    (operation, type) labels without parsing the document
+    
+    The operation is the first root field ("{ activeServices { ... } }" ->
+    activeServices) when the schema has it, else "other". operationName is
+    not used: clients choose it freely, and each new value would be a new
+    series of the histogram.
+    """
+    match = _DOCUMENT_HEAD.match(query or "")
+    if match is None:
+        return OTHER_OPERATION, "unknown"
+    operation = match.group(2) if match.group(2) in root_fields else OTHER_OPERATION
+    return operation, match.group(1) or "query"
+
+
+class InstrumentedSchema(strawberry.Schema):
+    """
+    Schema that records every execute() in haulistry_graphql_operation_seconds
+    and, when tracing is enabled, runs it inside an operation span
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Bounded operation label values
+        self.root_fields = root_field_names(self)
+    
+    async def execute(
+        self,
+        query: Optional[str],
+        variable_values: Optional[Dict[str, Any]] = None,
+        context_value: Optional[Any] = None,
+        root_value: Optional[Any] = None,
+        operation_name: Optional[str] = None,
+        allowed_operation_types: Optional[Iterable[OperationType]] = None,
+    ) -> ExecutionResult:
+        operation, operation_type = operation_labels(query, self.root_fields)
+        if not tracing_enabled():
+            return await self._execute_timed(
+                operation, operation_type, query, variable_values, context_value,
+                root_value, operation_name, allowed_operation_types,
+            )
+        
+        with tracer.start_as_current_span(
+            f"{operation_type} {operation}",
+            attributes={"graphql.operation.name": operation_name or operation, "graphql.operation.type": operation_type},
+        ) as span:
+            result = await self._execute_timed(
+                operation, operation_type, query, variable_values, context_value,
+                root_value, operation_name, allowed_operation_types,
+            )
+            if result.errors:
+                span.set_status(Status(StatusCode.ERROR, result.errors[0].message))
+            return result
+    
+    async def _execute_timed(
+        self, operation, operation_type, query, variable_values, context_value,
+        root_value, operation_name, allowed_operation_types,
+    ) -> ExecutionResult:
+        start = time.perf_counter()
+        status = "error"
+        try:
+            result = await super().execute(
+                query,
+                variable_values=variable_values,
+                context_value=context_value,
+                root_value=root_value,
+                operation_name=operation_name,
+                allowed_operation_types=allowed_operation_types,
+            )
+            status = "error" if result.errors else "ok"
+            return result
+        finally:
+            GRAPHQL_OPERATION_SECONDS.labels(operation, operation_type, status).observe(time.perf_counter() - start)
+
+
+class ResolverInstrumentation(FieldExtension):
+    """
+    Records one field's resolver in haulistry_graphql_resolver_seconds and,
+    when tracing is enabled, runs it inside a span named after the field
+    """
+    
+    def __init__(self, field: str):
+        self.field = field
+        self.histogram = GRAPHQL_RESOLVER_SECONDS.labels(field)
+    
+    def resolve(self, next_, source: Any, info, **kwargs) -> Any:
+        start = time.perf_counter()
+        try:
+            if not tracing_enabled():
+                return next_(source, info, **kwargs)
+            with tracer.start_as_current_span(self.field):
+                return next_(source, info, **kwargs)
+        finally:
+            self.histogram.observe(time.perf_counter() - start)
+    
+    async def resolve_async(self, next_, source: Any, info, **kwargs) -> Any:
+        start = time.perf_counter()
+        try:
+            if not tracing_enabled():
+                return await next_(source, info, **kwargs)
+            with tracer.start_as_current_span(self.field):
+                return await next_(source, info, **kwargs)
+        finally:
+            self.histogram.observe(time.perf_counter() - start)
+
+
+def instrument_resolvers(*types: type) -> None:
+    """
+    Attach resolver timing and spans to every field of the given types that has its
+    own resolver; must run before the schema is built
+    
+    Args:
+        *types: Strawberry types, e.g. Query and Mutation
+    """
+    for strawberry_type in types:
+        definition = strawberry_type.__strawberry_definition__
+        for field in definition.fields:
+            if field.base_resolver is None:
+                continue
+            if any(isinstance(extension, ResolverInstrumentation) for extension in field.extensions):
+                continue
+            field.extensions.append(ResolverInstrumentation(f"{definition.name}.{field.python_name}"))
@@ -2,11 +2,13 @@
 GraphQL Mutations for Haulistry
 """
 import strawberry
-from typing import Union
+from typing import Optional, Union
+from strawberry.types import Info
 from .types import (
     AuthResponse, 
     ProviderAuthResponse,
     SeekerAuthResponse,
+    SessionResponse,
     SeekerRegisterInput, 
     ProviderRegisterInput,
     UpdateProviderProfileInput,
@@ -25,10 +27,20 @@ from .types import (
     VehicleResponse,
     ServiceResponse,
     GenericResponse,
-    VehicleOnboardingInput
+    VehicleOnboardingInput,
+    # Review types
+    Review,
+    AddReviewInput,
+    UpdateReviewInput,
+    ReviewResponse,
+    # Booking types
+    Booking,
+    ReserveBookingInput,
+    BookingResponse
 )
 from services.auth_service import AuthService
 from pydantic import ValidationError
+from models.record_mapper import get_mapper
 
 
 @strawberry.type
@@ -69,15 +81,7 @@ class Mutation:
             print(f"✅ Auth service returned: {result.keys()}")
             
             # Create User object from result
-            user = Seeker(
-                uid=result['user']['uid'],
-                email=result['user']['email'],
-                full_name=result['user']['full_name'],
-                phone=result['user']['phone'],
-                user_type=result['user']['user_type'],
-                created_at=result['user']['created_at'],
-                updated_at=result['user']['updated_at']
-            )
+            user = get_mapper("Seeker", Seeker).to_object(result['user'])
             
             print(f"✅ Seeker GraphQL type created successfully")
             
@@ -146,37 +150,7 @@ class Mutation:
             result = await auth_service.register_provider(provider_request)
             
             # Create Provider object from result
-            user = Provider(
-                uid=result['user']['uid'],
-                email=result['user']['email'],
-                full_name=result['user']['full_name'],
-                phone=result['user']['phone'],
-                user_type=result['user']['user_type'],
-                business_name=result['user'].get('business_name'),
-                business_type=result['user'].get('business_type'),
-                service_type=result['user'].get('service_type'),
-                cnic_number=result['user'].get('cnic_number'),
-                address=result['user'].get('address'),
-                city=result['user'].get('city'),
-                province=result['user'].get('province'),
-                years_experience=result['user'].get('years_experience'),
-                description=result['user'].get('description'),
-                # Document images (initially None)
-                profile_image=result['user'].get('profile_image'),
-                cnic_front_image=result['user'].get('cnic_front_image'),
-                cnic_back_image=result['user'].get('cnic_back_image'),
-                license_image=result['user'].get('license_image'),
-                license_number=result['user'].get('license_number'),
-                # Verification (initially False/pending)
-                is_verified=result['user'].get('is_verified', False),
-                documents_uploaded=result['user'].get('documents_uploaded', False),
-                verification_status=result['user'].get('verification_status', 'pending'),
-                # Stats
-                rating=result['user'].get('rating'),
-                total_bookings=result['user'].get('total_bookings', 0),
-                created_at=result['user']['created_at'],
-                updated_at=result['user']['updated_at']
-            )
+            user = get_mapper("Provider", Provider).to_object(result['user'])
             
             return ProviderAuthResponse(
                 success=True,
@@ -234,37 +208,7 @@ class Mutation:
             
             # Return appropriate response based on user type
             if result['user']['user_type'] == 'provider':
-                user = Provider(
-                    uid=result['user']['uid'],
-                    email=result['user']['email'],
-                    full_name=result['user']['full_name'],
-                    phone=result['user']['phone'],
-                    user_type=result['user']['user_type'],
-                    business_name=result['user'].get('business_name'),
-                    business_type=result['user'].get('business_type'),
-                    service_type=result['user'].get('service_type'),
-                    cnic_number=result['user'].get('cnic_number'),
-                    address=result['user'].get('address'),
-                    city=result['user'].get('city'),
-                    province=result['user'].get('province'),
-                    years_experience=result['user'].get('years_experience'),
-                    description=result['user'].get('description'),
-                    # Document images
-                    profile_image=result['user'].get('profile_image'),
-                    cnic_front_image=result['user'].get('cnic_front_image'),
-                    cnic_back_image=result['user'].get('cnic_back_image'),
-                    license_image=result['user'].get('license_image'),
-                    license_number=result['user'].get('license_number'),
-                    # Verification
-                    is_verified=result['user'].get('is_verified', False),
-                    documents_uploaded=result['user'].get('documents_uploaded', False),
-                    verification_status=result['user'].get('verification_status', 'pending'),
-                    # Stats
-                    rating=result['user'].get('rating'),
-                    total_bookings=result['user'].get('total_bookings', 0),
-                    created_at=result['user']['created_at'],
-                    updated_at=result['user']['updated_at']
-                )
+                user = get_mapper("Provider", Provider).to_object(result['user'])
                 
                 return ProviderAuthResponse(
                     success=True,
@@ -273,26 +217,7 @@ class Mutation:
                     user=user
                 )
             else:
-                user = Seeker(
-                    uid=result['user']['uid'],
-                    email=result['user']['email'],
-                    full_name=result['user']['full_name'],
-                    phone=result['user']['phone'],
-                    user_type=result['user']['user_type'],
-                    profile_image=result['user'].get('profile_image'),
-                    address=result['user'].get('address'),
-                    bio=result['user'].get('bio'),
-                    gender=result['user'].get('gender'),
-                    date_of_birth=result['user'].get('date_of_birth'),
-                    service_categories=result['user'].get('service_categories'),
-                    category_details=result['user'].get('category_details'),
-                    service_requirements=result['user'].get('service_requirements'),
-                    primary_purpose=result['user'].get('primary_purpose'),
-                    urgency=result['user'].get('urgency'),
-                    preferences_notes=result['user'].get('preferences_notes'),
-                    created_at=result['user']['created_at'],
-                    updated_at=result['user']['updated_at']
-                )
+                user = get_mapper("Seeker", Seeker).to_object(result['user'])
                 
                 return SeekerAuthResponse(
                     success=True,
@@ -310,6 +235,93 @@ class Mutation:
                 user=None
             )
 
+    @strawberry.mutation
+    async def start_session(self, id_token: str) -> SessionResponse:
+        """
+        Exchange a Firebase ID token for an API access/refresh token pair
+        
+        Sign in with the Firebase SDK first (that is where the password is
+        checked), then send the ID token it returns.
+        
+        Args:
+            id_token: Firebase ID token of the signed-in user
+            
+        Returns:
+            SessionResponse with the new tokens
+        """
+        try:
+            pair = await AuthService().start_session(id_token)
+            return SessionResponse(success=True, message="Session started", **pair)
+            
+        except Exception as e:
+            return SessionResponse(success=False, message=str(e))
+
+    @strawberry.mutation
+    async def refresh_session(self, refresh_token: str) -> SessionResponse:
+        """
+        Exchange a refresh token for a new access/refresh token pair
+        
+        The refresh token is single-use: it is revoked by this call.
+        
+        Args:
+            refresh_token: Refresh token from startSession or the previous refresh
+            
+        Returns:
+            SessionResponse with the new tokens
+        """
+        try:
+            from services.session_tokens import session_tokens_enabled, refresh_session
+            
+            if not session_tokens_enabled():
+                raise Exception("Session tokens are not enabled")
+            
+            pair = await refresh_session(refresh_token)
+            return SessionResponse(success=True, message="Session refreshed", **pair)
+            
+        except Exception as e:
+            return SessionResponse(success=False, message=str(e))
+
+    @strawberry.mutation
+    async def logout(self, info: Info, refresh_token: Optional[str] = None) -> GenericResponse:
+        """
+        Revoke the session: the access token in the Authorization header
+        and, when given, its refresh token
+        
+        Args:
+            refresh_token: Refresh token of the same session
+            
+        Returns:
+            GenericResponse with success status
+        """
+        try:
+            from services.session_tokens import (
+                session_tokens_enabled, get_session_tokens, is_session_token, publish_revocation
+            )
+            
+            if not session_tokens_enabled():
+                raise Exception("Session tokens are not enabled")
+            
+            tokens = get_session_tokens()
+            request = info.context.get("request")
+            auth_header = request.headers.get("Authorization", "") if request else ""
+            presented = [auth_header.replace("Bearer ", "")] if auth_header.startswith("Bearer ") else []
+            if refresh_token:
+                presented.append(refresh_token)
+            
+            revoked = 0
+            for token in presented:
+                if is_session_token(token):
+                    entry = tokens.revoke(token)
+                    await publish_revocation(entry)
+                    revoked += entry is not None
+            
+            if not revoked:
+                return GenericResponse(success=False, message="No session token to revoke")
+            return GenericResponse(success=True, message="Logged out")
+            
+        except Exception as e:
+            return GenericResponse(success=False, message=str(e))
+
     @strawberry.mutation
     async def update_provider_profile(self, input: UpdateProviderProfileInput) -> ProviderAuthResponse:
         """
@@ -336,9 +348,9 @@ class Mutation:
         print(f"{'='*60}\n")
         
         try:
-            from repositories.user_repository import UserRepository
+            from repositories.backend import get_user_repository
             
-            user_repo = UserRepository()
+            user_repo = get_user_repository()
             
             # Build update data dictionary
             update_data = {}
@@ -383,9 +395,9 @@ class Mutation:
             # Handle vehicles if provided
             if input.vehicles is not None:
                 import json
-                from repositories.vehicle_repository import VehicleRepository
+                from repositories.backend import get_vehicle_repository
                 
-                vehicle_repo = VehicleRepository()
+                vehicle_repo = get_vehicle_repository()
                 vehicles_data = json.loads(input.vehicles)
                 
                 print(f"🚗 Processing {len(vehicles_data)} vehicles...")
@@ -439,38 +451,11 @@ class Mutation:
                 }
                 updated_user = user_repo.update_provider_profile(input.uid, verification_update)
             
+            from services.event_broker import publish_profile_updated
+            await publish_profile_updated(input.uid, "provider", list(update_data.keys()))
+            
             # Create Provider object from result
-            user = Provider(
-                uid=updated_user['uid'],
-                email=updated_user['email'],
-                full_name=updated_user['full_name'],
-                phone=updated_user['phone'],
-                user_type=updated_user['user_type'],
-                business_name=updated_user.get('business_name'),
-                business_type=updated_user.get('business_type'),
-                service_type=updated_user.get('service_type'),
-                cnic_number=updated_user.get('cnic_number'),
-                address=updated_user.get('address'),
-                city=updated_user.get('city'),
-                province=updated_user.get('province'),
-                years_experience=updated_user.get('years_experience'),
-                description=updated_user.get('description'),
-                # Document images
-                profile_image=updated_user.get('profile_image'),
-                cnic_front_image=updated_user.get('cnic_front_image'),
-                cnic_back_image=updated_user.get('cnic_back_image'),
-                license_image=updated_user.get('license_image'),
-                license_number=updated_user.get('license_number'),
-                # Verification
-                is_verified=updated_user.get('is_verified', False),
-                documents_uploaded=updated_user.get('documents_uploaded', False),
-                verification_status=updated_user.get('verification_status', 'pending'),
-                # Stats
-                rating=updated_user.get('rating'),
-                total_bookings=updated_user.get('total_bookings', 0),
-                created_at=updated_user['created_at'],
-                updated_at=updated_user['updated_at']
-            )
+            user = get_mapper("Provider", Provider).to_object(updated_user)
             
             return ProviderAuthResponse(
                 success=True,
@@ -600,9 +585,9 @@ class Mutation:
                 )
             
             # Update in repository
-            from repositories.user_repository import UserRepository
+            from repositories.backend import get_user_repository
             
-            user_repo = UserRepository()
+            user_repo = get_user_repository()
             
             # Verify seeker exists first
             print(f"🔍 Verifying seeker exists with UID: {input.uid}")
@@ -628,30 +613,14 @@ class Mutation:
                     user=None
                 )
             
+            from services.event_broker import publish_profile_updated
+            await publish_profile_updated(input.uid, "seeker", list(update_data.keys()))
+            
             # Convert to Seeker GraphQL type
             print(f"✅ Converting updated data to GraphQL type...")
             print(f"   Fields being returned: {list(updated_user.keys())}")
             
-            user = Seeker(
-                uid=updated_user['uid'],
-                email=updated_user['email'],
-                full_name=updated_user['full_name'],
-                phone=updated_user['phone'],
-                user_type=updated_user['user_type'],
-                profile_image=updated_user.get('profile_image'),
-                address=updated_user.get('address'),
-                bio=updated_user.get('bio'),
-                gender=updated_user.get('gender'),
-                date_of_birth=updated_user.get('date_of_birth'),
-                service_categories=updated_user.get('service_categories'),
-                category_details=updated_user.get('category_details'),
-                service_requirements=updated_user.get('service_requirements'),
-                primary_purpose=updated_user.get('primary_purpose'),
-                urgency=updated_user.get('urgency'),
-                preferences_notes=updated_user.get('preferences_notes'),
-                created_at=updated_user['created_at'],
-                updated_at=updated_user['updated_at']
-            )
+            user = get_mapper("Seeker", Seeker).to_object(updated_user)
             
             print(f"✅ Seeker profile update complete!")
             print(f"{'='*60}\n")
@@ -710,7 +679,7 @@ class Mutation:
         try:
             import uuid
             from models.user import VehicleNode
-            from repositories.user_repository import UserRepository
+            from repositories.backend import get_user_repository
             
             # Generate vehicle_id
             vehicle_id = str(uuid.uuid4())
@@ -732,6 +701,7 @@ class Mutation:
                 has_insurance=input.has_insurance,
                 insurance_expiry=input.insurance_expiry,
                 is_available=input.is_available,
+                availability_mask=input.availability_mask,
                 city=input.city,
                 province=input.province,
                 price_per_hour=input.price_per_hour,
@@ -740,15 +710,21 @@ class Mutation:
             )
             
             # Save to Neo4j
-            user_repo = UserRepository()
+            user_repo = get_user_repository()
             created_vehicle = user_repo.create_vehicle(vehicle)
             
             if created_vehicle:
+                from services.event_broker import publish_vehicle_availability_changed
+                await publish_vehicle_availability_changed(
+                    "created", created_vehicle['provider_uid'], vehicle_id,
+                    is_available=created_vehicle.get('is_available')
+                )
+                
                 from .types import Vehicle, VehicleResponse
                 return VehicleResponse(
                     success=True,
                     message="Vehicle added successfully!",
-                    vehicle=Vehicle(**created_vehicle)
+                    vehicle=get_mapper("Vehicle", Vehicle).to_object(created_vehicle)
                 )
             
             return VehicleResponse(
@@ -783,7 +759,7 @@ class Mutation:
         print(f"{'='*60}\n")
         
         try:
-            from repositories.user_repository import UserRepository
+            from repositories.backend import get_user_repository
             
             # Build update dict (only non-None fields)
             update_data = {}
@@ -813,6 +789,9 @@ class Mutation:
                 update_data['insurance_expiry'] = input.insurance_expiry
             if input.is_available is not None:
                 update_data['is_available'] = input.is_available
+            if input.availability_mask is not None:
+                from models.availability import normalize_mask
+                update_data['availability_mask'] = normalize_mask(input.availability_mask)
             if input.city is not None:
                 update_data['city'] = input.city
             if input.province is not None:
@@ -825,15 +804,22 @@ class Mutation:
                 update_data['description'] = input.description
             
             # Update in Neo4j
-            user_repo = UserRepository()
+            user_repo = get_user_repository()
             updated_vehicle = user_repo.update_vehicle(input.vehicle_id, update_data)
             
             if updated_vehicle:
+                if 'is_available' in update_data or 'availability_mask' in update_data:
+                    from services.event_broker import publish_vehicle_availability_changed
+                    await publish_vehicle_availability_changed(
+                        "updated", updated_vehicle['provider_uid'], input.vehicle_id,
+                        is_available=updated_vehicle.get('is_available')
+                    )
+                
                 from .types import Vehicle, VehicleResponse
                 return VehicleResponse(
                     success=True,
                     message="Vehicle updated successfully!",
-                    vehicle=Vehicle(**updated_vehicle)
+                    vehicle=get_mapper("Vehicle", Vehicle).to_object(updated_vehicle)
                 )
             
             return VehicleResponse(
@@ -869,12 +855,20 @@ class Mutation:
         print(f"{'='*60}\n")
         
         try:
-            from repositories.user_repository import UserRepository
+            from repositories.backend import get_user_repository
             
-            user_repo = UserRepository()
+            user_repo = get_user_repository()
+            # Read first: subscribers are keyed by the owner, gone after deletion
+            existing_vehicle = user_repo.get_vehicle_by_id(vehicle_id)
             success = user_repo.delete_vehicle(vehicle_id)
             
             if success:
+                if existing_vehicle:
+                    from services.event_broker import publish_vehicle_availability_changed
+                    await publish_vehicle_availability_changed(
+                        "deleted", existing_vehicle['provider_uid'], vehicle_id, is_available=False
+                    )
+                
                 from .types import GenericResponse
                 return GenericResponse(
                     success=True,
@@ -918,7 +912,7 @@ class Mutation:
         try:
             import uuid
             from models.user import ServiceNode
-            from repositories.user_repository import UserRepository
+            from repositories.backend import get_user_repository
             
             # Generate service_id
             service_id = str(uuid.uuid4())
@@ -945,21 +939,25 @@ class Mutation:
                 is_active=input.is_active,
                 available_days=input.available_days,
                 available_hours=input.available_hours,
+                availability_mask=input.availability_mask,
                 operator_included=input.operator_included,
                 fuel_included=input.fuel_included,
                 transportation_included=input.transportation_included
             )
             
             # Save to Neo4j
-            user_repo = UserRepository()
+            user_repo = get_user_repository()
             created_service = user_repo.create_service(service)
             
             if created_service:
+                from services.event_broker import publish_service_changed
+                await publish_service_changed("created", created_service)
+                
                 from .types import Service, ServiceResponse
                 return ServiceResponse(
                     success=True,
                     message="Service added successfully!",
-                    service=Service(**created_service)
+                    service=get_mapper("Service", Service).to_object(created_service)
                 )
             
             return ServiceResponse(
@@ -994,7 +992,7 @@ class Mutation:
         print(f"{'='*60}\n")
         
         try:
-            from repositories.user_repository import UserRepository
+            from repositories.backend import get_user_repository
             
             # Build update dict (only non-None fields)
             update_data = {}
@@ -1020,6 +1018,22 @@ class Mutation:
                 update_data['available_days'] = input.available_days
             if input.available_hours is not None:
                 update_data['available_hours'] = input.available_hours
+            if input.availability_mask is not None:
+                from models.availability import normalize_mask
+                update_data['availability_mask'] = normalize_mask(input.availability_mask)
+            elif input.available_days is not None or input.available_hours is not None:
+                # Keep the bitmap in step with the legacy strings; the one not
+                # given keeps its stored value. Unparseable strings clear the
+                # mask rather than leave it describing the old schedule.
+                from models.availability import mask_from_legacy
+                available_days, available_hours = input.available_days, input.available_hours
+                if available_days is None or available_hours is None:
+                    stored = get_user_repository().get_service_by_id(input.service_id) or {}
+                    if available_days is None:
+                        available_days = stored.get('available_days')
+                    if available_hours is None:
+                        available_hours = stored.get('available_hours')
+                update_data['availability_mask'] = mask_from_legacy(available_days, available_hours)
             if input.operator_included is not None:
                 update_data['operator_included'] = input.operator_included
             if input.fuel_included is not None:
@@ -1028,15 +1042,18 @@ class Mutation:
                 update_data['transportation_included'] = input.transportation_included
             
             # Update in Neo4j
-            user_repo = UserRepository()
+            user_repo = get_user_repository()
             updated_service = user_repo.update_service(input.service_id, update_data)
             
             if updated_service:
+                from services.event_broker import publish_service_changed
+                await publish_service_changed("updated", updated_service)
+                
                 from .types import Service, ServiceResponse
                 return ServiceResponse(
                     success=True,
                     message="Service updated successfully!",
-                    service=Service(**updated_service)
+                    service=get_mapper("Service", Service).to_object(updated_service)
                 )
             
             return ServiceResponse(
@@ -1071,12 +1088,18 @@ class Mutation:
         print(f"{'='*60}\n")
         
         try:
-            from repositories.user_repository import UserRepository
+            from repositories.backend import get_user_repository
             
-            user_repo = UserRepository()
+            user_repo = get_user_repository()
+            # Read first: category/area route the event to subscribers
+            existing_service = user_repo.get_service_by_id(service_id)
             success = user_repo.delete_service(service_id)
             
             if success:
+                if existing_service:
+                    from services.event_broker import publish_service_changed
+                    await publish_service_changed("deleted", existing_service)
+                
                 from .types import GenericResponse
                 return GenericResponse(
                     success=True,
@@ -1095,4 +1118,287 @@ class Mutation:
                 success=False,
                 message=f"Error: {str(e)}"
             )
-
+    
+    # ==================== REVIEW MUTATIONS ====================
+    
+    @strawberry.mutation
+    async def add_review(self, input: 'AddReviewInput') -> 'ReviewResponse':
+        """
+        Review a service (one review per seeker per service)
+        
+        The service and provider rating aggregates are updated in the
+        same transaction as the review write.
+        
+        Args:
+            input: Review details including seeker_uid, service_id and rating
+            
+        Returns:
+            ReviewResponse with success status, message, and created review
+        """
+        print(f"\n{'='*60}")
+        print(f"⭐ ADD_REVIEW MUTATION CALLED")
+        print(f"   Seeker UID: {input.seeker_uid}")
+        print(f"   Service ID: {input.service_id}")
+        print(f"   Rating: {input.rating}")
+        print(f"{'='*60}\n")
+        
+        if input.rating < 1 or input.rating > 5:
+            return ReviewResponse(
+                success=False,
+                message="Rating must be between 1 and 5",
+                review=None
+            )
+        
+        try:
+            import uuid
+            from models.user import ReviewNode
+            from repositories.review_repository import ReviewRepository
+            
+            review = ReviewNode(
+                review_id=str(uuid.uuid4()),
+                seeker_uid=input.seeker_uid,
+                service_id=input.service_id,
+                rating=input.rating,
+                comment=input.comment
+            )
+            
+            review_repo = ReviewRepository()
+            created_review = review_repo.create_review(review)
+            
+            if created_review:
+                return ReviewResponse(
+                    success=True,
+                    message="Review added successfully!",
+                    review=get_mapper("Review", Review).to_object(created_review)
+                )
+            
+            return ReviewResponse(
+                success=False,
+                message="Seeker or service not found",
+                review=None
+            )
+            
+        except Exception as e:
+            print(f"❌ ADD REVIEW FAILED: {str(e)}\n")
+            return ReviewResponse(
+                success=False,
+                message=f"Error: {str(e)}",
+                review=None
+            )
+    
+    @strawberry.mutation
+    async def update_review(self, input: 'UpdateReviewInput') -> 'ReviewResponse':
+        """
+        Update the rating/comment of an existing review
+        
+        Args:
+            input: UpdateReviewInput with review_id, seeker_uid and new rating
+            
+        Returns:
+            ReviewResponse with success status and updated review
+        """
+        print(f"\n{'='*60}")
+        print(f"⭐ UPDATE_REVIEW MUTATION CALLED")
+        print(f"   Review ID: {input.review_id}")
+        print(f"   Rating: {input.rating}")
+        print(f"{'='*60}\n")
+        
+        if input.rating < 1 or input.rating > 5:
+            return ReviewResponse(
+                success=False,
+                message="Rating must be between 1 and 5",
+                review=None
+            )
+        
+        try:
+            from repositories.review_repository import ReviewRepository
+            
+            review_repo = ReviewRepository()
+            updated_review = review_repo.update_review(
+                review_id=input.review_id,
+                seeker_uid=input.seeker_uid,
+                rating=input.rating,
+                comment=input.comment
+            )
+            
+            if updated_review:
+                return ReviewResponse(
+                    success=True,
+                    message="Review updated successfully!",
+                    review=get_mapper("Review", Review).to_object(updated_review)
+                )
+            
+            return ReviewResponse(
+                success=False,
+                message="Review not found",
+                review=None
+            )
+            
+        except Exception as e:
+            print(f"❌ UPDATE REVIEW FAILED: {str(e)}\n")
+            return ReviewResponse(
+                success=False,
+                message=f"Error: {str(e)}",
+                review=None
+            )
+    
+    @strawberry.mutation
+    async def delete_review(self, review_id: str, seeker_uid: str) -> 'GenericResponse':
+        """
+        Delete a review and remove it from the rating aggregates
+        
+        Args:
+            review_id: ID of review to delete
+            seeker_uid: UID of the seeker who wrote the review
+            
+        Returns:
+            GenericResponse with success status and message
+        """
+        print(f"\n{'='*60}")
+        print(f"🗑️  DELETE_REVIEW MUTATION CALLED")
+        print(f"   Review ID: {review_id}")
+        print(f"{'='*60}\n")
+        
+        try:
+            from repositories.review_repository import ReviewRepository
+            
+            review_repo = ReviewRepository()
+            success = review_repo.delete_review(review_id, seeker_uid)
+            
+            if success:
+                return GenericResponse(
+                    success=True,
+                    message="Review deleted successfully"
+                )
+            
+            return GenericResponse(
+                success=False,
+                message="Review not found"
+            )
+            
+        except Exception as e:
+            print(f"❌ DELETE REVIEW FAILED: {str(e)}\n")
+            return GenericResponse(
+                success=False,
+                message=f"Error: {str(e)}"
+            )
+    
+    # ==================== BOOKING MUTATIONS ====================
+    
+    @strawberry.mutation
+    async def reserve_booking(self, input: 'ReserveBookingInput') -> 'BookingResponse':
+        """
+        Reserve a vehicle for a time range
+        
+        Fails (success=False) if the range overlaps a confirmed booking of
+        the vehicle; concurrent reservations of the same range can't both win.
+        
+        Args:
+            input: Vehicle, seeker and ISO 8601 start/end times
+            
+        Returns:
+            BookingResponse with success status, message, and created booking
+        """
+        print(f"\n{'='*60}")
+        print(f"📅 RESERVE_BOOKING MUTATION CALLED")
+        print(f"   Vehicle ID: {input.vehicle_id}")
+        print(f"   Seeker UID: {input.seeker_uid}")
+        print(f"   Window: {input.start_time} → {input.end_time}")
+        print(f"{'='*60}\n")
+        
+        try:
+            import uuid
+            from models.user import BookingNode
+            from repositories.booking_repository import (
+                BookingRepository, BookingConflictError, parse_booking_time
+            )
+            
+            booking = BookingNode(
+                booking_id=str(uuid.uuid4()),
+                vehicle_id=input.vehicle_id,
+                seeker_uid=input.seeker_uid,
+                start_time=parse_booking_time(input.start_time),
+                end_time=parse_booking_time(input.end_time),
+                service_id=input.service_id,
+                notes=input.notes
+            )
+            
+            booking_repo = BookingRepository()
+            try:
+                created_booking = booking_repo.reserve(booking)
+            except BookingConflictError as e:
+                return BookingResponse(
+                    success=False,
+                    message=str(e),
+                    booking=None
+                )
+            
+            from services.event_broker import publish_vehicle_availability_changed
+            await publish_vehicle_availability_changed(
+                "booked", created_booking['provider_uid'], created_booking['vehicle_id'],
+                booking_id=created_booking['booking_id']
+            )
+            
+            return BookingResponse(
+                success=True,
+                message="Booking confirmed!",
+                booking=get_mapper("Booking", Booking).to_object(created_booking)
+            )
+            
+        except Exception as e:
+            print(f"❌ RESERVE BOOKING FAILED: {str(e)}\n")
+            return BookingResponse(
+                success=False,
+                message=f"Error: {str(e)}",
+                booking=None
+            )
+    
+    @strawberry.mutation
+    async def cancel_booking(self, booking_id: str, requester_uid: str) -> 'BookingResponse':
+        """
+        Cancel a confirmed booking, freeing its time range
+        
+        Args:
+            booking_id: ID of booking to cancel
+            requester_uid: UID of the seeker who booked or the vehicle's provider
+            
+        Returns:
+            BookingResponse with success status and cancelled booking
+        """
+        print(f"\n{'='*60}")
+        print(f"🚫 CANCEL_BOOKING MUTATION CALLED")
+        print(f"   Booking ID: {booking_id}")
+        print(f"{'='*60}\n")
+        
+        try:
+            from repositories.booking_repository import BookingRepository
+            
+            booking_repo = BookingRepository()
+            cancelled_booking = booking_repo.cancel_booking(booking_id, requester_uid)
+            
+            if cancelled_booking:
+                from services.event_broker import publish_vehicle_availability_changed
+                await publish_vehicle_availability_changed(
+                    "booking_cancelled", cancelled_booking['provider_uid'], cancelled_booking['vehicle_id'],
+                    booking_id=booking_id
+                )
+                
+                return BookingResponse(
+                    success=True,
+                    message="Booking cancelled",
+                    booking=get_mapper("Booking", Booking).to_object(cancelled_booking)
+                )
+            
+            return BookingResponse(
+                success=False,
+                message="Booking not found or already cancelled",
+                booking=None
+            )
+            
+        except Exception as e:
+            print(f"❌ CANCEL BOOKING FAILED: {str(e)}\n")
+            return BookingResponse(
+                success=False,
+                message=f"Error: {str(e)}",
+                booking=None
+            )
@@ -3,11 +3,51 @@ GraphQL Queries for Haulistry
 """
 import strawberry
 from typing import Optional, List, Union
-from .types import User, Seeker, Provider, Vehicle, Service
+from .types import (
+    User, Seeker, Provider, Vehicle, Service, Review,
+    ServiceSearchResult, ServiceSearchPage, ProviderSearchResult, ProviderSearchPage,
+    FacetCount, ServiceFacets, RankingWeightsInput, AvailabilityWindowInput,
+    Booking, TimeSlot, SlowQueryStat
+)
 from services.user_service import UserService
+from models.record_mapper import get_mapper
 from strawberry.types import Info
 
 
+# Identity documents are only returned to the provider themselves
+PRIVATE_PROVIDER_FIELDS = (
+    "cnic_number",
+    "cnic_front_image",
+    "cnic_back_image",
+    "license_image",
+    "license_number",
+)
+
+
+async def require_admin(info: Info) -> str:
+    """
+    Check that the request carries the Firebase (or session) token of an admin
+    
+    Args:
+        info: Resolver info (request in the context)
+    
+    Returns:
+        str: The admin's UID
+    """
+    from services.session_tokens import authenticate
+    from config.settings import settings
+    
+    request = info.context.get("request")
+    auth_header = request.headers.get("Authorization") if request else None
+    if not auth_header or not auth_header.startswith("Bearer "):
+        raise Exception("Authorization token required")
+    
+    uid = (await authenticate(auth_header.replace("Bearer ", "")))["uid"]
+    if uid not in settings.admin_uids_list:
+        raise Exception("Admin access required")
+    return uid
+
+
 @strawberry.type
 class Query:
     @strawberry.field
@@ -39,43 +79,9 @@ class Query:
             
             # Return appropriate user type
             if user_data['user_type'] == 'provider':
-                return Provider(
-                    uid=user_data['uid'],
-                    email=user_data['email'],
-                    full_name=user_data['full_name'],
-                    phone=user_data['phone'],
-                    user_type=user_data['user_type'],
-                    business_name=user_data['business_name'],
-                    business_type=user_data['business_type'],
-                    description=user_data.get('description'),
-                    location=user_data.get('location'),
-                    rating=user_data.get('rating'),
-                    total_bookings=user_data.get('total_bookings', 0),
-                    is_verified=user_data.get('is_verified', False),
-                    created_at=user_data['created_at'],
-                    updated_at=user_data['updated_at']
-                )
+                return get_mapper("Provider", Provider).to_object(user_data)
             else:
-                return Seeker(
-                    uid=user_data['uid'],
-                    email=user_data['email'],
-                    full_name=user_data['full_name'],
-                    phone=user_data['phone'],
-                    user_type=user_data['user_type'],
-                    profile_image=user_data.get('profile_image'),
-                    address=user_data.get('address'),
-                    bio=user_data.get('bio'),
-                    gender=user_data.get('gender'),
-                    date_of_birth=user_data.get('date_of_birth'),
-                    service_categories=user_data.get('service_categories'),
-                    category_details=user_data.get('category_details'),
-                    service_requirements=user_data.get('service_requirements'),
-                    primary_purpose=user_data.get('primary_purpose'),
-                    urgency=user_data.get('urgency'),
-                    preferences_notes=user_data.get('preferences_notes'),
-                    created_at=user_data['created_at'],
-                    updated_at=user_data['updated_at']
-                )
+                return get_mapper("Seeker", Seeker).to_object(user_data)
                 
         except Exception as e:
             raise Exception(f"Authentication failed: {str(e)}")
@@ -100,58 +106,9 @@ class Query:
             
             # Return appropriate user type
             if user_data['user_type'] == 'provider':
-                return Provider(
-                    uid=user_data['uid'],
-                    email=user_data['email'],
-                    full_name=user_data['full_name'],
-                    phone=user_data['phone'],
-                    user_type=user_data['user_type'],
-                    business_name=user_data.get('business_name'),
-                    business_type=user_data.get('business_type'),
-                    service_type=user_data.get('service_type'),
-                    cnic_number=user_data.get('cnic_number'),
-                    address=user_data.get('address'),
-                    city=user_data.get('city'),
-                    province=user_data.get('province'),
-                    years_experience=user_data.get('years_experience'),
-                    description=user_data.get('description'),
-                    # Document images
-                    profile_image=user_data.get('profile_image'),
-                    cnic_front_image=user_data.get('cnic_front_image'),
-                    cnic_back_image=user_data.get('cnic_back_image'),
-                    license_image=user_data.get('license_image'),
-                    license_number=user_data.get('license_number'),
-                    # Verification
-                    is_verified=user_data.get('is_verified', False),
-                    documents_uploaded=user_data.get('documents_uploaded', False),
-                    verification_status=user_data.get('verification_status', 'pending'),
-                    # Stats
-                    rating=user_data.get('rating'),
-                    total_bookings=user_data.get('total_bookings', 0),
-                    created_at=user_data['created_at'],
-                    updated_at=user_data['updated_at']
-                )
+                return get_mapper("Provider", Provider).to_object(user_data)
             else:
-                return Seeker(
-                    uid=user_data['uid'],
-                    email=user_data['email'],
-                    full_name=user_data['full_name'],
-                    phone=user_data['phone'],
-                    user_type=user_data['user_type'],
-                    profile_image=user_data.get('profile_image'),
-                    address=user_data.get('address'),
-                    bio=user_data.get('bio'),
-                    gender=user_data.get('gender'),
-                    date_of_birth=user_data.get('date_of_birth'),
-                    service_categories=user_data.get('service_categories'),
-                    category_details=user_data.get('category_details'),
-                    service_requirements=user_data.get('service_requirements'),
-                    primary_purpose=user_data.get('primary_purpose'),
-                    urgency=user_data.get('urgency'),
-                    preferences_notes=user_data.get('preferences_notes'),
-                    created_at=user_data['created_at'],
-                    updated_at=user_data['updated_at']
-                )
+                return get_mapper("Seeker", Seeker).to_object(user_data)
                 
         except Exception as e:
             raise Exception(f"Failed to fetch user: {str(e)}")
@@ -199,22 +156,7 @@ class Query:
             # Convert to Provider objects
             providers = []
             for provider_data in providers_data:
-                providers.append(Provider(
-                    uid=provider_data['uid'],
-                    email=provider_data['email'],
-                    full_name=provider_data['full_name'],
-                    phone=provider_data['phone'],
-                    user_type=provider_data['user_type'],
-                    business_name=provider_data['business_name'],
-                    business_type=provider_data['business_type'],
-                    description=provider_data.get('description'),
-                    location=provider_data.get('location'),
-                    rating=provider_data.get('rating'),
-                    total_bookings=provider_data.get('total_bookings', 0),
-                    is_verified=provider_data.get('is_verified', False),
-                    created_at=provider_data['created_at'],
-                    updated_at=provider_data['updated_at']
-                ))
+                providers.append(get_mapper("Provider", Provider, PRIVATE_PROVIDER_FIELDS).to_object(provider_data))
             
             return providers
             
@@ -255,8 +197,8 @@ class Query:
             print(f"   Limit: {limit}")
             print(f"{'='*60}\n")
             
-            from repositories.user_repository import UserRepository
-            user_repo = UserRepository()
+            from repositories.backend import get_user_repository
+            user_repo = get_user_repository()
             
             similar_seekers_data = user_repo.get_similar_seekers(uid, limit)
             
@@ -267,15 +209,13 @@ class Query:
             seekers = []
             for seeker_data in similar_seekers_data:
                 print(f"   ✓ Found: {seeker_data['name']} (score: {seeker_data['similarity_score']})")
-                seekers.append(Seeker(
-                    uid=seeker_data['uid'],
-                    email=seeker_data['email'],
+                seekers.append(get_mapper("Seeker", Seeker).to_object(
+                    seeker_data,
                     full_name=seeker_data['name'],
                     phone='',  # Don't expose phone to other users
                     user_type='seeker',
                     service_categories=seeker_data.get('categories'),
                     primary_purpose=seeker_data.get('purpose'),
-                    address=seeker_data.get('address'),
                     created_at='',
                     updated_at=''
                 ))
@@ -306,15 +246,15 @@ class Query:
         print(f"{'='*60}\n")
         
         try:
-            from repositories.user_repository import UserRepository
+            from repositories.backend import get_user_repository
             from .types import Vehicle
             
-            user_repo = UserRepository()
+            user_repo = get_user_repository()
             vehicles = user_repo.get_provider_vehicles(provider_uid)
             
             print(f"✅ Found {len(vehicles)} vehicles\n")
             
-            return [Vehicle(**vehicle) for vehicle in vehicles]
+            return get_mapper("Vehicle", Vehicle).to_objects(vehicles)
             
         except Exception as e:
             print(f"❌ Error fetching vehicles: {str(e)}\n")
@@ -337,15 +277,15 @@ class Query:
         print(f"{'='*60}\n")
         
         try:
-            from repositories.user_repository import UserRepository
+            from repositories.backend import get_user_repository
             from .types import Vehicle
             
-            user_repo = UserRepository()
+            user_repo = get_user_repository()
             vehicle = user_repo.get_vehicle_by_id(vehicle_id)
             
             if vehicle:
                 print(f"✅ Vehicle found: {vehicle['name']}\n")
-                return Vehicle(**vehicle)
+                return get_mapper("Vehicle", Vehicle).to_object(vehicle)
             
             print(f"⚠️  Vehicle not found\n")
             return None
@@ -373,15 +313,15 @@ class Query:
         print(f"{'='*60}\n")
         
         try:
-            from repositories.user_repository import UserRepository
+            from repositories.backend import get_user_repository
             from .types import Service
             
-            user_repo = UserRepository()
+            user_repo = get_user_repository()
             services = user_repo.get_vehicle_services(vehicle_id)
             
             print(f"✅ Found {len(services)} services\n")
             
-            return [Service(**service) for service in services]
+            return get_mapper("Service", Service).to_objects(services)
             
         except Exception as e:
             print(f"❌ Error fetching services: {str(e)}\n")
@@ -404,15 +344,15 @@ class Query:
         print(f"{'='*60}\n")
         
         try:
-            from repositories.user_repository import UserRepository
+            from repositories.backend import get_user_repository
             from .types import Service
             
-            user_repo = UserRepository()
+            user_repo = get_user_repository()
             services = user_repo.get_provider_services(provider_uid)
             
             print(f"✅ Found {len(services)} services\n")
             
-            return [Service(**service) for service in services]
+            return get_mapper("Service", Service).to_objects(services)
             
         except Exception as e:
             print(f"❌ Error fetching services: {str(e)}\n")
@@ -435,15 +375,15 @@ class Query:
         print(f"{'='*60}\n")
         
         try:
-            from repositories.user_repository import UserRepository
+            from repositories.backend import get_user_repository
             from .types import Service
             
-            user_repo = UserRepository()
+            user_repo = get_user_repository()
             service = user_repo.get_service_by_id(service_id)
             
             if service:
                 print(f"✅ Service found: {service['service_name']}\n")
-                return Service(**service)
+                return get_mapper("Service", Service).to_object(service)
             
             print(f"⚠️  Service not found\n")
             return None
@@ -460,7 +400,9 @@ class Query:
         category: Optional[str] = None,
         service_area: Optional[str] = None,
         min_rating: Optional[float] = None,
-        limit: int = 50
+        limit: int = 50,
+        ranking: Optional[RankingWeightsInput] = None,
+        available_during: Optional[List[AvailabilityWindowInput]] = None
     ) -> List['Service']:
         """
         Get all active services (for seekers) with optional filters
@@ -471,6 +413,10 @@ class Query:
             service_area: Filter by service area
             min_rating: Minimum rating filter
             limit: Maximum number of results (default: 50)
+            ranking: Optional weights; when set, results are ordered by the
+                     weighted ranking score instead of rating/recency
+            available_during: Only services whose weekly availability covers
+                              every window (e.g. Tuesday 8-12)
             
         Returns:
             List of active Service objects
@@ -484,20 +430,45 @@ class Query:
         print(f"{'='*60}\n")
         
         try:
-            from repositories.user_repository import UserRepository
+            from repositories.backend import get_user_repository
+            from models.availability import window_mask, union_masks
+            from services.single_flight import get_single_flight
             from .types import Service
             
-            user_repo = UserRepository()
-            services = user_repo.get_active_services(
-                category=category,
-                service_area=service_area,
-                min_rating=min_rating,
-                limit=limit
-            )
+            required_mask = None
+            if available_during:
+                required_mask = union_masks([
+                    window_mask(window.day, window.start_hour, window.end_hour)
+                    for window in available_during
+                ])
+            
+            # Identical concurrent calls share one query (services.single_flight)
+            single_flight = get_single_flight()
+            if ranking is not None:
+                from services.ranking_service import RankingService
+                services = await single_flight.do(
+                    RankingService().get_ranked_services,
+                    top_k=limit,
+                    weights=strawberry.asdict(ranking),
+                    category=category,
+                    service_area=service_area,
+                    min_rating=min_rating,
+                    available_during=required_mask
+                )
+            else:
+                user_repo = get_user_repository()
+                services = await single_flight.do(
+                    user_repo.get_active_services,
+                    category=category,
+                    service_area=service_area,
+                    min_rating=min_rating,
+                    limit=limit,
+                    available_during=required_mask
+                )
             
             print(f"✅ Found {len(services)} active services\n")
             
-            return [Service(**service) for service in services]
+            return get_mapper("Service", Service).to_objects(services)
             
         except Exception as e:
             print(f"❌ Error fetching active services: {str(e)}\n")
@@ -521,15 +492,15 @@ class Query:
         print(f"{'='*60}\n")
         
         try:
-            from repositories.user_repository import UserRepository
+            from repositories.backend import get_user_repository
             from .types import Service
             
-            user_repo = UserRepository()
+            user_repo = get_user_repository()
             services = user_repo.get_active_services_by_provider(provider_uid)
             
             print(f"✅ Found {len(services)} active services\n")
             
-            return [Service(**service) for service in services]
+            return get_mapper("Service", Service).to_objects(services)
             
         except Exception as e:
             print(f"❌ Error fetching active provider services: {str(e)}\n")
@@ -542,7 +513,9 @@ class Query:
         longitude: float,
         radius_km: float = 50,
         category: Optional[str] = None,
-        limit: int = 50
+        limit: int = 50,
+        ranking: Optional[RankingWeightsInput] = None,
+        available_during: Optional[List[AvailabilityWindowInput]] = None
     ) -> List['Service']:
         """
         Find services near a location using geospatial search
@@ -554,6 +527,10 @@ class Query:
             radius_km: Search radius in kilometers (default: 50)
             category: Optional filter by service category
             limit: Maximum number of results (default: 50)
+            ranking: Optional weights; when set, results are ordered by the
+                     weighted ranking score instead of distance alone
+            available_during: Only services whose weekly availability covers
+                              every window (e.g. Tuesday 8-12)
             
         Returns:
             List of Service objects with distance information
@@ -567,23 +544,425 @@ class Query:
         print(f"{'='*60}\n")
         
         try:
-            from repositories.user_repository import UserRepository
+            from repositories.backend import get_user_repository
+            from models.availability import window_mask, union_masks
+            from services.single_flight import get_single_flight
             from .types import Service
             
-            user_repo = UserRepository()
-            services = user_repo.get_nearby_services(
+            required_mask = None
+            if available_during:
+                required_mask = union_masks([
+                    window_mask(window.day, window.start_hour, window.end_hour)
+                    for window in available_during
+                ])
+            
+            # Identical concurrent calls share one query (services.single_flight)
+            single_flight = get_single_flight()
+            if ranking is not None:
+                from services.ranking_service import RankingService
+                services = await single_flight.do(
+                    RankingService().get_ranked_services,
+                    top_k=limit,
+                    weights=strawberry.asdict(ranking),
+                    category=category,
+                    latitude=latitude,
+                    longitude=longitude,
+                    radius_km=radius_km,
+                    available_during=required_mask
+                )
+            else:
+                user_repo = get_user_repository()
+                services = await single_flight.do(
+                    user_repo.get_nearby_services,
+                    latitude=latitude,
+                    longitude=longitude,
+                    radius_km=radius_km,
+                    service_category=category,
+                    limit=limit,
+                    available_during=required_mask
+                )
+            
+            print(f"✅ Found {len(services)} nearby services\n")
+            
+            return get_mapper("Service", Service).to_objects(services)
+            
+        except Exception as e:
+            print(f"❌ Error fetching nearby services: {str(e)}\n")
+            raise Exception(f"Failed to fetch nearby services: {str(e)}")
+    
+    # ==================== FULL-TEXT SEARCH QUERIES ====================
+    
+    @strawberry.field
+    async def search_services(
+        self,
+        text: str,
+        category: Optional[str] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius_km: Optional[float] = None,
+        limit: int = 20,
+        skip: int = 0
+    ) -> ServiceSearchPage:
+        """
+        Free-text search over active services ("crane Lahore 20 ton")
+        
+        Matches service name, description, address and city, ordered by
+        relevance. Category and geo filters run inside the index query.
+        
+        Args:
+            text: Search text
+            category: Optional filter by service category
+            latitude: Optional center latitude for geo filtering
+            longitude: Optional center longitude for geo filtering
+            radius_km: Optional search radius in kilometers
+            limit: Page size (default: 20)
+            skip: Number of results to skip for pagination (default: 0)
+            
+        Returns:
+            ServiceSearchPage with scored results
+        """
+        try:
+            from repositories.search_repository import SearchRepository
+            
+            search_repo = SearchRepository()
+            page = search_repo.search_services(
+                text=text,
+                category=category,
                 latitude=latitude,
                 longitude=longitude,
                 radius_km=radius_km,
-                service_category=category,
+                limit=limit,
+                skip=skip
+            )
+            
+            return ServiceSearchPage(
+                results=[
+                    ServiceSearchResult(
+                        service=get_mapper("Service", Service).to_object(result['service']),
+                        score=result['score'],
+                        distance_km=result['distance_km']
+                    )
+                    for result in page['results']
+                ],
+                has_more=page['has_more'],
+                skip=skip,
                 limit=limit
             )
             
-            print(f"✅ Found {len(services)} nearby services\n")
+        except Exception as e:
+            print(f"❌ Error searching services: {str(e)}\n")
+            raise Exception(f"Failed to search services: {str(e)}")
+    
+    @strawberry.field
+    async def search_providers(
+        self,
+        text: str,
+        business_type: Optional[str] = None,
+        city: Optional[str] = None,
+        limit: int = 20,
+        skip: int = 0
+    ) -> ProviderSearchPage:
+        """
+        Free-text search over provider business name and description
+        
+        Args:
+            text: Search text
+            business_type: Optional filter by business type
+            city: Optional filter by city
+            limit: Page size (default: 20)
+            skip: Number of results to skip for pagination (default: 0)
             
-            return [Service(**service) for service in services]
+        Returns:
+            ProviderSearchPage with scored results
+        """
+        try:
+            from repositories.search_repository import SearchRepository
+            
+            search_repo = SearchRepository()
+            page = search_repo.search_providers(
+                text=text,
+                business_type=business_type,
+                city=city,
+                limit=limit,
+                skip=skip
+            )
+            
+            results = []
+            for result in page['results']:
+                provider_data = result['provider']
+                results.append(ProviderSearchResult(
+                    provider=get_mapper("Provider", Provider, PRIVATE_PROVIDER_FIELDS).to_object(
+                        provider_data,
+                        user_type=provider_data.get('user_type', 'provider')
+                    ),
+                    score=result['score']
+                ))
+            
+            return ProviderSearchPage(
+                results=results,
+                has_more=page['has_more'],
+                skip=skip,
+                limit=limit
+            )
             
         except Exception as e:
-            print(f"❌ Error fetching nearby services: {str(e)}\n")
-            raise Exception(f"Failed to fetch nearby services: {str(e)}")
-
+            print(f"❌ Error searching providers: {str(e)}\n")
+            raise Exception(f"Failed to search providers: {str(e)}")
+    
+    @strawberry.field
+    async def service_facets(
+        self,
+        category: Optional[str] = None,
+        city: Optional[str] = None,
+        price_band: Optional[str] = None
+    ) -> ServiceFacets:
+        """
+        Get active service counts per category, city and price band
+        
+        Counts for each dimension respect the filters on the other two,
+        e.g. with category="crane" the cities facet shows crane counts per city.
+        
+        Args:
+            category: Current category filter
+            city: Current city filter
+            price_band: Current price band filter (under_2k, 2k_5k, 5k_10k, 10k_plus, unpriced)
+            
+        Returns:
+            ServiceFacets with grouped counts
+        """
+        try:
+            from repositories.facet_repository import FacetRepository
+            
+            facet_repo = FacetRepository()
+            facets = facet_repo.get_service_facets(
+                category=category,
+                city=city,
+                price_band=price_band
+            )
+            
+            return ServiceFacets(
+                categories=[FacetCount(**facet) for facet in facets['categories']],
+                cities=[FacetCount(**facet) for facet in facets['cities']],
+                price_bands=[FacetCount(**facet) for facet in facets['price_bands']],
+                total=facets['total'],
+                source=facets['source']
+            )
+            
+        except Exception as e:
+            print(f"❌ Error fetching service facets: {str(e)}\n")
+            raise Exception(f"Failed to fetch service facets: {str(e)}")
+    
+    # ==================== BOOKING QUERIES ====================
+    
+    @strawberry.field
+    async def vehicle_bookings(
+        self,
+        vehicle_id: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        include_cancelled: bool = False
+    ) -> List[Booking]:
+        """
+        Get the bookings of a vehicle, optionally within a time window
+        
+        Args:
+            vehicle_id: Vehicle ID
+            start_time: Only bookings ending after this ISO 8601 time
+            end_time: Only bookings starting before this ISO 8601 time
+            include_cancelled: Also return cancelled bookings
+            
+        Returns:
+            List of Booking objects ordered by start time
+        """
+        try:
+            from repositories.booking_repository import BookingRepository
+            
+            booking_repo = BookingRepository()
+            bookings = booking_repo.get_vehicle_bookings(
+                vehicle_id,
+                range_start=start_time,
+                range_end=end_time,
+                include_cancelled=include_cancelled
+            )
+            
+            return get_mapper("Booking", Booking).to_objects(bookings)
+            
+        except Exception as e:
+            print(f"❌ Error fetching vehicle bookings: {str(e)}\n")
+            raise Exception(f"Failed to fetch vehicle bookings: {str(e)}")
+    
+    @strawberry.field
+    async def seeker_bookings(self, seeker_uid: str, include_cancelled: bool = False) -> List[Booking]:
+        """
+        Get all bookings made by a seeker, newest first
+        
+        Args:
+            seeker_uid: Seeker UID
+            include_cancelled: Also return cancelled bookings
+            
+        Returns:
+            List of Booking objects
+        """
+        try:
+            from repositories.booking_repository import BookingRepository
+            
+            booking_repo = BookingRepository()
+            bookings = booking_repo.get_seeker_bookings(seeker_uid, include_cancelled=include_cancelled)
+            
+            return get_mapper("Booking", Booking).to_objects(bookings)
+            
+        except Exception as e:
+            print(f"❌ Error fetching seeker bookings: {str(e)}\n")
+            raise Exception(f"Failed to fetch seeker bookings: {str(e)}")
+    
+    @strawberry.field
+    async def vehicle_free_slots(
+        self,
+        vehicle_id: str,
+        start_time: str,
+        end_time: str,
+        min_duration_minutes: int = 0
+    ) -> List[TimeSlot]:
+        """
+        Free time slots of a vehicle between start_time and end_time
+        
+        Args:
+            vehicle_id: Vehicle ID
+            start_time: ISO 8601 start of the window to search
+            end_time: ISO 8601 end of the window to search
+            min_duration_minutes: Skip gaps shorter than this
+            
+        Returns:
+            List of TimeSlot objects in chronological order
+        """
+        try:
+            from repositories.booking_repository import BookingRepository
+            
+            booking_repo = BookingRepository()
+            slots = booking_repo.get_free_slots(
+                vehicle_id,
+                start_time,
+                end_time,
+                min_duration_minutes=min_duration_minutes
+            )
+            if slots is None:
+                raise Exception("Vehicle not found")
+            
+            return [TimeSlot(**slot) for slot in slots]
+            
+        except Exception as e:
+            print(f"❌ Error fetching free slots: {str(e)}\n")
+            raise Exception(f"Failed to fetch free slots: {str(e)}")
+    
+    @strawberry.field
+    async def vehicle_available_between(self, vehicle_id: str, start_time: str, end_time: str) -> bool:
+        """
+        Check whether a vehicle is switched on and has no booking in the range
+        
+        Args:
+            vehicle_id: Vehicle ID
+            start_time: ISO 8601 start of the range
+            end_time: ISO 8601 end of the range
+            
+        Returns:
+            bool: True if the vehicle can be reserved for the range
+        """
+        try:
+            from repositories.backend import get_vehicle_repository
+            
+            vehicle_repo = get_vehicle_repository()
+            return vehicle_repo.check_vehicle_availability(vehicle_id, start_time, end_time)
+            
+        except Exception as e:
+            print(f"❌ Error checking vehicle availability: {str(e)}\n")
+            raise Exception(f"Failed to check vehicle availability: {str(e)}")
+    
+    # ==================== REVIEW QUERIES ====================
+    
+    @strawberry.field
+    async def service_reviews(
+        self,
+        service_id: str,
+        limit: int = 20,
+        skip: int = 0
+    ) -> List['Review']:
+        """
+        Get reviews for a service, newest first
+        
+        Args:
+            service_id: The service's ID
+            limit: Maximum number of results (default: 20)
+            skip: Number of results to skip for pagination (default: 0)
+            
+        Returns:
+            List of Review objects
+        """
+        try:
+            from repositories.review_repository import ReviewRepository
+            
+            review_repo = ReviewRepository()
+            reviews = review_repo.get_service_reviews(service_id, limit=limit, skip=skip)
+            
+            return get_mapper("Review", Review).to_objects(reviews)
+            
+        except Exception as e:
+            print(f"❌ Error fetching service reviews: {str(e)}\n")
+            raise Exception(f"Failed to fetch service reviews: {str(e)}")
+    
+    @strawberry.field
+    async def provider_reviews(
+        self,
+        provider_uid: str,
+        limit: int = 20,
+        skip: int = 0
+    ) -> List['Review']:
+        """
+        Get reviews across all services of a provider, newest first
+        
+        Args:
+            provider_uid: The provider's UID
+            limit: Maximum number of results (default: 20)
+            skip: Number of results to skip for pagination (default: 0)
+            
+        Returns:
+            List of Review objects
+        """
+        try:
+            from repositories.review_repository import ReviewRepository
+            
+            review_repo = ReviewRepository()
+            reviews = review_repo.get_provider_reviews(provider_uid, limit=limit, skip=skip)
+            
+            return get_mapper("Review", Review).to_objects(reviews)
+            
+        except Exception as e:
+            print(f"❌ Error fetching provider reviews: {str(e)}\n")
+            raise Exception(f"Failed to fetch provider reviews: {str(e)}")
+    
+    # ==================== ADMIN QUERIES ====================
+    
+    @strawberry.field
+    async def slow_queries(self, info: Info, limit: int = 10) -> List[SlowQueryStat]:
+        """
+        Get the Neo4j statements that spent the most time over the
+        slow-query threshold in this worker
+        
+        Requires: Authorization header with the Firebase token of a UID
+        listed in ADMIN_UIDS
+        
+        Args:
+            limit: Maximum number of statements (default: 10)
+            
+        Returns:
+            List of SlowQueryStat objects, worst first
+        """
+        try:
+            await require_admin(info)
+            
+            from monitoring.slow_queries import get_slow_query_log
+            
+            return [SlowQueryStat(**offender) for offender in get_slow_query_log().top_offenders(limit)]
+            
+        except Exception as e:
+            print(f"❌ Error fetching slow queries: {str(e)}\n")
+            raise Exception(f"Failed to fetch slow queries: {str(e)}")
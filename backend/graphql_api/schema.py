@@ -1,13 +1,32 @@
 """
 GraphQL Schema for Haulistry
 """
-import strawberry
-from .queries import Query
+from models.record_mapper import compile_mappers
+from .queries import Query, PRIVATE_PROVIDER_FIELDS
 from .mutations import Mutation
+from .subscriptions import Subscription
+from .extensions import InstrumentedSchema, instrument_resolvers
+from .types import Seeker, Provider, Vehicle, Service, Review, Booking
 
 
-# Create the GraphQL schema
-schema = strawberry.Schema(
+# Resolver latency histograms and spans (must be attached before the schema is built)
+instrument_resolvers(Query, Mutation)
+
+# Record mappers the resolvers and repositories use, compiled before the first request
+compile_mappers([
+    ("Seeker", Seeker),
+    ("Provider", Provider),
+    ("Provider", Provider, PRIVATE_PROVIDER_FIELDS),
+    ("Vehicle", Vehicle),
+    ("Service", Service),
+    ("Review", Review),
+    ("Booking", Booking),
+    *((label,) for label in ("Seeker", "Provider", "Vehicle", "Service", "Review", "Booking")),
+])
+
+# Create the GraphQL schema (operation latency histograms and spans)
+schema = InstrumentedSchema(
     query=Query,
-    mutation=Mutation
+    mutation=Mutation,
+    subscription=Subscription
 )
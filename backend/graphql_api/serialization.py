@@ -0,0 +1,63 @@
+"""
+JSON serialization with orjson
+
+Used for every GraphQL response (ORJSONGraphQLRouter) and as the FastAPI
+default response class (ORJSONResponse). Neo4j temporal and spatial values
+are encoded natively, so records can be returned without converting each
+property first.
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse as FastAPIORJSONResponse
+from neo4j.spatial import Point
+from neo4j.time import Date, DateTime, Duration, Time
+from strawberry.fastapi import GraphQLRouter
+
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def default_encoder(value: Any) -> Any:
+    """
+    Encode the types orjson does not handle itself
+    
+    Neo4j DateTime/Date/Time/Duration become ISO-8601 strings (the same text
+    iso_format() returns, nanoseconds included), points become
+    {"srid", "x", "y"[, "z"]}, sets and other tuples become lists.
+    
+    Raises:
+        TypeError: Unsupported type (orjson turns it into JSONEncodeError)
+    """
+    if isinstance(value, (DateTime, Date, Time, Duration)):
+        return value.iso_format()
+    if isinstance(value, Point):
+        point = {"srid": value.srid, "x": value.x, "y": value.y}
+        if len(value) > 2:
+            point["z"] = value.z
+        return point
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(data: Any) -> bytes:
+    """Serialize data to UTF-8 JSON bytes"""
+    return orjson.dumps(data, default=default_encoder, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(FastAPIORJSONResponse):
+    """FastAPI response rendered by orjson with Neo4j type support"""
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class ORJSONGraphQLRouter(GraphQLRouter):
+    """GraphQLRouter that encodes results with orjson instead of json.dumps"""
+    
+    def encode_json(self, response_data: Any) -> str:
+        # Strawberry also splices this into multipart subscription frames,
+        # which are built as str, so decode rather than return bytes
+        return dumps(response_data).decode("utf-8")
@@ -0,0 +1,63 @@
+"""
+GraphQL Subscriptions for Haulistry
+
+Served over WebSocket on /graphql (graphql-transport-ws and graphql-ws).
+Events come from services.event_broker, which the mutations publish to.
+"""
+import strawberry
+from typing import Optional, AsyncGenerator
+from .types import Service, ServiceChangeEvent, VehicleAvailabilityEvent, ProfileUpdatedEvent
+from models.record_mapper import get_mapper
+from services.event_broker import (
+    get_event_broker, topic_key,
+    SERVICE_CHANGED, VEHICLE_AVAILABILITY_CHANGED, PROFILE_UPDATED
+)
+
+
+@strawberry.type
+class Subscription:
+    @strawberry.subscription
+    async def service_changed(
+        self,
+        category: Optional[str] = None,
+        area: Optional[str] = None
+    ) -> AsyncGenerator[ServiceChangeEvent, None]:
+        """
+        Services created, updated or deleted
+        
+        Args:
+            category: Only services in this category
+            area: Only services with this service area
+        """
+        broker = get_event_broker()
+        async for event in broker.subscribe(topic_key(SERVICE_CHANGED, category, area)):
+            yield ServiceChangeEvent(
+                action=event["action"],
+                service_id=event["service_id"],
+                provider_uid=event.get("provider_uid"),
+                service=get_mapper("Service", Service).to_object(event["service"]) if event.get("service") else None
+            )
+    
+    @strawberry.subscription
+    async def vehicle_availability_changed(self, provider_uid: str) -> AsyncGenerator[VehicleAvailabilityEvent, None]:
+        """
+        Availability or bookings of a provider's vehicles changed
+        
+        Args:
+            provider_uid: Provider whose vehicles to watch
+        """
+        broker = get_event_broker()
+        async for event in broker.subscribe(topic_key(VEHICLE_AVAILABILITY_CHANGED, provider_uid)):
+            yield VehicleAvailabilityEvent(**event)
+    
+    @strawberry.subscription
+    async def profile_updated(self, uid: str) -> AsyncGenerator[ProfileUpdatedEvent, None]:
+        """
+        A user's profile was updated
+        
+        Args:
+            uid: User whose profile to watch
+        """
+        broker = get_event_broker()
+        async for event in broker.subscribe(topic_key(PROFILE_UPDATED, uid)):
+            yield ProfileUpdatedEvent(**event)
@@ -2,7 +2,7 @@
 GraphQL Types for Haulistry
 """
 import strawberry
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
 
@@ -58,6 +58,7 @@ class Provider(User):
     verification_status: str = "pending"
     # Stats
     rating: Optional[float] = None
+    rating_count: int = 0
     total_bookings: int = 0
 
 
@@ -88,6 +89,16 @@ class ProviderAuthResponse:
     user: Optional[Provider] = None
 
 
+@strawberry.type
+class SessionResponse:
+    """New API session token pair"""
+    success: bool
+    message: str
+    access_token: Optional[str] = None
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None
+
+
 @strawberry.type
 class ErrorResponse:
     """Error response type"""
@@ -204,6 +215,7 @@ class Vehicle:
     has_insurance: bool = False
     insurance_expiry: Optional[str] = None
     is_available: bool = True
+    availability_mask: Optional[List[int]] = None  # 7 day masks (Monday first), bit h = hour h
     # Location
     city: Optional[str] = None
     province: Optional[str] = None
@@ -245,6 +257,7 @@ class Service:
     is_active: bool = True
     available_days: Optional[str] = None
     available_hours: Optional[str] = None
+    availability_mask: Optional[List[int]] = None  # 7 day masks (Monday first), bit h = hour h
     # Requirements
     operator_included: bool = True
     fuel_included: bool = False
@@ -252,9 +265,14 @@ class Service:
     # Stats
     total_bookings: int = 0
     rating: float = 0.0
+    rating_sum: float = 0.0
+    rating_count: int = 0
     # Metadata
     created_at: str
     updated_at: str
+    # Query-time fields (set by nearby/ranked queries, not stored)
+    distance_km: Optional[float] = None
+    ranking_score: Optional[float] = None
 
 
 @strawberry.input
@@ -276,6 +294,7 @@ class AddVehicleInput:
     has_insurance: bool = False
     insurance_expiry: Optional[str] = None
     is_available: bool = True
+    availability_mask: Optional[List[int]] = None
     # Location
     city: Optional[str] = None
     province: Optional[str] = None
@@ -304,6 +323,7 @@ class UpdateVehicleInput:
     has_insurance: Optional[bool] = None
     insurance_expiry: Optional[str] = None
     is_available: Optional[bool] = None
+    availability_mask: Optional[List[int]] = None
     # Location
     city: Optional[str] = None
     province: Optional[str] = None
@@ -340,6 +360,7 @@ class AddServiceInput:
     is_active: bool = True
     available_days: Optional[str] = None
     available_hours: Optional[str] = None
+    availability_mask: Optional[List[int]] = None  # Derived from days/hours when omitted
     # Requirements
     operator_included: bool = True
     fuel_included: bool = False
@@ -372,6 +393,7 @@ class UpdateServiceInput:
     is_active: Optional[bool] = None
     available_days: Optional[str] = None
     available_hours: Optional[str] = None
+    availability_mask: Optional[List[int]] = None
     # Requirements
     operator_included: Optional[bool] = None
     fuel_included: Optional[bool] = None
@@ -399,3 +421,216 @@ class GenericResponse:
     """Generic response for delete operations"""
     success: bool
     message: str
+
+
+# ==================== REVIEW TYPES ====================
+
+@strawberry.type
+class Review:
+    """Review type for GraphQL"""
+    review_id: str
+    seeker_uid: str
+    service_id: str
+    provider_uid: str
+    rating: int
+    comment: Optional[str] = None
+    seeker_name: Optional[str] = None
+    # Metadata
+    created_at: str
+    updated_at: str
+
+
+@strawberry.input
+class AddReviewInput:
+    """Input for reviewing a service"""
+    seeker_uid: str
+    service_id: str
+    rating: int  # 1 - 5
+    comment: Optional[str] = None
+
+
+@strawberry.input
+class UpdateReviewInput:
+    """Input for updating an existing review"""
+    review_id: str
+    seeker_uid: str
+    rating: int  # 1 - 5
+    comment: Optional[str] = None
+
+
+@strawberry.type
+class ReviewResponse:
+    """Response type for review operations"""
+    success: bool
+    message: str
+    review: Optional[Review] = None
+
+
+# ==================== BOOKING TYPES ====================
+
+@strawberry.type
+class Booking:
+    """Booking type for GraphQL (times are ISO 8601, UTC)"""
+    booking_id: str
+    vehicle_id: str
+    seeker_uid: str
+    provider_uid: str
+    start_time: str
+    end_time: str
+    status: str  # confirmed, cancelled
+    service_id: Optional[str] = None
+    notes: Optional[str] = None
+    # Metadata
+    created_at: str
+    updated_at: str
+
+
+@strawberry.type
+class TimeSlot:
+    """A free time range of a vehicle"""
+    start_time: str
+    end_time: str
+
+
+@strawberry.input
+class ReserveBookingInput:
+    """Input for reserving a vehicle"""
+    vehicle_id: str
+    seeker_uid: str
+    start_time: str  # ISO 8601; UTC assumed when no offset is given
+    end_time: str
+    service_id: Optional[str] = None
+    notes: Optional[str] = None
+
+
+@strawberry.type
+class BookingResponse:
+    """Response type for booking operations"""
+    success: bool
+    message: str
+    booking: Optional[Booking] = None
+
+
+# ==================== SUBSCRIPTION EVENT TYPES ====================
+
+@strawberry.type
+class ServiceChangeEvent:
+    """Pushed to service_changed subscribers"""
+    action: str  # created, updated, deleted
+    service_id: str
+    provider_uid: Optional[str] = None
+    service: Optional[Service] = None  # None for deletes
+
+
+@strawberry.type
+class VehicleAvailabilityEvent:
+    """Pushed to vehicle_availability_changed subscribers"""
+    action: str  # created, updated, deleted, booked, booking_cancelled
+    provider_uid: str
+    vehicle_id: str
+    is_available: Optional[bool] = None
+    booking_id: Optional[str] = None
+
+
+@strawberry.type
+class ProfileUpdatedEvent:
+    """Pushed to profile_updated subscribers; refetch `me` for the new values"""
+    uid: str
+    user_type: str
+    changed_fields: List[str]
+
+
+# ==================== SEARCH TYPES ====================
+
+@strawberry.type
+class ServiceSearchResult:
+    """A service matched by full-text search with its relevance score"""
+    service: Service
+    score: float
+    distance_km: Optional[float] = None
+
+
+@strawberry.type
+class ServiceSearchPage:
+    """One page of full-text service search results"""
+    results: List[ServiceSearchResult]
+    has_more: bool
+    skip: int
+    limit: int
+
+
+@strawberry.type
+class ProviderSearchResult:
+    """A provider matched by full-text search with its relevance score"""
+    provider: Provider
+    score: float
+
+
+@strawberry.type
+class ProviderSearchPage:
+    """One page of full-text provider search results"""
+    results: List[ProviderSearchResult]
+    has_more: bool
+    skip: int
+    limit: int
+
+
+# ==================== AVAILABILITY TYPES ====================
+
+@strawberry.input
+class AvailabilityWindowInput:
+    """One weekly time window, e.g. Tuesday 8-12 is day=1, start_hour=8, end_hour=12"""
+    day: int  # 0 = Monday ... 6 = Sunday
+    start_hour: int  # 0-23
+    end_hour: int  # 1-24, exclusive
+
+
+# ==================== RANKING TYPES ====================
+
+@strawberry.input
+class RankingWeightsInput:
+    """Per-query ranking weights; omitted weights use the server defaults"""
+    distance: Optional[float] = None
+    rating: Optional[float] = None
+    reviews: Optional[float] = None
+    price: Optional[float] = None
+    freshness: Optional[float] = None
+    verified: Optional[float] = None
+
+
+# ==================== FACET TYPES ====================
+
+@strawberry.type
+class FacetCount:
+    """Number of active services for one facet value"""
+    value: str
+    count: int
+
+
+@strawberry.type
+class ServiceFacets:
+    """Browse counts per category, city and price band"""
+    categories: List[FacetCount]
+    cities: List[FacetCount]
+    price_bands: List[FacetCount]
+    total: int
+    source: str  # "counters" or "query" (fallback)
+
+
+# ==================== ADMIN TYPES ====================
+
+@strawberry.type
+class SlowQueryStat:
+    """Neo4j statement that exceeded the slow-query threshold (per worker)"""
+    statement: str
+    calls: int
+    slow_calls: int
+    slow_total_ms: float
+    mean_ms: float
+    max_ms: float
+    mean_available_after_ms: float  # Server time until the first record
+    mean_consumed_after_ms: float  # Server time until the last record was streamed
+    last_slow_at: Optional[str] = None
+    last_fingerprint: Optional[str] = None  # Hash of the parameter names and types
+    db_hits: Optional[int] = None  # From the last PROFILE capture
+    plan: Optional[List[str]] = None  # Last captured PROFILE/EXPLAIN plan, one operator per line
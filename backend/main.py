@@ -3,15 +3,19 @@ Haulistry Backend API
 FastAPI application with GraphQL, Firebase Auth and Neo4j database
 """
 
+import asyncio
 import uvicorn
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
-from strawberry.fastapi import GraphQLRouter
+from strawberry.subscriptions import GRAPHQL_TRANSPORT_WS_PROTOCOL, GRAPHQL_WS_PROTOCOL
 
-from config import settings, initialize_firebase, get_neo4j_driver, close_neo4j_driver
+from config import settings, initialize_firebase, get_neo4j_driver, close_neo4j_driver, add_driver_listener
 from graphql_api.schema import schema
+from graphql_api.serialization import ORJSONResponse, ORJSONGraphQLRouter
+from middleware import CompressionMiddleware, IdentityCache, RateLimitMiddleware, TracingMiddleware, compression_stats, create_bucket_store, parse_costs
+from monitoring import instrument_pool, render_metrics, setup_tracing, shutdown_tracing
 
 
 @asynccontextmanager
@@ -23,6 +27,12 @@ async def lifespan(app: FastAPI):
     print("🚀 Starting Haulistry Backend API with GraphQL...")
     print(f"📝 Environment: {'Development' if settings.DEBUG else 'Production'}")
     
+    # OpenTelemetry exporter (TRACING_EXPORTER)
+    try:
+        setup_tracing()
+    except Exception as e:
+        print(f"⚠️  Tracing disabled: {str(e)}")
+    
     # Initialize Firebase
     try:
         initialize_firebase()
@@ -30,20 +40,109 @@ async def lifespan(app: FastAPI):
         print(f"⚠️  Firebase initialization failed: {str(e)}")
         print(f"⚠️  Continuing without Firebase...")
     
+    # Pool acquisition timing for every driver this worker creates
+    add_driver_listener(instrument_pool)
+    
     # Test Neo4j connection (non-blocking)
     try:
         driver = get_neo4j_driver()
+        
+        # Make sure full-text search indexes exist
+        try:
+            from repositories.search_repository import SearchRepository
+            SearchRepository().ensure_indexes()
+        except Exception as e:
+            print(f"⚠️  Could not create search indexes: {str(e)}")
+        
+        # Booking constraints (unique booking_id, lookup indexes)
+        try:
+            from repositories.booking_repository import BookingRepository
+            BookingRepository().ensure_constraints()
+        except Exception as e:
+            print(f"⚠️  Could not create booking constraints: {str(e)}")
+        
+        # Review constraints (unique review_id, one review per seeker per service)
+        try:
+            from repositories.review_repository import ReviewRepository
+            ReviewRepository().ensure_constraints()
+        except Exception as e:
+            print(f"⚠️  Could not create review constraints: {str(e)}")
+        
+        # Facet counter constraint (one node per category/city/price band)
+        try:
+            from repositories.facet_repository import FacetRepository
+            FacetRepository().ensure_constraints()
+        except Exception as e:
+            print(f"⚠️  Could not create facet constraints: {str(e)}")
+        
         print(f"✅ All services initialized successfully!\n")
     except Exception as e:
         print(f"⚠️  Neo4j connection failed: {str(e)}")
         print(f"⚠️  Server will start but database operations may fail")
         print(f"⚠️  Please check Neo4j Aura instance is running\n")
     
+    # Embedded user/vehicle storage is read into memory once, before the first request
+    if settings.STORAGE_BACKEND == "embedded":
+        from repositories.embedded_graph import get_embedded_graph
+        get_embedded_graph()
+    
+    # Event broker behind GraphQL subscriptions
+    from services.event_broker import get_event_broker
+    event_broker = get_event_broker()
+    try:
+        await event_broker.start()
+        print(f"📡 Event broker started ({settings.EVENT_BROKER_BACKEND})")
+    except Exception as e:
+        print(f"⚠️  Event broker failed to start: {str(e)}")
+    
+    # Session token revocations from every worker (SESSION_TOKENS)
+    revocation_task = None
+    if settings.SESSION_TOKENS:
+        from services.session_tokens import get_session_tokens, replicate_revocations
+        get_session_tokens()  # Refuses to start with a weak SECRET_KEY
+        revocation_task = asyncio.create_task(replicate_revocations())
+        print(f"🔑 Session tokens enabled ({settings.ALGORITHM}, {settings.ACCESS_TOKEN_EXPIRE_MINUTES} min access)")
+    
+    # Creates the profiles of registrations waiting in the outbox (REGISTRATION_MODE=outbox)
+    registration_worker = None
+    if settings.REGISTRATION_MODE == "outbox":
+        from services.registration_outbox import get_registration_worker
+        registration_worker = get_registration_worker()
+        await registration_worker.start()
+        print(f"📮 Registration outbox worker started ({registration_worker.outbox.stats()['pending']} pending)")
+    
+    # Per-client token buckets (RateLimitMiddleware, added below the app)
+    if rate_limit_store is not None:
+        print(f"🚦 Rate limiting on ({settings.RATE_LIMIT_BACKEND}, {settings.RATE_LIMIT_RATE:g}/s, burst {settings.RATE_LIMIT_BURST:g})")
+    
+    # Background dependency probe behind /readyz
+    from services.health_prober import get_health_prober
+    health_prober = get_health_prober()
+    await health_prober.start()
+    print(f"🩺 Health prober started (every {settings.HEALTH_PROBE_INTERVAL:.0f}s)")
+    
     yield
     
     # Shutdown
     print("\n🛑 Shutting down Haulistry Backend API...")
+    await health_prober.stop()
+    if registration_worker is not None:
+        await registration_worker.stop()
+        registration_worker.outbox.close()
+    if revocation_task is not None:
+        revocation_task.cancel()
+        from services.session_tokens import get_session_tokens
+        get_session_tokens().deny_list.close()
+    await event_broker.stop()
+    if rate_limit_store is not None:
+        await rate_limit_store.close()
+        rate_limit_identities.close()
     close_neo4j_driver()
+    from repositories.embedded_graph import close_embedded_graph
+    close_embedded_graph()
+    from config.firebase_async import shutdown_async_firebase
+    shutdown_async_firebase()
+    shutdown_tracing()
     print("✅ Cleanup completed")
 
 
@@ -54,9 +153,27 @@ app = FastAPI(
     version=settings.API_VERSION,
     docs_url="/docs",
     redoc_url="/redoc",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# Per-client token buckets (RATE_LIMIT_BACKEND). Added first so it runs inside
+# CORS: 429 responses still carry the CORS headers browsers need to read them
+rate_limit_store = create_bucket_store(settings.RATE_LIMIT_BACKEND, settings.RATE_LIMIT_REDIS_URL)
+rate_limit_identities = IdentityCache(
+    max_pending=settings.RATE_LIMIT_MAX_PENDING,
+    verify_workers=settings.RATE_LIMIT_VERIFY_WORKERS,
+)
+if rate_limit_store is not None:
+    app.add_middleware(
+        RateLimitMiddleware,
+        store=rate_limit_store,
+        rate=settings.RATE_LIMIT_RATE,
+        burst=settings.RATE_LIMIT_BURST,
+        costs=parse_costs(settings.RATE_LIMIT_COSTS),
+        identities=rate_limit_identities,
+    )
+
 # Configure CORS - MUST be before routes
 app.add_middleware(
     CORSMiddleware,
@@ -67,6 +184,18 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Compression, ETags and If-None-Match -> 304 (GET queries)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    operations=schema.root_fields,
+)
+
+# Root span per request (outermost, so compression is inside the span)
+app.add_middleware(TracingMiddleware)
+
 
 # Global exception handler
 @app.exception_handler(Exception)
@@ -84,12 +213,15 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 
 # Context getter for GraphQL
-async def get_context(request: Request):
+async def get_context(request: Request = None, websocket: WebSocket = None):
     """
     Context getter for GraphQL - provides request context to resolvers
+    
+    Subscriptions arrive over WebSocket; resolvers see the socket as
+    "request" (both expose headers and query params).
     """
     return {
-        "request": request
+        "request": request or websocket
     }
 
 
@@ -109,10 +241,11 @@ async def graphql_options():
 
 
 # Create GraphQL router
-graphql_app = GraphQLRouter(
+graphql_app = ORJSONGraphQLRouter(
     schema,
     context_getter=get_context,
-    graphql_ide="graphiql"  # Enable GraphQL playground in development
+    graphql_ide="graphiql",  # Enable GraphQL playground in development
+    subscription_protocols=[GRAPHQL_TRANSPORT_WS_PROTOCOL, GRAPHQL_WS_PROTOCOL]
 )
 
 # Mount GraphQL endpoint
@@ -139,7 +272,7 @@ async def root():
 @app.get("/health", tags=["Health"])
 async def health_check():
     """
-    Health check endpoint
+    Health check endpoint (static; load balancers should use /livez and /readyz)
     """
     return {
         "status": "healthy",
@@ -148,6 +281,74 @@ async def health_check():
     }
 
 
+# Liveness probe
+@app.get("/livez", tags=["Health"])
+async def liveness():
+    """
+    Liveness probe - the process is up and serving requests
+    
+    Never checks dependencies, so a Neo4j outage does not get workers restarted.
+    """
+    from services.health_prober import LIVENESS_BODY
+    return Response(content=LIVENESS_BODY, media_type="application/json")
+
+
+# Readiness probe
+@app.get("/readyz", tags=["Health"])
+async def readiness():
+    """
+    Readiness probe - 200 when Neo4j answered the last background probe, 503 otherwise
+    
+    Served from the prober's cached snapshot (Neo4j latency and pool state,
+    Firebase key freshness); no database or network call per request.
+    """
+    from services.health_prober import get_health_prober
+    ready, body = get_health_prober().readiness()
+    return Response(content=body, status_code=200 if ready else 503, media_type="application/json")
+
+
+# Prometheus metrics
+@app.get("/metrics", tags=["Health"])
+async def metrics():
+    """
+    Prometheus metrics: GraphQL operation/resolver latency, Neo4j statement
+    latency and pool state, cache and Firebase call counters
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
+# Compression report
+@app.get("/stats/compression", tags=["Health"])
+async def compression_report():
+    """
+    Bytes saved by compression and 304 responses, per GraphQL root field
+    or REST route (anything else under "other")
+    """
+    operations = compression_stats.report()
+    return {
+        "total_bytes_saved": sum(entry["bytes_saved"] for entry in operations.values()),
+        "operations": operations
+    }
+
+
+# Single-flight report
+@app.get("/stats/single_flight", tags=["Health"])
+async def single_flight_report():
+    """
+    Identical concurrent reads coalesced into one query, per repository method
+    """
+    from services.single_flight import get_single_flight
+    operations = get_single_flight().stats()
+    calls = sum(entry["calls"] for entry in operations.values())
+    coalesced = sum(entry["coalesced"] for entry in operations.values())
+    return {
+        "enabled": settings.SINGLE_FLIGHT_READS,
+        "coalescing_ratio": round(coalesced / calls, 3) if calls else 0.0,
+        "operations": operations
+    }
+
+
 # Database test endpoint
 @app.get("/test/database", tags=["Testing"])
 async def test_database():
@@ -184,6 +385,7 @@ if __name__ == "__main__":
 🎯 GraphQL Playground: http://{settings.API_HOST}:{settings.API_PORT}/graphql
 📚 API Documentation: http://{settings.API_HOST}:{settings.API_PORT}/docs
 🔧 Environment: {'Development' if settings.DEBUG else 'Production'}
+🏭 Production: python serve.py (multi-worker, no reloader)
 
 """)
     
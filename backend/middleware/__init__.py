@@ -0,0 +1,19 @@
+"""
+Middleware package initialization
+"""
+
+from .compression import CompressionMiddleware, CompressionStats, compression_stats
+from .rate_limit import RateLimitMiddleware, BucketStore, IdentityCache, create_bucket_store, parse_costs
+from .tracing import TracingMiddleware
+
+__all__ = [
+    "CompressionMiddleware",
+    "CompressionStats",
+    "compression_stats",
+    "RateLimitMiddleware",
+    "BucketStore",
+    "IdentityCache",
+    "create_bucket_store",
+    "parse_costs",
+    "TracingMiddleware",
+]
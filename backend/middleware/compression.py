@@ -0,0 +1,299 @@
+"""
+Response compression and conditional GET middleware
+
+- Negotiates brotli (when the `brotli` package is installed) or gzip from
+  Accept-Encoding for compressible bodies of at least a minimum size
+- Adds a strong ETag (hash of the uncompressed body, suffixed per encoding)
+  to successful GET responses, which covers GraphQL queries and persisted
+  queries sent over GET, and answers a matching If-None-Match with 304
+- Records original vs. sent bytes per GraphQL operation (see compression_stats)
+
+Stats are keyed by the operation's root field when it is one of the
+schema's (see CompressionMiddleware's operations), by route path for REST
+requests, and under "other" otherwise: operationName and URL paths are
+chosen by the client and would grow the report without bound.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import re
+from typing import Optional, Dict, Any, List, Tuple, Iterable
+from urllib.parse import parse_qs
+
+from monitoring.metrics import record_cache
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/graphql-response+json",
+    "application/javascript",
+    "text/",
+)
+# Responses that are streamed incrementally must not be buffered
+STREAMING_TYPES = ("text/event-stream", "multipart/mixed")
+
+# Bodies above this size are compressed off the event loop
+OFFLOAD_THRESHOLD = 256 * 1024
+# Request bodies above this size are not inspected for an operation name
+MAX_INSPECTED_BODY = 64 * 1024
+
+# First root field of a document, past the operation keyword, name and an alias
+_FIRST_FIELD_PATTERN = re.compile(r"^\s*(?:(?:query|mutation|subscription)\b[^{]*)?\{\s*(?:\w+\s*:\s*)?(\w+)")
+
+# Stats key of requests that are not a known root field or route
+OTHER_OPERATION = "other"
+
+
+class CompressionStats:
+    """Bytes before/after compression, per GraphQL operation"""
+    
+    def __init__(self):
+        self._operations: Dict[str, Dict[str, int]] = {}
+    
+    def record(self, operation: str, original: int, sent: int, not_modified: bool = False) -> None:
+        entry = self._operations.setdefault(operation, {
+            "responses": 0,
+            "not_modified": 0,
+            "bytes_original": 0,
+            "bytes_sent": 0,
+        })
+        entry["responses"] += 1
+        entry["not_modified"] += 1 if not_modified else 0
+        entry["bytes_original"] += original
+        entry["bytes_sent"] += sent
+    
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-operation totals, largest savings first"""
+        report = {}
+        for operation, entry in self._operations.items():
+            saved = entry["bytes_original"] - entry["bytes_sent"]
+            report[operation] = {
+                **entry,
+                "bytes_saved": saved,
+                "saved_ratio": round(saved / entry["bytes_original"], 3) if entry["bytes_original"] else 0.0,
+            }
+        return dict(sorted(report.items(), key=lambda item: -item[1]["bytes_saved"]))
+    
+    def reset(self) -> None:
+        self._operations.clear()
+
+
+compression_stats = CompressionStats()
+
+
+def operation_name(scope, body: bytes, operations: Iterable[str] = ()) -> str:
+    """
+    Stats key of a request, from a bounded set of names
+    
+    GraphQL requests are keyed by their first root field when it is in
+    operations; other requests by the path of the route that served them.
+    Anything else (unknown fields, fragments, unmatched paths) is "other".
+    """
+    params: Dict[str, Any] = {}
+    query_string = scope.get("query_string", b"")
+    if query_string:
+        params = {key: values[0] for key, values in parse_qs(query_string.decode("latin-1")).items()}
+    elif body:
+        try:
+            params = json.loads(body)
+        except ValueError:
+            params = {}
+        if not isinstance(params, dict):
+            params = {}
+    
+    document = params.get("query")
+    if isinstance(document, str):
+        match = _FIRST_FIELD_PATTERN.match(document)
+        if match and match.group(1) in operations:
+            return match.group(1)
+        return OTHER_OPERATION
+    # FastAPI records the matched route in the scope
+    route = scope.get("route")
+    return getattr(route, "path", None) or OTHER_OPERATION
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0"""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        pieces = part.strip().split(";")
+        coding = pieces[0].strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in pieces[1:]:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    
+    def allowed(coding: str) -> bool:
+        return accepted.get(coding, accepted.get("*", 0.0)) > 0
+    
+    if brotli is not None and allowed("br"):
+        return "br"
+    if allowed("gzip"):
+        return "gzip"
+    return None
+
+
+def _etag_matches(if_none_match: str, base_tag: str) -> bool:
+    """True if any entity tag in If-None-Match is a variant of base_tag"""
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag == base_tag or tag.split("-", 1)[0] == base_tag:
+            return True
+    return False
+
+
+class CompressionMiddleware:
+    """ASGI middleware adding compression, ETags and 304 responses"""
+    
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        operations: Iterable[str] = ()
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        # GraphQL root fields that get their own stats entry
+        self.operations = frozenset(operations)
+    
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request_headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope["headers"]}
+        method = scope["method"]
+        request_body: List[bytes] = []
+        
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request" and sum(map(len, request_body)) < MAX_INSPECTED_BODY:
+                request_body.append(message.get("body", b""))
+            return message
+        
+        start_message: Optional[Dict[str, Any]] = None
+        passthrough = False
+        chunks: List[bytes] = []
+        
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            
+            if message["type"] == "http.response.start":
+                headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in message["headers"]}
+                content_type = headers.get("content-type", "")
+                passthrough = (
+                    "content-encoding" in headers
+                    or content_type.startswith(STREAMING_TYPES)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            
+            await self._finish(
+                scope, method, request_headers, b"".join(request_body),
+                start_message, b"".join(chunks), send
+            )
+        
+        await self.app(scope, receive_wrapper, send_wrapper)
+    
+    async def _finish(
+        self,
+        scope,
+        method: str,
+        request_headers: Dict[str, str],
+        request_body: bytes,
+        start_message: Dict[str, Any],
+        body: bytes,
+        send
+    ) -> None:
+        """Send the buffered response, compressed and/or as 304"""
+        status = start_message["status"]
+        headers: List[Tuple[bytes, bytes]] = [
+            (key, value) for key, value in start_message["headers"]
+            if key.lower() not in (b"content-length", b"etag", b"content-encoding")
+        ]
+        content_type = dict((key.lower(), value) for key, value in start_message["headers"]).get(b"content-type", b"").decode("latin-1")
+        operation = operation_name(scope, request_body, self.operations)
+        
+        encoding = None
+        if len(body) >= self.minimum_size and content_type.startswith(COMPRESSIBLE_TYPES):
+            encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+        
+        base_tag = None
+        if method in ("GET", "HEAD") and status == 200:
+            base_tag = hashlib.blake2b(body, digest_size=16).hexdigest()
+            if_none_match = request_headers.get("if-none-match", "")
+            matched = _etag_matches(if_none_match, base_tag)
+            if if_none_match:
+                record_cache("etag", matched)
+            if matched:
+                etag = f'"{base_tag}-{encoding}"' if encoding else f'"{base_tag}"'
+                not_modified_headers = [
+                    (key, value) for key, value in headers if key.lower() != b"content-type"
+                ] + [(b"etag", etag.encode()), (b"vary", b"Accept-Encoding")]
+                await send({"type": "http.response.start", "status": 304, "headers": not_modified_headers})
+                await send({"type": "http.response.body", "body": b""})
+                compression_stats.record(operation, len(body), 0, not_modified=True)
+                return
+        
+        payload = body
+        if encoding is not None:
+            if len(body) > OFFLOAD_THRESHOLD:
+                compressed = await asyncio.get_running_loop().run_in_executor(None, self._compress, body, encoding)
+            else:
+                compressed = self._compress(body, encoding)
+            if len(compressed) < len(body):
+                payload = compressed
+            else:
+                encoding = None
+        
+        if encoding is not None:
+            headers.append((b"content-encoding", encoding.encode()))
+        if base_tag is not None:
+            etag = f'"{base_tag}-{encoding}"' if encoding else f'"{base_tag}"'
+            headers.append((b"etag", etag.encode()))
+        if len(body) >= self.minimum_size:
+            headers.append((b"vary", b"Accept-Encoding"))
+        headers.append((b"content-length", str(len(payload)).encode()))
+        
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": payload if method != "HEAD" else b""})
+        compression_stats.record(operation, len(body), len(payload))
@@ -0,0 +1,530 @@
+"""
+Per-client rate limiting middleware
+
+Every client has a token bucket holding up to `burst` cost units and
+refilled at `rate` units per second. A request takes its cost from the
+bucket, and an empty bucket answers 429 with Retry-After.
+
+- Clients are keyed by uid once their bearer token (session or Firebase ID
+  token) has been verified, and by IP until then. Verification runs in the
+  background after the first request, so it never delays a request, on
+  its own Firebase threads and for at most `max_pending` tokens at once.
+- A GraphQL request costs the sum of its root fields (DEFAULT_FIELD_COSTS,
+  overridable per field), so one nearbyServices query weighs as much as
+  several cheap lookups. Aliases and fragments are counted; the operation
+  name is not trusted. A body too large to price (MAX_INSPECTED_BODY) is
+  charged the whole burst, and is not read past the limit here.
+- Buckets live in a BucketStore: MemoryBucketStore is per worker, and
+  RedisBucketStore shares every client's bucket between workers.
+
+Health probes, /metrics and CORS preflights are never limited. WebSocket
+subscriptions are not limited either. If the store fails, requests are let
+through rather than turned away.
+"""
+
+import asyncio
+import base64
+import functools
+import hashlib
+import json
+import math
+import time
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import parse_qs
+
+from graphql import parse, GraphQLError
+from graphql.language import FieldNode, FragmentSpreadNode, InlineFragmentNode, OperationDefinitionNode, FragmentDefinitionNode
+
+from monitoring.metrics import record_rate_limit
+
+
+# Cost units per GraphQL root field; fields not listed cost DEFAULT_COST
+DEFAULT_COST = 1.0
+DEFAULT_FIELD_COSTS: Dict[str, float] = {
+    "__typename": 0.0,
+    # Geo, full-text and ranking queries over many nodes
+    "nearbyServices": 5.0,
+    "searchServices": 5.0,
+    "searchProviders": 5.0,
+    "similarSeekers": 5.0,
+    "activeServices": 3.0,
+    "serviceFacets": 3.0,
+    "providers": 3.0,
+    "vehicleFreeSlots": 2.0,
+    # Mutations calling Firebase (and worth slowing down for credential stuffing)
+    "registerSeeker": 10.0,
+    "registerProvider": 10.0,
+    "login": 5.0,
+    "startSession": 5.0,
+    "refreshSession": 2.0,
+    "reserveBooking": 2.0,
+}
+
+EXEMPT_PATHS = ("/livez", "/readyz", "/health", "/metrics")
+
+# Request bodies above this size are not parsed for a cost (charged the whole burst)
+MAX_INSPECTED_BODY = 64 * 1024
+
+
+def parse_costs(spec: str) -> Dict[str, float]:
+    """Field costs from "nearbyServices=8,login=10" (RATE_LIMIT_COSTS), over the defaults"""
+    costs = dict(DEFAULT_FIELD_COSTS)
+    for part in spec.split(","):
+        field, _, cost = part.partition("=")
+        if field.strip() and cost.strip():
+            costs[field.strip()] = float(cost)
+    return costs
+
+
+class OperationCosts:
+    """Cost of GraphQL documents, cached per (document, operationName)"""
+    
+    def __init__(self, costs: Optional[Dict[str, float]] = None, default: float = DEFAULT_COST, cache_size: int = 1024):
+        self.costs = DEFAULT_FIELD_COSTS if costs is None else costs
+        self.default = default
+        self.document_cost = functools.lru_cache(maxsize=cache_size)(self._document_cost)
+    
+    def _document_cost(self, document: str, operation_name: Optional[str]) -> float:
+        try:
+            ast = parse(document, no_location=True)
+        except GraphQLError:
+            return self.default  # Rejected by the GraphQL endpoint anyway
+        
+        operations = [node for node in ast.definitions if isinstance(node, OperationDefinitionNode)]
+        fragments = {node.name.value: node for node in ast.definitions if isinstance(node, FragmentDefinitionNode)}
+        if operation_name:
+            operations = [node for node in operations if node.name and node.name.value == operation_name]
+        if len(operations) != 1:
+            return self.default
+        return self._selection_cost(operations[0].selection_set, fragments, set())
+    
+    def _selection_cost(self, selection_set, fragments: Dict[str, Any], seen: set) -> float:
+        cost = 0.0
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                cost += self.costs.get(selection.name.value, self.default)
+            elif isinstance(selection, InlineFragmentNode):
+                cost += self._selection_cost(selection.selection_set, fragments, seen)
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                if name in fragments and name not in seen:
+                    cost += self._selection_cost(fragments[name].selection_set, fragments, seen | {name})
+        return cost
+    
+    def request_cost(self, method: str, query_string: bytes, body: Optional[bytes]) -> float:
+        """
+        Cost of a GraphQL request sent over GET (query string) or POST (JSON body)
+        
+        Each method is priced from where the GraphQL endpoint reads its
+        operation, so a query string on a POST cannot stand in for the body.
+        Batched requests cost the sum of their operations; anything that is
+        not a readable GraphQL request costs the default.
+        """
+        if method == "GET":
+            params: Any = {key: values[0] for key, values in parse_qs(query_string.decode("latin-1")).items()}
+        elif method == "POST" and body:
+            try:
+                params = json.loads(body)
+            except ValueError:
+                return self.default
+        else:
+            return self.default
+        
+        requests = params if isinstance(params, list) else [params]
+        cost = 0.0
+        for request in requests:
+            document = request.get("query") if isinstance(request, dict) else None
+            if not isinstance(document, str):
+                cost += self.default
+                continue
+            operation_name = request.get("operationName")
+            cost += self.document_cost(document, operation_name if isinstance(operation_name, str) else None)
+        return cost
+
+
+# ==================== BUCKET STORES ====================
+
+class BucketStore:
+    """
+    Token buckets shared by everything that uses the same store
+    
+    Subclasses implement take() atomically: two concurrent takes on one key
+    must never both spend the same tokens.
+    """
+    
+    async def take(self, key: str, cost: float, rate: float, burst: float) -> Tuple[bool, float, float]:
+        """
+        Take `cost` tokens from a bucket if it holds that many
+        
+        Returns:
+            tuple: (allowed, tokens left, seconds until `cost` tokens are available;
+            0.0 when allowed)
+        """
+        raise NotImplementedError
+    
+    async def close(self) -> None:
+        pass
+
+
+class MemoryBucketStore(BucketStore):
+    """
+    Buckets in this process (one budget per worker)
+    
+    A bucket that has refilled completely is the same as no bucket, so
+    those are swept periodically and only recently active clients are kept.
+    """
+    
+    def __init__(self, sweep_interval: float = 60.0):
+        # key -> [tokens, monotonic time of the last update, time the bucket is full again]
+        self._buckets: Dict[str, List[float]] = {}
+        self.sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+    
+    def __len__(self) -> int:
+        return len(self._buckets)
+    
+    async def take(self, key: str, cost: float, rate: float, burst: float) -> Tuple[bool, float, float]:
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._sweep(now)
+        
+        bucket = self._buckets.get(key)
+        tokens = burst if bucket is None else min(burst, bucket[0] + (now - bucket[1]) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = [tokens, now, now + (burst - tokens) / rate]
+        return allowed, tokens, 0.0 if allowed else (cost - tokens) / rate
+    
+    def _sweep(self, now: float) -> None:
+        self._next_sweep = now + self.sweep_interval
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+
+
+# Refill, take and expire in one atomic step, on Redis's clock
+_TAKE_SCRIPT = """
+local burst = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(retry)}
+"""
+
+
+class RedisBucketStore(BucketStore):
+    """
+    Buckets in Redis, shared by every worker and host using the same URL
+    
+    Requires the optional `redis` package (redis.asyncio). Keys expire once
+    their bucket would be full again.
+    """
+    
+    def __init__(self, url: str, prefix: str = "haulistry:ratelimit:"):
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package") from e
+        self._redis = redis_asyncio.from_url(url)
+        self._script = self._redis.register_script(_TAKE_SCRIPT)
+        self.prefix = prefix
+    
+    async def take(self, key: str, cost: float, rate: float, burst: float) -> Tuple[bool, float, float]:
+        allowed, tokens, retry = await self._script(keys=[self.prefix + key], args=[burst, rate, cost])
+        return bool(allowed), float(tokens), float(retry)
+    
+    async def close(self) -> None:
+        await self._redis.close()
+
+
+def create_bucket_store(backend: str, redis_url: str = "") -> Optional[BucketStore]:
+    """
+    Store for RATE_LIMIT_BACKEND
+    
+    Args:
+        backend: none, memory or redis
+        redis_url: Redis URL (redis backend only)
+    
+    Returns:
+        BucketStore, or None when rate limiting is off
+    """
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return MemoryBucketStore()
+    if backend == "redis":
+        return RedisBucketStore(redis_url)
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND {backend!r} (none, memory or redis)")
+
+
+# ==================== CLIENT IDENTITY ====================
+
+class IdentityCache:
+    """
+    uid behind bearer tokens that have been verified once
+    
+    Only used to pick the rate-limit key, never to authorize: a token is
+    remembered for `ttl` seconds even if it expires or is revoked sooner.
+    Tokens that fail verification are remembered too, and stay keyed by IP.
+    
+    Firebase ID tokens are verified on a client of their own
+    (`verify_workers` threads, no retries, the shared circuit breaker), so a flood of new tokens cannot
+    hold up the Firebase calls requests are waiting on. Past `max_pending`
+    verifications in flight, and for anything that is not a JWT, nothing is
+    queued and the request simply stays keyed by IP. Failed tokens have
+    their own, smaller table, so they cannot push verified uids out.
+    """
+    
+    def __init__(self, ttl: float = 300.0, max_entries: int = 10000, max_pending: int = 32, verify_workers: int = 2):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_pending = max_pending
+        self.verify_workers = verify_workers
+        # token digest -> (uid, expiry) for verified tokens, expiry for failed ones
+        self._entries: Dict[bytes, Tuple[str, float]] = {}
+        self._failed: Dict[bytes, float] = {}
+        self._pending: set = set()
+        self._firebase = None
+    
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+    
+    @staticmethod
+    def looks_like_jwt(token: str) -> bool:
+        """Three base64url segments whose header names an algorithm (session and Firebase tokens both are)"""
+        parts = token.split(".")
+        if len(parts) != 3 or not all(parts):
+            return False
+        try:
+            header = json.loads(base64.urlsafe_b64decode(parts[0] + "=" * (-len(parts[0]) % 4)))
+        except ValueError:
+            return False
+        return isinstance(header, dict) and isinstance(header.get("alg"), str)
+    
+    def lookup(self, digest: bytes) -> Tuple[bool, Optional[str]]:
+        """(known, uid); uid is None for tokens that did not verify"""
+        now = time.monotonic()
+        entry = self._entries.get(digest)
+        if entry is not None and entry[1] >= now:
+            return True, entry[0]
+        return self._failed.get(digest, 0.0) >= now, None
+    
+    def verify_later(self, digest: bytes, token: str) -> None:
+        """Verify a token in the background, once, and remember its uid"""
+        if digest in self._pending or len(self._pending) >= self.max_pending or not self.looks_like_jwt(token):
+            return
+        self._pending.add(digest)
+        asyncio.get_running_loop().create_task(self._verify(digest, token))
+    
+    def close(self) -> None:
+        """Stop the verification threads"""
+        if self._firebase is not None:
+            self._firebase.shutdown()
+    
+    def _get_firebase(self):
+        if self._firebase is None:
+            from config.firebase_async import AsyncFirebase, get_async_firebase
+            # Same breaker: Firebase being unreachable is news for both clients
+            self._firebase = AsyncFirebase(
+                max_workers=self.verify_workers, max_retries=1, breaker=get_async_firebase().breaker
+            )
+        return self._firebase
+    
+    async def _verify(self, digest: bytes, token: str) -> None:
+        from config.firebase_async import FirebaseUnavailableError
+        from services.session_tokens import authenticate
+        try:
+            uid = (await authenticate(token, firebase=self._get_firebase()))["uid"]
+        except FirebaseUnavailableError:
+            return  # Not the token's fault; try again on a later request
+        except Exception:
+            uid = None
+        finally:
+            self._pending.discard(digest)
+        
+        expiry = time.monotonic() + self.ttl
+        if uid is None:
+            self._failed = self._bounded(self._failed, max(1, self.max_entries // 10), lambda entry: entry)
+            self._failed[digest] = expiry
+        else:
+            self._entries = self._bounded(self._entries, self.max_entries, lambda entry: entry[1])
+            self._entries[digest] = (uid, expiry)
+    
+    @staticmethod
+    def _bounded(entries: Dict[bytes, Any], limit: int, expiry_of) -> Dict[bytes, Any]:
+        """`entries` with room for one more: expired ones dropped, then the oldest"""
+        if len(entries) < limit:
+            return entries
+        now = time.monotonic()
+        entries = {key: entry for key, entry in entries.items() if expiry_of(entry) > now}
+        while len(entries) >= limit:
+            del entries[next(iter(entries))]
+        return entries
+
+
+# ==================== MIDDLEWARE ====================
+
+class RateLimitMiddleware:
+    """ASGI middleware spending each request's cost from its client's token bucket"""
+    
+    def __init__(
+        self,
+        app,
+        store: BucketStore,
+        rate: float = 10.0,
+        burst: float = 100.0,
+        costs: Optional[Dict[str, float]] = None,
+        graphql_path: str = "/graphql",
+        identities: Optional[IdentityCache] = None
+    ):
+        self.app = app
+        self.store = store
+        self.rate = rate
+        self.burst = burst
+        self.operation_costs = OperationCosts(costs)
+        self.graphql_path = graphql_path
+        self.identities = identities or IdentityCache()
+        self._store_warned_at = 0.0
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+        
+        # The body is read here to price the request, then replayed to the app
+        messages: List[Dict[str, Any]] = []
+        cost = DEFAULT_COST
+        if scope["path"] == self.graphql_path:
+            body = b""
+            if scope["method"] == "POST" and self._declared_length(scope) <= MAX_INSPECTED_BODY:
+                messages = await self._read_body(receive)
+                body = b"".join(message.get("body", b"") for message in messages)
+            if scope["method"] == "POST" and (not messages or len(body) > MAX_INSPECTED_BODY):
+                # Too large to price: the most a request can cost, so padding buys nothing
+                cost = self.burst
+            else:
+                cost = self.operation_costs.request_cost(scope["method"], scope.get("query_string", b""), body)
+        
+        key, client = self._client_key(scope)
+        try:
+            allowed, remaining, retry_after = await self.store.take(key, min(cost, self.burst), self.rate, self.burst)
+        except Exception as e:
+            self._warn_store(e)
+            record_rate_limit(client, "error")
+            allowed, remaining, retry_after = True, None, 0.0
+        
+        if not allowed:
+            record_rate_limit(client, "limited")
+            await self._reject(send, retry_after)
+            return
+        record_rate_limit(client, "allowed")
+        
+        if messages:
+            replay = iter(messages)
+            
+            async def receive_replayed():
+                message = next(replay, None)
+                return message if message is not None else await receive()
+        else:
+            receive_replayed = receive
+        
+        if remaining is None:
+            await self.app(scope, receive_replayed, send)
+            return
+        
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-ratelimit-limit", str(int(self.burst)).encode()),
+                    (b"x-ratelimit-remaining", str(int(remaining)).encode()),
+                ]
+            await send(message)
+        
+        await self.app(scope, receive_replayed, send_with_headers)
+    
+    @staticmethod
+    def _declared_length(scope) -> int:
+        """Content-Length of the request, 0 when absent or not a number (chunked)"""
+        for name, value in scope["headers"]:
+            if name.lower() == b"content-length":
+                try:
+                    return int(value)
+                except ValueError:
+                    return 0
+        return 0
+    
+    @staticmethod
+    async def _read_body(receive) -> List[Dict[str, Any]]:
+        """
+        Messages of the request body, up to the first that passes MAX_INSPECTED_BODY
+        
+        The rest of a longer body is left unread for the app.
+        """
+        messages = []
+        size = 0
+        while True:
+            message = await receive()
+            messages.append(message)
+            size += len(message.get("body", b""))
+            if message["type"] != "http.request" or not message.get("more_body", False) or size > MAX_INSPECTED_BODY:
+                return messages
+    
+    def _client_key(self, scope) -> Tuple[str, str]:
+        """(bucket key, key kind): the verified uid, else the client address"""
+        for name, value in scope["headers"]:
+            if name.lower() == b"authorization":
+                authorization = value.decode("latin-1")
+                if authorization.startswith("Bearer "):
+                    token = authorization[7:]
+                    digest = self.identities.digest(token)
+                    known, uid = self.identities.lookup(digest)
+                    if uid is not None:
+                        return f"uid:{uid}", "uid"
+                    if not known:
+                        self.identities.verify_later(digest, token)
+                break
+        # uvicorn's proxy_headers already puts the X-Forwarded-For address of trusted proxies here
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}", "ip"
+    
+    async def _reject(self, send, retry_after: float) -> None:
+        seconds = max(1, math.ceil(retry_after))
+        body = json.dumps({
+            "errors": [{
+                "message": f"Rate limit exceeded. Retry in {seconds} s.",
+                "extensions": {"code": "RATE_LIMITED", "retryAfter": seconds},
+            }]
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(seconds).encode()),
+                (b"x-ratelimit-limit", str(int(self.burst)).encode()),
+                (b"x-ratelimit-remaining", b"0"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+    
+    def _warn_store(self, error: Exception) -> None:
+        now = time.monotonic()
+        if now - self._store_warned_at >= 60.0:
+            self._store_warned_at = now
+            print(f"⚠️  Rate limit store unavailable, letting requests through: {str(error)}")
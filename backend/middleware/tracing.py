@@ -0,0 +1,49 @@
+"""
+Request tracing middleware
+
+Opens the root span of every HTTP request (monitoring.tracing), continuing
+the caller's trace when a W3C traceparent header is present, and records
+the method, path and response status. The GraphQL operation, resolver,
+Neo4j and Firebase spans of the request are nested below it.
+"""
+
+from opentelemetry import propagate
+from opentelemetry.trace import SpanKind, Status, StatusCode
+
+from monitoring.tracing import tracer, tracing_enabled
+
+
+class TracingMiddleware:
+    """ASGI middleware creating one server span per HTTP request"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracing_enabled():
+            await self.app(scope, receive, send)
+            return
+        
+        carrier = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        method = scope["method"]
+        path = scope["path"]
+        
+        with tracer.start_as_current_span(
+            f"{method} {path}",
+            context=propagate.extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={
+                "http.request.method": method,
+                "url.path": path,
+                "url.scheme": scope.get("scheme", "http"),
+            },
+        ) as span:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    span.set_attribute("http.response.status_code", status)
+                    if status >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+            
+            await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,301 @@
+"""
+Weekly availability bitmaps
+
+A weekly schedule is 168 hourly bits. It is stored on Service and Vehicle
+nodes as `availability_mask`: a list of 7 integers (Monday first), where bit h
+of a day's integer means "available from h:00 to h+1:00". A day fits in 24
+bits, so every element is a plain Neo4j integer, and Cypher can test
+containment arithmetically without APOC (see availability_filter_clause).
+"""
+
+import json
+import re
+from typing import Optional, List, Dict, Any, Union
+
+
+DAYS_PER_WEEK = 7
+HOURS_PER_DAY = 24
+HOURS_PER_WEEK = DAYS_PER_WEEK * HOURS_PER_DAY
+FULL_DAY = (1 << HOURS_PER_DAY) - 1
+
+DAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+_DAY_ALIASES = {}
+for _index, _name in enumerate(DAY_NAMES):
+    _DAY_ALIASES[_name] = _index
+    _DAY_ALIASES[_name[:3]] = _index
+_DAY_ALIASES.update({"tues": 1, "wed": 2, "thur": 3, "thurs": 3})
+
+_EVERY_DAY_WORDS = {"everyday", "every day", "all days", "all week", "daily", "24/7", "mon-sun"}
+_ALL_HOURS_WORDS = {"24 hours", "24hrs", "24 hrs", "24h", "24/7", "all day", "anytime"}
+
+MaskInput = Union[None, int, str, List[int]]
+
+
+def empty_mask() -> List[int]:
+    """Schedule with no available hours"""
+    return [0] * DAYS_PER_WEEK
+
+
+def pack_mask(mask: List[int]) -> int:
+    """Pack a 7-day mask into one 168-bit integer (Monday hour 0 is bit 0)"""
+    packed = 0
+    for day, bits in enumerate(mask):
+        packed |= bits << (day * HOURS_PER_DAY)
+    return packed
+
+
+def unpack_mask(packed: int) -> List[int]:
+    """Split a 168-bit integer into the 7-day mask"""
+    return [(packed >> (day * HOURS_PER_DAY)) & FULL_DAY for day in range(DAYS_PER_WEEK)]
+
+
+def normalize_mask(value: MaskInput) -> Optional[List[int]]:
+    """
+    Validate an availability value and return the canonical 7-day mask
+    
+    Accepts the stored list form, a packed 168-bit integer, or the same
+    integer as a hex string ("0x..." optional).
+    
+    Args:
+        value: Availability in any accepted form, or None
+    
+    Returns:
+        List of 7 day masks, or None when value is None
+    
+    Raises:
+        ValueError: Malformed or out-of-range availability
+    """
+    if value is None:
+        return None
+    
+    if isinstance(value, bool):
+        raise ValueError("Availability mask must be a list of 7 integers, an integer or a hex string")
+    
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text.startswith("0x"):
+            text = text[2:]
+        if not text or not re.fullmatch(r"[0-9a-f]+", text):
+            raise ValueError("Availability hex string contains invalid characters")
+        value = int(text, 16)
+    
+    if isinstance(value, int):
+        if value < 0 or value >> HOURS_PER_WEEK:
+            raise ValueError(f"Availability bitmap must fit in {HOURS_PER_WEEK} bits")
+        return unpack_mask(value)
+    
+    if isinstance(value, (list, tuple)):
+        if len(value) != DAYS_PER_WEEK:
+            raise ValueError(f"Availability mask must have {DAYS_PER_WEEK} day entries (Monday first)")
+        mask = []
+        for day, bits in enumerate(value):
+            if isinstance(bits, bool) or not isinstance(bits, int):
+                raise ValueError(f"Availability for {DAY_NAMES[day]} must be an integer")
+            if bits < 0 or bits > FULL_DAY:
+                raise ValueError(f"Availability for {DAY_NAMES[day]} must fit in {HOURS_PER_DAY} bits")
+            mask.append(bits)
+        return mask
+    
+    raise ValueError("Availability mask must be a list of 7 integers, an integer or a hex string")
+
+
+def window_mask(day: int, start_hour: int, end_hour: int) -> List[int]:
+    """
+    Mask covering one day's hours [start_hour, end_hour)
+    
+    Args:
+        day: 0 = Monday ... 6 = Sunday
+        start_hour: First hour (0-23)
+        end_hour: Hour the window ends (1-24), exclusive
+    
+    Returns:
+        7-day mask with only the window set
+    
+    Raises:
+        ValueError: Day or hours out of range
+    """
+    if not 0 <= day < DAYS_PER_WEEK:
+        raise ValueError("Day must be between 0 (Monday) and 6 (Sunday)")
+    if not 0 <= start_hour < end_hour <= HOURS_PER_DAY:
+        raise ValueError("Hours must satisfy 0 <= start_hour < end_hour <= 24")
+    mask = empty_mask()
+    mask[day] = ((1 << (end_hour - start_hour)) - 1) << start_hour
+    return mask
+
+
+def union_masks(masks: List[List[int]]) -> List[int]:
+    """Bitwise OR of several 7-day masks"""
+    combined = empty_mask()
+    for mask in masks:
+        for day in range(DAYS_PER_WEEK):
+            combined[day] |= mask[day]
+    return combined
+
+
+def mask_contains(mask: Optional[List[int]], required: List[int]) -> bool:
+    """True when every hour set in required is also set in mask"""
+    if mask is None:
+        return False
+    return all((mask[day] & required[day]) == required[day] for day in range(DAYS_PER_WEEK))
+
+
+# ==================== LEGACY STRING PARSING ====================
+
+def _parse_days(available_days: str) -> Optional[List[int]]:
+    text = available_days.strip()
+    if not text:
+        return None
+    if text.lower() in _EVERY_DAY_WORDS:
+        return list(range(DAYS_PER_WEEK))
+    
+    # Stored by the app as a JSON array, but free text is common too
+    try:
+        parsed = json.loads(text)
+        tokens = [str(item) for item in parsed] if isinstance(parsed, list) else [text]
+    except (ValueError, TypeError):
+        tokens = re.split(r"[,/;]|\band\b", text)
+    
+    days = set()
+    for token in tokens:
+        token = token.strip().lower().rstrip(".")
+        if not token:
+            continue
+        if token in _EVERY_DAY_WORDS:
+            return list(range(DAYS_PER_WEEK))
+        if "-" in token or " to " in token:
+            start, _, end = re.split(r"\s*(-|to)\s*", token, maxsplit=1)
+            if start not in _DAY_ALIASES or end not in _DAY_ALIASES:
+                return None
+            day = _DAY_ALIASES[start]
+            while True:
+                days.add(day)
+                if day == _DAY_ALIASES[end]:
+                    break
+                day = (day + 1) % DAYS_PER_WEEK
+            continue
+        if token not in _DAY_ALIASES:
+            return None
+        days.add(_DAY_ALIASES[token])
+    return sorted(days) if days else None
+
+
+def _parse_hour(text: str, end: bool = False) -> Optional[int]:
+    """Hour of a "9 AM" / "08:00" token; 24 ("24:00") only ends a range"""
+    match = re.fullmatch(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?", text.strip().lower())
+    if not match:
+        return None
+    hour = int(match.group(1))
+    minutes = int(match.group(2) or 0)
+    meridiem = match.group(3)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "pm" else 0)
+    if minutes >= 60 or hour > HOURS_PER_DAY:
+        return None
+    if hour == HOURS_PER_DAY and (not end or minutes):
+        return None
+    return hour
+
+
+def _parse_hours(available_hours: str) -> Optional[List[int]]:
+    text = available_hours.strip().lower()
+    if not text:
+        return None
+    if text in _ALL_HOURS_WORDS:
+        return [0, HOURS_PER_DAY]
+    parts = re.split(r"\s*(?:-|–|to)\s*", text)
+    if len(parts) != 2:
+        return None
+    start, end = _parse_hour(parts[0]), _parse_hour(parts[1], end=True)
+    if start is None or end is None:
+        return None
+    if end == 0:
+        end = HOURS_PER_DAY
+    if start == end:
+        # "8 AM - 8 AM" could mean around the clock or not at all; don't guess
+        return None
+    return [start, end]
+
+
+def mask_from_legacy(available_days: Optional[str], available_hours: Optional[str]) -> Optional[List[int]]:
+    """
+    Derive a mask from the free-form available_days / available_hours strings
+    
+    Understands day lists ('["Monday", "Tuesday"]', "Mon-Fri", "Everyday")
+    and hour ranges ("9 AM - 6 PM", "08:00-20:00", "24 hours"). Overnight
+    ranges spill into the following day. A range that starts where it ends
+    (other than "00:00-00:00", the whole day) is not understood.
+    
+    Returns:
+        7-day mask, or None if either string is missing or not understood
+    """
+    if not available_days or not available_hours:
+        return None
+    days = _parse_days(available_days)
+    hours = _parse_hours(available_hours)
+    if days is None or hours is None:
+        return None
+    
+    start, end = hours
+    mask = empty_mask()
+    for day in days:
+        if start < end:
+            mask[day] |= window_mask(day, start, end)[day]
+        else:
+            # Overnight: start..midnight today, midnight..end tomorrow
+            mask[day] |= window_mask(day, start, HOURS_PER_DAY)[day]
+            if end > 0:
+                next_day = (day + 1) % DAYS_PER_WEEK
+                mask[next_day] |= window_mask(next_day, 0, end)[next_day]
+    return mask
+
+
+# ==================== CYPHER FILTER ====================
+
+def mask_runs(required: List[int]) -> List[Dict[str, int]]:
+    """
+    Decompose a required mask into contiguous hour runs per day
+    
+    A run of `length` hours starting at `start` is contained in a day mask m
+    exactly when (m / 2^start) % 2^length == 2^length - 1, which Cypher can
+    evaluate with integer arithmetic.
+    
+    Returns:
+        [{"day", "divisor", "modulus"}] parameter rows for availability_filter_clause
+    """
+    runs = []
+    for day, bits in enumerate(required):
+        hour = 0
+        while hour < HOURS_PER_DAY:
+            if bits >> hour & 1:
+                start = hour
+                while hour < HOURS_PER_DAY and bits >> hour & 1:
+                    hour += 1
+                runs.append({
+                    "day": day,
+                    "divisor": 1 << start,
+                    "modulus": 1 << (hour - start),
+                })
+            else:
+                hour += 1
+    return runs
+
+
+def availability_filter_clause(var: str = "s", param: str = "availability_runs") -> str:
+    """
+    Cypher predicate matching nodes whose availability_mask covers every run
+    
+    Args:
+        var: Cypher variable bound to the Service/Vehicle node
+        param: Name of the parameter holding mask_runs() output
+    
+    Returns:
+        str: Cypher boolean expression
+    """
+    return (
+        f"{var}.availability_mask IS NOT NULL AND "
+        f"all(run IN ${param} WHERE "
+        f"({var}.availability_mask[run.day] / run.divisor) % run.modulus = run.modulus - 1)"
+    )
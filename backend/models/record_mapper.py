@@ -0,0 +1,159 @@
+"""
+Record mapping
+Converts Neo4j nodes/records into plain dictionaries and GraphQL objects
+
+A RecordMapper is compiled once per (label, target type): it knows which
+properties of the label hold temporal values and, for a target type, which
+keyword arguments the type accepts and which fields fall back to a default.
+The properties to copy are worked out once per row shape (the property
+names a label's nodes carry), so mapping a row is then a dict copy, a
+handful of conversions and one constructor call, with no per-row
+introspection. The resolvers' mappers are compiled when the schema is
+built (compile_mappers), not on the first request that needs them.
+"""
+
+import dataclasses
+from typing import Optional, Dict, Any, List, Tuple, Iterable, Mapping
+
+
+# Properties written with datetime() per label; other labels use the default
+DEFAULT_TEMPORAL_FIELDS: Tuple[str, ...] = ("created_at", "updated_at")
+LABEL_TEMPORAL_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "Booking": ("start_time", "end_time", "created_at", "updated_at"),
+}
+
+# Row shapes remembered per mapper; rows of further shapes are planned each time
+MAX_ROW_SHAPES = 64
+
+
+# type -> unbound formatter (iso_format for Neo4j types, isoformat for Python ones)
+_formatters: Dict[type, Any] = {}
+
+
+def to_iso(value: Any) -> Any:
+    """ISO-8601 text of a Neo4j or Python temporal value; other values unchanged"""
+    value_type = type(value)
+    formatter = _formatters.get(value_type)
+    if formatter is None:
+        formatter = getattr(value_type, "iso_format", None) or getattr(value_type, "isoformat", None) or False
+        _formatters[value_type] = formatter
+    return formatter(value) if formatter else value
+
+
+class RecordMapper:
+    """Compiled conversion of one node label into dicts or a target type"""
+    
+    __slots__ = ("label", "target", "temporal_fields", "accepted_fields", "defaulted_fields", "_plans")
+    
+    def __init__(self, label: str, target: Optional[type] = None, exclude: Tuple[str, ...] = ()):
+        self.label = label
+        self.target = target
+        self.temporal_fields = LABEL_TEMPORAL_FIELDS.get(label, DEFAULT_TEMPORAL_FIELDS)
+        self.accepted_fields: Optional[frozenset] = None
+        self.defaulted_fields: Tuple[str, ...] = ()
+        # Row shape -> (properties to copy, or None for all of them; defaulted ones among them)
+        self._plans: Dict[Tuple[str, ...], Tuple[Optional[Tuple[str, ...]], Tuple[str, ...]]] = {}
+        
+        if target is not None:
+            fields = [field for field in dataclasses.fields(target) if field.init and field.name not in exclude]
+            self.accepted_fields = frozenset(field.name for field in fields)
+            # Non-null fields with a default: a stored null falls back to it
+            self.defaulted_fields = tuple(
+                field.name for field in fields
+                if field.default is not dataclasses.MISSING and field.default is not None
+            )
+    
+    def _plan(self, shape: Tuple[str, ...]) -> Tuple[Optional[Tuple[str, ...]], Tuple[str, ...]]:
+        """Which properties of a row of this shape to copy, and which of them have defaults"""
+        plan = self._plans.get(shape)
+        if plan is None:
+            kept = tuple(key for key in shape if key in self.accepted_fields)
+            defaulted = tuple(key for key in self.defaulted_fields if key in kept)
+            plan = (None if len(kept) == len(shape) else kept, defaulted)
+            if len(self._plans) < MAX_ROW_SHAPES:
+                self._plans[shape] = plan
+        return plan
+    
+    def to_dict(self, node: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Copy a node's properties, converting temporal values to ISO strings
+        
+        Args:
+            node: Neo4j Node, record value or dictionary
+        
+        Returns:
+            dict: JSON-friendly property dictionary
+        """
+        data = dict(node)
+        for field in self.temporal_fields:
+            value = data.get(field)
+            if value is not None and not isinstance(value, str):
+                data[field] = to_iso(value)
+        return data
+    
+    def to_object(self, node: Mapping[str, Any], **overrides: Any) -> Any:
+        """
+        Build the target type from a node or property dictionary
+        
+        Properties the type does not declare are ignored, so new node
+        properties never break existing queries.
+        
+        Args:
+            node: Neo4j Node, record value or dictionary
+            **overrides: Values that replace the node's properties
+        
+        Returns:
+            Instance of the target type
+        """
+        kwargs = dict(node)
+        kept, defaulted = self._plan(tuple(kwargs))
+        if kept is not None:
+            kwargs = {key: kwargs[key] for key in kept}
+        for key in defaulted:
+            if kwargs[key] is None:
+                del kwargs[key]
+        if overrides:
+            kwargs.update(overrides)
+        for field in self.temporal_fields:
+            value = kwargs.get(field)
+            if value is not None and not isinstance(value, str):
+                kwargs[field] = to_iso(value)
+        return self.target(**kwargs)
+    
+    def to_objects(self, nodes: Iterable[Mapping[str, Any]]) -> List[Any]:
+        """Build the target type for every node"""
+        return [self.to_object(node) for node in nodes]
+
+
+_mappers: Dict[Tuple[str, Optional[type], Tuple[str, ...]], RecordMapper] = {}
+
+
+def get_mapper(label: str, target: Optional[type] = None, exclude: Tuple[str, ...] = ()) -> RecordMapper:
+    """
+    Return the shared mapper for a label and optional target type
+    
+    Args:
+        label: Neo4j node label (Seeker, Provider, Service, Vehicle, ...)
+        target: Dataclass/strawberry type built by to_object(), if any
+        exclude: Fields of target never copied from the node (left at their default)
+    
+    Returns:
+        RecordMapper: Compiled on first use (see compile_mappers), then reused
+    """
+    key = (label, target, exclude)
+    mapper = _mappers.get(key)
+    if mapper is None:
+        mapper = _mappers[key] = RecordMapper(label, target, exclude)
+    return mapper
+
+
+def compile_mappers(specs: Iterable[Tuple]) -> None:
+    """
+    Compile mappers ahead of the first request that uses them
+    
+    Args:
+        specs: get_mapper() arguments, e.g. ("Service", Service) or
+            ("Provider", Provider, PRIVATE_PROVIDER_FIELDS)
+    """
+    for spec in specs:
+        get_mapper(*spec)
@@ -4,7 +4,8 @@ User Models for Neo4j Database
 
 from enum import Enum
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List, Dict, Any, Tuple
+from models.availability import normalize_mask, mask_from_legacy
 
 
 class UserType(str, Enum):
@@ -13,13 +14,98 @@ class UserType(str, Enum):
     PROVIDER = "provider"
 
 
-class SeekerNode:
+def _compile_to_dict(cls) -> None:
+    """
+    Generate cls.to_dict as one dict literal over cls.FIELDS
+    
+    Same technique as dataclasses: the source is built once per class, so a
+    call costs what a hand-written to_dict would, without the hand-written
+    copy of every field list.
+    """
+    entries = []
+    for field in cls.FIELDS:
+        if field in cls.TEMPORAL_FIELDS:
+            entries.append(f"{field!r}: self.{field}.isoformat() if self.{field} else None")
+        else:
+            entries.append(f"{field!r}: self.{field}")
+    entries.extend(f"{key!r}: {value!r}" for key, value in cls.EXTRA_PROPERTIES.items())
+    source = (
+        "def to_dict(self):\n"
+        "    return {" + ", ".join(entries) + "}\n"
+    )
+    namespace: Dict[str, Any] = {}
+    exec(source, {}, namespace)
+    to_dict = namespace["to_dict"]
+    to_dict.__qualname__ = f"{cls.__qualname__}.to_dict"
+    to_dict.__doc__ = "Convert to the property dictionary used as Cypher parameters"
+    cls.to_dict = to_dict
+
+
+class NodeModel:
+    """
+    Base class of the node models
+    
+    Subclasses declare their stored properties in __slots__, so instances
+    carry no per-instance __dict__. FIELDS (the slots, in order) is computed
+    once per class and to_dict() is generated from it; the returned dict is
+    passed to Cypher as the parameter map as-is.
+    """
+    
+    __slots__ = ()
+    
+    FIELDS: Tuple[str, ...] = ()
+    # Datetime properties serialized as ISO strings (stored with datetime($x))
+    TEMPORAL_FIELDS: Tuple[str, ...] = ("created_at", "updated_at")
+    # Constant properties added to every node of the class
+    EXTRA_PROPERTIES: Dict[str, Any] = {}
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.FIELDS = tuple(cls.__dict__.get("__slots__", ()))
+        _compile_to_dict(cls)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the property dictionary used as Cypher parameters"""
+        raise NotImplementedError
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        """Create instance from dictionary (unknown keys are ignored)"""
+        kwargs = {field: data[field] for field in cls.FIELDS if field in data}
+        for field in cls.TEMPORAL_FIELDS:
+            if isinstance(kwargs.get(field), str):
+                kwargs[field] = datetime.fromisoformat(kwargs[field])
+        return cls(**kwargs)
+
+
+class SeekerNode(NodeModel):
     """
     Seeker user node model for Neo4j
     
     Represents a service seeker in the graph database
     """
     
+    __slots__ = (
+        "uid",
+        "email",
+        "full_name",
+        "phone",
+        "profile_image",
+        "address",
+        "bio",
+        "gender",
+        "date_of_birth",
+        "service_categories",
+        "category_details",
+        "service_requirements",
+        "primary_purpose",
+        "urgency",
+        "preferences_notes",
+        "created_at",
+        "updated_at",
+    )
+    EXTRA_PROPERTIES = {"user_type": UserType.SEEKER.value}
+    
     def __init__(
         self,
         uid: str,
@@ -57,61 +143,46 @@ class SeekerNode:
         self.preferences_notes = preferences_notes
         self.created_at = created_at or datetime.utcnow()
         self.updated_at = updated_at or datetime.utcnow()
-    
-    def to_dict(self):
-        """Convert to dictionary for Neo4j"""
-        return {
-            "uid": self.uid,
-            "email": self.email,
-            "full_name": self.full_name,
-            "phone": self.phone,
-            "profile_image": self.profile_image,
-            "address": self.address,
-            "bio": self.bio,
-            "gender": self.gender,
-            "date_of_birth": self.date_of_birth,
-            "service_categories": self.service_categories,
-            "category_details": self.category_details,
-            "service_requirements": self.service_requirements,
-            "primary_purpose": self.primary_purpose,
-            "urgency": self.urgency,
-            "preferences_notes": self.preferences_notes,
-            "user_type": UserType.SEEKER.value,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
-    
-    @classmethod
-    def from_dict(cls, data: dict):
-        """Create instance from dictionary"""
-        return cls(
-            uid=data.get("uid"),
-            email=data.get("email"),
-            full_name=data.get("full_name"),
-            phone=data.get("phone"),
-            profile_image=data.get("profile_image"),
-            address=data.get("address"),
-            bio=data.get("bio"),
-            gender=data.get("gender"),
-            date_of_birth=data.get("date_of_birth"),
-            service_categories=data.get("service_categories"),
-            category_details=data.get("category_details"),
-            service_requirements=data.get("service_requirements"),
-            primary_purpose=data.get("primary_purpose"),
-            urgency=data.get("urgency"),
-            preferences_notes=data.get("preferences_notes"),
-            created_at=datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None,
-            updated_at=datetime.fromisoformat(data["updated_at"]) if data.get("updated_at") else None,
-        )
 
 
-class ProviderNode:
+class ProviderNode(NodeModel):
     """
     Provider user node model for Neo4j
     
     Represents a service provider in the graph database
     """
     
+    __slots__ = (
+        "uid",
+        "email",
+        "full_name",
+        "phone",
+        "business_name",
+        "business_type",
+        "service_type",
+        "cnic_number",
+        "address",
+        "city",
+        "province",
+        "years_experience",
+        "description",
+        "profile_image",
+        "cnic_front_image",
+        "cnic_back_image",
+        "license_image",
+        "license_number",
+        "is_verified",
+        "documents_uploaded",
+        "verification_status",
+        "rating",
+        "rating_sum",
+        "rating_count",
+        "total_bookings",
+        "created_at",
+        "updated_at",
+    )
+    EXTRA_PROPERTIES = {"user_type": UserType.PROVIDER.value}
+    
     def __init__(
         self,
         uid: str,
@@ -139,6 +210,8 @@ class ProviderNode:
         verification_status: str = "pending",  # pending, approved, rejected
         # Rating & Stats
         rating: float = 0.0,
+        rating_sum: float = 0.0,
+        rating_count: int = 0,
         total_bookings: int = 0,
         created_at: Optional[datetime] = None,
         updated_at: Optional[datetime] = None,
@@ -168,86 +241,46 @@ class ProviderNode:
         self.verification_status = verification_status
         # Stats
         self.rating = rating
+        self.rating_sum = rating_sum
+        self.rating_count = rating_count
         self.total_bookings = total_bookings
         self.created_at = created_at or datetime.utcnow()
         self.updated_at = updated_at or datetime.utcnow()
-    
-    def to_dict(self):
-        """Convert to dictionary for Neo4j"""
-        return {
-            "uid": self.uid,
-            "email": self.email,
-            "full_name": self.full_name,
-            "phone": self.phone,
-            "business_name": self.business_name,
-            "business_type": self.business_type,
-            "service_type": self.service_type,
-            "cnic_number": self.cnic_number,
-            "address": self.address,
-            "city": self.city,
-            "province": self.province,
-            "years_experience": self.years_experience,
-            "description": self.description,
-            # Document images (Base64 URLs)
-            "profile_image": self.profile_image,
-            "cnic_front_image": self.cnic_front_image,
-            "cnic_back_image": self.cnic_back_image,
-            "license_image": self.license_image,
-            "license_number": self.license_number,
-            # Verification
-            "user_type": UserType.PROVIDER.value,
-            "is_verified": self.is_verified,
-            "documents_uploaded": self.documents_uploaded,
-            "verification_status": self.verification_status,
-            # Stats
-            "rating": self.rating,
-            "total_bookings": self.total_bookings,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
-    
-    @classmethod
-    def from_dict(cls, data: dict):
-        """Create instance from dictionary"""
-        return cls(
-            uid=data.get("uid"),
-            email=data.get("email"),
-            full_name=data.get("full_name"),
-            phone=data.get("phone"),
-            business_name=data.get("business_name"),
-            business_type=data.get("business_type"),
-            service_type=data.get("service_type"),
-            cnic_number=data.get("cnic_number"),
-            address=data.get("address"),
-            city=data.get("city"),
-            province=data.get("province"),
-            years_experience=data.get("years_experience"),
-            description=data.get("description"),
-            # Document images
-            profile_image=data.get("profile_image"),
-            cnic_front_image=data.get("cnic_front_image"),
-            cnic_back_image=data.get("cnic_back_image"),
-            license_image=data.get("license_image"),
-            license_number=data.get("license_number"),
-            # Verification
-            is_verified=data.get("is_verified", False),
-            documents_uploaded=data.get("documents_uploaded", False),
-            verification_status=data.get("verification_status", "pending"),
-            # Stats
-            rating=data.get("rating", 0.0),
-            total_bookings=data.get("total_bookings", 0),
-            created_at=datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None,
-            updated_at=datetime.fromisoformat(data["updated_at"]) if data.get("updated_at") else None,
-        )
 
 
-class VehicleNode:
+class VehicleNode(NodeModel):
     """
     Vehicle node model for Neo4j
     
     Represents a vehicle/equipment owned by a provider
     """
     
+    __slots__ = (
+        "vehicle_id",
+        "provider_uid",
+        "name",
+        "vehicle_type",
+        "make",
+        "model",
+        "year",
+        "registration_number",
+        "capacity",
+        "condition",
+        "vehicle_image",
+        "additional_images",
+        "has_insurance",
+        "insurance_expiry",
+        "is_available",
+        "availability_mask",
+        "city",
+        "province",
+        "price_per_hour",
+        "price_per_day",
+        "description",
+        "created_at",
+        "updated_at",
+    )
+    
     def __init__(
         self,
         vehicle_id: str,
@@ -267,6 +300,7 @@ class VehicleNode:
         has_insurance: bool = False,
         insurance_expiry: Optional[str] = None,
         is_available: bool = True,
+        availability_mask: Optional[List[int]] = None,  # 7 day masks of 24 hourly bits
         # Location
         city: Optional[str] = None,
         province: Optional[str] = None,
@@ -296,6 +330,7 @@ class VehicleNode:
         self.has_insurance = has_insurance
         self.insurance_expiry = insurance_expiry
         self.is_available = is_available
+        self.availability_mask = normalize_mask(availability_mask)
         # Location
         self.city = city
         self.province = province
@@ -307,82 +342,48 @@ class VehicleNode:
         # Metadata
         self.created_at = created_at or datetime.utcnow()
         self.updated_at = updated_at or datetime.utcnow()
-    
-    def to_dict(self):
-        """Convert instance to dictionary"""
-        return {
-            "vehicle_id": self.vehicle_id,
-            "provider_uid": self.provider_uid,
-            "name": self.name,
-            "vehicle_type": self.vehicle_type,
-            "make": self.make,
-            "model": self.model,
-            "year": self.year,
-            "registration_number": self.registration_number,
-            "capacity": self.capacity,
-            "condition": self.condition,
-            # Images
-            "vehicle_image": self.vehicle_image,
-            "additional_images": self.additional_images,
-            # Insurance
-            "has_insurance": self.has_insurance,
-            "insurance_expiry": self.insurance_expiry,
-            "is_available": self.is_available,
-            # Location
-            "city": self.city,
-            "province": self.province,
-            # Pricing
-            "price_per_hour": self.price_per_hour,
-            "price_per_day": self.price_per_day,
-            # Description
-            "description": self.description,
-            # Metadata
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
-    
-    @classmethod
-    def from_dict(cls, data: dict):
-        """Create instance from dictionary"""
-        return cls(
-            vehicle_id=data.get("vehicle_id"),
-            provider_uid=data.get("provider_uid"),
-            name=data.get("name"),
-            vehicle_type=data.get("vehicle_type"),
-            make=data.get("make"),
-            model=data.get("model"),
-            year=data.get("year"),
-            registration_number=data.get("registration_number"),
-            capacity=data.get("capacity"),
-            condition=data.get("condition", "Good"),
-            # Images
-            vehicle_image=data.get("vehicle_image"),
-            additional_images=data.get("additional_images"),
-            # Insurance
-            has_insurance=data.get("has_insurance", False),
-            insurance_expiry=data.get("insurance_expiry"),
-            is_available=data.get("is_available", True),
-            # Location
-            city=data.get("city"),
-            province=data.get("province"),
-            # Pricing
-            price_per_hour=data.get("price_per_hour"),
-            price_per_day=data.get("price_per_day"),
-            # Description
-            description=data.get("description"),
-            # Metadata
-            created_at=datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None,
-            updated_at=datetime.fromisoformat(data["updated_at"]) if data.get("updated_at") else None,
-        )
 
 
-class ServiceNode:
+class ServiceNode(NodeModel):
     """
     Service node model for Neo4j
     
     Represents a service offered by a provider for a specific vehicle
     """
     
+    __slots__ = (
+        "service_id",
+        "vehicle_id",
+        "provider_uid",
+        "service_name",
+        "service_category",
+        "price_per_hour",
+        "price_per_day",
+        "price_per_service",
+        "description",
+        "service_area",
+        "min_booking_duration",
+        "latitude",
+        "longitude",
+        "full_address",
+        "city",
+        "province",
+        "service_images",
+        "is_active",
+        "available_days",
+        "available_hours",
+        "availability_mask",
+        "operator_included",
+        "fuel_included",
+        "transportation_included",
+        "total_bookings",
+        "rating",
+        "rating_sum",
+        "rating_count",
+        "created_at",
+        "updated_at",
+    )
+    
     def __init__(
         self,
         service_id: str,
@@ -410,6 +411,7 @@ class ServiceNode:
         is_active: bool = True,
         available_days: Optional[str] = None,  # JSON array of days
         available_hours: Optional[str] = None,  # e.g., "9 AM - 6 PM"
+        availability_mask: Optional[List[int]] = None,  # 7 day masks of 24 hourly bits
         # Requirements
         operator_included: bool = True,
         fuel_included: bool = False,
@@ -417,6 +419,8 @@ class ServiceNode:
         # Stats
         total_bookings: int = 0,
         rating: float = 0.0,
+        rating_sum: float = 0.0,
+        rating_count: int = 0,
         # Metadata
         created_at: Optional[datetime] = None,
         updated_at: Optional[datetime] = None,
@@ -446,6 +450,12 @@ class ServiceNode:
         self.is_active = is_active
         self.available_days = available_days
         self.available_hours = available_hours
+        # Explicit mask wins; otherwise derive it from the legacy strings
+        self.availability_mask = (
+            normalize_mask(availability_mask)
+            if availability_mask is not None
+            else mask_from_legacy(available_days, available_hours)
+        )
         # Requirements
         self.operator_included = operator_included
         self.fuel_included = fuel_included
@@ -453,81 +463,102 @@ class ServiceNode:
         # Stats
         self.total_bookings = total_bookings
         self.rating = rating
+        self.rating_sum = rating_sum
+        self.rating_count = rating_count
         # Metadata
         self.created_at = created_at or datetime.utcnow()
         self.updated_at = updated_at or datetime.utcnow()
+
+
+class ReviewNode(NodeModel):
+    """
+    Review node model for Neo4j
     
-    def to_dict(self):
-        """Convert instance to dictionary"""
-        return {
-            "service_id": self.service_id,
-            "vehicle_id": self.vehicle_id,
-            "provider_uid": self.provider_uid,
-            "service_name": self.service_name,
-            "service_category": self.service_category,
-            # Pricing
-            "price_per_hour": self.price_per_hour,
-            "price_per_day": self.price_per_day,
-            "price_per_service": self.price_per_service,
-            # Service Details
-            "description": self.description,
-            "service_area": self.service_area,
-            "min_booking_duration": self.min_booking_duration,
-            # Location
-            "latitude": self.latitude,
-            "longitude": self.longitude,
-            "full_address": self.full_address,
-            "city": self.city,
-            "province": self.province,
-            # Images
-            "service_images": self.service_images,
-            # Availability
-            "is_active": self.is_active,
-            "available_days": self.available_days,
-            "available_hours": self.available_hours,
-            # Requirements
-            "operator_included": self.operator_included,
-            "fuel_included": self.fuel_included,
-            "transportation_included": self.transportation_included,
-            # Stats
-            "total_bookings": self.total_bookings,
-            "rating": self.rating,
-            # Metadata
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
+    Represents a seeker's rating of a service. Each review is linked to the
+    seeker who wrote it, the reviewed service and the provider offering it.
+    """
     
-    @classmethod
-    def from_dict(cls, data: dict):
-        """Create instance from dictionary"""
-        return cls(
-            service_id=data.get("service_id"),
-            vehicle_id=data.get("vehicle_id"),
-            provider_uid=data.get("provider_uid"),
-            service_name=data.get("service_name"),
-            service_category=data.get("service_category"),
-            # Pricing
-            price_per_hour=data.get("price_per_hour"),
-            price_per_day=data.get("price_per_day"),
-            price_per_service=data.get("price_per_service"),
-            # Service Details
-            description=data.get("description"),
-            service_area=data.get("service_area"),
-            min_booking_duration=data.get("min_booking_duration"),
-            # Images
-            service_images=data.get("service_images"),
-            # Availability
-            is_active=data.get("is_active", True),
-            available_days=data.get("available_days"),
-            available_hours=data.get("available_hours"),
-            # Requirements
-            operator_included=data.get("operator_included", True),
-            fuel_included=data.get("fuel_included", False),
-            transportation_included=data.get("transportation_included", False),
-            # Stats
-            total_bookings=data.get("total_bookings", 0),
-            rating=data.get("rating", 0.0),
-            # Metadata
-            created_at=datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None,
-            updated_at=datetime.fromisoformat(data["updated_at"]) if data.get("updated_at") else None,
-        )
+    __slots__ = (
+        "review_id",
+        "seeker_uid",
+        "service_id",
+        "rating",
+        "comment",
+        "provider_uid",
+        "created_at",
+        "updated_at",
+    )
+    
+    def __init__(
+        self,
+        review_id: str,
+        seeker_uid: str,
+        service_id: str,
+        rating: int,  # 1 - 5 stars
+        comment: Optional[str] = None,
+        provider_uid: Optional[str] = None,  # Resolved from the service on write
+        # Metadata
+        created_at: Optional[datetime] = None,
+        updated_at: Optional[datetime] = None,
+    ):
+        self.review_id = review_id
+        self.seeker_uid = seeker_uid
+        self.service_id = service_id
+        self.rating = rating
+        self.comment = comment
+        self.provider_uid = provider_uid
+        # Metadata
+        self.created_at = created_at or datetime.utcnow()
+        self.updated_at = updated_at or datetime.utcnow()
+
+
+class BookingNode(NodeModel):
+    """
+    Booking node model for Neo4j
+    
+    Represents a seeker's reservation of a vehicle for the half-open time
+    range [start_time, end_time). Times are stored in UTC.
+    """
+    
+    __slots__ = (
+        "booking_id",
+        "vehicle_id",
+        "seeker_uid",
+        "start_time",
+        "end_time",
+        "service_id",
+        "provider_uid",
+        "status",
+        "notes",
+        "created_at",
+        "updated_at",
+    )
+    TEMPORAL_FIELDS = ("start_time", "end_time", "created_at", "updated_at")
+    
+    def __init__(
+        self,
+        booking_id: str,
+        vehicle_id: str,
+        seeker_uid: str,
+        start_time: datetime,
+        end_time: datetime,
+        service_id: Optional[str] = None,  # Service the vehicle is booked through
+        provider_uid: Optional[str] = None,  # Resolved from the vehicle on write
+        status: str = "confirmed",  # confirmed, cancelled
+        notes: Optional[str] = None,
+        # Metadata
+        created_at: Optional[datetime] = None,
+        updated_at: Optional[datetime] = None,
+    ):
+        self.booking_id = booking_id
+        self.vehicle_id = vehicle_id
+        self.seeker_uid = seeker_uid
+        self.start_time = start_time
+        self.end_time = end_time
+        self.service_id = service_id
+        self.provider_uid = provider_uid
+        self.status = status
+        self.notes = notes
+        # Metadata
+        self.created_at = created_at or datetime.utcnow()
+        self.updated_at = updated_at or datetime.utcnow()
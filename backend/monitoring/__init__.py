@@ -0,0 +1,27 @@
+"""
+Monitoring package initialization
+"""
+
+from .metrics import (
+    record_cache,
+    count_firebase_call,
+    instrument_pool,
+    refresh_pool_gauges,
+    render_metrics,
+)
+from .slow_queries import get_slow_query_log
+from .tracing import tracer, tracing_enabled, setup_tracing, shutdown_tracing, traced
+
+__all__ = [
+    "record_cache",
+    "count_firebase_call",
+    "instrument_pool",
+    "refresh_pool_gauges",
+    "render_metrics",
+    "get_slow_query_log",
+    "tracer",
+    "tracing_enabled",
+    "setup_tracing",
+    "shutdown_tracing",
+    "traced",
+]
@@ -0,0 +1,212 @@
+"""
+Prometheus metrics
+Latency histograms, pool gauges and call counters exposed on /metrics
+
+- GraphQL: one histogram per operation (root field or "other", type, status) and one per
+  field that has its own resolver (plain attribute fields are not timed)
+- Neo4j: one histogram per named statement (repositories.statements),
+  pool in-use/idle gauges and the time spent waiting for a connection
+- Counters for cache lookups (booking interval index, ETag revalidation)
+  and Firebase Admin calls
+- Firebase: latency per awaited Admin call (config.firebase_async), calls
+  in flight and the circuit breaker state
+- Rate limiting: requests allowed, limited (429) or let through on a store
+  error, by client key kind (middleware.rate_limit)
+- Single-flight reads: calls that ran a query (leader) or joined one
+  already running (follower), per repository method (services.single_flight)
+
+With several workers, set PROMETHEUS_MULTIPROC_DIR (serve.py does) so every
+worker writes its samples to that directory and /metrics aggregates them.
+"""
+
+import functools
+import os
+import time
+from typing import Callable, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+
+
+# Seconds; resolvers and statements are mostly in the 1-250 ms range
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+GRAPHQL_OPERATION_SECONDS = Histogram(
+    "haulistry_graphql_operation_seconds",
+    "GraphQL operation latency",
+    ["operation", "type", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+GRAPHQL_RESOLVER_SECONDS = Histogram(
+    "haulistry_graphql_resolver_seconds",
+    "GraphQL field resolver latency",
+    ["field"],
+    buckets=LATENCY_BUCKETS,
+)
+NEO4J_STATEMENT_SECONDS = Histogram(
+    "haulistry_neo4j_statement_seconds",
+    "Neo4j statement latency, from run until the result is consumed",
+    ["statement"],
+    buckets=LATENCY_BUCKETS,
+)
+NEO4J_POOL_ACQUIRE_SECONDS = Histogram(
+    "haulistry_neo4j_pool_acquire_seconds",
+    "Time spent waiting for a connection from the Neo4j pool",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+NEO4J_POOL_CONNECTIONS = Gauge(
+    "haulistry_neo4j_pool_connections",
+    "Neo4j pool connections by state",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+NEO4J_POOL_WAITING = Gauge(
+    "haulistry_neo4j_pool_waiting",
+    "Callers currently waiting for a Neo4j pool connection",
+    multiprocess_mode="livesum",
+)
+CACHE_REQUESTS = Counter(
+    "haulistry_cache_requests_total",
+    "Cache lookups by cache and result (hit/miss)",
+    ["cache", "result"],
+)
+FIREBASE_CALLS = Counter(
+    "haulistry_firebase_calls_total",
+    "Firebase Admin SDK calls by operation and outcome",
+    ["operation", "outcome"],
+)
+FIREBASE_CALL_SECONDS = Histogram(
+    "haulistry_firebase_call_seconds",
+    "Awaited Firebase Admin call latency, retries and executor queueing included",
+    ["operation", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+FIREBASE_INFLIGHT = Gauge(
+    "haulistry_firebase_inflight",
+    "Firebase Admin calls submitted to the executor and not finished",
+    multiprocess_mode="livesum",
+)
+FIREBASE_CIRCUIT_STATE = Gauge(
+    "haulistry_firebase_circuit_state",
+    "Firebase circuit breaker: 0 closed, 1 half-open, 2 open",
+    multiprocess_mode="livemax",
+)
+
+RATE_LIMIT_REQUESTS = Counter(
+    "haulistry_rate_limit_requests_total",
+    "Rate-limited requests by client key (uid/ip) and result (allowed/limited/error)",
+    ["client", "result"],
+)
+SINGLE_FLIGHT_CALLS = Counter(
+    "haulistry_single_flight_calls_total",
+    "Coalesced reads by operation and role (leader ran the query, follower shared it)",
+    ["operation", "role"],
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count one cache lookup"""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_rate_limit(client: str, result: str) -> None:
+    """Count one rate limit decision"""
+    RATE_LIMIT_REQUESTS.labels(client, result).inc()
+
+
+def record_single_flight(operation: str, role: str) -> None:
+    """Count one single-flight call"""
+    SINGLE_FLIGHT_CALLS.labels(operation, role).inc()
+
+
+def record_firebase_call(operation: str, outcome: str, seconds: float) -> None:
+    """
+    Count and time one awaited Firebase Admin call
+    
+    Args:
+        operation: Label value, e.g. "verify_token"
+        outcome: success, error (Firebase refused the request), unavailable
+            (connection errors or timeouts) or rejected (circuit open)
+        seconds: Time from the await until the final attempt finished
+    """
+    FIREBASE_CALLS.labels(operation, outcome).inc()
+    FIREBASE_CALL_SECONDS.labels(operation, outcome).observe(seconds)
+
+
+def count_firebase_call(operation: str) -> Callable:
+    """
+    Decorator counting calls to a Firebase Admin wrapper by outcome
+    
+    Args:
+        operation: Label value, e.g. "verify_token"
+    """
+    success = FIREBASE_CALLS.labels(operation, "success")
+    error = FIREBASE_CALLS.labels(operation, "error")
+    
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                error.inc()
+                raise
+            success.inc()
+            return result
+        return wrapper
+    return decorator
+
+
+def instrument_pool(driver) -> None:
+    """
+    Time connection acquisition on a driver's pool
+    
+    Registered as a Neo4j driver listener, so every driver the process
+    creates (including after a reconnect) is covered. Wraps the neo4j 5.x
+    pool's acquire(); drivers without one are left alone.
+    """
+    pool = getattr(driver, "_pool", None)
+    acquire = getattr(pool, "acquire", None)
+    if acquire is None or getattr(acquire, "_instrumented", False):
+        return
+    
+    @functools.wraps(acquire)
+    def timed_acquire(*args, **kwargs):
+        NEO4J_POOL_WAITING.inc()
+        start = time.perf_counter()
+        try:
+            return acquire(*args, **kwargs)
+        finally:
+            NEO4J_POOL_ACQUIRE_SECONDS.observe(time.perf_counter() - start)
+            NEO4J_POOL_WAITING.dec()
+    
+    timed_acquire._instrumented = True
+    pool.acquire = timed_acquire
+
+
+def refresh_pool_gauges() -> None:
+    """Copy this process's pool counts into the pool gauges"""
+    from config.neo4j_config import pool_stats
+    
+    stats = pool_stats()
+    NEO4J_POOL_CONNECTIONS.labels("in_use").set(stats.get("in_use", 0))
+    NEO4J_POOL_CONNECTIONS.labels("idle").set(stats.get("idle", 0))
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Current metrics in the Prometheus text format
+    
+    Returns:
+        tuple: (body, content type)
+    """
+    refresh_pool_gauges()
+    
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
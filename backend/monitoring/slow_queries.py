@@ -0,0 +1,313 @@
+"""
+Slow-query log
+Per-statement timings and a rotating log of statements over a threshold
+
+run_statement() hands every statement's timings to SlowQueryLog.observe():
+the wall time measured around the call, and result_available_after /
+result_consumed_after from the result summary (server time until the first
+record, then until the last one was streamed). The gap between the wall
+time and the server's numbers is spent in the pool, on the network or in
+the driver.
+
+A statement slower than SLOW_QUERY_THRESHOLD_MS is written to
+SLOW_QUERY_LOG_PATH as one JSON line with:
+
+- the statement name and its server timings
+- a parameter fingerprint: parameter names and value types only
+  ({"lat": "<float>", "uids": "<list[3] of str>"}); values are never logged
+- its plan, captured on demand in a background thread: PROFILE (with db
+  hits and rows per operator) for read-only statements, EXPLAIN for
+  writes so nothing is written twice; at most once per statement every
+  SLOW_QUERY_PROFILE_INTERVAL seconds
+
+Aggregates are kept per worker process and exposed through the admin
+slowQueries GraphQL query (top_offenders()).
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from typing import Optional, Dict, Any, List
+
+import orjson
+
+from config.settings import settings
+
+
+def redact(value: Any) -> Any:
+    """
+    Replace parameter values with their type, keeping the structure
+    
+    Args:
+        value: A Cypher parameter value
+    
+    Returns:
+        Type placeholder ("<str>", "<list[3] of float>") or, for maps, a
+        dict with the same keys and redacted values
+    """
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        item_types = sorted({type(item).__name__ for item in value})
+        if not item_types:
+            return "<list[0]>"
+        return f"<list[{len(value)}] of {'|'.join(item_types)}>"
+    return f"<{type(value).__name__}>"
+
+
+def fingerprint(statement: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Redacted parameters and a short hash identifying their shape
+    
+    Two calls with the same statement and the same parameter names and
+    types share a hash, whatever the values were.
+    """
+    shape = redact(parameters)
+    digest = hashlib.sha1(statement.encode() + orjson.dumps(shape, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    return {"hash": digest[:12], "parameters": shape}
+
+
+def format_plan(plan: Dict[str, Any], depth: int = 0) -> List[str]:
+    """
+    Operator tree of a PROFILE/EXPLAIN plan, one line per operator
+    
+    Args:
+        plan: summary.profile or summary.plan
+        depth: Indentation level
+    
+    Returns:
+        List of lines, e.g. "  NodeIndexSeek rows=12 db_hits=13 (s:Service(is_active))"
+    """
+    args = plan.get("args", {})
+    line = "  " * depth + plan.get("operatorType", "?")
+    if "rows" in plan:
+        line += f" rows={plan['rows']} db_hits={plan.get('dbHits', 0)}"
+    elif "EstimatedRows" in args:
+        line += f" estimated_rows={args['EstimatedRows']:.0f}"
+    if args.get("Details"):
+        line += f" ({args['Details']})"
+    
+    lines = [line]
+    for child in plan.get("children", []):
+        lines.extend(format_plan(child, depth + 1))
+    return lines
+
+
+def total_db_hits(plan: Dict[str, Any]) -> int:
+    """Sum of db hits over every operator of a profiled plan"""
+    return plan.get("dbHits", 0) + sum(total_db_hits(child) for child in plan.get("children", []))
+
+
+class StatementStats:
+    """Running totals for one statement name"""
+    
+    __slots__ = (
+        "calls", "total_ms", "max_ms", "available_after_ms", "consumed_after_ms",
+        "slow_calls", "slow_total_ms", "last_slow_at", "last_fingerprint",
+        "last_plan", "db_hits", "profiled_at",
+    )
+    
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.available_after_ms = 0
+        self.consumed_after_ms = 0
+        self.slow_calls = 0
+        self.slow_total_ms = 0.0
+        self.last_slow_at: Optional[str] = None
+        self.last_fingerprint: Optional[str] = None
+        self.last_plan: Optional[List[str]] = None
+        self.db_hits: Optional[int] = None
+        self.profiled_at = float("-inf")
+
+
+class SlowQueryLog:
+    """Statement timings, slow-statement log file and on-demand plans"""
+    
+    def __init__(
+        self,
+        threshold_ms: float = 500.0,
+        path: Optional[str] = "logs/slow_queries.log",
+        max_bytes: int = 10 * 1024 * 1024,
+        backups: int = 5,
+        profile: bool = True,
+        profile_interval: float = 300.0,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.profile = profile
+        self.profile_interval = profile_interval
+        self._stats: Dict[str, StatementStats] = {}
+        self._lock = threading.Lock()
+        self._profiler: Optional[ThreadPoolExecutor] = None
+        
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._logger: Optional[logging.Logger] = None
+    
+    def observe(self, statement: str, query: str, parameters: Dict[str, Any], elapsed: float, summary) -> None:
+        """
+        Record one statement run; log it if it was slow
+        
+        Args:
+            statement: Statement name (run_statement's label)
+            query: Cypher text
+            parameters: Parameters it ran with
+            elapsed: Wall time in seconds
+            summary: Its ResultSummary
+        """
+        elapsed_ms = elapsed * 1000
+        available_after = summary.result_available_after or 0
+        consumed_after = summary.result_consumed_after or 0
+        
+        with self._lock:
+            stats = self._stats.get(statement)
+            if stats is None:
+                stats = self._stats[statement] = StatementStats()
+            stats.calls += 1
+            stats.total_ms += elapsed_ms
+            stats.available_after_ms += available_after
+            stats.consumed_after_ms += consumed_after
+            if elapsed_ms > stats.max_ms:
+                stats.max_ms = elapsed_ms
+            if elapsed < self.threshold:
+                return
+            
+            fingerprinted = fingerprint(statement, parameters)
+            now = time.monotonic()
+            stats.slow_calls += 1
+            stats.slow_total_ms += elapsed_ms
+            slow_at = stats.last_slow_at = datetime.now(timezone.utc).isoformat()
+            stats.last_fingerprint = fingerprinted["hash"]
+            capture_plan = self.profile and now - stats.profiled_at >= self.profile_interval
+            if capture_plan:
+                stats.profiled_at = now
+        
+        entry = {
+            "at": slow_at,
+            "statement": statement,
+            "elapsed_ms": round(elapsed_ms, 1),
+            "result_available_after_ms": available_after,
+            "result_consumed_after_ms": consumed_after,
+            "query_type": summary.query_type,
+            "fingerprint": fingerprinted["hash"],
+            "parameters": fingerprinted["parameters"],
+        }
+        if capture_plan:
+            if self._profiler is None:
+                self._profiler = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-profile")
+            self._profiler.submit(self._capture_plan, entry, query, parameters)
+        else:
+            self._write(entry)
+    
+    def _capture_plan(self, entry: Dict[str, Any], query: str, parameters: Dict[str, Any]) -> None:
+        """Re-run the statement under PROFILE (reads) or EXPLAIN (writes), then log it"""
+        from config.neo4j_config import current_neo4j_driver
+        
+        mode = "PROFILE" if entry["query_type"] == "r" else "EXPLAIN"
+        try:
+            driver = current_neo4j_driver()
+            if driver is None:
+                raise RuntimeError("Neo4j driver not connected")
+            with driver.session() as session:
+                summary = session.run(f"{mode} {query}", parameters).consume()
+            plan = summary.profile if mode == "PROFILE" else summary.plan
+            entry["plan_mode"] = mode
+            entry["plan"] = format_plan(plan or {})
+            if mode == "PROFILE" and plan:
+                entry["db_hits"] = total_db_hits(plan)
+        except Exception as e:
+            entry["plan_error"] = str(e)
+        
+        with self._lock:
+            stats = self._stats.get(entry["statement"])
+            if stats is not None and "plan" in entry:
+                stats.last_plan = entry["plan"]
+                stats.db_hits = entry.get("db_hits")
+        self._write(entry)
+    
+    def _write(self, entry: Dict[str, Any]) -> None:
+        if not self.path:
+            return
+        if self._logger is None:
+            # Opened on the first slow statement, not at import
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            logger = logging.getLogger("haulistry.slow_queries")
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            if not logger.handlers:
+                handler = RotatingFileHandler(self.path, maxBytes=self.max_bytes, backupCount=self.backups, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger.addHandler(handler)
+            self._logger = logger
+        self._logger.info(orjson.dumps(entry).decode())
+    
+    def top_offenders(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Statements that spent the most time over the threshold
+        
+        Args:
+            limit: Number of statements to return
+        
+        Returns:
+            List of per-statement summaries, worst first
+        """
+        with self._lock:
+            offenders = [
+                {
+                    "statement": statement,
+                    "calls": stats.calls,
+                    "slow_calls": stats.slow_calls,
+                    "slow_total_ms": round(stats.slow_total_ms, 1),
+                    "mean_ms": round(stats.total_ms / stats.calls, 2),
+                    "max_ms": round(stats.max_ms, 1),
+                    "mean_available_after_ms": round(stats.available_after_ms / stats.calls, 2),
+                    "mean_consumed_after_ms": round(stats.consumed_after_ms / stats.calls, 2),
+                    "last_slow_at": stats.last_slow_at,
+                    "last_fingerprint": stats.last_fingerprint,
+                    "db_hits": stats.db_hits,
+                    "plan": stats.last_plan,
+                }
+                for statement, stats in self._stats.items()
+                if stats.slow_calls
+            ]
+        offenders.sort(key=lambda offender: offender["slow_total_ms"], reverse=True)
+        return offenders[:limit]
+    
+    def reset(self) -> None:
+        """Forget all statistics (the log file is kept)"""
+        with self._lock:
+            self._stats.clear()
+
+
+# Global slow-query log
+_slow_query_log: Optional[SlowQueryLog] = None
+
+
+def get_slow_query_log() -> SlowQueryLog:
+    """
+    Get or create the process-wide slow-query log
+    
+    Returns:
+        SlowQueryLog: Configured from settings
+    """
+    global _slow_query_log
+    
+    if _slow_query_log is None:
+        _slow_query_log = SlowQueryLog(
+            threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+            path=settings.SLOW_QUERY_LOG_PATH or None,
+            max_bytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+            backups=settings.SLOW_QUERY_LOG_BACKUPS,
+            profile=settings.SLOW_QUERY_PROFILE,
+            profile_interval=settings.SLOW_QUERY_PROFILE_INTERVAL,
+        )
+    return _slow_query_log
@@ -0,0 +1,117 @@
+"""
+Tracing
+OpenTelemetry spans from the HTTP request down to Neo4j and Firebase
+
+One traced request looks like:
+
+    POST /graphql                                   middleware.tracing
+      mutation updateProviderProfile                graphql_api.extensions (operation)
+        Mutation.update_provider_profile            graphql_api.extensions (resolver)
+          UserRepository.update_provider_profile    repositories.statements (one per statement)
+          VehicleRepository.create_vehicle
+          ...
+        firebase.update_user                        config.firebase
+
+TRACING_EXPORTER selects where finished spans go: "console" (stdout),
+"file" (one JSON span per line at TRACING_FILE_PATH) or "none". With
+"none" the SDK is never loaded and the instrumented code skips span
+creation entirely. TRACING_SAMPLE_RATIO is applied to new traces; child
+spans, and requests arriving with a sampled traceparent header, follow
+their parent's decision.
+"""
+
+import functools
+import os
+from typing import Callable, Optional
+
+from opentelemetry import trace
+
+from config.settings import settings
+
+
+tracer = trace.get_tracer("haulistry")
+
+_provider = None
+
+
+def tracing_enabled() -> bool:
+    """Whether setup_tracing() installed an exporter in this process"""
+    return _provider is not None
+
+
+def setup_tracing() -> bool:
+    """
+    Install the tracer provider configured in settings
+    
+    Called once per worker process at startup (the batch exporter runs a
+    background thread, which must not be created before the fork).
+    
+    Returns:
+        bool: True if spans are exported
+    """
+    global _provider
+    
+    exporter_name = settings.TRACING_EXPORTER.lower()
+    if exporter_name == "none" or _provider is not None:
+        return _provider is not None
+    
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    
+    if exporter_name == "console":
+        exporter = ConsoleSpanExporter()
+    elif exporter_name == "file":
+        os.makedirs(os.path.dirname(settings.TRACING_FILE_PATH) or ".", exist_ok=True)
+        exporter = ConsoleSpanExporter(
+            out=open(settings.TRACING_FILE_PATH, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + os.linesep,
+        )
+    else:
+        raise ValueError(f"Unknown TRACING_EXPORTER '{settings.TRACING_EXPORTER}' (none, console or file)")
+    
+    provider = TracerProvider(
+        resource=Resource.create({
+            "service.name": "haulistry-api",
+            "service.version": settings.API_VERSION,
+            "process.pid": os.getpid(),
+        }),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _provider = provider
+    
+    print(f"🔭 Tracing to {exporter_name} (sample ratio {settings.TRACING_SAMPLE_RATIO})")
+    return True
+
+
+def shutdown_tracing() -> None:
+    """Flush pending spans and stop the exporter"""
+    global _provider
+    
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+
+
+def traced(name: str, attributes: Optional[dict] = None) -> Callable:
+    """
+    Decorator running a synchronous function inside a span
+    
+    Exceptions are recorded on the span and re-raised.
+    
+    Args:
+        name: Span name, e.g. "firebase.verify_token"
+        attributes: Static span attributes
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _provider is None:
+                return func(*args, **kwargs)
+            with tracer.start_as_current_span(name, kind=trace.SpanKind.CLIENT, attributes=attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,41 @@
+"""
+Backfill weekly availability bitmaps on existing services
+
+Parses the legacy available_days / available_hours strings into the
+168-bit availability_mask used by the availableDuring filter. Services whose
+strings can't be understood are left without a mask (and therefore don't
+match availability filters) until the provider sets their schedule:
+
+    python rebuild_availability.py [--batch-size 500]
+"""
+
+import argparse
+import sys
+from repositories.backend import get_user_repository
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Backfill service availability bitmaps")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Services processed per round trip (default: 500)"
+    )
+    args = parser.parse_args()
+    
+    try:
+        user_repo = get_user_repository()
+        summary = user_repo.backfill_availability_masks(batch_size=args.batch_size)
+    except Exception as e:
+        print(f"❌ Backfill failed: {str(e)}")
+        return 1
+    
+    print(f"Services updated: {summary['updated']}")
+    print(f"Services without parseable availability: {summary['unparsed']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
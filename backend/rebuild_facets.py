@@ -0,0 +1,32 @@
+"""
+Rebuild service facet counters
+
+Counts every active service into its (category, city, price band)
+combination and enables counter-backed serviceFacets reads. Run once after
+deploying facets, or any time the counters need repair:
+
+    python rebuild_facets.py
+"""
+
+import sys
+from repositories.facet_repository import FacetRepository
+
+
+def main():
+    """Main function"""
+    try:
+        facet_repo = FacetRepository()
+        summary = facet_repo.rebuild_counters()
+        # After the rebuild: it clears any duplicate combinations the constraint would reject
+        facet_repo.ensure_constraints()
+    except Exception as e:
+        print(f"❌ Rebuild failed: {str(e)}")
+        return 1
+    
+    print(f"Active services counted: {summary['services']}")
+    print(f"Facet combinations: {summary['combinations']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
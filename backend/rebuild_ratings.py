@@ -0,0 +1,40 @@
+"""
+Rebuild service and provider rating aggregates from Review nodes
+
+Backfills rating_sum / rating_count / rating on every Service and Provider.
+Run once after deploying reviews, or any time the aggregates need repair:
+
+    python rebuild_ratings.py [--batch-size 1000]
+"""
+
+import argparse
+import sys
+from repositories.review_repository import ReviewRepository
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Rebuild rating aggregates from reviews")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Nodes updated per inner transaction (default: 1000)"
+    )
+    args = parser.parse_args()
+    
+    try:
+        review_repo = ReviewRepository()
+        review_repo.ensure_constraints()
+        summary = review_repo.rebuild_rating_aggregates(batch_size=args.batch_size)
+    except Exception as e:
+        print(f"❌ Rebuild failed: {str(e)}")
+        return 1
+    
+    print(f"Services rebuilt: {summary['services_rebuilt']}")
+    print(f"Providers rebuilt: {summary['providers_rebuilt']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
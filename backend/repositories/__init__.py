@@ -4,5 +4,16 @@ Repositories package initialization
 
 from .user_repository import UserRepository
 from .vehicle_repository import VehicleRepository
+from .review_repository import ReviewRepository
+from .search_repository import SearchRepository
+from .facet_repository import FacetRepository
+from .booking_repository import BookingRepository
+from .protocols import UserStore, VehicleStore
+from .embedded_repository import EmbeddedUserRepository, EmbeddedVehicleRepository
+from .backend import get_user_repository, get_vehicle_repository
 
-__all__ = ["UserRepository", "VehicleRepository"]
+__all__ = [
+    "UserRepository", "VehicleRepository", "ReviewRepository", "SearchRepository", "FacetRepository", "BookingRepository",
+    "UserStore", "VehicleStore", "EmbeddedUserRepository", "EmbeddedVehicleRepository",
+    "get_user_repository", "get_vehicle_repository",
+]
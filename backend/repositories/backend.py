@@ -0,0 +1,35 @@
+"""
+Storage backend selection
+User and vehicle repositories for the backend named by STORAGE_BACKEND
+"""
+
+from config.settings import settings
+from repositories.protocols import UserStore, VehicleStore
+
+
+STORAGE_BACKENDS = ("neo4j", "embedded")
+
+
+def storage_backend() -> str:
+    """The configured backend, validated"""
+    if settings.STORAGE_BACKEND not in STORAGE_BACKENDS:
+        raise ValueError(f"STORAGE_BACKEND must be one of {', '.join(STORAGE_BACKENDS)}, not {settings.STORAGE_BACKEND!r}")
+    return settings.STORAGE_BACKEND
+
+
+def get_user_repository() -> UserStore:
+    """UserRepository, or its embedded counterpart"""
+    if storage_backend() == "embedded":
+        from repositories.embedded_repository import EmbeddedUserRepository
+        return EmbeddedUserRepository()
+    from repositories.user_repository import UserRepository
+    return UserRepository()
+
+
+def get_vehicle_repository() -> VehicleStore:
+    """VehicleRepository, or its embedded counterpart"""
+    if storage_backend() == "embedded":
+        from repositories.embedded_repository import EmbeddedVehicleRepository
+        return EmbeddedVehicleRepository()
+    from repositories.vehicle_repository import VehicleRepository
+    return VehicleRepository()
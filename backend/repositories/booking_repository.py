@@ -0,0 +1,546 @@
+"""
+Booking Repository - Neo4j Database Operations for Vehicle Bookings
+
+Bookings are (:Vehicle)-[:HAS_BOOKING]->(:Booking) nodes with a UTC
+[start_time, end_time) range. Each process keeps an in-memory interval index
+per vehicle, rebuilt lazily from the graph, so conflict checks and free-slot
+queries don't scan the vehicle's bookings.
+
+Every booking write bumps v.booking_version in the same transaction. That
+write takes Neo4j's lock on the vehicle node, which serializes concurrent
+reservations of one vehicle across all processes, and lets a process see
+that its cached index is stale (another worker wrote) with one property read.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Tuple, Union
+from config.neo4j_config import get_neo4j_driver
+from repositories.statements import run_statement
+from monitoring.metrics import record_cache
+from models.record_mapper import get_mapper
+from models.user import BookingNode
+
+
+BOOKING_CONFIRMED = "confirmed"
+BOOKING_CANCELLED = "cancelled"
+
+
+class BookingConflictError(Exception):
+    """Raised when a reservation overlaps an existing confirmed booking"""
+
+
+def parse_booking_time(value: Union[str, datetime]) -> datetime:
+    """
+    Parse an ISO 8601 string (or datetime) into an aware UTC datetime
+    
+    Naive values are taken to be UTC.
+    
+    Raises:
+        ValueError: Unparseable time
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _epoch_millis(value: datetime) -> int:
+    return int(value.timestamp() * 1000)
+
+
+def _from_epoch_millis(millis: int) -> str:
+    return datetime.fromtimestamp(millis / 1000, tz=timezone.utc).isoformat()
+
+
+class BookingIntervalIndex:
+    """
+    A vehicle's confirmed bookings as sorted, non-overlapping [start, end) ranges
+    
+    reserve() never lets confirmed bookings of one vehicle overlap. So both
+    starts and ends are sorted, and a binary search finds the only interval
+    that can collide with a query. Conflict checks are O(log n). Free-slot
+    queries are O(log n + k) for the k bookings inside the range.
+    """
+    
+    def __init__(self, version: int = 0):
+        self.version = version
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        self._ids: List[str] = []
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    @classmethod
+    def build(cls, version: int, intervals: List[Tuple[str, int, int]]) -> 'BookingIntervalIndex':
+        """Build from (booking_id, start_ms, end_ms) tuples in any order"""
+        index = cls(version)
+        for booking_id, start, end in sorted(intervals, key=lambda item: item[1]):
+            if index._ends and start < index._ends[-1]:
+                # Overlap in stored data (written outside reserve()): keep the
+                # union so the range still reports as booked
+                print(f"⚠️  Overlapping bookings {index._ids[-1]} / {booking_id} on one vehicle")
+                index._ends[-1] = max(index._ends[-1], end)
+                continue
+            index._starts.append(start)
+            index._ends.append(end)
+            index._ids.append(booking_id)
+        return index
+    
+    def find_conflict(self, start: int, end: int) -> Optional[str]:
+        """Return the id of a booking overlapping [start, end), or None"""
+        # First booking that ends after the query starts; it is the only
+        # candidate, since every later one also starts later
+        position = bisect_right(self._ends, start)
+        if position < len(self._starts) and self._starts[position] < end:
+            return self._ids[position]
+        return None
+    
+    def add(self, booking_id: str, start: int, end: int) -> None:
+        """
+        Insert a booking
+        
+        Raises:
+            BookingConflictError: The range overlaps an indexed booking
+        """
+        clash = self.find_conflict(start, end)
+        if clash is not None:
+            raise BookingConflictError(f"Overlaps booking {clash}")
+        position = bisect_left(self._starts, start)
+        self._starts.insert(position, start)
+        self._ends.insert(position, end)
+        self._ids.insert(position, booking_id)
+    
+    def remove(self, booking_id: str, start: int) -> bool:
+        """Remove a booking located by its start time; False if absent"""
+        position = bisect_left(self._starts, start)
+        if position < len(self._ids) and self._ids[position] == booking_id:
+            del self._starts[position]
+            del self._ends[position]
+            del self._ids[position]
+            return True
+        return False
+    
+    def free_slots(self, start: int, end: int, min_length: int = 0) -> List[Tuple[int, int]]:
+        """Gaps between bookings inside [start, end) of at least min_length"""
+        slots = []
+        cursor = start
+        position = bisect_right(self._ends, start)
+        while position < len(self._starts) and self._starts[position] < end:
+            if self._starts[position] - cursor >= max(min_length, 1):
+                slots.append((cursor, self._starts[position]))
+            cursor = max(cursor, self._ends[position])
+            position += 1
+        if end - cursor >= max(min_length, 1):
+            slots.append((cursor, end))
+        return slots
+
+
+# Per-process index cache, shared by all BookingRepository instances
+_index_cache: Dict[str, BookingIntervalIndex] = {}
+_vehicle_locks: Dict[str, threading.Lock] = {}
+_cache_lock = threading.Lock()
+
+
+def _vehicle_lock(vehicle_id: str) -> threading.Lock:
+    with _cache_lock:
+        lock = _vehicle_locks.get(vehicle_id)
+        if lock is None:
+            lock = _vehicle_locks[vehicle_id] = threading.Lock()
+        return lock
+
+
+class BookingRepository:
+    """Repository for booking-related database operations"""
+    
+    def __init__(self):
+        self.driver = get_neo4j_driver()
+    
+    @staticmethod
+    def _format_booking(booking_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert Neo4j datetime values of a booking to ISO format strings"""
+        return get_mapper("Booking").to_dict(booking_data)
+    
+    def ensure_constraints(self) -> None:
+        """
+        Create the uniqueness constraint and lookup indexes used by bookings
+        """
+        with self.driver.session() as session:
+            run_statement(session, "BookingRepository.ensure_constraints.booking_id_unique", """
+            CREATE CONSTRAINT booking_id_unique IF NOT EXISTS
+            FOR (b:Booking) REQUIRE b.booking_id IS UNIQUE
+            """)
+            run_statement(session, "BookingRepository.ensure_constraints.booking_seeker_uid", """
+            CREATE INDEX booking_seeker_uid IF NOT EXISTS
+            FOR (b:Booking) ON (b.seeker_uid)
+            """)
+            run_statement(session, "BookingRepository.ensure_constraints.booking_vehicle_window", """
+            CREATE INDEX booking_vehicle_window IF NOT EXISTS
+            FOR (b:Booking) ON (b.vehicle_id, b.end_time)
+            """)
+    
+    # ==================== INTERVAL INDEX ====================
+    
+    @staticmethod
+    def invalidate(vehicle_id: str) -> None:
+        """Drop the cached index of a vehicle (rebuilt on next use)"""
+        with _cache_lock:
+            _index_cache.pop(vehicle_id, None)
+    
+    def _get_index(self, session, vehicle_id: str) -> Optional[BookingIntervalIndex]:
+        """
+        Return an up-to-date index for the vehicle, rebuilding it when the
+        graph's booking_version has moved on
+        
+        Returns:
+            BookingIntervalIndex, or None if the vehicle does not exist
+        """
+        record = run_statement(session, "BookingRepository._get_index.version",
+            "MATCH (v:Vehicle {vehicle_id: $vehicle_id}) RETURN COALESCE(v.booking_version, 0) AS version",
+            vehicle_id=vehicle_id
+        ).single()
+        if record is None:
+            self.invalidate(vehicle_id)
+            return None
+        
+        cached = _index_cache.get(vehicle_id)
+        if cached is not None and cached.version == record["version"]:
+            record_cache("booking_index", True)
+            return cached
+        record_cache("booking_index", False)
+        
+        # Past bookings can't conflict with new ones, so only load the rest
+        record = run_statement(session, "BookingRepository._get_index.load", """
+        MATCH (v:Vehicle {vehicle_id: $vehicle_id})
+        OPTIONAL MATCH (v)-[:HAS_BOOKING]->(b:Booking)
+        WHERE b.status = $confirmed AND b.end_time > datetime()
+        RETURN COALESCE(v.booking_version, 0) AS version,
+               [x IN collect(b) | [x.booking_id, x.start_time.epochMillis, x.end_time.epochMillis]] AS intervals
+        """, vehicle_id=vehicle_id, confirmed=BOOKING_CONFIRMED).single()
+        if record is None:
+            self.invalidate(vehicle_id)
+            return None
+        
+        index = BookingIntervalIndex.build(
+            record["version"],
+            [tuple(interval) for interval in record["intervals"]]
+        )
+        with _cache_lock:
+            _index_cache[vehicle_id] = index
+        print(f"🗂️  Booking index rebuilt for vehicle {vehicle_id} ({len(index)} bookings, v{index.version})")
+        return index
+    
+    @staticmethod
+    def _apply_write(vehicle_id: str, index: BookingIntervalIndex, new_version: int, change) -> None:
+        """
+        Apply a committed write to the cached index if nobody else wrote in
+        between; otherwise drop it so the next read rebuilds
+        """
+        if new_version == index.version + 1:
+            change(index)
+            index.version = new_version
+        else:
+            BookingRepository.invalidate(vehicle_id)
+    
+    # ==================== WRITES ====================
+    
+    @staticmethod
+    def _reserve_tx(tx, params: Dict[str, Any]) -> Dict[str, Any]:
+        # Bumping the version locks the vehicle node until commit, so the
+        # overlap check below can't race another reservation of this vehicle
+        record = run_statement(tx, "BookingRepository._reserve_tx.bump_version", """
+        MATCH (v:Vehicle {vehicle_id: $vehicle_id})
+        SET v.booking_version = COALESCE(v.booking_version, 0) + 1
+        WITH v
+        OPTIONAL MATCH (seeker:Seeker {uid: $seeker_uid})
+        OPTIONAL MATCH (v)-[:HAS_BOOKING]->(b:Booking)
+        WHERE b.status = $confirmed
+          AND b.start_time < datetime($end_time)
+          AND b.end_time > datetime($start_time)
+        RETURN v.booking_version AS version, v.provider_uid AS provider_uid,
+               seeker IS NOT NULL AS seeker_exists, collect(b.booking_id) AS clashes
+        """, confirmed=BOOKING_CONFIRMED, **params).single()
+        
+        if record is None:
+            raise ValueError("Vehicle not found")
+        if not record["seeker_exists"]:
+            raise ValueError("Seeker not found")
+        if record["clashes"]:
+            raise BookingConflictError("Vehicle is already booked for part of this time range")
+        
+        created = run_statement(tx, "BookingRepository._reserve_tx.create", """
+        MATCH (v:Vehicle {vehicle_id: $vehicle_id})
+        MATCH (seeker:Seeker {uid: $seeker_uid})
+        CREATE (b:Booking)
+        SET b.booking_id = $booking_id,
+            b.vehicle_id = $vehicle_id,
+            b.seeker_uid = $seeker_uid,
+            b.provider_uid = v.provider_uid,
+            b.service_id = $service_id,
+            b.start_time = datetime($start_time),
+            b.end_time = datetime($end_time),
+            b.status = $status,
+            b.notes = $notes,
+            b.created_at = datetime($created_at),
+            b.updated_at = datetime($updated_at)
+        CREATE (v)-[:HAS_BOOKING]->(b)
+        CREATE (seeker)-[:BOOKED]->(b)
+        WITH b
+        OPTIONAL MATCH (s:Service {service_id: $service_id})
+        FOREACH (_ IN CASE WHEN s IS NULL THEN [] ELSE [1] END | CREATE (b)-[:FOR_SERVICE]->(s))
+        RETURN b
+        """, **params).single()
+        
+        return {"booking": dict(created["b"]), "version": record["version"]}
+    
+    def reserve(self, booking: BookingNode) -> Dict[str, Any]:
+        """
+        Reserve a vehicle for [start_time, end_time)
+        
+        The in-memory index rejects obvious conflicts without a write. The
+        authoritative check runs inside the write transaction while holding
+        the vehicle's lock, so parallel requests (in this or any other
+        process) can't double-book.
+        
+        Args:
+            booking: BookingNode with vehicle, seeker and time range
+        
+        Returns:
+            dict: Created booking data
+        
+        Raises:
+            ValueError: Invalid range, or vehicle/seeker not found
+            BookingConflictError: The range overlaps a confirmed booking
+        """
+        start = parse_booking_time(booking.start_time)
+        end = parse_booking_time(booking.end_time)
+        if end <= start:
+            raise ValueError("Booking end time must be after its start time")
+        if end <= datetime.now(timezone.utc):
+            raise ValueError("Booking must end in the future")
+        
+        booking.start_time, booking.end_time = start, end
+        params = booking.to_dict()
+        start_ms, end_ms = _epoch_millis(start), _epoch_millis(end)
+        
+        print(f"\n{'='*60}")
+        print(f"📅 RESERVING VEHICLE")
+        print(f"   Vehicle ID: {booking.vehicle_id}")
+        print(f"   Seeker UID: {booking.seeker_uid}")
+        print(f"   Window: {params['start_time']} → {params['end_time']}")
+        print(f"{'='*60}\n")
+        
+        with _vehicle_lock(booking.vehicle_id):
+            with self.driver.session() as session:
+                index = self._get_index(session, booking.vehicle_id)
+                if index is None:
+                    raise ValueError("Vehicle not found")
+                
+                clash = index.find_conflict(start_ms, end_ms)
+                if clash is not None:
+                    raise BookingConflictError("Vehicle is already booked for part of this time range")
+                
+                result = session.execute_write(self._reserve_tx, params)
+            
+            self._apply_write(
+                booking.vehicle_id, index, result["version"],
+                lambda idx: idx.add(booking.booking_id, start_ms, end_ms)
+            )
+        
+        print(f"✅ Booking {booking.booking_id} confirmed\n")
+        return self._format_booking(result["booking"])
+    
+    @staticmethod
+    def _cancel_booking_tx(tx, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        record = run_statement(tx, "BookingRepository._cancel_booking_tx", """
+        MATCH (v:Vehicle)-[:HAS_BOOKING]->(b:Booking {booking_id: $booking_id})
+        WHERE b.status = $confirmed
+          AND (b.seeker_uid = $requester_uid OR b.provider_uid = $requester_uid)
+        SET v.booking_version = COALESCE(v.booking_version, 0) + 1,
+            b.status = $cancelled,
+            b.updated_at = datetime()
+        RETURN b, v.booking_version AS version, b.start_time.epochMillis AS start_ms
+        """, confirmed=BOOKING_CONFIRMED, cancelled=BOOKING_CANCELLED, **params).single()
+        
+        if record is None:
+            return None
+        return {"booking": dict(record["b"]), "version": record["version"], "start_ms": record["start_ms"]}
+    
+    def cancel_booking(self, booking_id: str, requester_uid: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a confirmed booking (by its seeker or the vehicle's provider)
+        
+        Args:
+            booking_id: ID of booking to cancel
+            requester_uid: UID of the seeker or provider cancelling
+        
+        Returns:
+            dict: Cancelled booking data, or None if not found / not allowed
+        """
+        params = {"booking_id": booking_id, "requester_uid": requester_uid}
+        with self.driver.session() as session:
+            result = session.execute_write(self._cancel_booking_tx, params)
+        
+        if result is None:
+            print(f"❌ Booking {booking_id} not found or not cancellable by {requester_uid}\n")
+            return None
+        
+        vehicle_id = result["booking"]["vehicle_id"]
+        with _vehicle_lock(vehicle_id):
+            index = _index_cache.get(vehicle_id)
+            if index is not None:
+                self._apply_write(
+                    vehicle_id, index, result["version"],
+                    lambda idx: idx.remove(booking_id, result["start_ms"])
+                )
+        
+        print(f"✅ Booking {booking_id} cancelled\n")
+        return self._format_booking(result["booking"])
+    
+    @staticmethod
+    def remove_vehicle_bookings_tx(tx, vehicle_ids: List[str]) -> None:
+        """
+        Delete the bookings of vehicles that are being deleted
+        
+        Call inside the write transaction that deletes the vehicles.
+        """
+        if not vehicle_ids:
+            return
+        run_statement(tx, "BookingRepository.remove_vehicle_bookings_tx", """
+        UNWIND $vehicle_ids AS vid
+        MATCH (:Vehicle {vehicle_id: vid})-[:HAS_BOOKING]->(b:Booking)
+        DETACH DELETE b
+        """, vehicle_ids=vehicle_ids)
+        for vehicle_id in vehicle_ids:
+            BookingRepository.invalidate(vehicle_id)
+    
+    # ==================== READS ====================
+    
+    def has_conflict(self, vehicle_id: str, start_time: Union[str, datetime], end_time: Union[str, datetime]) -> Optional[bool]:
+        """
+        Check whether [start_time, end_time) overlaps a confirmed booking
+        
+        Returns:
+            bool, or None if the vehicle does not exist
+        """
+        start_ms = _epoch_millis(parse_booking_time(start_time))
+        end_ms = _epoch_millis(parse_booking_time(end_time))
+        if end_ms <= start_ms:
+            raise ValueError("End time must be after start time")
+        
+        with self.driver.session() as session:
+            index = self._get_index(session, vehicle_id)
+        if index is None:
+            return None
+        return index.find_conflict(start_ms, end_ms) is not None
+    
+    def get_free_slots(
+        self,
+        vehicle_id: str,
+        range_start: Union[str, datetime],
+        range_end: Union[str, datetime],
+        min_duration_minutes: int = 0
+    ) -> Optional[List[Dict[str, str]]]:
+        """
+        Free time slots of a vehicle between range_start and range_end
+        
+        Args:
+            vehicle_id: Vehicle ID
+            range_start: Start of the window to search
+            range_end: End of the window to search
+            min_duration_minutes: Skip gaps shorter than this
+        
+        Returns:
+            List of {"start_time", "end_time"} ISO strings, or None if the
+            vehicle does not exist
+        """
+        start_ms = _epoch_millis(parse_booking_time(range_start))
+        end_ms = _epoch_millis(parse_booking_time(range_end))
+        if end_ms <= start_ms:
+            raise ValueError("End time must be after start time")
+        
+        with self.driver.session() as session:
+            index = self._get_index(session, vehicle_id)
+        if index is None:
+            return None
+        
+        slots = index.free_slots(start_ms, end_ms, min_length=min_duration_minutes * 60 * 1000)
+        return [
+            {"start_time": _from_epoch_millis(slot_start), "end_time": _from_epoch_millis(slot_end)}
+            for slot_start, slot_end in slots
+        ]
+    
+    def get_vehicle_bookings(
+        self,
+        vehicle_id: str,
+        range_start: Optional[Union[str, datetime]] = None,
+        range_end: Optional[Union[str, datetime]] = None,
+        include_cancelled: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the bookings of a vehicle, optionally limited to a time window
+        
+        Args:
+            vehicle_id: Vehicle ID
+            range_start: Only bookings ending after this time
+            range_end: Only bookings starting before this time
+            include_cancelled: Also return cancelled bookings
+        
+        Returns:
+            List of booking data dictionaries ordered by start time
+        """
+        where_clauses = ["true"]
+        params: Dict[str, Any] = {"vehicle_id": vehicle_id}
+        
+        if not include_cancelled:
+            where_clauses.append("b.status = $confirmed")
+            params["confirmed"] = BOOKING_CONFIRMED
+        if range_start is not None:
+            where_clauses.append("b.end_time > datetime($range_start)")
+            params["range_start"] = parse_booking_time(range_start).isoformat()
+        if range_end is not None:
+            where_clauses.append("b.start_time < datetime($range_end)")
+            params["range_end"] = parse_booking_time(range_end).isoformat()
+        
+        query = f"""
+        MATCH (:Vehicle {{vehicle_id: $vehicle_id}})-[:HAS_BOOKING]->(b:Booking)
+        WHERE {" AND ".join(where_clauses)}
+        RETURN b
+        ORDER BY b.start_time
+        """
+        
+        with self.driver.session() as session:
+            result = run_statement(session, "BookingRepository.get_vehicle_bookings", query, params)
+            bookings = [self._format_booking(dict(record["b"])) for record in result]
+        
+        print(f"📋 Retrieved {len(bookings)} bookings for vehicle {vehicle_id}")
+        return bookings
+    
+    def get_seeker_bookings(self, seeker_uid: str, include_cancelled: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get all bookings made by a seeker, newest first
+        
+        Args:
+            seeker_uid: Seeker Firebase UID
+            include_cancelled: Also return cancelled bookings
+        
+        Returns:
+            List of booking data dictionaries
+        """
+        status_filter = "" if include_cancelled else "AND b.status = $confirmed"
+        query = f"""
+        MATCH (b:Booking)
+        WHERE b.seeker_uid = $seeker_uid {status_filter}
+        RETURN b
+        ORDER BY b.start_time DESC
+        """
+        
+        with self.driver.session() as session:
+            result = run_statement(session, "BookingRepository.get_seeker_bookings", query, seeker_uid=seeker_uid, confirmed=BOOKING_CONFIRMED)
+            bookings = [self._format_booking(dict(record["b"])) for record in result]
+        
+        print(f"📋 Retrieved {len(bookings)} bookings for seeker {seeker_uid}")
+        return bookings
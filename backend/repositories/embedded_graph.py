@@ -0,0 +1,519 @@
+"""
+Embedded graph engine
+Users, vehicles and services in indexed in-memory structures, written through to SQLite
+
+The embedded storage backend (STORAGE_BACKEND=embedded) keeps the part of
+the graph the user and vehicle repositories work on in process memory:
+
+    nodes      label -> key -> properties
+    emails     email -> (label, uid) of the users holding it
+    owns       provider uid -> vehicle ids          (OWNS)
+    offers     provider uid -> service ids          (OFFERS)
+    provides   vehicle id -> service ids            (PROVIDES)
+    similar    seeker uid -> SIMILAR_* relationships, in creation order
+    active     service category -> ids of its active services
+    cells      latitude/longitude grid cell -> service ids, for radius searches
+
+Every change is written to SQLite (a row per node and per relationship,
+properties as JSON) before the call returns, and the whole graph is read
+back when the engine opens, so reads never touch the disk. Temporal
+properties are held as aware UTC datetimes, which compare far faster than
+the driver's DateTime; the repositories convert them on the way out.
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Set, Tuple, Iterable, Iterator
+
+from neo4j.time import DateTime
+
+from config.settings import settings
+
+
+LABELS = ("Seeker", "Provider", "Vehicle", "Service")
+USER_LABELS = ("Seeker", "Provider")
+
+# Property identifying a node of each label
+KEYS = {"Seeker": "uid", "Provider": "uid", "Vehicle": "vehicle_id", "Service": "service_id"}
+
+SIMILAR_TYPES = ("SIMILAR_INTERESTS", "SIMILAR_LOCATION")
+
+# Radius searches only visit the grid cells overlapping the circle's bounding box
+CELL_DEGREES = 0.25
+GRID_COLUMNS = int(360 / CELL_DEGREES)
+
+# Sphere radius of Neo4j's WGS-84 point.distance(), so distances agree to the metre
+EARTH_RADIUS_METERS = 6378140.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    label TEXT NOT NULL,
+    key TEXT NOT NULL,
+    properties TEXT NOT NULL,
+    PRIMARY KEY (label, key)
+);
+CREATE TABLE IF NOT EXISTS relationships (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT NOT NULL,
+    start_key TEXT NOT NULL,
+    end_key TEXT NOT NULL,
+    properties TEXT
+);
+CREATE INDEX IF NOT EXISTS relationships_start ON relationships (start_key, type);
+CREATE INDEX IF NOT EXISTS relationships_end ON relationships (end_key, type);
+"""
+
+
+def to_datetime(value: Any) -> Any:
+    """
+    Temporal value as stored by Cypher's datetime(): ISO text or a naive
+    datetime is UTC, a driver DateTime is converted; None stays None
+    """
+    if value is None:
+        return None
+    if isinstance(value, DateTime):
+        value = value.to_native()
+    elif isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def now() -> datetime:
+    """Cypher's datetime()"""
+    return datetime.now(timezone.utc)
+
+
+def distance_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Haversine distance as computed by Neo4j's point.distance() for WGS-84 points"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return EARTH_RADIUS_METERS * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _decode(value: Dict[str, Any]) -> Any:
+    if len(value) == 1 and "$datetime" in value:
+        return datetime.fromisoformat(value["$datetime"])
+    return value
+
+
+def _dumps(properties: Dict[str, Any]) -> str:
+    return json.dumps(properties, default=_encode, separators=(",", ":"))
+
+
+def _loads(text: Optional[str]) -> Dict[str, Any]:
+    return json.loads(text, object_hook=_decode) if text else {}
+
+
+def _cell(latitude: float, longitude: float) -> Tuple[int, int]:
+    return (math.floor(latitude / CELL_DEGREES), _wrap(math.floor(longitude / CELL_DEGREES)))
+
+
+def _wrap(column: int) -> int:
+    return (column + GRID_COLUMNS // 2) % GRID_COLUMNS - GRID_COLUMNS // 2
+
+
+class EmbeddedGraph:
+    """
+    In-memory graph of users, vehicles and services persisted to SQLite
+    
+    Thread-safe: every read and write holds one re-entrant lock, and
+    transaction() groups several writes into a single SQLite transaction.
+    Nodes are plain dictionaries; callers copy them before handing them out.
+    """
+    
+    def __init__(self, path: str = ":memory:"):
+        """
+        Args:
+            path: SQLite database file (":memory:" for a throwaway graph)
+        """
+        self.path = path
+        self.lock = threading.RLock()
+        self._depth = 0
+        
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Transactions are managed explicitly with BEGIN / COMMIT
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+        
+        self._reset()
+        self._load()
+    
+    def _reset(self) -> None:
+        self.nodes: Dict[str, Dict[str, Dict[str, Any]]] = {label: {} for label in LABELS}
+        self.emails: Dict[str, Set[Tuple[str, str]]] = {}
+        self.owns: Dict[str, Set[str]] = {}
+        self.owner: Dict[str, str] = {}
+        self.offers: Dict[str, Set[str]] = {}
+        self.offered_by: Dict[str, str] = {}
+        self.provides: Dict[str, Set[str]] = {}
+        self.provided_by: Dict[str, str] = {}
+        self.similar: Dict[str, List[Dict[str, Any]]] = {}
+        self.similar_to: Dict[str, Set[str]] = {}
+        self.active: Dict[Any, Set[str]] = {}
+        self.cells: Dict[Tuple[int, int], Set[str]] = {}
+    
+    def _load(self) -> None:
+        """Read the whole graph from SQLite into memory"""
+        for label, properties in self.connection.execute("SELECT label, properties FROM nodes"):
+            self._index(label, _loads(properties))
+        for rel_type, start, end, properties in self.connection.execute(
+            "SELECT type, start_key, end_key, properties FROM relationships ORDER BY id"
+        ):
+            self._link(rel_type, start, end, _loads(properties))
+    
+    def close(self) -> None:
+        self.connection.close()
+    
+    # ==================== TRANSACTIONS ====================
+    
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Hold the graph lock and make the enclosed writes one SQLite transaction
+        
+        Nested calls join the outermost transaction. On an exception SQLite
+        rolls back and memory is reloaded from it, so a failed change leaves
+        no trace in either.
+        """
+        with self.lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+            
+            self._depth = 1
+            self.connection.execute("BEGIN")
+            try:
+                yield
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                self._reset()
+                self._load()
+                raise
+            else:
+                self.connection.execute("COMMIT")
+            finally:
+                self._depth = 0
+    
+    # ==================== INDEXES ====================
+    
+    def _index(self, label: str, node: Dict[str, Any]) -> None:
+        key = node[KEYS[label]]
+        self.nodes[label][key] = node
+        if label in USER_LABELS:
+            if node.get("email") is not None:
+                self.emails.setdefault(node["email"], set()).add((label, key))
+        elif label == "Service":
+            if node.get("is_active") is True:
+                self.active.setdefault(node.get("service_category"), set()).add(key)
+            if node.get("latitude") is not None and node.get("longitude") is not None:
+                self.cells.setdefault(_cell(node["latitude"], node["longitude"]), set()).add(key)
+    
+    def _unindex(self, label: str, node: Dict[str, Any]) -> None:
+        key = node[KEYS[label]]
+        self.nodes[label].pop(key, None)
+        if label in USER_LABELS:
+            holders = self.emails.get(node.get("email"))
+            if holders is not None:
+                holders.discard((label, key))
+                if not holders:
+                    del self.emails[node["email"]]
+        elif label == "Service":
+            if node.get("is_active") is True:
+                self.active[node.get("service_category")].discard(key)
+            if node.get("latitude") is not None and node.get("longitude") is not None:
+                self.cells[_cell(node["latitude"], node["longitude"])].discard(key)
+    
+    def _link(self, rel_type: str, start: str, end: str, properties: Dict[str, Any]) -> None:
+        if rel_type == "OWNS":
+            self.owns.setdefault(start, set()).add(end)
+            self.owner[end] = start
+        elif rel_type == "OFFERS":
+            self.offers.setdefault(start, set()).add(end)
+            self.offered_by[end] = start
+        elif rel_type == "PROVIDES":
+            self.provides.setdefault(start, set()).add(end)
+            self.provided_by[end] = start
+        else:
+            self.similar.setdefault(start, []).append({"type": rel_type, "end": end, **properties})
+            self.similar_to.setdefault(end, set()).add(start)
+    
+    # ==================== NODES ====================
+    
+    def node(self, label: str, key: str) -> Optional[Dict[str, Any]]:
+        return self.nodes[label].get(key)
+    
+    def nodes_with_label(self, label: str) -> Iterable[Dict[str, Any]]:
+        return self.nodes[label].values()
+    
+    def users_with_email(self, email: str) -> List[Dict[str, Any]]:
+        return [self.nodes[label][key] for label, key in self.emails.get(email, ())]
+    
+    def create(self, label: str, properties: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store a node; None values are left out, as Cypher's SET does.
+        A node with the same key is replaced.
+        """
+        node = {name: value for name, value in properties.items() if value is not None}
+        with self.transaction():
+            existing = self.nodes[label].get(node[KEYS[label]])
+            if existing is not None:
+                self._unindex(label, existing)
+            self._index(label, node)
+            self._write_node(label, node)
+        return node
+    
+    def update(self, label: str, key: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Apply changes to a node in order; None removes the property
+        
+        Returns:
+            dict: The updated node, or None if it does not exist
+        """
+        with self.transaction():
+            node = self.nodes[label].get(key)
+            if node is None:
+                return None
+            self._unindex(label, node)
+            for name, value in changes.items():
+                if value is None:
+                    node.pop(name, None)
+                else:
+                    node[name] = value
+            # The key property itself is never changed
+            node[KEYS[label]] = key
+            self._index(label, node)
+            self._write_node(label, node)
+        return node
+    
+    def delete(self, label: str, key: str) -> bool:
+        """Delete a node and its relationships (DETACH DELETE)"""
+        with self.transaction():
+            node = self.nodes[label].get(key)
+            if node is None:
+                return False
+            self._unindex(label, node)
+            self._detach(label, key)
+            self.connection.execute("DELETE FROM nodes WHERE label = ? AND key = ?", (label, key))
+        return True
+    
+    def _write_node(self, label: str, node: Dict[str, Any]) -> None:
+        self.connection.execute(
+            "INSERT OR REPLACE INTO nodes (label, key, properties) VALUES (?, ?, ?)",
+            (label, node[KEYS[label]], _dumps(node)),
+        )
+    
+    def _detach(self, label: str, key: str) -> None:
+        execute = self.connection.execute
+        if label == "Provider":
+            for vehicle_id in self.owns.pop(key, ()):
+                self.owner.pop(vehicle_id, None)
+            for service_id in self.offers.pop(key, ()):
+                self.offered_by.pop(service_id, None)
+            execute("DELETE FROM relationships WHERE start_key = ? AND type IN ('OWNS', 'OFFERS')", (key,))
+        elif label == "Vehicle":
+            owner = self.owner.pop(key, None)
+            if owner is not None:
+                self.owns[owner].discard(key)
+            for service_id in self.provides.pop(key, ()):
+                self.provided_by.pop(service_id, None)
+            execute("DELETE FROM relationships WHERE end_key = ? AND type = 'OWNS'", (key,))
+            execute("DELETE FROM relationships WHERE start_key = ? AND type = 'PROVIDES'", (key,))
+        elif label == "Service":
+            provider = self.offered_by.pop(key, None)
+            if provider is not None:
+                self.offers[provider].discard(key)
+            vehicle = self.provided_by.pop(key, None)
+            if vehicle is not None:
+                self.provides[vehicle].discard(key)
+            execute("DELETE FROM relationships WHERE end_key = ? AND type IN ('OFFERS', 'PROVIDES')", (key,))
+        elif label == "Seeker":
+            for relationship in self.similar.pop(key, ()):
+                self.similar_to.get(relationship["end"], set()).discard(key)
+            for start in self.similar_to.pop(key, ()):
+                self.similar[start] = [r for r in self.similar.get(start, ()) if r["end"] != key]
+            execute(
+                "DELETE FROM relationships WHERE (start_key = ? OR end_key = ?) "
+                "AND type IN ('SIMILAR_INTERESTS', 'SIMILAR_LOCATION')",
+                (key, key),
+            )
+    
+    # ==================== RELATIONSHIPS ====================
+    
+    def relate(self, rel_type: str, start: str, end: str, properties: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Create a relationship between two node keys
+        
+        OWNS, OFFERS and PROVIDES link one vehicle or service to one owner;
+        SIMILAR_INTERESTS / SIMILAR_LOCATION keep every relationship created.
+        """
+        properties = {name: value for name, value in (properties or {}).items() if value is not None}
+        with self.transaction():
+            self._link(rel_type, start, end, properties)
+            self.connection.execute(
+                "INSERT INTO relationships (type, start_key, end_key, properties) VALUES (?, ?, ?, ?)",
+                (rel_type, start, end, _dumps(properties) if properties else None),
+            )
+    
+    def relate_many(self, relationships: List[Tuple[str, str, str, Dict[str, Any]]]) -> None:
+        """Create several (type, start, end, properties) relationships in one statement"""
+        rows = []
+        with self.transaction():
+            for rel_type, start, end, properties in relationships:
+                properties = {name: value for name, value in properties.items() if value is not None}
+                self._link(rel_type, start, end, properties)
+                rows.append((rel_type, start, end, _dumps(properties) if properties else None))
+            self.connection.executemany(
+                "INSERT INTO relationships (type, start_key, end_key, properties) VALUES (?, ?, ?, ?)", rows
+            )
+    
+    def vehicles_of(self, provider_uid: str) -> List[Dict[str, Any]]:
+        vehicles = self.nodes["Vehicle"]
+        return [vehicles[vehicle_id] for vehicle_id in self.owns.get(provider_uid, ())]
+    
+    def services_of_provider(self, provider_uid: str) -> List[Dict[str, Any]]:
+        services = self.nodes["Service"]
+        return [services[service_id] for service_id in self.offers.get(provider_uid, ())]
+    
+    def services_of_vehicle(self, vehicle_id: str) -> List[Dict[str, Any]]:
+        services = self.nodes["Service"]
+        return [services[service_id] for service_id in self.provides.get(vehicle_id, ())]
+    
+    def provider_of_service(self, service_id: str) -> Optional[Dict[str, Any]]:
+        provider_uid = self.offered_by.get(service_id)
+        return self.nodes["Provider"].get(provider_uid) if provider_uid is not None else None
+    
+    def similar_relationships(self, seeker_uid: str) -> List[Dict[str, Any]]:
+        """Outgoing SIMILAR_* relationships as {"type", "end", **properties}"""
+        return self.similar.get(seeker_uid, [])
+    
+    # ==================== SERVICE LOOKUPS ====================
+    
+    def active_services(self, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Services with is_active = true, optionally of one category"""
+        services = self.nodes["Service"]
+        if category is not None:
+            return [services[service_id] for service_id in self.active.get(category, ())]
+        return [services[service_id] for ids in self.active.values() for service_id in ids]
+    
+    def services_within(
+        self, latitude: float, longitude: float, radius_meters: float
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Services whose coordinates lie within a radius of a point
+        
+        Returns:
+            list: (service, distance in metres) pairs, unordered
+        """
+        services = self.nodes["Service"]
+        span = math.degrees(radius_meters / EARTH_RADIUS_METERS)
+        lowest = max(latitude - span, -90.0)
+        highest = min(latitude + span, 90.0)
+        widest = max(abs(lowest), abs(highest))
+        
+        if widest >= 89.0 or span * 2 >= 180.0:
+            # Near a pole or larger than a hemisphere: every cell may qualify
+            candidates = [service_id for ids in self.cells.values() for service_id in ids]
+        else:
+            lon_span = span / math.cos(math.radians(widest))
+            rows = range(math.floor(lowest / CELL_DEGREES), math.floor(highest / CELL_DEGREES) + 1)
+            first = math.floor((longitude - lon_span) / CELL_DEGREES)
+            last = math.floor((longitude + lon_span) / CELL_DEGREES)
+            columns = {_wrap(column) for column in range(first, last + 1)}
+            candidates = [
+                service_id
+                for row in rows for column in columns
+                for service_id in self.cells.get((row, column), ())
+            ]
+        
+        found = []
+        for service_id in candidates:
+            service = services[service_id]
+            distance = distance_meters(service["latitude"], service["longitude"], latitude, longitude)
+            if distance <= radius_meters:
+                found.append((service, distance))
+        return found
+    
+    # ==================== BULK LOADING ====================
+    
+    def insert_many(self, label: str, rows: List[Dict[str, Any]], links: List[Tuple[str, str, str]]) -> None:
+        """
+        Store a batch of nodes and the relationships (type, start, end) pointing to them
+        in one transaction; used by datagen's EmbeddedWriter
+        """
+        with self.transaction():
+            nodes = []
+            created = set()
+            for row in rows:
+                node = {name: value for name, value in row.items() if value is not None}
+                existing = self.nodes[label].get(node[KEYS[label]])
+                if existing is None:
+                    created.add(node[KEYS[label]])
+                else:
+                    self._unindex(label, existing)
+                self._index(label, node)
+                nodes.append((label, node[KEYS[label]], _dumps(node)))
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO nodes (label, key, properties) VALUES (?, ?, ?)", nodes
+            )
+            # A replaced node keeps its relationships, as the MERGE loader does
+            links = [link for link in links if link[2] in created]
+            for rel_type, start, end in links:
+                self._link(rel_type, start, end, {})
+            self.connection.executemany(
+                "INSERT INTO relationships (type, start_key, end_key) VALUES (?, ?, ?)", links
+            )
+    
+    def clear(self) -> None:
+        """Delete every node and relationship"""
+        with self.transaction():
+            self.connection.execute("DELETE FROM nodes")
+            self.connection.execute("DELETE FROM relationships")
+            self._reset()
+
+
+# Global engine (opened on first use)
+_graph: Optional[EmbeddedGraph] = None
+_graph_lock = threading.Lock()
+
+
+def get_embedded_graph() -> EmbeddedGraph:
+    """Get or open the embedded graph stored at EMBEDDED_DB_PATH"""
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = EmbeddedGraph(settings.EMBEDDED_DB_PATH)
+                print(f"✅ Embedded graph loaded from {settings.EMBEDDED_DB_PATH}")
+    return _graph
+
+
+def close_embedded_graph() -> None:
+    """Close the embedded graph"""
+    global _graph
+    if _graph is not None:
+        _graph.close()
+        _graph = None
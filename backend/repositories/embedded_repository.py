@@ -0,0 +1,978 @@
+"""
+Embedded Repositories - User and Vehicle Operations on the Embedded Graph
+
+Same methods, arguments and return values as UserRepository and
+VehicleRepository (see repositories.protocols), answered from the
+in-memory indexes of repositories.embedded_graph instead of Cypher.
+
+Reviews, bookings and facet counters stay in Neo4j, so the side effects the
+Neo4j repositories apply to them (review and facet cleanup when a service
+goes away, booking conflicts in check_vehicle_availability) are not
+performed here.
+"""
+
+import heapq
+import json
+import uuid
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Callable
+
+from neo4j.time import DateTime
+
+from models.user import SeekerNode, ProviderNode, VehicleNode, ServiceNode
+from models.availability import mask_contains, mask_from_legacy
+from models.record_mapper import get_mapper
+from repositories.embedded_graph import EmbeddedGraph, get_embedded_graph, to_datetime, now, distance_meters
+
+
+def _out(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return DateTime.from_native(value)
+    if isinstance(value, list):
+        return list(value)
+    return value
+
+
+def _copy(node: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Detached copy of a node for returning to callers, with temporals as the
+    driver's DateTime, exactly as the Neo4j repositories return them
+    """
+    return {name: _out(value) for name, value in node.items()}
+
+
+def _mapped(label: str, node: Dict[str, Any]) -> Dict[str, Any]:
+    return get_mapper(label).to_dict(_copy(node))
+
+
+def _descending(*fields: str) -> Callable[[Dict[str, Any]], tuple]:
+    """Sort key for ORDER BY field DESC, ... (Cypher sorts nulls first when descending)"""
+    def key(node: Dict[str, Any]) -> tuple:
+        return tuple((1, 0) if node.get(field) is None else (0, node[field]) for field in fields)
+    return key
+
+
+_NEWEST = _descending("created_at")
+_BEST_RATED = _descending("rating", "created_at")
+
+
+def _at_least(value: Any, minimum: float) -> bool:
+    """Cypher's value >= minimum, where a missing value never matches"""
+    return value is not None and value >= minimum
+
+
+def _contains(text: Any, part: str) -> bool:
+    """Cypher's text CONTAINS part, where a missing value never matches"""
+    return isinstance(text, str) and part in text
+
+
+class EmbeddedUserRepository:
+    """Repository for user, vehicle and service operations on the embedded graph"""
+    
+    def __init__(self, graph: Optional[EmbeddedGraph] = None):
+        self.graph = graph or get_embedded_graph()
+    
+    # ==================== USERS ====================
+    
+    def _create_user(self, label: str, properties: Dict[str, Any]) -> Dict[str, Any]:
+        properties["name"] = properties.get("full_name")
+        properties["created_at"] = to_datetime(properties.get("created_at"))
+        properties["updated_at"] = to_datetime(properties.get("updated_at"))
+        return _copy(self.graph.create(label, properties))
+    
+    def create_seeker(self, seeker: SeekerNode) -> Dict[str, Any]:
+        """
+        Create a new Seeker node
+        
+        Args:
+            seeker: SeekerNode instance
+        
+        Returns:
+            dict: Created seeker data
+        """
+        return self._create_user("Seeker", seeker.to_dict())
+    
+    def create_provider(self, provider: ProviderNode) -> Dict[str, Any]:
+        """
+        Create a new Provider node
+        
+        Args:
+            provider: ProviderNode instance
+        
+        Returns:
+            dict: Created provider data
+        """
+        return self._create_user("Provider", provider.to_dict())
+    
+    def _find_user(self, uid: str) -> Optional[tuple]:
+        for label in ("Seeker", "Provider"):
+            node = self.graph.node(label, uid)
+            if node is not None:
+                return label, node
+        return None
+    
+    def get_user_by_uid(self, uid: str) -> Optional[Dict[str, Any]]:
+        """
+        Get user by Firebase UID (checks both Seeker and Provider)
+        
+        Args:
+            uid: Firebase user UID
+        
+        Returns:
+            dict: User data or None
+        """
+        with self.graph.lock:
+            found = self._find_user(uid)
+            if found is None:
+                return None
+            label, node = found
+            user_data = _copy(node)
+        user_data["labels"] = [label]
+        return user_data
+    
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """
+        Get user by email (checks both Seeker and Provider)
+        
+        Args:
+            email: User's email address
+        
+        Returns:
+            dict: User data or None
+        """
+        with self.graph.lock:
+            for label, uid in self.graph.emails.get(email, ()):
+                user_data = _copy(self.graph.node(label, uid))
+                user_data["labels"] = [label]
+                return user_data
+        return None
+    
+    def _update_user(self, label: str, uid: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not updates:
+            return None
+        # Stored as text, as the Neo4j repository's SET s.updated_at = $updated_at does
+        changes = {**updates, "updated_at": datetime.utcnow().isoformat()}
+        with self.graph.transaction():
+            node = self.graph.update(label, uid, changes)
+            return _copy(node) if node is not None else None
+    
+    def update_seeker(self, uid: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Update Seeker node
+        
+        Args:
+            uid: Firebase user UID
+            updates: Dictionary of fields to update
+        
+        Returns:
+            dict: Updated seeker data
+        """
+        return self._update_user("Seeker", uid, updates)
+    
+    def update_provider(self, uid: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Update Provider node
+        
+        Args:
+            uid: Firebase user UID
+            updates: Dictionary of fields to update
+        
+        Returns:
+            dict: Updated provider data
+        """
+        return self._update_user("Provider", uid, updates)
+    
+    def delete_user(self, uid: str) -> bool:
+        """
+        Delete user node (both Seeker and Provider)
+        
+        Args:
+            uid: Firebase user UID
+        
+        Returns:
+            bool: True if deleted, False otherwise
+        """
+        with self.graph.transaction():
+            deleted_seeker = self.graph.delete("Seeker", uid)
+            deleted_provider = self.graph.delete("Provider", uid)
+        return deleted_seeker or deleted_provider
+    
+    def user_exists(self, uid: str = None, email: str = None) -> bool:
+        """
+        Check if user exists by UID or email
+        
+        Args:
+            uid: Firebase user UID (optional)
+            email: User's email (optional)
+        
+        Returns:
+            bool: True if user exists
+        """
+        if not uid and not email:
+            return False
+        with self.graph.lock:
+            if uid:
+                return self._find_user(uid) is not None
+            return bool(self.graph.emails.get(email))
+    
+    def _page(self, label: str, limit: int, skip: int) -> List[Dict[str, Any]]:
+        with self.graph.lock:
+            newest = heapq.nlargest(skip + limit, self.graph.nodes_with_label(label), key=_NEWEST)
+            return [_copy(node) for node in newest[skip:]]
+    
+    def get_all_seekers(self, limit: int = 100, skip: int = 0) -> List[Dict[str, Any]]:
+        """
+        Get all seekers with pagination, newest first
+        
+        Args:
+            limit: Maximum number of results
+            skip: Number of results to skip
+        
+        Returns:
+            list: List of seeker data
+        """
+        return self._page("Seeker", limit, skip)
+    
+    def get_all_providers(self, limit: int = 100, skip: int = 0) -> List[Dict[str, Any]]:
+        """
+        Get all providers with pagination, newest first
+        
+        Args:
+            limit: Maximum number of results
+            skip: Number of results to skip
+        
+        Returns:
+            list: List of provider data
+        """
+        return self._page("Provider", limit, skip)
+    
+    def search_providers(
+        self,
+        business_type: Optional[str] = None,
+        min_rating: float = 0.0,
+        is_verified: Optional[bool] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        Search providers with filters
+        
+        Args:
+            business_type: Filter by business type
+            min_rating: Minimum rating
+            is_verified: Filter by verification status
+            limit: Maximum results
+        
+        Returns:
+            list: List of matching providers
+        """
+        with self.graph.lock:
+            matches = (
+                provider for provider in self.graph.nodes_with_label("Provider")
+                if _at_least(provider.get("rating"), min_rating)
+                and (not business_type or provider.get("business_type") == business_type)
+                and (is_verified is None or provider.get("is_verified") == is_verified)
+            )
+            best = heapq.nlargest(limit, matches, key=_descending("rating", "total_bookings"))
+            return [_copy(provider) for provider in best]
+    
+    def _update_profile(self, label: str, uid: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self.graph.transaction():
+            node = self.graph.node(label, uid)
+            if node is None:
+                return None
+            changes = {**update_data, "updated_at": now()}
+            changes["name"] = changes["full_name"] if "full_name" in changes else node.get("full_name")
+            return _mapped(label, self.graph.update(label, uid, changes))
+    
+    def update_provider_profile(self, uid: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Update provider profile with optional business fields
+        
+        Args:
+            uid: Provider Firebase UID
+            update_data: Dictionary of fields to update
+        
+        Returns:
+            dict: Updated provider data
+        """
+        return self._update_profile("Provider", uid, update_data)
+    
+    def update_seeker_profile(self, uid: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Update seeker profile with optional fields
+        
+        Args:
+            uid: Seeker Firebase UID
+            update_data: Dictionary of fields to update
+        
+        Returns:
+            dict: Updated seeker data
+        """
+        return self._update_profile("Seeker", uid, update_data)
+    
+    def create_seeker_similarity_relationships(self, uid: str) -> Dict[str, Any]:
+        """
+        Create relationships between seekers based on similar preferences
+        
+        Every call adds a new relationship per match, as the Neo4j repository's
+        MERGE on a fresh created_at does.
+        
+        Args:
+            uid: Seeker UID to find similar seekers for
+        
+        Returns:
+            dict: Summary of relationships created
+        """
+        with self.graph.transaction():
+            seeker = self.graph.node("Seeker", uid)
+            if seeker is None:
+                print(f"❌ Seeker not found: {uid}\n")
+                return {"relationships_created": 0, "similar_seekers": []}
+            
+            categories = seeker.get("service_categories")
+            try:
+                categories_list = (json.loads(categories) if isinstance(categories, str) else categories) or []
+            except ValueError:
+                categories_list = []
+            purpose = seeker.get("primary_purpose")
+            urgency = seeker.get("urgency")
+            address = seeker.get("address")
+            
+            others = [other for other in self.graph.nodes_with_label("Seeker") if other["uid"] != uid]
+            created_at = now()
+            similar_seekers = []
+            
+            def relate(rel_type, matches, similarity, strength, properties):
+                properties = {**properties, "created_at": created_at, "strength": strength}
+                self.graph.relate_many([(rel_type, uid, other["uid"], properties) for other in matches])
+                for other in matches:
+                    similar_seekers.append({
+                        "uid": other["uid"],
+                        "name": other.get("full_name"),
+                        "similarity": similarity,
+                        "strength": strength,
+                    })
+            
+            for category in categories_list:
+                relate(
+                    "SIMILAR_INTERESTS",
+                    [other for other in others if _contains(other.get("service_categories"), category)],
+                    "service_category", 1,
+                    {"similarity_type": "service_category", "matching_category": category},
+                )
+            if purpose:
+                relate(
+                    "SIMILAR_INTERESTS",
+                    [other for other in others if other.get("primary_purpose") == purpose],
+                    "primary_purpose", 2,
+                    {"similarity_type": "primary_purpose", "matching_purpose": purpose},
+                )
+            if urgency:
+                relate(
+                    "SIMILAR_INTERESTS",
+                    [other for other in others if other.get("urgency") == urgency],
+                    "urgency", 1,
+                    {"similarity_type": "urgency", "matching_urgency": urgency},
+                )
+            if address:
+                relate(
+                    "SIMILAR_LOCATION",
+                    [other for other in others if _contains(other.get("address"), address)],
+                    "location", 1,
+                    {"location": address},
+                )
+        
+        print(f"✅ Similarity relationships created for {uid}: {len(similar_seekers)}")
+        return {
+            "relationships_created": len(similar_seekers),
+            "similar_seekers": similar_seekers,
+            "seeker_uid": uid
+        }
+    
+    def get_similar_seekers(self, uid: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Get seekers similar to the given seeker based on relationships
+        
+        Args:
+            uid: Seeker UID
+            limit: Maximum number of similar seekers to return
+        
+        Returns:
+            list: List of similar seekers with similarity scores
+        """
+        with self.graph.lock:
+            scores: Dict[str, Dict[str, Any]] = {}
+            for relationship in self.graph.similar_relationships(uid):
+                score = scores.setdefault(relationship["end"], {"types": [], "total": 0})
+                if relationship["type"] not in score["types"]:
+                    score["types"].append(relationship["type"])
+                strength = relationship.get("strength")
+                score["total"] += strength if strength is not None else 1
+            
+            ranked = heapq.nlargest(limit, scores.items(), key=lambda item: item[1]["total"])
+            similar_seekers = []
+            for other_uid, score in ranked:
+                other = self.graph.node("Seeker", other_uid)
+                similar_seekers.append({
+                    'uid': other.get("uid"),
+                    'name': other.get("full_name"),
+                    'email': other.get("email"),
+                    'categories': other.get("service_categories"),
+                    'purpose': other.get("primary_purpose"),
+                    'address': other.get("address"),
+                    'relationship_types': score["types"],
+                    'similarity_score': score["total"]
+                })
+            return similar_seekers
+    
+    # ==================== VEHICLE MANAGEMENT ====================
+    
+    def create_vehicle(self, vehicle: VehicleNode) -> Dict[str, Any]:
+        """
+        Create a new Vehicle node and link to Provider
+        
+        Args:
+            vehicle: VehicleNode instance
+        
+        Returns:
+            dict: Created vehicle data, or None if the provider does not exist
+        """
+        properties = vehicle.to_dict()
+        properties["created_at"] = to_datetime(properties.get("created_at"))
+        properties["updated_at"] = to_datetime(properties.get("updated_at"))
+        with self.graph.transaction():
+            if self.graph.node("Provider", properties["provider_uid"]) is None:
+                return None
+            node = self.graph.create("Vehicle", properties)
+            self.graph.relate("OWNS", properties["provider_uid"], node["vehicle_id"])
+            return _copy(node)
+    
+    def get_provider_vehicles(self, provider_uid: str) -> List[Dict[str, Any]]:
+        """
+        Get all vehicles owned by a provider
+        
+        Args:
+            provider_uid: Provider Firebase UID
+        
+        Returns:
+            List of vehicle data dictionaries
+        """
+        with self.graph.lock:
+            vehicles = sorted(self.graph.vehicles_of(provider_uid), key=_NEWEST, reverse=True)
+            return [_mapped("Vehicle", vehicle) for vehicle in vehicles]
+    
+    def get_vehicle_by_id(self, vehicle_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get vehicle by ID
+        
+        Args:
+            vehicle_id: Vehicle ID
+        
+        Returns:
+            Vehicle data or None
+        """
+        with self.graph.lock:
+            vehicle = self.graph.node("Vehicle", vehicle_id)
+            return _mapped("Vehicle", vehicle) if vehicle is not None else None
+    
+    def update_vehicle(self, vehicle_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Update vehicle properties
+        
+        Args:
+            vehicle_id: Vehicle ID
+            update_data: Dictionary of fields to update
+        
+        Returns:
+            Updated vehicle data or None
+        """
+        with self.graph.transaction():
+            vehicle = self.graph.update("Vehicle", vehicle_id, {**update_data, "updated_at": now()})
+            return _mapped("Vehicle", vehicle) if vehicle is not None else None
+    
+    def delete_vehicle(self, vehicle_id: str) -> bool:
+        """
+        Delete vehicle and all related services (CASCADE)
+        
+        Args:
+            vehicle_id: Vehicle ID
+        
+        Returns:
+            True if deleted, False otherwise
+        """
+        with self.graph.transaction():
+            if self.graph.node("Vehicle", vehicle_id) is None:
+                return False
+            for service in self.graph.services_of_vehicle(vehicle_id):
+                self.graph.delete("Service", service["service_id"])
+            return self.graph.delete("Vehicle", vehicle_id)
+    
+    # ==================== SERVICE MANAGEMENT ====================
+    
+    def create_service(self, service: ServiceNode) -> Dict[str, Any]:
+        """
+        Create a new Service node and link to Provider and Vehicle
+        
+        Args:
+            service: ServiceNode instance
+        
+        Returns:
+            dict: Created service data, or None if the provider or vehicle does not exist
+        """
+        properties = service.to_dict()
+        properties["created_at"] = to_datetime(properties.get("created_at"))
+        properties["updated_at"] = to_datetime(properties.get("updated_at"))
+        with self.graph.transaction():
+            if (self.graph.node("Provider", properties["provider_uid"]) is None
+                    or self.graph.node("Vehicle", properties["vehicle_id"]) is None):
+                return None
+            node = self.graph.create("Service", properties)
+            self.graph.relate("OFFERS", properties["provider_uid"], node["service_id"])
+            self.graph.relate("PROVIDES", properties["vehicle_id"], node["service_id"])
+            return _copy(node)
+    
+    def get_vehicle_services(self, vehicle_id: str) -> List[Dict[str, Any]]:
+        """
+        Get all services for a specific vehicle
+        
+        Args:
+            vehicle_id: Vehicle ID
+        
+        Returns:
+            List of service data dictionaries
+        """
+        with self.graph.lock:
+            services = sorted(self.graph.services_of_vehicle(vehicle_id), key=_NEWEST, reverse=True)
+            return [_mapped("Service", service) for service in services]
+    
+    def get_provider_services(self, provider_uid: str) -> List[Dict[str, Any]]:
+        """
+        Get all services offered by a provider
+        
+        Args:
+            provider_uid: Provider Firebase UID
+        
+        Returns:
+            List of service data dictionaries
+        """
+        with self.graph.lock:
+            services = sorted(self.graph.services_of_provider(provider_uid), key=_NEWEST, reverse=True)
+            return [_mapped("Service", service) for service in services]
+    
+    def get_service_by_id(self, service_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get service by ID
+        
+        Args:
+            service_id: Service ID
+        
+        Returns:
+            Service data or None
+        """
+        with self.graph.lock:
+            service = self.graph.node("Service", service_id)
+            return _mapped("Service", service) if service is not None else None
+    
+    def backfill_availability_masks(self, batch_size: int = 500) -> Dict[str, int]:
+        """
+        Derive availability_mask for services that only have the legacy
+        available_days / available_hours strings
+        
+        Args:
+            batch_size: Services written per transaction
+        
+        Returns:
+            dict: Number of services updated and left without a mask
+        """
+        with self.graph.lock:
+            pending = sorted(
+                service["service_id"] for service in self.graph.nodes_with_label("Service")
+                if service.get("availability_mask") is None
+            )
+        
+        updated = 0
+        unparsed = 0
+        for start in range(0, len(pending), batch_size):
+            with self.graph.transaction():
+                for service_id in pending[start:start + batch_size]:
+                    service = self.graph.node("Service", service_id)
+                    if service is None or service.get("availability_mask") is not None:
+                        continue
+                    mask = mask_from_legacy(service.get("available_days"), service.get("available_hours"))
+                    if mask is None:
+                        unparsed += 1
+                    else:
+                        self.graph.update("Service", service_id, {"availability_mask": mask})
+                        updated += 1
+        
+        return {"updated": updated, "unparsed": unparsed}
+    
+    # ==================== SEEKER-FACING SERVICE QUERIES ====================
+    
+    def _matches(
+        self,
+        service: Dict[str, Any],
+        service_area: Optional[str],
+        min_rating: Optional[float],
+        available_during: Optional[List[int]]
+    ) -> bool:
+        """Filters shared by the seeker-facing queries (category and is_active come from the index)"""
+        if service_area and service.get("service_area") != service_area:
+            return False
+        if min_rating is not None and not _at_least(service.get("rating"), min_rating):
+            return False
+        if available_during is not None and not mask_contains(service.get("availability_mask"), available_during):
+            return False
+        return True
+    
+    def get_active_services(
+        self,
+        category: Optional[str] = None,
+        service_area: Optional[str] = None,
+        min_rating: Optional[float] = None,
+        limit: int = 50,
+        available_during: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get all active services (for seekers) with optional filters
+        
+        Args:
+            category: Filter by service category
+            service_area: Filter by service area
+            min_rating: Minimum rating filter
+            limit: Maximum number of results
+            available_during: 7-day availability mask the service must cover
+        
+        Returns:
+            List of active service data dictionaries
+        """
+        with self.graph.lock:
+            matches = (
+                service for service in self.graph.active_services(category or None)
+                if self._matches(service, service_area, min_rating, available_during)
+            )
+            return [_mapped("Service", service) for service in heapq.nlargest(limit, matches, key=_BEST_RATED)]
+    
+    def get_active_services_by_provider(self, provider_uid: str) -> List[Dict[str, Any]]:
+        """
+        Get all active services for a specific provider (for seekers)
+        
+        Args:
+            provider_uid: Provider Firebase UID
+        
+        Returns:
+            List of active service data dictionaries
+        """
+        with self.graph.lock:
+            active = [
+                service for service in self.graph.services_of_provider(provider_uid)
+                if service.get("is_active") is True
+            ]
+            return [_mapped("Service", service) for service in sorted(active, key=_BEST_RATED, reverse=True)]
+    
+    def update_service(self, service_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Update service properties
+        
+        Args:
+            service_id: Service ID
+            update_data: Dictionary of fields to update
+        
+        Returns:
+            Updated service data or None
+        """
+        with self.graph.transaction():
+            service = self.graph.update("Service", service_id, {**update_data, "updated_at": now()})
+            return _mapped("Service", service) if service is not None else None
+    
+    def delete_service(self, service_id: str) -> bool:
+        """
+        Delete a service
+        
+        Args:
+            service_id: Service ID
+        
+        Returns:
+            True if deleted, False otherwise
+        """
+        return self.graph.delete("Service", service_id)
+    
+    def get_nearby_services(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float = 50,
+        service_category: Optional[str] = None,
+        limit: int = 50,
+        available_during: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find services within a specified radius, nearest first
+        
+        Args:
+            latitude: Center point latitude
+            longitude: Center point longitude
+            radius_km: Search radius in kilometers (default: 50km)
+            service_category: Optional filter by service category
+            limit: Maximum number of results (default: 50)
+            available_during: 7-day availability mask the service must cover
+        
+        Returns:
+            List of services with distance information, ordered by distance
+        """
+        with self.graph.lock:
+            found = [
+                (service, distance)
+                for service, distance in self.graph.services_within(latitude, longitude, radius_km * 1000)
+                if service.get("is_active") is True
+                and (not service_category or service.get("service_category") == service_category)
+                and self._matches(service, None, None, available_during)
+            ]
+            services = []
+            for service, distance in heapq.nsmallest(limit, found, key=lambda pair: pair[1]):
+                service_data = _mapped("Service", service)
+                service_data["distance_km"] = round(distance / 1000, 2)
+                services.append(service_data)
+            return services
+    
+    def get_ranking_candidates(
+        self,
+        category: Optional[str] = None,
+        service_area: Optional[str] = None,
+        min_rating: Optional[float] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius_km: Optional[float] = None,
+        limit: int = 500,
+        available_during: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch the candidate pool for the ranking stage
+        
+        Args:
+            category: Filter by service category
+            service_area: Filter by service area
+            min_rating: Minimum rating filter
+            latitude: Optional center latitude
+            longitude: Optional center longitude
+            radius_km: Search radius in kilometers (requires latitude/longitude)
+            limit: Maximum candidate pool size
+            available_during: 7-day availability mask the service must cover
+        
+        Returns:
+            List of {"service", "distance_km", "provider_verified", "touched_epoch"}
+        """
+        with self.graph.lock:
+            if latitude is not None and longitude is not None:
+                if radius_km is not None:
+                    pool = self.graph.services_within(latitude, longitude, radius_km * 1000)
+                    pool = [
+                        (service, distance) for service, distance in pool
+                        if service.get("is_active") is True
+                        and (not category or service.get("service_category") == category)
+                    ]
+                else:
+                    pool = [
+                        (service, distance_meters(service["latitude"], service["longitude"], latitude, longitude))
+                        for service in self.graph.active_services(category or None)
+                        if service.get("latitude") is not None and service.get("longitude") is not None
+                    ]
+                matches = [
+                    (service, distance) for service, distance in pool
+                    if self._matches(service, service_area, min_rating, available_during)
+                ]
+                # Nearest candidates first so the pool covers the closest services
+                chosen = heapq.nsmallest(limit, matches, key=lambda pair: pair[1])
+            else:
+                matches = (
+                    service for service in self.graph.active_services(category or None)
+                    if self._matches(service, service_area, min_rating, available_during)
+                )
+                chosen = [(service, None) for service in heapq.nlargest(limit, matches, key=_BEST_RATED)]
+            
+            candidates = []
+            for service, distance in chosen:
+                provider = self.graph.provider_of_service(service["service_id"])
+                touched = service.get("updated_at", service.get("created_at"))
+                candidates.append({
+                    "service": _mapped("Service", service),
+                    "distance_km": round(distance / 1000, 2) if distance is not None else None,
+                    "provider_verified": (provider or {}).get("is_verified") or False,
+                    "touched_epoch": int(touched.timestamp()) if isinstance(touched, datetime) else None,
+                })
+            return candidates
+
+
+class EmbeddedVehicleRepository:
+    """Repository for vehicle-related operations on the embedded graph"""
+    
+    def __init__(self, graph: Optional[EmbeddedGraph] = None):
+        self.graph = graph or get_embedded_graph()
+    
+    def create_vehicle(
+        self,
+        provider_uid: str,
+        vehicle_type: str,
+        registration_number: str,
+        model: str,
+        vehicle_image: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Create a new Vehicle node and link it to provider
+        
+        Args:
+            provider_uid: Provider's UID
+            vehicle_type: Type of vehicle (Harvester, Tractor, Crane, Loader riksha)
+            registration_number: Vehicle registration number
+            model: Vehicle model
+            vehicle_image: Base64 encoded vehicle image
+        
+        Returns:
+            dict: Created vehicle data
+        
+        Raises:
+            Exception: The provider does not exist
+        """
+        created_at = to_datetime(datetime.utcnow())
+        with self.graph.transaction():
+            if self.graph.node("Provider", provider_uid) is None:
+                raise Exception(f"Provider with UID {provider_uid} not found")
+            node = self.graph.create("Vehicle", {
+                "vehicle_id": str(uuid.uuid4()),
+                "provider_uid": provider_uid,
+                "vehicle_type": vehicle_type,
+                "registration_number": registration_number,
+                "model": model,
+                "vehicle_image": vehicle_image,
+                "name": vehicle_type,
+                "make": "",
+                "year": 0,
+                "is_available": True,
+                "condition": "Good",
+                "has_insurance": False,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            self.graph.relate("OWNS", provider_uid, node["vehicle_id"])
+            return _copy(node)
+    
+    def get_provider_vehicles(self, provider_uid: str) -> List[Dict[str, Any]]:
+        """
+        Get all vehicles for a specific provider
+        
+        Args:
+            provider_uid: Provider's UID
+        
+        Returns:
+            list: List of vehicle dictionaries
+        """
+        with self.graph.lock:
+            vehicles = sorted(self.graph.vehicles_of(provider_uid), key=_NEWEST, reverse=True)
+            return [_copy(vehicle) for vehicle in vehicles]
+    
+    def get_vehicle_by_id(self, vehicle_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a specific vehicle by ID
+        
+        Args:
+            vehicle_id: Vehicle's unique ID
+        
+        Returns:
+            dict: Vehicle data or None if not found
+        """
+        with self.graph.lock:
+            vehicle = self.graph.node("Vehicle", vehicle_id)
+            return _copy(vehicle) if vehicle is not None else None
+    
+    def update_vehicle(self, vehicle_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Update vehicle information
+        
+        Args:
+            vehicle_id: Vehicle's unique ID
+            update_data: Dictionary of fields to update
+        
+        Returns:
+            dict: Updated vehicle data or None if not found
+        """
+        changes = {**update_data, "updated_at": to_datetime(datetime.utcnow())}
+        with self.graph.transaction():
+            vehicle = self.graph.update("Vehicle", vehicle_id, changes)
+            return _copy(vehicle) if vehicle is not None else None
+    
+    def delete_vehicle(self, vehicle_id: str) -> bool:
+        """
+        Delete a vehicle (its services stay, without the PROVIDES link)
+        
+        Args:
+            vehicle_id: Vehicle's unique ID
+        
+        Returns:
+            bool: True if deleted, False if not found
+        """
+        return self.graph.delete("Vehicle", vehicle_id)
+    
+    def check_vehicle_availability(
+        self,
+        vehicle_id: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None
+    ) -> bool:
+        """
+        Check if a vehicle is available
+        
+        Only the provider's is_available switch is checked; bookings are not
+        part of the embedded graph.
+        
+        Args:
+            vehicle_id: Vehicle's unique ID
+            start_time: Optional ISO 8601 start of the range to check
+            end_time: Optional ISO 8601 end of the range to check
+        
+        Returns:
+            bool: True if available, False otherwise
+        """
+        with self.graph.lock:
+            vehicle = self.graph.node("Vehicle", vehicle_id)
+            return bool(vehicle and vehicle.get("is_available"))
+    
+    def update_vehicle_availability(self, vehicle_id: str, is_available: bool) -> bool:
+        """
+        Update vehicle availability status
+        
+        Args:
+            vehicle_id: Vehicle's unique ID
+            is_available: New availability status
+        
+        Returns:
+            bool: True if updated successfully
+        """
+        changes = {"is_available": is_available, "updated_at": to_datetime(datetime.utcnow())}
+        return self.graph.update("Vehicle", vehicle_id, changes) is not None
+    
+    def remove_duplicate_vehicles(self, provider_uid: str) -> int:
+        """
+        Remove duplicate vehicles (same registration number) for a provider
+        Keeps the oldest vehicle and removes duplicates
+        
+        Args:
+            provider_uid: Provider's UID
+        
+        Returns:
+            int: Number of duplicates removed
+        """
+        with self.graph.transaction():
+            by_registration: Dict[Any, List[Dict[str, Any]]] = {}
+            for vehicle in self.graph.vehicles_of(provider_uid):
+                by_registration.setdefault(vehicle.get("registration_number"), []).append(vehicle)
+            
+            deleted_count = 0
+            for vehicles in by_registration.values():
+                vehicles.sort(key=lambda vehicle: (vehicle.get("created_at") is None, vehicle.get("created_at") or 0, vehicle["vehicle_id"]))
+                for duplicate in vehicles[1:]:
+                    self.graph.delete("Vehicle", duplicate["vehicle_id"])
+                    deleted_count += 1
+        
+        if deleted_count > 0:
+            print(f"✅ Removed {deleted_count} duplicate vehicles")
+        return deleted_count
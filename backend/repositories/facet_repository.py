@@ -0,0 +1,243 @@
+"""
+Facet Repository - Browse counts per category, city and price band
+
+Active services are counted in (:ServiceFacet {category, city, price_band, count})
+nodes, one per combination of the three dimensions. The counters are adjusted
+in the same transaction as create_service / update_service / delete_service,
+so facet reads scan O(combinations) rows instead of every service. Until the
+counters have been built once (see rebuild_facets.py) reads fall back to a
+single grouped Cypher query over the services.
+"""
+
+from typing import Optional, Dict, Any, List
+from config.neo4j_config import get_neo4j_driver
+from repositories.statements import run_statement
+
+
+FACET_META_NAME = "service_facets"
+
+# Price bands over price_per_hour (PKR): (band, upper bound exclusive)
+PRICE_BANDS = [
+    ("under_2k", 2000),
+    ("2k_5k", 5000),
+    ("5k_10k", 10000),
+    ("10k_plus", None),
+]
+UNPRICED_BAND = "unpriced"
+
+
+def price_band_expression(var: str = "s") -> str:
+    """
+    Cypher CASE expression mapping a service's price_per_hour to its band
+    
+    Args:
+        var: Cypher variable bound to the Service node
+    
+    Returns:
+        str: Cypher expression
+    """
+    branches = [f"WHEN {var}.price_per_hour IS NULL THEN '{UNPRICED_BAND}'"]
+    for band, upper in PRICE_BANDS:
+        if upper is None:
+            branches.append(f"ELSE '{band}'")
+        else:
+            branches.append(f"WHEN {var}.price_per_hour < {upper} THEN '{band}'")
+    return "CASE " + " ".join(branches) + " END"
+
+
+_FACET_KEYS = f"""
+    COALESCE(s.service_category, '') AS category,
+    COALESCE(s.city, '') AS city,
+    {price_band_expression('s')} AS price_band
+"""
+
+
+class FacetRepository:
+    """Repository for faceted browse counts"""
+    
+    def __init__(self):
+        self.driver = get_neo4j_driver()
+    
+    def ensure_constraints(self) -> None:
+        """
+        Create the uniqueness constraint on facet combinations
+        
+        Concurrent MERGEs of a new combination would both create it under a
+        plain index; the constraint makes the second one match instead. It
+        replaces the service_facet_key index of earlier versions, since an
+        index and a constraint cannot cover the same properties.
+        """
+        with self.driver.session() as session:
+            run_statement(session, "FacetRepository.ensure_constraints.drop_service_facet_key", """
+            DROP INDEX service_facet_key IF EXISTS
+            """)
+            run_statement(session, "FacetRepository.ensure_constraints.service_facet_unique", """
+            CREATE CONSTRAINT service_facet_unique IF NOT EXISTS
+            FOR (f:ServiceFacet) REQUIRE (f.category, f.city, f.price_band) IS UNIQUE
+            """)
+    
+    # ==================== INCREMENTAL MAINTENANCE ====================
+    
+    @staticmethod
+    def add_services_tx(tx, service_ids: List[str]) -> None:
+        """
+        Count the given services in their facet combination (active services only)
+        
+        Call inside the write transaction, after the service has been created
+        or updated.
+        """
+        if not service_ids:
+            return
+        query = f"""
+        UNWIND $service_ids AS sid
+        MATCH (s:Service {{service_id: sid}})
+        WHERE s.is_active = true
+        WITH {_FACET_KEYS}, count(*) AS n
+        MERGE (f:ServiceFacet {{category: category, city: city, price_band: price_band}})
+        ON CREATE SET f.count = 0
+        SET f.count = f.count + n
+        """
+        run_statement(tx, "FacetRepository.add_services_tx", query, service_ids=service_ids)
+    
+    @staticmethod
+    def remove_services_tx(tx, service_ids: List[str]) -> None:
+        """
+        Uncount the given services from their facet combination
+        
+        Call inside the write transaction, before the service is updated or
+        deleted, so the old property values are used.
+        """
+        if not service_ids:
+            return
+        query = f"""
+        UNWIND $service_ids AS sid
+        MATCH (s:Service {{service_id: sid}})
+        WHERE s.is_active = true
+        WITH {_FACET_KEYS}, count(*) AS n
+        MATCH (f:ServiceFacet {{category: category, city: city, price_band: price_band}})
+        SET f.count = CASE WHEN f.count > n THEN f.count - n ELSE 0 END
+        """
+        run_statement(tx, "FacetRepository.remove_services_tx", query, service_ids=service_ids)
+    
+    def rebuild_counters(self) -> Dict[str, int]:
+        """
+        Recompute every facet counter from the services and mark the
+        counters as ready for reads
+        
+        Returns:
+            dict: Number of combinations and services counted
+        """
+        print(f"\n{'='*60}")
+        print(f"🔁 REBUILDING SERVICE FACET COUNTERS")
+        print(f"{'='*60}\n")
+        
+        def rebuild_tx(tx):
+            run_statement(tx, "FacetRepository.rebuild_counters.clear", "MATCH (f:ServiceFacet) DELETE f")
+            record = run_statement(tx, "FacetRepository.rebuild_counters.count", f"""
+            MATCH (s:Service)
+            WHERE s.is_active = true
+            WITH {_FACET_KEYS}, count(*) AS n
+            CREATE (f:ServiceFacet {{category: category, city: city, price_band: price_band, count: n}})
+            RETURN count(f) AS combinations, sum(n) AS services
+            """).single()
+            run_statement(tx, "FacetRepository.rebuild_counters.mark_ready", """
+            MERGE (m:FacetMeta {name: $name})
+            SET m.ready = true, m.rebuilt_at = datetime()
+            """, name=FACET_META_NAME)
+            return record
+        
+        with self.driver.session() as session:
+            record = session.execute_write(rebuild_tx)
+        
+        summary = {
+            "combinations": record["combinations"] if record else 0,
+            "services": (record["services"] or 0) if record else 0,
+        }
+        print(f"✅ Counted {summary['services']} active services in {summary['combinations']} combinations\n")
+        return summary
+    
+    # ==================== READS ====================
+    
+    def _counters_ready(self, session) -> bool:
+        record = run_statement(session, "FacetRepository._counters_ready",
+            "MATCH (m:FacetMeta {name: $name}) RETURN m.ready AS ready",
+            name=FACET_META_NAME
+        ).single()
+        return bool(record and record["ready"])
+    
+    def get_service_facets(
+        self,
+        category: Optional[str] = None,
+        city: Optional[str] = None,
+        price_band: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get active service counts per category, city and price band
+        
+        Each dimension's counts apply the filters of the other dimensions,
+        so the client can show how many results every alternative value of
+        that filter would return.
+        
+        Args:
+            category: Current category filter
+            city: Current city filter
+            price_band: Current price band filter
+        
+        Returns:
+            dict: {"categories", "cities", "price_bands": [{"value", "count"}],
+                   "total": int, "source": "counters" | "query"}
+        """
+        with self.driver.session() as session:
+            if self._counters_ready(session):
+                source = "counters"
+                result = run_statement(session, "FacetRepository.get_service_facets.counters", """
+                MATCH (f:ServiceFacet)
+                WHERE f.count > 0
+                RETURN f.category AS category, f.city AS city,
+                       f.price_band AS price_band, f.count AS count
+                """)
+            else:
+                source = "query"
+                result = run_statement(session, "FacetRepository.get_service_facets.live", f"""
+                MATCH (s:Service)
+                WHERE s.is_active = true
+                WITH {_FACET_KEYS}
+                RETURN category, city, price_band, count(*) AS count
+                """)
+            
+            combinations = [
+                (record["category"], record["city"], record["price_band"], record["count"])
+                for record in result
+            ]
+        
+        filters = (category, city, price_band)
+        
+        def matches(combo, skip_dimension=None):
+            for dimension, wanted in enumerate(filters):
+                if dimension == skip_dimension or wanted is None:
+                    continue
+                if combo[dimension] != wanted:
+                    return False
+            return True
+        
+        def facet(dimension):
+            counts: Dict[str, int] = {}
+            for combo in combinations:
+                if matches(combo, skip_dimension=dimension):
+                    counts[combo[dimension]] = counts.get(combo[dimension], 0) + combo[3]
+            return [
+                {"value": value, "count": count}
+                for value, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+                if value != ""
+            ]
+        
+        total = sum(combo[3] for combo in combinations if matches(combo))
+        
+        print(f"📊 Facets computed from {len(combinations)} combinations (source: {source})")
+        return {
+            "categories": facet(0),
+            "cities": facet(1),
+            "price_bands": facet(2),
+            "total": total,
+            "source": source,
+        }
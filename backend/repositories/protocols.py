@@ -0,0 +1,146 @@
+"""
+Storage protocols
+The public methods of the user and vehicle repositories, independent of the database
+
+UserRepository / VehicleRepository (Neo4j) and EmbeddedUserRepository /
+EmbeddedVehicleRepository (embedded graph) both satisfy these protocols;
+resolvers and services obtain one through repositories.backend.
+"""
+
+from typing import Optional, Dict, Any, List, Protocol, runtime_checkable
+
+from models.user import SeekerNode, ProviderNode, VehicleNode, ServiceNode
+
+
+@runtime_checkable
+class UserStore(Protocol):
+    """Users, their vehicles and services (see UserRepository for the semantics)"""
+    
+    # Users
+    def create_seeker(self, seeker: SeekerNode) -> Dict[str, Any]: ...
+    
+    def create_provider(self, provider: ProviderNode) -> Dict[str, Any]: ...
+    
+    def get_user_by_uid(self, uid: str) -> Optional[Dict[str, Any]]: ...
+    
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]: ...
+    
+    def update_seeker(self, uid: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+    
+    def update_provider(self, uid: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+    
+    def delete_user(self, uid: str) -> bool: ...
+    
+    def user_exists(self, uid: str = None, email: str = None) -> bool: ...
+    
+    def get_all_seekers(self, limit: int = 100, skip: int = 0) -> List[Dict[str, Any]]: ...
+    
+    def get_all_providers(self, limit: int = 100, skip: int = 0) -> List[Dict[str, Any]]: ...
+    
+    def search_providers(
+        self,
+        business_type: Optional[str] = None,
+        min_rating: float = 0.0,
+        is_verified: Optional[bool] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]: ...
+    
+    def update_provider_profile(self, uid: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+    
+    def update_seeker_profile(self, uid: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+    
+    def create_seeker_similarity_relationships(self, uid: str) -> Dict[str, Any]: ...
+    
+    def get_similar_seekers(self, uid: str, limit: int = 10) -> List[Dict[str, Any]]: ...
+    
+    # Vehicles
+    def create_vehicle(self, vehicle: VehicleNode) -> Dict[str, Any]: ...
+    
+    def get_provider_vehicles(self, provider_uid: str) -> List[Dict[str, Any]]: ...
+    
+    def get_vehicle_by_id(self, vehicle_id: str) -> Optional[Dict[str, Any]]: ...
+    
+    def update_vehicle(self, vehicle_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+    
+    def delete_vehicle(self, vehicle_id: str) -> bool: ...
+    
+    # Services
+    def create_service(self, service: ServiceNode) -> Dict[str, Any]: ...
+    
+    def get_vehicle_services(self, vehicle_id: str) -> List[Dict[str, Any]]: ...
+    
+    def get_provider_services(self, provider_uid: str) -> List[Dict[str, Any]]: ...
+    
+    def get_service_by_id(self, service_id: str) -> Optional[Dict[str, Any]]: ...
+    
+    def backfill_availability_masks(self, batch_size: int = 500) -> Dict[str, int]: ...
+    
+    def get_active_services(
+        self,
+        category: Optional[str] = None,
+        service_area: Optional[str] = None,
+        min_rating: Optional[float] = None,
+        limit: int = 50,
+        available_during: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]: ...
+    
+    def get_active_services_by_provider(self, provider_uid: str) -> List[Dict[str, Any]]: ...
+    
+    def update_service(self, service_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+    
+    def delete_service(self, service_id: str) -> bool: ...
+    
+    def get_nearby_services(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float = 50,
+        service_category: Optional[str] = None,
+        limit: int = 50,
+        available_during: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]: ...
+    
+    def get_ranking_candidates(
+        self,
+        category: Optional[str] = None,
+        service_area: Optional[str] = None,
+        min_rating: Optional[float] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius_km: Optional[float] = None,
+        limit: int = 500,
+        available_during: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]: ...
+
+
+@runtime_checkable
+class VehicleStore(Protocol):
+    """Vehicle registration and availability (see VehicleRepository for the semantics)"""
+    
+    def create_vehicle(
+        self,
+        provider_uid: str,
+        vehicle_type: str,
+        registration_number: str,
+        model: str,
+        vehicle_image: Optional[str] = None
+    ) -> Dict[str, Any]: ...
+    
+    def get_provider_vehicles(self, provider_uid: str) -> List[Dict[str, Any]]: ...
+    
+    def get_vehicle_by_id(self, vehicle_id: str) -> Optional[Dict[str, Any]]: ...
+    
+    def update_vehicle(self, vehicle_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+    
+    def delete_vehicle(self, vehicle_id: str) -> bool: ...
+    
+    def check_vehicle_availability(
+        self,
+        vehicle_id: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None
+    ) -> bool: ...
+    
+    def update_vehicle_availability(self, vehicle_id: str, is_available: bool) -> bool: ...
+    
+    def remove_duplicate_vehicles(self, provider_uid: str) -> int: ...
@@ -0,0 +1,419 @@
+"""
+Review Repository - Neo4j Database Operations for Reviews
+
+Service and provider ratings are stored as running aggregates
+(rating_sum / rating_count / rating) on the Service and Provider nodes.
+Every review write adjusts those aggregates inside the same transaction,
+so listing queries can sort on s.rating / p.rating without touching
+the Review nodes at read time.
+
+Each write locks the Service and Provider (SET n._lock) before reading
+their aggregates: under read-committed isolation a plain read takes no
+lock, and concurrent reviews of one provider would otherwise lose updates.
+"""
+
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+from neo4j.exceptions import ConstraintError
+from config.neo4j_config import get_neo4j_driver
+from repositories.statements import run_statement
+from models.record_mapper import get_mapper
+from models.user import ReviewNode
+
+
+class ReviewRepository:
+    """Repository for review-related database operations"""
+    
+    def __init__(self):
+        self.driver = get_neo4j_driver()
+    
+    @staticmethod
+    def _format_review(review_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert Neo4j datetime values of a review to ISO format strings"""
+        return get_mapper("Review").to_dict(review_data)
+    
+    def ensure_constraints(self) -> None:
+        """
+        Create the uniqueness constraints and lookup indexes used by reviews
+        
+        review_seeker_service_unique backs the one-review-per-seeker-per-service
+        rule, which a check-then-create alone cannot guarantee.
+        """
+        with self.driver.session() as session:
+            run_statement(session, "ReviewRepository.ensure_constraints.review_id_unique", """
+            CREATE CONSTRAINT review_id_unique IF NOT EXISTS
+            FOR (r:Review) REQUIRE r.review_id IS UNIQUE
+            """)
+            run_statement(session, "ReviewRepository.ensure_constraints.review_seeker_service_unique", """
+            CREATE CONSTRAINT review_seeker_service_unique IF NOT EXISTS
+            FOR (r:Review) REQUIRE (r.seeker_uid, r.service_id) IS UNIQUE
+            """)
+            run_statement(session, "ReviewRepository.ensure_constraints.review_service_id", """
+            CREATE INDEX review_service_id IF NOT EXISTS
+            FOR (r:Review) ON (r.service_id)
+            """)
+            run_statement(session, "ReviewRepository.ensure_constraints.review_provider_uid", """
+            CREATE INDEX review_provider_uid IF NOT EXISTS
+            FOR (r:Review) ON (r.provider_uid)
+            """)
+    
+    # ==================== WRITES (aggregates updated in-transaction) ====================
+    
+    @staticmethod
+    def _create_review_tx(tx, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        existing = run_statement(tx, "ReviewRepository._create_review_tx.existing",
+            """
+            MATCH (:Seeker {uid: $seeker_uid})-[:WROTE]->(r:Review)-[:REVIEWS]->(:Service {service_id: $service_id})
+            RETURN r.review_id AS review_id
+            """,
+            seeker_uid=params["seeker_uid"],
+            service_id=params["service_id"]
+        ).single()
+        
+        if existing:
+            raise Exception("You have already reviewed this service. Update your existing review instead.")
+        
+        query = """
+        MATCH (seeker:Seeker {uid: $seeker_uid})
+        MATCH (s:Service {service_id: $service_id})
+        MATCH (p:Provider {uid: s.provider_uid})
+        SET s._lock = true, p._lock = true
+        WITH seeker, s, p,
+             COALESCE(s.rating_sum, 0.0) + $rating AS service_sum,
+             COALESCE(s.rating_count, 0) + 1 AS service_count,
+             COALESCE(p.rating_sum, 0.0) + $rating AS provider_sum,
+             COALESCE(p.rating_count, 0) + 1 AS provider_count
+        CREATE (r:Review)
+        SET r.review_id = $review_id,
+            r.seeker_uid = $seeker_uid,
+            r.service_id = $service_id,
+            r.provider_uid = p.uid,
+            r.rating = $rating,
+            r.comment = $comment,
+            r.created_at = datetime($created_at),
+            r.updated_at = datetime($updated_at)
+        CREATE (seeker)-[:WROTE]->(r)
+        CREATE (r)-[:REVIEWS]->(s)
+        CREATE (r)-[:ABOUT]->(p)
+        SET s.rating_sum = service_sum,
+            s.rating_count = service_count,
+            s.rating = service_sum / service_count,
+            p.rating_sum = provider_sum,
+            p.rating_count = provider_count,
+            p.rating = provider_sum / provider_count
+        REMOVE s._lock, p._lock
+        RETURN r
+        """
+        
+        record = run_statement(tx, "ReviewRepository._create_review_tx.create", query, params).single()
+        return dict(record["r"]) if record else None
+    
+    def create_review(self, review: ReviewNode) -> Optional[Dict[str, Any]]:
+        """
+        Create a Review node and fold its rating into the service and
+        provider aggregates in a single write transaction
+        
+        Args:
+            review: ReviewNode instance
+        
+        Returns:
+            dict: Created review data, or None if the seeker or service does not exist
+        """
+        review_dict = review.to_dict()
+        
+        print(f"\n{'='*60}")
+        print(f"⭐ CREATING REVIEW NODE IN NEO4J")
+        print(f"   Review ID: {review_dict.get('review_id')}")
+        print(f"   Seeker UID: {review_dict.get('seeker_uid')}")
+        print(f"   Service ID: {review_dict.get('service_id')}")
+        print(f"   Rating: {review_dict.get('rating')}")
+        print(f"{'='*60}\n")
+        
+        try:
+            with self.driver.session() as session:
+                review_data = session.execute_write(self._create_review_tx, review_dict)
+        except ConstraintError:
+            # A concurrent create for the same seeker and service committed first
+            raise Exception("You have already reviewed this service. Update your existing review instead.")
+        
+        if review_data:
+            print(f"✅ Review created and aggregates updated\n")
+            return self._format_review(review_data)
+        
+        print(f"❌ Seeker or service not found\n")
+        return None
+    
+    @staticmethod
+    def _update_review_tx(tx, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        query = """
+        MATCH (seeker:Seeker {uid: $seeker_uid})-[:WROTE]->(r:Review {review_id: $review_id})
+        MATCH (r)-[:REVIEWS]->(s:Service)
+        MATCH (r)-[:ABOUT]->(p:Provider)
+        SET s._lock = true, p._lock = true
+        WITH r, s, p,
+             $rating - r.rating AS delta,
+             COALESCE(s.rating_count, 0) AS service_count,
+             COALESCE(p.rating_count, 0) AS provider_count
+        WITH r, s, p, service_count, provider_count,
+             COALESCE(s.rating_sum, 0.0) + delta AS service_sum,
+             COALESCE(p.rating_sum, 0.0) + delta AS provider_sum
+        SET r.rating = $rating,
+            r.comment = COALESCE($comment, r.comment),
+            r.updated_at = datetime(),
+            s.rating_sum = service_sum,
+            s.rating = CASE WHEN service_count > 0 THEN service_sum / service_count ELSE 0.0 END,
+            p.rating_sum = provider_sum,
+            p.rating = CASE WHEN provider_count > 0 THEN provider_sum / provider_count ELSE 0.0 END
+        REMOVE s._lock, p._lock
+        RETURN r
+        """
+        
+        record = run_statement(tx, "ReviewRepository._update_review_tx", query, params).single()
+        return dict(record["r"]) if record else None
+    
+    def update_review(
+        self,
+        review_id: str,
+        seeker_uid: str,
+        rating: int,
+        comment: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Change a review's rating/comment and apply the rating delta to the
+        service and provider aggregates in the same transaction
+        
+        Args:
+            review_id: Review ID
+            seeker_uid: UID of the seeker who wrote the review
+            rating: New rating (1-5)
+            comment: New comment (keeps the old one if None)
+        
+        Returns:
+            dict: Updated review data or None if not found
+        """
+        params = {
+            "review_id": review_id,
+            "seeker_uid": seeker_uid,
+            "rating": rating,
+            "comment": comment,
+        }
+        
+        with self.driver.session() as session:
+            review_data = session.execute_write(self._update_review_tx, params)
+        
+        if review_data:
+            print(f"✅ Review {review_id} updated\n")
+            return self._format_review(review_data)
+        return None
+    
+    @staticmethod
+    def _delete_review_tx(tx, params: Dict[str, Any]) -> bool:
+        query = """
+        MATCH (:Seeker {uid: $seeker_uid})-[:WROTE]->(r:Review {review_id: $review_id})
+        MATCH (r)-[:REVIEWS]->(s:Service)
+        MATCH (r)-[:ABOUT]->(p:Provider)
+        SET s._lock = true, p._lock = true
+        WITH r, s, p,
+             COALESCE(s.rating_sum, 0.0) - r.rating AS service_sum,
+             CASE WHEN COALESCE(s.rating_count, 0) > 0 THEN s.rating_count - 1 ELSE 0 END AS service_count,
+             COALESCE(p.rating_sum, 0.0) - r.rating AS provider_sum,
+             CASE WHEN COALESCE(p.rating_count, 0) > 0 THEN p.rating_count - 1 ELSE 0 END AS provider_count
+        SET s.rating_count = service_count,
+            s.rating_sum = CASE WHEN service_count > 0 THEN service_sum ELSE 0.0 END,
+            s.rating = CASE WHEN service_count > 0 THEN service_sum / service_count ELSE 0.0 END,
+            p.rating_count = provider_count,
+            p.rating_sum = CASE WHEN provider_count > 0 THEN provider_sum ELSE 0.0 END,
+            p.rating = CASE WHEN provider_count > 0 THEN provider_sum / provider_count ELSE 0.0 END
+        REMOVE s._lock, p._lock
+        DETACH DELETE r
+        RETURN count(*) AS deleted_count
+        """
+        
+        record = run_statement(tx, "ReviewRepository._delete_review_tx", query, params).single()
+        return record is not None and record["deleted_count"] > 0
+    
+    def delete_review(self, review_id: str, seeker_uid: str) -> bool:
+        """
+        Delete a review and remove its rating from the aggregates
+        
+        Args:
+            review_id: Review ID
+            seeker_uid: UID of the seeker who wrote the review
+        
+        Returns:
+            True if deleted, False otherwise
+        """
+        params = {"review_id": review_id, "seeker_uid": seeker_uid}
+        
+        with self.driver.session() as session:
+            deleted = session.execute_write(self._delete_review_tx, params)
+        
+        if deleted:
+            print(f"✅ Review {review_id} deleted\n")
+        else:
+            print(f"❌ Review {review_id} not found\n")
+        return deleted
+    
+    @staticmethod
+    def remove_service_reviews_tx(tx, service_ids: List[str]) -> int:
+        """
+        Delete all reviews of the given services and subtract their ratings
+        from the owning providers' aggregates
+        
+        Meant to be called inside the write transaction that deletes the
+        services themselves, so provider ratings never include reviews of
+        services that no longer exist.
+        
+        Args:
+            tx: Active Neo4j transaction
+            service_ids: IDs of the services being deleted
+        
+        Returns:
+            int: Number of reviews removed
+        """
+        query = """
+        UNWIND $service_ids AS sid
+        MATCH (r:Review)-[:REVIEWS]->(:Service {service_id: sid})
+        MATCH (r)-[:ABOUT]->(p:Provider)
+        WITH p, collect(r) AS reviews, sum(r.rating) AS removed_sum, count(r) AS removed_count
+        SET p._lock = true
+        WITH p, reviews, removed_count,
+             COALESCE(p.rating_sum, 0.0) - removed_sum AS provider_sum,
+             CASE WHEN COALESCE(p.rating_count, 0) > removed_count
+                  THEN p.rating_count - removed_count ELSE 0 END AS provider_count
+        SET p.rating_count = provider_count,
+            p.rating_sum = CASE WHEN provider_count > 0 THEN provider_sum ELSE 0.0 END,
+            p.rating = CASE WHEN provider_count > 0 THEN provider_sum / provider_count ELSE 0.0 END
+        REMOVE p._lock
+        FOREACH (r IN reviews | DETACH DELETE r)
+        RETURN sum(removed_count) AS removed
+        """
+        
+        record = run_statement(tx, "ReviewRepository.remove_service_reviews_tx", query, service_ids=service_ids).single()
+        return (record["removed"] or 0) if record else 0
+    
+    # ==================== READS ====================
+    
+    def get_service_reviews(self, service_id: str, limit: int = 20, skip: int = 0) -> List[Dict[str, Any]]:
+        """
+        Get reviews for a service, newest first
+        
+        Args:
+            service_id: Service ID
+            limit: Maximum number of reviews
+            skip: Number of reviews to skip
+        
+        Returns:
+            List of review data dictionaries
+        """
+        with self.driver.session() as session:
+            query = """
+            MATCH (r:Review)-[:REVIEWS]->(:Service {service_id: $service_id})
+            OPTIONAL MATCH (seeker:Seeker)-[:WROTE]->(r)
+            RETURN r, seeker.full_name AS seeker_name
+            ORDER BY r.created_at DESC
+            SKIP $skip
+            LIMIT $limit
+            """
+            
+            result = run_statement(session, "ReviewRepository.get_service_reviews", query, service_id=service_id, skip=skip, limit=limit)
+            reviews = []
+            for record in result:
+                review_data = self._format_review(dict(record["r"]))
+                review_data["seeker_name"] = record["seeker_name"]
+                reviews.append(review_data)
+            return reviews
+    
+    def get_provider_reviews(self, provider_uid: str, limit: int = 20, skip: int = 0) -> List[Dict[str, Any]]:
+        """
+        Get reviews across all services of a provider, newest first
+        
+        Args:
+            provider_uid: Provider Firebase UID
+            limit: Maximum number of reviews
+            skip: Number of reviews to skip
+        
+        Returns:
+            List of review data dictionaries
+        """
+        with self.driver.session() as session:
+            query = """
+            MATCH (r:Review)-[:ABOUT]->(:Provider {uid: $provider_uid})
+            OPTIONAL MATCH (seeker:Seeker)-[:WROTE]->(r)
+            RETURN r, seeker.full_name AS seeker_name
+            ORDER BY r.created_at DESC
+            SKIP $skip
+            LIMIT $limit
+            """
+            
+            result = run_statement(session, "ReviewRepository.get_provider_reviews", query, provider_uid=provider_uid, skip=skip, limit=limit)
+            reviews = []
+            for record in result:
+                review_data = self._format_review(dict(record["r"]))
+                review_data["seeker_name"] = record["seeker_name"]
+                reviews.append(review_data)
+            return reviews
+    
+    # ==================== BACKFILL ====================
+    
+    def rebuild_rating_aggregates(self, batch_size: int = 1000) -> Dict[str, int]:
+        """
+        Recompute rating_sum / rating_count / rating for every Service and
+        Provider from their Review nodes
+        
+        Used to backfill existing data and to repair drift. Runs in batched
+        auto-commit transactions so it is safe on large graphs.
+        
+        Args:
+            batch_size: Number of nodes updated per inner transaction
+        
+        Returns:
+            dict: Number of services and providers rebuilt
+        """
+        print(f"\n{'='*60}")
+        print(f"🔁 REBUILDING RATING AGGREGATES")
+        print(f"   Batch size: {batch_size}")
+        print(f"{'='*60}\n")
+        
+        started = datetime.utcnow()
+        
+        with self.driver.session() as session:
+            service_query = """
+            MATCH (s:Service)
+            CALL {
+                WITH s
+                OPTIONAL MATCH (r:Review)-[:REVIEWS]->(s)
+                WITH s, toFloat(COALESCE(sum(r.rating), 0)) AS total, count(r) AS n
+                SET s.rating_sum = total,
+                    s.rating_count = n,
+                    s.rating = CASE WHEN n > 0 THEN total / n ELSE 0.0 END
+            } IN TRANSACTIONS OF $batch_size ROWS
+            RETURN count(s) AS rebuilt
+            """
+            record = run_statement(session, "ReviewRepository.rebuild_rating_aggregates.service", service_query, batch_size=batch_size).single()
+            services_rebuilt = record["rebuilt"] if record else 0
+            print(f"   ✓ Services rebuilt: {services_rebuilt}")
+            
+            provider_query = """
+            MATCH (p:Provider)
+            CALL {
+                WITH p
+                OPTIONAL MATCH (r:Review)-[:ABOUT]->(p)
+                WITH p, toFloat(COALESCE(sum(r.rating), 0)) AS total, count(r) AS n
+                SET p.rating_sum = total,
+                    p.rating_count = n,
+                    p.rating = CASE WHEN n > 0 THEN total / n ELSE 0.0 END
+            } IN TRANSACTIONS OF $batch_size ROWS
+            RETURN count(p) AS rebuilt
+            """
+            record = run_statement(session, "ReviewRepository.rebuild_rating_aggregates.provider", provider_query, batch_size=batch_size).single()
+            providers_rebuilt = record["rebuilt"] if record else 0
+            print(f"   ✓ Providers rebuilt: {providers_rebuilt}")
+        
+        elapsed = (datetime.utcnow() - started).total_seconds()
+        print(f"\n✅ Rating aggregates rebuilt in {elapsed:.2f}s\n")
+        
+        return {
+            "services_rebuilt": services_rebuilt,
+            "providers_rebuilt": providers_rebuilt,
+        }
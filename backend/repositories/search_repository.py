@@ -0,0 +1,239 @@
+"""
+Search Repository - Neo4j Full-Text Search over Services and Providers
+"""
+
+from typing import Optional, Dict, Any, List
+from config.neo4j_config import get_neo4j_driver
+from repositories.statements import run_statement
+from models.record_mapper import get_mapper
+
+
+SERVICE_SEARCH_INDEX = "service_search"
+PROVIDER_SEARCH_INDEX = "provider_search"
+
+# Characters with special meaning in Lucene query syntax
+_LUCENE_SPECIAL_CHARS = set('+-&|!(){}[]^"~*?:\\/')
+_LUCENE_OPERATORS = {"AND", "OR", "NOT", "TO"}
+
+
+def build_lucene_query(text: str) -> str:
+    """
+    Turn free text ("crane Lahore 20 ton") into a safe Lucene query
+    
+    Every term is escaped and matched either exactly or as a prefix, and
+    terms are OR-ed so documents matching more terms score higher.
+    
+    Args:
+        text: Raw search text from the client
+    
+    Returns:
+        str: Lucene query string, empty if the text has no usable terms
+    """
+    clauses = []
+    for raw_term in text.split():
+        term = "".join(f"\\{ch}" if ch in _LUCENE_SPECIAL_CHARS else ch for ch in raw_term)
+        if not term:
+            continue
+        if raw_term.upper() in _LUCENE_OPERATORS:
+            term = term.lower()
+        if len(raw_term) >= 3:
+            clauses.append(f"({term} OR {term}*)")
+        else:
+            clauses.append(term)
+    return " ".join(clauses)
+
+
+class SearchRepository:
+    """Repository for full-text search queries"""
+    
+    def __init__(self):
+        self.driver = get_neo4j_driver()
+    
+    def ensure_indexes(self) -> None:
+        """
+        Create the full-text indexes used by service and provider search
+        """
+        with self.driver.session() as session:
+            run_statement(session, "SearchRepository.ensure_indexes.services_index", f"""
+            CREATE FULLTEXT INDEX {SERVICE_SEARCH_INDEX} IF NOT EXISTS
+            FOR (s:Service) ON EACH [s.service_name, s.description, s.full_address, s.city]
+            """)
+            run_statement(session, "SearchRepository.ensure_indexes.providers_index", f"""
+            CREATE FULLTEXT INDEX {PROVIDER_SEARCH_INDEX} IF NOT EXISTS
+            FOR (p:Provider) ON EACH [p.business_name, p.description]
+            """)
+            print(f"✅ Full-text search indexes ready")
+    
+    def search_services(
+        self,
+        text: str,
+        category: Optional[str] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius_km: Optional[float] = None,
+        limit: int = 20,
+        skip: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Full-text search over active services
+        
+        Category and geo filters are applied in the same Cypher query as the
+        index lookup, so only matching rows leave the database.
+        
+        Args:
+            text: Free-text search query
+            category: Optional filter by service category
+            latitude: Optional center latitude for geo filtering
+            longitude: Optional center longitude for geo filtering
+            radius_km: Search radius in kilometers (requires latitude/longitude)
+            limit: Page size
+            skip: Number of results to skip
+        
+        Returns:
+            dict: {"results": [{"service", "score", "distance_km"}], "has_more": bool}
+        """
+        lucene_query = build_lucene_query(text or "")
+        if not lucene_query:
+            return {"results": [], "has_more": False}
+        
+        where_clauses = ["s.is_active = true"]
+        params = {
+            "index_name": SERVICE_SEARCH_INDEX,
+            "search_text": lucene_query,
+            "skip": skip,
+            # Fetch one extra row to know whether another page exists
+            "limit": limit + 1,
+        }
+        
+        if category:
+            where_clauses.append("s.service_category = $category")
+            params["category"] = category
+        
+        use_geo = latitude is not None and longitude is not None
+        if use_geo:
+            distance_expr = """point.distance(
+                     point({latitude: s.latitude, longitude: s.longitude}),
+                     point({latitude: $lat, longitude: $lon})
+                 )"""
+            where_clauses.append("s.latitude IS NOT NULL AND s.longitude IS NOT NULL")
+            params["lat"] = latitude
+            params["lon"] = longitude
+        else:
+            distance_expr = "null"
+        
+        where_clause = " AND ".join(where_clauses)
+        radius_filter = ""
+        if use_geo and radius_km is not None:
+            radius_filter = "WHERE distance <= $radius_meters"
+            params["radius_meters"] = radius_km * 1000
+        
+        query = f"""
+        CALL db.index.fulltext.queryNodes($index_name, $search_text) YIELD node AS s, score
+        WHERE {where_clause}
+        WITH s, score, {distance_expr} AS distance
+        {radius_filter}
+        RETURN s, score, distance
+        ORDER BY score DESC, s.rating DESC
+        SKIP $skip
+        LIMIT $limit
+        """
+        
+        print(f"\n{'='*60}")
+        print(f"🔎 FULL-TEXT SERVICE SEARCH")
+        print(f"   Text: {text}")
+        print(f"   Lucene: {lucene_query}")
+        if category:
+            print(f"   Category Filter: {category}")
+        if use_geo:
+            print(f"   Center: ({latitude}, {longitude}) Radius: {radius_km} km")
+        print(f"{'='*60}\n")
+        
+        with self.driver.session() as session:
+            result = run_statement(session, "SearchRepository.search_services", query, params)
+            
+            results = []
+            for record in result:
+                service_data = get_mapper("Service").to_dict(record["s"])
+                
+                distance = record["distance"]
+                results.append({
+                    "service": service_data,
+                    "score": record["score"],
+                    "distance_km": round(distance / 1000, 2) if distance is not None else None,
+                })
+        
+        has_more = len(results) > limit
+        results = results[:limit]
+        
+        print(f"✅ Found {len(results)} matching services (has_more={has_more})\n")
+        return {"results": results, "has_more": has_more}
+    
+    def search_providers(
+        self,
+        text: str,
+        business_type: Optional[str] = None,
+        city: Optional[str] = None,
+        limit: int = 20,
+        skip: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Full-text search over provider business name and description
+        
+        Args:
+            text: Free-text search query
+            business_type: Optional filter by business type
+            city: Optional filter by city (case-insensitive)
+            limit: Page size
+            skip: Number of results to skip
+        
+        Returns:
+            dict: {"results": [{"provider", "score"}], "has_more": bool}
+        """
+        lucene_query = build_lucene_query(text or "")
+        if not lucene_query:
+            return {"results": [], "has_more": False}
+        
+        where_clauses = ["true"]
+        params = {
+            "index_name": PROVIDER_SEARCH_INDEX,
+            "search_text": lucene_query,
+            "skip": skip,
+            "limit": limit + 1,
+        }
+        
+        if business_type:
+            where_clauses.append("p.business_type = $business_type")
+            params["business_type"] = business_type
+        
+        if city:
+            where_clauses.append("toLower(p.city) = toLower($city)")
+            params["city"] = city
+        
+        where_clause = " AND ".join(where_clauses)
+        
+        query = f"""
+        CALL db.index.fulltext.queryNodes($index_name, $search_text) YIELD node AS p, score
+        WHERE {where_clause}
+        RETURN p, score
+        ORDER BY score DESC, p.rating DESC
+        SKIP $skip
+        LIMIT $limit
+        """
+        
+        with self.driver.session() as session:
+            result = run_statement(session, "SearchRepository.search_providers", query, params)
+            
+            results = []
+            for record in result:
+                provider_data = get_mapper("Provider").to_dict(record["p"])
+                
+                results.append({
+                    "provider": provider_data,
+                    "score": record["score"],
+                })
+        
+        has_more = len(results) > limit
+        results = results[:limit]
+        
+        print(f"✅ Found {len(results)} matching providers (has_more={has_more})\n")
+        return {"results": results, "has_more": has_more}
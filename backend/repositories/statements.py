@@ -0,0 +1,106 @@
+"""
+Statement execution
+Runs a named Cypher statement and records its latency
+
+Every repository query goes through run_statement() with a stable name
+("UserRepository.get_service_by_id", ...). The result is read in full
+before returning, so the recorded latency covers the whole round trip
+(RUN, PULL and streaming the records), not only the time to the first
+response, and the summary is available to callers.
+
+Besides the latency histogram, each run is handed to the slow-query log
+(monitoring.slow_queries) with its result_available_after and
+result_consumed_after, which logs statements over the threshold. When
+tracing is enabled, each statement also gets a span named after it.
+"""
+
+import time
+from typing import Optional, Dict, Any, List, Iterator
+
+from neo4j import Record, ResultSummary
+from opentelemetry.trace import SpanKind
+
+from monitoring.metrics import NEO4J_STATEMENT_SECONDS
+from monitoring.slow_queries import get_slow_query_log
+from monitoring.tracing import tracer, tracing_enabled
+
+
+# Histogram child per statement name (labels() costs as much as observe())
+_statement_histograms: Dict[str, Any] = {}
+
+class StatementResult:
+    """
+    Fully read result of a statement
+    
+    Supports the Result methods the repositories use: iteration, single(),
+    data() and consume().
+    """
+    
+    __slots__ = ("records", "summary")
+    
+    def __init__(self, records: List[Record], summary: ResultSummary):
+        self.records = records
+        self.summary = summary
+    
+    def __iter__(self) -> Iterator[Record]:
+        return iter(self.records)
+    
+    def __len__(self) -> int:
+        return len(self.records)
+    
+    def single(self) -> Optional[Record]:
+        """First record, or None when the statement returned no rows"""
+        return self.records[0] if self.records else None
+    
+    def data(self) -> List[Dict[str, Any]]:
+        """Records as dictionaries"""
+        return [record.data() for record in self.records]
+    
+    def consume(self) -> ResultSummary:
+        """Result summary (counters, timings, notifications)"""
+        return self.summary
+
+
+def run_statement(runner, statement: str, query: str, parameters: Optional[Dict[str, Any]] = None, /, **kwargs) -> StatementResult:
+    """
+    Run a Cypher statement on a session or transaction and read its result
+    
+    Args:
+        runner: Session or transaction (anything with run())
+        statement: Stable statement name used as the metrics label and span name
+        query: Cypher text
+        parameters: Query parameters (kwargs are merged in, as with run())
+    
+    Returns:
+        StatementResult: All records plus the result summary
+    """
+    if not tracing_enabled():
+        return _run(runner, statement, query, parameters, kwargs)
+    
+    with tracer.start_as_current_span(
+        statement,
+        kind=SpanKind.CLIENT,
+        attributes={"db.system": "neo4j", "db.operation.name": statement, "db.query.text": query},
+    ) as span:
+        result = _run(runner, statement, query, parameters, kwargs)
+        span.set_attributes({
+            "db.response.returned_rows": len(result.records),
+            "neo4j.result_available_after_ms": result.summary.result_available_after or 0,
+            "neo4j.result_consumed_after_ms": result.summary.result_consumed_after or 0,
+        })
+        return result
+
+
+def _run(runner, statement: str, query: str, parameters: Optional[Dict[str, Any]], kwargs: Dict[str, Any]) -> StatementResult:
+    start = time.perf_counter()
+    result = runner.run(query, parameters, **kwargs)
+    records = list(result)
+    summary = result.consume()
+    elapsed = time.perf_counter() - start
+    
+    histogram = _statement_histograms.get(statement)
+    if histogram is None:
+        histogram = _statement_histograms[statement] = NEO4J_STATEMENT_SECONDS.labels(statement)
+    histogram.observe(elapsed)
+    get_slow_query_log().observe(statement, query, {**(parameters or {}), **kwargs}, elapsed, summary)
+    return StatementResult(records, summary)
@@ -5,7 +5,13 @@ User Repository - Neo4j Database Operations
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from config.neo4j_config import get_neo4j_driver
+from repositories.statements import run_statement
 from models.user import UserType, SeekerNode, ProviderNode, VehicleNode, ServiceNode
+from repositories.review_repository import ReviewRepository
+from repositories.facet_repository import FacetRepository
+from repositories.booking_repository import BookingRepository
+from models.availability import mask_runs, availability_filter_clause
+from models.record_mapper import get_mapper
 
 
 class UserRepository:
@@ -65,7 +71,7 @@ class UserRepository:
             RETURN s
             """
             
-            result = session.run(query, **seeker_dict)
+            result = run_statement(session, "UserRepository.create_seeker", query, seeker_dict)
             record = result.single()
             
             if record:
@@ -140,13 +146,15 @@ class UserRepository:
                 p.documents_uploaded = $documents_uploaded,
                 p.verification_status = $verification_status,
                 p.rating = $rating,
+                p.rating_sum = $rating_sum,
+                p.rating_count = $rating_count,
                 p.total_bookings = $total_bookings,
                 p.created_at = datetime($created_at),
                 p.updated_at = datetime($updated_at)
             RETURN p
             """
             
-            result = session.run(query, **provider_dict)
+            result = run_statement(session, "UserRepository.create_provider", query, provider_dict)
             record = result.single()
             
             if record:
@@ -185,7 +193,7 @@ class UserRepository:
             RETURN u, labels(u) as labels
             """
             
-            result = session.run(query, uid=uid)
+            result = run_statement(session, "UserRepository.get_user_by_uid", query, uid=uid)
             record = result.single()
             
             if record:
@@ -211,7 +219,7 @@ class UserRepository:
             RETURN u, labels(u) as labels
             """
             
-            result = session.run(query, email=email)
+            result = run_statement(session, "UserRepository.get_user_by_email", query, email=email)
             record = result.single()
             
             if record:
@@ -248,7 +256,7 @@ class UserRepository:
             RETURN s
             """
             
-            result = session.run(query, uid=uid, **updates)
+            result = run_statement(session, "UserRepository.update_seeker", query, uid=uid, **updates)
             record = result.single()
             
             if record:
@@ -283,7 +291,7 @@ class UserRepository:
             RETURN p
             """
             
-            result = session.run(query, uid=uid, **updates)
+            result = run_statement(session, "UserRepository.update_provider", query, uid=uid, **updates)
             record = result.single()
             
             if record:
@@ -308,7 +316,7 @@ class UserRepository:
             RETURN count(u) as deleted_count
             """
             
-            result = session.run(query, uid=uid)
+            result = run_statement(session, "UserRepository.delete_user", query, uid=uid)
             record = result.single()
             
             return record["deleted_count"] > 0 if record else False
@@ -334,14 +342,14 @@ class UserRepository:
                 WHERE (u:Seeker OR u:Provider) AND u.uid = $uid
                 RETURN count(u) > 0 as exists
                 """
-                result = session.run(query, uid=uid)
+                result = run_statement(session, "UserRepository.user_exists.by_uid", query, uid=uid)
             else:
                 query = """
                 MATCH (u)
                 WHERE (u:Seeker OR u:Provider) AND u.email = $email
                 RETURN count(u) > 0 as exists
                 """
-                result = session.run(query, email=email)
+                result = run_statement(session, "UserRepository.user_exists.by_email", query, email=email)
             
             record = result.single()
             return record["exists"] if record else False
@@ -366,7 +374,7 @@ class UserRepository:
             LIMIT $limit
             """
             
-            result = session.run(query, skip=skip, limit=limit)
+            result = run_statement(session, "UserRepository.get_all_seekers", query, skip=skip, limit=limit)
             return [dict(record["s"]) for record in result]
     
     def get_all_providers(self, limit: int = 100, skip: int = 0) -> List[Dict[str, Any]]:
@@ -389,7 +397,7 @@ class UserRepository:
             LIMIT $limit
             """
             
-            result = session.run(query, skip=skip, limit=limit)
+            result = run_statement(session, "UserRepository.get_all_providers", query, skip=skip, limit=limit)
             return [dict(record["p"]) for record in result]
     
     def search_providers(
@@ -433,7 +441,7 @@ class UserRepository:
             LIMIT $limit
             """
             
-            result = session.run(query, **params)
+            result = run_statement(session, "UserRepository.search_providers", query, params)
             return [dict(record["p"]) for record in result]
 
 
@@ -472,23 +480,11 @@ class UserRepository:
             RETURN p
             """
             
-            result = session.run(query, params)
+            result = run_statement(session, "UserRepository.update_provider_profile", query, params)
             record = result.single()
             
             if record:
-                node_data = dict(record["p"])
-                
-                # Convert Neo4j datetime objects to ISO format strings
-                if 'created_at' in node_data and hasattr(node_data['created_at'], 'iso_format'):
-                    node_data['created_at'] = node_data['created_at'].iso_format()
-                elif 'created_at' in node_data and hasattr(node_data['created_at'], 'isoformat'):
-                    node_data['created_at'] = node_data['created_at'].isoformat()
-                    
-                if 'updated_at' in node_data and hasattr(node_data['updated_at'], 'iso_format'):
-                    node_data['updated_at'] = node_data['updated_at'].iso_format()
-                elif 'updated_at' in node_data and hasattr(node_data['updated_at'], 'isoformat'):
-                    node_data['updated_at'] = node_data['updated_at'].isoformat()
-                
+                node_data = get_mapper("Provider").to_dict(record["p"])
                 return node_data
             else:
                 return None
@@ -535,23 +531,11 @@ class UserRepository:
             print(f"   {query}")
             print(f" Parameters: {params}\n")
             
-            result = session.run(query, params)
+            result = run_statement(session, "UserRepository.update_seeker_profile", query, params)
             record = result.single()
             
             if record:
-                node_data = dict(record["s"])
-                
-                # Convert Neo4j datetime objects to ISO format strings
-                if 'created_at' in node_data and hasattr(node_data['created_at'], 'iso_format'):
-                    node_data['created_at'] = node_data['created_at'].iso_format()
-                elif 'created_at' in node_data and hasattr(node_data['created_at'], 'isoformat'):
-                    node_data['created_at'] = node_data['created_at'].isoformat()
-                    
-                if 'updated_at' in node_data and hasattr(node_data['updated_at'], 'iso_format'):
-                    node_data['updated_at'] = node_data['updated_at'].iso_format()
-                elif 'updated_at' in node_data and hasattr(node_data['updated_at'], 'isoformat'):
-                    node_data['updated_at'] = node_data['updated_at'].isoformat()
-                
+                node_data = get_mapper("Seeker").to_dict(record["s"])
                 print(f"✅ Seeker profile updated successfully")
                 print(f"   Total properties: {len(node_data)}")
                 print(f"   Updated fields: {list(update_data.keys())}")
@@ -595,7 +579,7 @@ class UserRepository:
                    s.address as address
             """
             
-            result = session.run(get_seeker_query, uid=uid)
+            result = run_statement(session, "UserRepository.create_seeker_similarity_relationships.get_seeker", get_seeker_query, uid=uid)
             record = result.single()
             
             if not record:
@@ -656,7 +640,7 @@ class UserRepository:
                     RETURN s2.uid as similar_uid, s2.full_name as name, r.strength as strength
                     """
                     
-                    category_result = session.run(find_query, uid=uid, category=category)
+                    category_result = run_statement(session, "UserRepository.create_seeker_similarity_relationships.find", find_query, uid=uid, category=category)
                     for rec in category_result:
                         relationships_created += 1
                         similar_seekers.append({
@@ -683,7 +667,7 @@ class UserRepository:
                 RETURN s2.uid as similar_uid, s2.full_name as name, r.strength as strength
                 """
                 
-                purpose_result = session.run(purpose_query, uid=uid, purpose=purpose)
+                purpose_result = run_statement(session, "UserRepository.create_seeker_similarity_relationships.purpose", purpose_query, uid=uid, purpose=purpose)
                 for rec in purpose_result:
                     relationships_created += 1
                     similar_seekers.append({
@@ -710,7 +694,7 @@ class UserRepository:
                 RETURN s2.uid as similar_uid, s2.full_name as name, r.strength as strength
                 """
                 
-                urgency_result = session.run(urgency_query, uid=uid, urgency=urgency)
+                urgency_result = run_statement(session, "UserRepository.create_seeker_similarity_relationships.urgency", urgency_query, uid=uid, urgency=urgency)
                 for rec in urgency_result:
                     relationships_created += 1
                     similar_seekers.append({
@@ -737,7 +721,7 @@ class UserRepository:
                 RETURN s2.uid as similar_uid, s2.full_name as name, r.strength as strength
                 """
                 
-                location_result = session.run(location_query, uid=uid, address=address)
+                location_result = run_statement(session, "UserRepository.create_seeker_similarity_relationships.location", location_query, uid=uid, address=address)
                 for rec in location_result:
                     relationships_created += 1
                     similar_seekers.append({
@@ -783,7 +767,7 @@ class UserRepository:
             LIMIT $limit
             """
             
-            result = session.run(query, uid=uid, limit=limit)
+            result = run_statement(session, "UserRepository.get_similar_seekers", query, uid=uid, limit=limit)
             similar_seekers = []
             
             for record in result:
@@ -845,6 +829,7 @@ class UserRepository:
                 v.has_insurance = $has_insurance,
                 v.insurance_expiry = $insurance_expiry,
                 v.is_available = $is_available,
+                v.availability_mask = $availability_mask,
                 v.city = $city,
                 v.province = $province,
                 v.price_per_hour = $price_per_hour,
@@ -856,7 +841,7 @@ class UserRepository:
             RETURN v
             """
             
-            result = session.run(query, **vehicle_dict)
+            result = run_statement(session, "UserRepository.create_vehicle", query, vehicle_dict)
             record = result.single()
             
             if record:
@@ -883,24 +868,11 @@ class UserRepository:
             ORDER BY v.created_at DESC
             """
             
-            result = session.run(query, provider_uid=provider_uid)
+            result = run_statement(session, "UserRepository.get_provider_vehicles", query, provider_uid=provider_uid)
             vehicles = []
             
             for record in result:
-                vehicle_data = dict(record["v"])
-                # Convert datetime objects to ISO format
-                if vehicle_data.get('created_at'):
-                    if hasattr(vehicle_data['created_at'], 'iso_format'):
-                        vehicle_data['created_at'] = vehicle_data['created_at'].iso_format()
-                    elif hasattr(vehicle_data['created_at'], 'isoformat'):
-                        vehicle_data['created_at'] = vehicle_data['created_at'].isoformat()
-                        
-                if vehicle_data.get('updated_at'):
-                    if hasattr(vehicle_data['updated_at'], 'iso_format'):
-                        vehicle_data['updated_at'] = vehicle_data['updated_at'].iso_format()
-                    elif hasattr(vehicle_data['updated_at'], 'isoformat'):
-                        vehicle_data['updated_at'] = vehicle_data['updated_at'].isoformat()
-                        
+                vehicle_data = get_mapper("Vehicle").to_dict(record["v"])
                 vehicles.append(vehicle_data)
             
             print(f"📋 Retrieved {len(vehicles)} vehicles for provider {provider_uid}")
@@ -922,24 +894,11 @@ class UserRepository:
             RETURN v
             """
             
-            result = session.run(query, vehicle_id=vehicle_id)
+            result = run_statement(session, "UserRepository.get_vehicle_by_id", query, vehicle_id=vehicle_id)
             record = result.single()
             
             if record:
-                vehicle_data = dict(record["v"])
-                # Convert datetime
-                if vehicle_data.get('created_at'):
-                    if hasattr(vehicle_data['created_at'], 'iso_format'):
-                        vehicle_data['created_at'] = vehicle_data['created_at'].iso_format()
-                    elif hasattr(vehicle_data['created_at'], 'isoformat'):
-                        vehicle_data['created_at'] = vehicle_data['created_at'].isoformat()
-                        
-                if vehicle_data.get('updated_at'):
-                    if hasattr(vehicle_data['updated_at'], 'iso_format'):
-                        vehicle_data['updated_at'] = vehicle_data['updated_at'].iso_format()
-                    elif hasattr(vehicle_data['updated_at'], 'isoformat'):
-                        vehicle_data['updated_at'] = vehicle_data['updated_at'].isoformat()
-                        
+                vehicle_data = get_mapper("Vehicle").to_dict(record["v"])
                 return vehicle_data
             return None
     
@@ -980,24 +939,11 @@ class UserRepository:
             RETURN v
             """
             
-            result = session.run(query, params)
+            result = run_statement(session, "UserRepository.update_vehicle", query, params)
             record = result.single()
             
             if record:
-                vehicle_data = dict(record["v"])
-                # Convert datetime
-                if vehicle_data.get('created_at'):
-                    if hasattr(vehicle_data['created_at'], 'iso_format'):
-                        vehicle_data['created_at'] = vehicle_data['created_at'].iso_format()
-                    elif hasattr(vehicle_data['created_at'], 'isoformat'):
-                        vehicle_data['created_at'] = vehicle_data['created_at'].isoformat()
-                        
-                if vehicle_data.get('updated_at'):
-                    if hasattr(vehicle_data['updated_at'], 'iso_format'):
-                        vehicle_data['updated_at'] = vehicle_data['updated_at'].iso_format()
-                    elif hasattr(vehicle_data['updated_at'], 'isoformat'):
-                        vehicle_data['updated_at'] = vehicle_data['updated_at'].isoformat()
-                        
+                vehicle_data = get_mapper("Vehicle").to_dict(record["v"])
                 print(f"✅ Vehicle updated successfully\n")
                 return vehicle_data
             return None
@@ -1024,21 +970,34 @@ class UserRepository:
             RETURN count(s) as service_count
             """
             
-            count_result = session.run(count_query, vehicle_id=vehicle_id)
+            count_result = run_statement(session, "UserRepository.delete_vehicle.count", count_query, vehicle_id=vehicle_id)
             count_record = count_result.single()
             service_count = count_record["service_count"] if count_record else 0
             
-            # Delete vehicle and all related services
+            # Delete vehicle and all related services (and their reviews) and bookings
             delete_query = """
             MATCH (v:Vehicle {vehicle_id: $vehicle_id})
             OPTIONAL MATCH (v)-[:PROVIDES]->(s:Service)
-            OPTIONAL MATCH (p:Provider)-[r:OFFERS]->(s)
-            DELETE r, s, v
-            RETURN count(v) as deleted_count
+            DETACH DELETE s, v
+            RETURN count(DISTINCT v) as deleted_count
             """
             
-            result = session.run(delete_query, vehicle_id=vehicle_id)
-            record = result.single()
+            def delete_tx(tx):
+                service_ids = [
+                    rec["service_id"] for rec in run_statement(tx, "UserRepository.delete_vehicle.service_ids",
+                        """
+                        MATCH (:Vehicle {vehicle_id: $vehicle_id})-[:PROVIDES]->(s:Service)
+                        RETURN s.service_id as service_id
+                        """,
+                        vehicle_id=vehicle_id
+                    )
+                ]
+                ReviewRepository.remove_service_reviews_tx(tx, service_ids)
+                FacetRepository.remove_services_tx(tx, service_ids)
+                BookingRepository.remove_vehicle_bookings_tx(tx, [vehicle_id])
+                return run_statement(tx, "UserRepository.delete_vehicle.delete", delete_query, vehicle_id=vehicle_id).single()
+            
+            record = session.execute_write(delete_tx)
             
             if record and record["deleted_count"] > 0:
                 print(f"✅ Vehicle deleted successfully")
@@ -1098,11 +1057,14 @@ class UserRepository:
                 s.is_active = $is_active,
                 s.available_days = $available_days,
                 s.available_hours = $available_hours,
+                s.availability_mask = $availability_mask,
                 s.operator_included = $operator_included,
                 s.fuel_included = $fuel_included,
                 s.transportation_included = $transportation_included,
                 s.total_bookings = $total_bookings,
                 s.rating = $rating,
+                s.rating_sum = $rating_sum,
+                s.rating_count = $rating_count,
                 s.created_at = datetime($created_at),
                 s.updated_at = datetime($updated_at)
             CREATE (p)-[:OFFERS]->(s)
@@ -1110,8 +1072,14 @@ class UserRepository:
             RETURN s
             """
             
-            result = session.run(query, **service_dict)
-            record = result.single()
+            # Facet counters are updated in the same transaction as the create
+            def create_tx(tx):
+                created = run_statement(tx, "UserRepository.create_service", query, service_dict).single()
+                if created:
+                    FacetRepository.add_services_tx(tx, [service_dict['service_id']])
+                return created
+            
+            record = session.execute_write(create_tx)
             
             if record:
                 node_data = dict(record["s"])
@@ -1137,24 +1105,11 @@ class UserRepository:
             ORDER BY s.created_at DESC
             """
             
-            result = session.run(query, vehicle_id=vehicle_id)
+            result = run_statement(session, "UserRepository.get_vehicle_services", query, vehicle_id=vehicle_id)
             services = []
             
             for record in result:
-                service_data = dict(record["s"])
-                # Convert datetime
-                if service_data.get('created_at'):
-                    if hasattr(service_data['created_at'], 'iso_format'):
-                        service_data['created_at'] = service_data['created_at'].iso_format()
-                    elif hasattr(service_data['created_at'], 'isoformat'):
-                        service_data['created_at'] = service_data['created_at'].isoformat()
-                        
-                if service_data.get('updated_at'):
-                    if hasattr(service_data['updated_at'], 'iso_format'):
-                        service_data['updated_at'] = service_data['updated_at'].iso_format()
-                    elif hasattr(service_data['updated_at'], 'isoformat'):
-                        service_data['updated_at'] = service_data['updated_at'].isoformat()
-                        
+                service_data = get_mapper("Service").to_dict(record["s"])
                 services.append(service_data)
             
             print(f"📋 Retrieved {len(services)} services for vehicle {vehicle_id}")
@@ -1177,24 +1132,11 @@ class UserRepository:
             ORDER BY s.created_at DESC
             """
             
-            result = session.run(query, provider_uid=provider_uid)
+            result = run_statement(session, "UserRepository.get_provider_services", query, provider_uid=provider_uid)
             services = []
             
             for record in result:
-                service_data = dict(record["s"])
-                # Convert datetime
-                if service_data.get('created_at'):
-                    if hasattr(service_data['created_at'], 'iso_format'):
-                        service_data['created_at'] = service_data['created_at'].iso_format()
-                    elif hasattr(service_data['created_at'], 'isoformat'):
-                        service_data['created_at'] = service_data['created_at'].isoformat()
-                        
-                if service_data.get('updated_at'):
-                    if hasattr(service_data['updated_at'], 'iso_format'):
-                        service_data['updated_at'] = service_data['updated_at'].iso_format()
-                    elif hasattr(service_data['updated_at'], 'isoformat'):
-                        service_data['updated_at'] = service_data['updated_at'].isoformat()
-                        
+                service_data = get_mapper("Service").to_dict(record["s"])
                 services.append(service_data)
             
             print(f"📋 Retrieved {len(services)} services for provider {provider_uid}")
@@ -1216,27 +1158,64 @@ class UserRepository:
             RETURN s
             """
             
-            result = session.run(query, service_id=service_id)
+            result = run_statement(session, "UserRepository.get_service_by_id", query, service_id=service_id)
             record = result.single()
             
             if record:
-                service_data = dict(record["s"])
-                # Convert datetime
-                if service_data.get('created_at'):
-                    if hasattr(service_data['created_at'], 'iso_format'):
-                        service_data['created_at'] = service_data['created_at'].iso_format()
-                    elif hasattr(service_data['created_at'], 'isoformat'):
-                        service_data['created_at'] = service_data['created_at'].isoformat()
-                        
-                if service_data.get('updated_at'):
-                    if hasattr(service_data['updated_at'], 'iso_format'):
-                        service_data['updated_at'] = service_data['updated_at'].iso_format()
-                    elif hasattr(service_data['updated_at'], 'isoformat'):
-                        service_data['updated_at'] = service_data['updated_at'].isoformat()
-                        
+                service_data = get_mapper("Service").to_dict(record["s"])
                 return service_data
             return None
     
+    def backfill_availability_masks(self, batch_size: int = 500) -> Dict[str, int]:
+        """
+        Derive availability_mask for services that only have the legacy
+        available_days / available_hours strings
+        
+        Args:
+            batch_size: Services read and written per round trip
+        
+        Returns:
+            dict: Number of services updated and left without a mask
+        """
+        from models.availability import mask_from_legacy
+        
+        updated = 0
+        unparsed = 0
+        last_id = ""
+        with self.driver.session() as session:
+            while True:
+                rows = run_statement(session, "UserRepository.backfill_availability_masks.batch", """
+                MATCH (s:Service)
+                WHERE s.availability_mask IS NULL AND s.service_id > $last_id
+                RETURN s.service_id AS service_id,
+                       s.available_days AS available_days,
+                       s.available_hours AS available_hours
+                ORDER BY s.service_id
+                LIMIT $batch_size
+                """, last_id=last_id, batch_size=batch_size).data()
+                if not rows:
+                    break
+                last_id = rows[-1]["service_id"]
+                
+                masks = []
+                for row in rows:
+                    mask = mask_from_legacy(row["available_days"], row["available_hours"])
+                    if mask is None:
+                        unparsed += 1
+                    else:
+                        masks.append({"service_id": row["service_id"], "mask": mask})
+                
+                if masks:
+                    run_statement(session, "UserRepository.backfill_availability_masks.write", """
+                    UNWIND $masks AS row
+                    MATCH (s:Service {service_id: row.service_id})
+                    SET s.availability_mask = row.mask
+                    """, masks=masks)
+                    updated += len(masks)
+        
+        print(f"✅ Availability masks set on {updated} services ({unparsed} not parseable)")
+        return {"updated": updated, "unparsed": unparsed}
+    
     # ==================== SEEKER-FACING SERVICE QUERIES ====================
     
     def get_active_services(
@@ -1244,7 +1223,8 @@ class UserRepository:
         category: Optional[str] = None, 
         service_area: Optional[str] = None,
         min_rating: Optional[float] = None,
-        limit: int = 50
+        limit: int = 50,
+        available_during: Optional[List[int]] = None
     ) -> List[Dict[str, Any]]:
         """
         Get all active services (for seekers) with optional filters
@@ -1254,6 +1234,7 @@ class UserRepository:
             service_area: Filter by service area
             min_rating: Minimum rating filter
             limit: Maximum number of results
+            available_during: 7-day availability mask the service must cover
         
         Returns:
             List of active service data dictionaries
@@ -1275,6 +1256,10 @@ class UserRepository:
                 where_clauses.append("s.rating >= $min_rating")
                 params["min_rating"] = min_rating
             
+            if available_during is not None:
+                where_clauses.append(availability_filter_clause("s"))
+                params["availability_runs"] = mask_runs(available_during)
+            
             where_clause = " AND ".join(where_clauses)
             
             query = f"""
@@ -1285,24 +1270,11 @@ class UserRepository:
             LIMIT $limit
             """
             
-            result = session.run(query, params)
+            result = run_statement(session, "UserRepository.get_active_services", query, params)
             services = []
             
             for record in result:
-                service_data = dict(record["s"])
-                # Convert datetime
-                if service_data.get('created_at'):
-                    if hasattr(service_data['created_at'], 'iso_format'):
-                        service_data['created_at'] = service_data['created_at'].iso_format()
-                    elif hasattr(service_data['created_at'], 'isoformat'):
-                        service_data['created_at'] = service_data['created_at'].isoformat()
-                        
-                if service_data.get('updated_at'):
-                    if hasattr(service_data['updated_at'], 'iso_format'):
-                        service_data['updated_at'] = service_data['updated_at'].iso_format()
-                    elif hasattr(service_data['updated_at'], 'isoformat'):
-                        service_data['updated_at'] = service_data['updated_at'].isoformat()
-                        
+                service_data = get_mapper("Service").to_dict(record["s"])
                 services.append(service_data)
             
             print(f"📋 Retrieved {len(services)} active services (seeker view)")
@@ -1326,24 +1298,11 @@ class UserRepository:
             ORDER BY s.rating DESC, s.created_at DESC
             """
             
-            result = session.run(query, provider_uid=provider_uid)
+            result = run_statement(session, "UserRepository.get_active_services_by_provider", query, provider_uid=provider_uid)
             services = []
             
             for record in result:
-                service_data = dict(record["s"])
-                # Convert datetime
-                if service_data.get('created_at'):
-                    if hasattr(service_data['created_at'], 'iso_format'):
-                        service_data['created_at'] = service_data['created_at'].iso_format()
-                    elif hasattr(service_data['created_at'], 'isoformat'):
-                        service_data['created_at'] = service_data['created_at'].isoformat()
-                        
-                if service_data.get('updated_at'):
-                    if hasattr(service_data['updated_at'], 'iso_format'):
-                        service_data['updated_at'] = service_data['updated_at'].iso_format()
-                    elif hasattr(service_data['updated_at'], 'isoformat'):
-                        service_data['updated_at'] = service_data['updated_at'].isoformat()
-                        
+                service_data = get_mapper("Service").to_dict(record["s"])
                 services.append(service_data)
             
             print(f"📋 Retrieved {len(services)} active services for provider {provider_uid} (seeker view)")
@@ -1386,24 +1345,17 @@ class UserRepository:
             RETURN s
             """
             
-            result = session.run(query, params)
-            record = result.single()
+            # Move the service between facet counters in the same transaction
+            def update_tx(tx):
+                FacetRepository.remove_services_tx(tx, [service_id])
+                updated = run_statement(tx, "UserRepository.update_service", query, params).single()
+                FacetRepository.add_services_tx(tx, [service_id])
+                return updated
+            
+            record = session.execute_write(update_tx)
             
             if record:
-                service_data = dict(record["s"])
-                # Convert datetime
-                if service_data.get('created_at'):
-                    if hasattr(service_data['created_at'], 'iso_format'):
-                        service_data['created_at'] = service_data['created_at'].iso_format()
-                    elif hasattr(service_data['created_at'], 'isoformat'):
-                        service_data['created_at'] = service_data['created_at'].isoformat()
-                        
-                if service_data.get('updated_at'):
-                    if hasattr(service_data['updated_at'], 'iso_format'):
-                        service_data['updated_at'] = service_data['updated_at'].iso_format()
-                    elif hasattr(service_data['updated_at'], 'isoformat'):
-                        service_data['updated_at'] = service_data['updated_at'].isoformat()
-                        
+                service_data = get_mapper("Service").to_dict(record["s"])
                 print(f"✅ Service updated successfully\n")
                 return service_data
             return None
@@ -1432,8 +1384,13 @@ class UserRepository:
             RETURN count(s) as deleted_count
             """
             
-            result = session.run(query, service_id=service_id)
-            record = result.single()
+            # Reviews (with provider rating) and facet counters are adjusted in the same transaction
+            def delete_tx(tx):
+                ReviewRepository.remove_service_reviews_tx(tx, [service_id])
+                FacetRepository.remove_services_tx(tx, [service_id])
+                return run_statement(tx, "UserRepository.delete_service", query, service_id=service_id).single()
+            
+            record = session.execute_write(delete_tx)
             
             if record and record["deleted_count"] > 0:
                 print(f"✅ Service deleted successfully\n")
@@ -1448,7 +1405,8 @@ class UserRepository:
         longitude: float,
         radius_km: float = 50,
         service_category: Optional[str] = None,
-        limit: int = 50
+        limit: int = 50,
+        available_during: Optional[List[int]] = None
     ) -> List[Dict[str, Any]]:
         """
         Find services within a specified radius using Neo4j geospatial queries
@@ -1459,6 +1417,7 @@ class UserRepository:
             radius_km: Search radius in kilometers (default: 50km)
             service_category: Optional filter by service category
             limit: Maximum number of results (default: 50)
+            available_during: 7-day availability mask the service must cover
         
         Returns:
             List of services with distance information, ordered by distance
@@ -1477,12 +1436,17 @@ class UserRepository:
             if service_category:
                 category_filter = "AND s.service_category = $service_category"
             
+            availability_filter = ""
+            if available_during is not None:
+                availability_filter = f"AND {availability_filter_clause('s')}"
+            
             query = f"""
             MATCH (s:Service)
             WHERE s.latitude IS NOT NULL 
               AND s.longitude IS NOT NULL
               AND s.is_active = true
               {category_filter}
+              {availability_filter}
             WITH s, 
                  point.distance(
                      point({{latitude: s.latitude, longitude: s.longitude}}),
@@ -1504,30 +1468,122 @@ class UserRepository:
             if service_category:
                 params["service_category"] = service_category
             
-            result = session.run(query, params)
+            if available_during is not None:
+                params["availability_runs"] = mask_runs(available_during)
+            
+            result = run_statement(session, "UserRepository.get_nearby_services", query, params)
             
             services = []
             for record in result:
-                service_data = dict(record["s"])
+                service_data = get_mapper("Service").to_dict(record["s"])
                 distance_meters = record["distance"]
                 
                 # Convert distance to kilometers
                 service_data["distance_km"] = round(distance_meters / 1000, 2)
                 
-                # Format datetime fields
-                if service_data.get('created_at'):
-                    if hasattr(service_data['created_at'], 'iso_format'):
-                        service_data['created_at'] = service_data['created_at'].iso_format()
-                    elif hasattr(service_data['created_at'], 'isoformat'):
-                        service_data['created_at'] = service_data['created_at'].isoformat()
-                        
-                if service_data.get('updated_at'):
-                    if hasattr(service_data['updated_at'], 'iso_format'):
-                        service_data['updated_at'] = service_data['updated_at'].iso_format()
-                    elif hasattr(service_data['updated_at'], 'isoformat'):
-                        service_data['updated_at'] = service_data['updated_at'].isoformat()
-                
                 services.append(service_data)
             
             print(f"✅ Found {len(services)} services within {radius_km}km\n")
             return services
+    
+    def get_ranking_candidates(
+        self,
+        category: Optional[str] = None,
+        service_area: Optional[str] = None,
+        min_rating: Optional[float] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius_km: Optional[float] = None,
+        limit: int = 500,
+        available_during: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch the candidate pool for the ranking stage
+        
+        Applies the same filters as get_active_services / get_nearby_services
+        and returns the extra columns the ranker needs (distance, provider
+        verification, last-touched time) alongside each service.
+        
+        Args:
+            category: Filter by service category
+            service_area: Filter by service area
+            min_rating: Minimum rating filter
+            latitude: Optional center latitude
+            longitude: Optional center longitude
+            radius_km: Search radius in kilometers (requires latitude/longitude)
+            limit: Maximum candidate pool size
+            available_during: 7-day availability mask the service must cover
+        
+        Returns:
+            List of {"service", "distance_km", "provider_verified", "touched_epoch"}
+        """
+        where_clauses = ["s.is_active = true"]
+        params = {"limit": limit}
+        
+        if category:
+            where_clauses.append("s.service_category = $category")
+            params["category"] = category
+        
+        if service_area:
+            where_clauses.append("s.service_area = $service_area")
+            params["service_area"] = service_area
+        
+        if min_rating is not None:
+            where_clauses.append("s.rating >= $min_rating")
+            params["min_rating"] = min_rating
+        
+        if available_during is not None:
+            where_clauses.append(availability_filter_clause("s"))
+            params["availability_runs"] = mask_runs(available_during)
+        
+        use_geo = latitude is not None and longitude is not None
+        radius_filter = ""
+        if use_geo:
+            where_clauses.append("s.latitude IS NOT NULL AND s.longitude IS NOT NULL")
+            distance_expr = """point.distance(
+                     point({latitude: s.latitude, longitude: s.longitude}),
+                     point({latitude: $lat, longitude: $lon})
+                 )"""
+            params["lat"] = latitude
+            params["lon"] = longitude
+            if radius_km is not None:
+                radius_filter = "WHERE distance <= $radius_meters"
+                params["radius_meters"] = radius_km * 1000
+            # Nearest candidates first so the pool covers the closest services
+            order_by = "distance ASC"
+        else:
+            distance_expr = "null"
+            order_by = "s.rating DESC, s.created_at DESC"
+        
+        where_clause = " AND ".join(where_clauses)
+        
+        query = f"""
+        MATCH (s:Service)
+        WHERE {where_clause}
+        WITH s, {distance_expr} AS distance
+        {radius_filter}
+        OPTIONAL MATCH (p:Provider)-[:OFFERS]->(s)
+        RETURN s, distance,
+               COALESCE(p.is_verified, false) AS provider_verified,
+               COALESCE(s.updated_at, s.created_at).epochSeconds AS touched_epoch
+        ORDER BY {order_by}
+        LIMIT $limit
+        """
+        
+        with self.driver.session() as session:
+            result = run_statement(session, "UserRepository.get_ranking_candidates", query, params)
+            
+            candidates = []
+            for record in result:
+                service_data = get_mapper("Service").to_dict(record["s"])
+                
+                distance = record["distance"]
+                candidates.append({
+                    "service": service_data,
+                    "distance_km": round(distance / 1000, 2) if distance is not None else None,
+                    "provider_verified": record["provider_verified"],
+                    "touched_epoch": record["touched_epoch"],
+                })
+        
+        print(f"📋 Retrieved {len(candidates)} ranking candidates")
+        return candidates
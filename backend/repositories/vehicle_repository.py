@@ -6,6 +6,7 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime
 import uuid
 from config.neo4j_config import get_neo4j_driver
+from repositories.statements import run_statement
 
 
 class VehicleRepository:
@@ -71,7 +72,7 @@ class VehicleRepository:
             RETURN v
             """
             
-            result = session.run(
+            result = run_statement(session, "VehicleRepository.create_vehicle",
                 query,
                 provider_uid=provider_uid,
                 vehicle_id=vehicle_id,
@@ -109,7 +110,7 @@ class VehicleRepository:
             ORDER BY v.created_at DESC
             """
             
-            result = session.run(query, provider_uid=provider_uid)
+            result = run_statement(session, "VehicleRepository.get_provider_vehicles", query, provider_uid=provider_uid)
             vehicles = []
             
             for record in result:
@@ -134,7 +135,7 @@ class VehicleRepository:
             RETURN v
             """
             
-            result = session.run(query, vehicle_id=vehicle_id)
+            result = run_statement(session, "VehicleRepository.get_vehicle_by_id", query, vehicle_id=vehicle_id)
             record = result.single()
             
             if record:
@@ -166,7 +167,7 @@ class VehicleRepository:
             RETURN v
             """
             
-            result = session.run(query, vehicle_id=vehicle_id, **update_data)
+            result = run_statement(session, "VehicleRepository.update_vehicle", query, vehicle_id=vehicle_id, **update_data)
             record = result.single()
             
             if record:
@@ -186,21 +187,36 @@ class VehicleRepository:
         with self.driver.session() as session:
             query = """
             MATCH (v:Vehicle {vehicle_id: $vehicle_id})
-            DETACH DELETE v
-            RETURN count(v) as deleted_count
+            OPTIONAL MATCH (v)-[:HAS_BOOKING]->(b:Booking)
+            DETACH DELETE b, v
+            RETURN count(DISTINCT v) as deleted_count
             """
             
-            result = session.run(query, vehicle_id=vehicle_id)
+            result = run_statement(session, "VehicleRepository.delete_vehicle", query, vehicle_id=vehicle_id)
             record = result.single()
             
+            from repositories.booking_repository import BookingRepository
+            BookingRepository.invalidate(vehicle_id)
+            
             return record["deleted_count"] > 0 if record else False
     
-    def check_vehicle_availability(self, vehicle_id: str) -> bool:
+    def check_vehicle_availability(
+        self,
+        vehicle_id: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None
+    ) -> bool:
         """
         Check if a vehicle is available
         
+        is_available is the provider's global on/off switch. When a time
+        range is given the vehicle must also have no confirmed booking
+        overlapping it.
+        
         Args:
             vehicle_id: Vehicle's unique ID
+            start_time: Optional ISO 8601 start of the range to check
+            end_time: Optional ISO 8601 end of the range to check
         
         Returns:
             bool: True if available, False otherwise
@@ -211,10 +227,16 @@ class VehicleRepository:
             RETURN v.is_available as is_available
             """
             
-            result = session.run(query, vehicle_id=vehicle_id)
+            result = run_statement(session, "VehicleRepository.check_vehicle_availability", query, vehicle_id=vehicle_id)
             record = result.single()
             
-            return record["is_available"] if record else False
+            if not record or not record["is_available"]:
+                return False
+        
+        if start_time is not None and end_time is not None:
+            from repositories.booking_repository import BookingRepository
+            return BookingRepository().has_conflict(vehicle_id, start_time, end_time) is False
+        return True
     
     def update_vehicle_availability(self, vehicle_id: str, is_available: bool) -> bool:
         """
@@ -235,7 +257,7 @@ class VehicleRepository:
             RETURN v
             """
             
-            result = session.run(
+            result = run_statement(session, "VehicleRepository.update_vehicle_availability",
                 query,
                 vehicle_id=vehicle_id,
                 is_available=is_available,
@@ -248,7 +270,7 @@ class VehicleRepository:
     def remove_duplicate_vehicles(self, provider_uid: str) -> int:
         """
         Remove duplicate vehicles (same registration number) for a provider
-        Keeps the oldest vehicle and removes duplicates
+        Keeps the oldest vehicle and removes duplicates, with their bookings
         
         Args:
             provider_uid: Provider's UID
@@ -256,21 +278,34 @@ class VehicleRepository:
         Returns:
             int: Number of duplicates removed
         """
+        from repositories.booking_repository import BookingRepository
+        
+        def remove_tx(tx):
+            duplicate_ids = [
+                record["vehicle_id"] for record in run_statement(tx, "VehicleRepository.remove_duplicate_vehicles.find", """
+                MATCH (p:Provider {uid: $provider_uid})-[:OWNS]->(v:Vehicle)
+                WITH v.registration_number as reg_num, COLLECT(v) as vehicles
+                WHERE SIZE(vehicles) > 1
+                UNWIND vehicles[1..] as duplicate
+                RETURN duplicate.vehicle_id as vehicle_id
+                """, provider_uid=provider_uid)
+            ]
+            # Bookings go in the same transaction (and each index is invalidated), as in delete_vehicle
+            BookingRepository.remove_vehicle_bookings_tx(tx, duplicate_ids)
+            record = run_statement(tx, "VehicleRepository.remove_duplicate_vehicles.delete", """
+            UNWIND $vehicle_ids AS vid
+            MATCH (v:Vehicle {vehicle_id: vid})
+            DETACH DELETE v
+            RETURN COUNT(v) as deleted_count
+            """, vehicle_ids=duplicate_ids).single()
+            return duplicate_ids, record["deleted_count"] if record else 0
+        
         with self.driver.session() as session:
-            query = """
-            MATCH (p:Provider {uid: $provider_uid})-[:OWNS]->(v:Vehicle)
-            WITH v.registration_number as reg_num, COLLECT(v) as vehicles
-            WHERE SIZE(vehicles) > 1
-            WITH vehicles
-            UNWIND vehicles[1..] as duplicate
-            DETACH DELETE duplicate
-            RETURN COUNT(duplicate) as deleted_count
-            """
-            
-            result = session.run(query, provider_uid=provider_uid)
-            record = result.single()
+            duplicate_ids, deleted_count = session.execute_write(remove_tx)
             
-            deleted_count = record["deleted_count"] if record else 0
+            # Again once committed, so no index rebuilt during the transaction survives it
+            for vehicle_id in duplicate_ids:
+                BookingRepository.invalidate(vehicle_id)
             if deleted_count > 0:
                 print(f"🧹 Removed {deleted_count} duplicate vehicles for provider {provider_uid}")
             
@@ -0,0 +1,149 @@
+"""
+Production server launcher
+
+Runs the API under uvicorn without the reloader:
+- one worker process per available CPU core (settings.WORKERS overrides)
+- uvloop event loop and httptools parser from uvicorn[standard], with a
+  fallback to asyncio/h11 when they are not installed
+- a deep listen backlog and a keep-alive timeout above the load balancer's
+- graceful drain: a stopping worker finishes in-flight requests for up to
+  settings.GRACEFUL_TIMEOUT seconds
+
+The application is imported once here before any worker starts, so a
+broken import or bad .env fails fast instead of crash-looping every worker.
+Workers then import it again themselves; Firebase and the Neo4j pool are
+created in each worker's lifespan, never shared across processes.
+
+Usage:
+    python serve.py                      # workers = CPU count
+    python serve.py --workers 4 --port 8000
+    kill -HUP <pid>                      # rolling restart, one worker at a time (2+ workers)
+    kill -TERM <pid>                     # drain all workers and exit
+
+main.py's __main__ block remains the development server (reload=DEBUG).
+"""
+
+import argparse
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+
+import uvicorn
+
+from config import settings
+
+
+def available_cpus() -> int:
+    """CPU cores this process may run on (honours affinity/cgroup cpusets)"""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+def worker_count(requested: int = 0) -> int:
+    """
+    Number of worker processes to run
+    
+    Args:
+        requested: Explicit count; 0 means one per available CPU core
+    
+    Returns:
+        int: Worker count (at least 1)
+    """
+    return requested if requested > 0 else available_cpus()
+
+
+def event_loop() -> str:
+    """uvloop when installed, otherwise the standard asyncio loop"""
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    """httptools when installed, otherwise the pure-Python h11 parser"""
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def prepare_metrics_dir() -> str:
+    """
+    Point prometheus_client at a fresh shared directory so /metrics on any
+    worker reports the sum over all workers
+    
+    Must run before the workers start: they inherit the environment
+    variable. An existing PROMETHEUS_MULTIPROC_DIR is emptied and reused.
+    
+    Returns:
+        str: The metrics directory
+    """
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or os.path.join(tempfile.gettempdir(), f"haulistry-metrics-{os.getpid()}")
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+    return path
+
+
+def preload_app() -> None:
+    """Import main:app in the supervisor so configuration errors surface once"""
+    from main import app  # noqa: F401
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Haulistry API in production mode")
+    parser.add_argument("--host", default=settings.API_HOST, help="Bind address")
+    parser.add_argument("--port", type=int, default=settings.API_PORT, help="Bind port")
+    parser.add_argument("--workers", type=int, default=settings.WORKERS, help="Worker processes (0 = CPU count)")
+    parser.add_argument("--no-preload", action="store_true", help="Skip importing the app before starting workers")
+    args = parser.parse_args()
+    
+    workers = worker_count(args.workers)
+    if workers > 1 and settings.STORAGE_BACKEND == "embedded":
+        print("⚠️  STORAGE_BACKEND=embedded holds the graph in process memory; running a single worker")
+        workers = 1
+    loop = event_loop()
+    http = http_protocol()
+    
+    print(f"\n{'='*60}")
+    print(f"🏭 HAULISTRY PRODUCTION SERVER")
+    print(f"{'='*60}")
+    print(f"   📍 Bind:       {args.host}:{args.port} (backlog {settings.SERVER_BACKLOG})")
+    print(f"   👷 Workers:    {workers} ({available_cpus()} CPU cores available)")
+    print(f"   🔁 Loop/HTTP:  {loop} / {http}")
+    print(f"   ⏱️  Keep-alive: {settings.KEEPALIVE_TIMEOUT}s, graceful drain {settings.GRACEFUL_TIMEOUT}s")
+    print(f"{'='*60}\n")
+    
+    if settings.DEBUG:
+        print("⚠️  DEBUG is enabled; set DEBUG=False in .env for production error messages")
+    if workers > 1 and settings.EVENT_BROKER_BACKEND == "memory":
+        print("⚠️  EVENT_BROKER_BACKEND=memory: subscriptions only see events published by their own worker")
+    if loop == "asyncio" or http == "h11":
+        print("⚠️  uvloop/httptools not installed; install uvicorn[standard] for full throughput")
+    
+    if workers > 1:
+        print(f"📈 Metrics from all workers aggregated in {prepare_metrics_dir()}")
+    
+    if not args.no_preload:
+        preload_app()
+    
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        ws="websockets",
+        reload=False,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.KEEPALIVE_TIMEOUT,
+        timeout_graceful_shutdown=settings.GRACEFUL_TIMEOUT,
+        proxy_headers=True,
+        server_header=False,
+        access_log=settings.LOG_LEVEL.upper() == "DEBUG",
+        log_level=settings.LOG_LEVEL.lower()
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
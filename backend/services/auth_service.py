@@ -1,13 +1,23 @@
 """
 Authentication Service
 Handles user authentication using Firebase and Neo4j
+
+Firebase Admin calls are awaited through config.firebase_async, so a slow
+or unreachable Firebase never blocks the event loop. With
+REGISTRATION_MODE=outbox, registration returns once the Firebase user and
+its token exist; services.registration_outbox creates the profile. With
+SESSION_TOKENS, start_session exchanges a Firebase ID token for API session
+tokens (services.session_tokens).
 """
 
 from typing import Dict, Any, Optional, Tuple
-from firebase_admin import auth as firebase_auth
 from firebase_admin.exceptions import FirebaseError
-from config.firebase import create_user, verify_token, get_user_by_email, create_custom_token
-from repositories.user_repository import UserRepository
+from config.firebase_async import get_async_firebase, FirebaseUnavailableError
+from repositories.backend import get_user_repository
+from services.session_tokens import session_tokens_enabled, get_session_tokens, authenticate, account_active
+from services.registration_outbox import (
+    outbox_enabled, get_registration_outbox, get_registration_worker, pending_profile
+)
 from models.user import UserType, SeekerNode, ProviderNode
 from models.schemas import SeekerRegisterRequest, ProviderRegisterRequest, LoginRequest
 
@@ -16,7 +26,58 @@ class AuthService:
     """Service for handling authentication operations"""
     
     def __init__(self):
-        self.user_repo = UserRepository()
+        self.user_repo = get_user_repository()
+        self.firebase = get_async_firebase()
+    
+    def _email_taken(self, email: str) -> bool:
+        """Whether a user, or a registration still in the outbox, has this email"""
+        if self.user_repo.user_exists(email=email):
+            return True
+        return outbox_enabled() and get_registration_outbox().has_email(email)
+    
+    async def _enqueue_profile(self, uid: str, user_type: UserType, node) -> Dict[str, Any]:
+        """
+        Hand a new profile to the registration outbox instead of creating it
+        
+        Args:
+            uid: Firebase UID of the new user
+            user_type: Seeker or provider
+            node: SeekerNode or ProviderNode
+        
+        Returns:
+            dict: The profile as it will be stored
+        """
+        profile = node.to_dict()
+        try:
+            get_registration_outbox().add(uid, user_type.value, profile)
+        except Exception as outbox_error:
+            # Nothing would ever create the profile; undo the Firebase user
+            print(f"❌ Registration outbox error: {str(outbox_error)}, rolling back...")
+            try:
+                await self.firebase.delete_user(uid)
+            except Exception:
+                pass
+            raise Exception(f"Failed to save registration: {str(outbox_error)}. Please try again.")
+        
+        get_registration_worker().notify()
+        print(f"📮 Profile queued in the registration outbox: {uid}")
+        return {**profile, "name": profile["full_name"]}
+    
+    async def _get_user(self, uid: str) -> Optional[Dict[str, Any]]:
+        """
+        get_user_by_uid, finishing or falling back to a registration that is
+        still in the outbox
+        """
+        user_data = self.user_repo.get_user_by_uid(uid)
+        if user_data is not None or not outbox_enabled():
+            return user_data
+        
+        record = get_registration_outbox().get(uid)
+        if record is None:
+            return None
+        if await get_registration_worker().flush(uid):
+            return self.user_repo.get_user_by_uid(uid)
+        return pending_profile(record)
     
     async def register_seeker(self, request: SeekerRegisterRequest) -> Dict[str, Any]:
         """
@@ -43,7 +104,7 @@ class AuthService:
             
             # Check if user already exists in Neo4j database
             print("📋 Checking if user exists in Neo4j...")
-            if self.user_repo.user_exists(email=request.email):
+            if self._email_taken(request.email):
                 print("❌ User already exists")
                 raise Exception("An account with this email already exists. Please use a different email or try logging in.")
             print("✅ Email available")
@@ -51,7 +112,7 @@ class AuthService:
             # Create user in Firebase Authentication
             print("🔥 Creating Firebase user...")
             try:
-                firebase_user = create_user(
+                firebase_user = await self.firebase.create_user(
                     email=request.email,
                     password=request.password,
                     display_name=request.full_name,
@@ -81,29 +142,32 @@ class AuthService:
                 phone=request.phone
             )
             
-            try:
-                seeker_data = self.user_repo.create_seeker(seeker)
-                print(f"✅ Neo4j node created: {seeker_data}")
-                
-                if not seeker_data:
-                    # Rollback: delete Firebase user if database creation fails
-                    print("❌ Neo4j creation returned None, rolling back Firebase user...")
-                    firebase_auth.delete_user(firebase_user.uid)
-                    raise Exception("Failed to create user profile. Please try again.")
-                    
-            except Exception as db_error:
-                # Rollback: delete Firebase user if database operation fails
-                print(f"❌ Neo4j error: {str(db_error)}, rolling back...")
+            if outbox_enabled():
+                seeker_data = await self._enqueue_profile(firebase_user.uid, UserType.SEEKER, seeker)
+            else:
                 try:
-                    firebase_auth.delete_user(firebase_user.uid)
-                except:
-                    pass  # If rollback fails, log it but don't block error message
-                raise Exception(f"Database error: {str(db_error)}. Please try again.")
+                    seeker_data = self.user_repo.create_seeker(seeker)
+                    print(f"✅ Neo4j node created: {seeker_data}")
+                    
+                    if not seeker_data:
+                        # Rollback: delete Firebase user if database creation fails
+                        print("❌ Neo4j creation returned None, rolling back Firebase user...")
+                        await self.firebase.delete_user(firebase_user.uid)
+                        raise Exception("Failed to create user profile. Please try again.")
+                        
+                except Exception as db_error:
+                    # Rollback: delete Firebase user if database operation fails
+                    print(f"❌ Neo4j error: {str(db_error)}, rolling back...")
+                    try:
+                        await self.firebase.delete_user(firebase_user.uid)
+                    except:
+                        pass  # If rollback fails, log it but don't block error message
+                    raise Exception(f"Database error: {str(db_error)}. Please try again.")
             
             # Generate custom authentication token
             print("🔑 Generating custom token...")
             try:
-                custom_token = create_custom_token(
+                custom_token = await self.firebase.create_custom_token(
                     firebase_user.uid, 
                     {"user_type": UserType.SEEKER.value}
                 )
@@ -143,7 +207,7 @@ class AuthService:
         """
         try:
             # Check if user already exists in Neo4j database
-            if self.user_repo.user_exists(email=request.email):
+            if self._email_taken(request.email):
                 raise Exception("An account with this email already exists. Please use a different email or try logging in.")
             
             # Business fields are now optional - validate only if provided
@@ -155,7 +219,7 @@ class AuthService:
             
             # Create user in Firebase Authentication
             try:
-                firebase_user = create_user(
+                firebase_user = await self.firebase.create_user(
                     email=request.email,
                     password=request.password,
                     display_name=request.full_name,
@@ -206,25 +270,28 @@ class AuthService:
                 description=request.description
             )
             
-            try:
-                provider_data = self.user_repo.create_provider(provider)
-                
-                if not provider_data:
-                    # Rollback: delete Firebase user if database creation fails
-                    firebase_auth.delete_user(firebase_user.uid)
-                    raise Exception("Failed to create provider profile. Please try again.")
-                    
-            except Exception as db_error:
-                # Rollback: delete Firebase user if database operation fails
+            if outbox_enabled():
+                provider_data = await self._enqueue_profile(firebase_user.uid, UserType.PROVIDER, provider)
+            else:
                 try:
-                    firebase_auth.delete_user(firebase_user.uid)
-                except:
-                    pass  # If rollback fails, log it but don't block error message
-                raise Exception(f"Database error: {str(db_error)}. Please try again.")
+                    provider_data = self.user_repo.create_provider(provider)
+                    
+                    if not provider_data:
+                        # Rollback: delete Firebase user if database creation fails
+                        await self.firebase.delete_user(firebase_user.uid)
+                        raise Exception("Failed to create provider profile. Please try again.")
+                        
+                except Exception as db_error:
+                    # Rollback: delete Firebase user if database operation fails
+                    try:
+                        await self.firebase.delete_user(firebase_user.uid)
+                    except:
+                        pass  # If rollback fails, log it but don't block error message
+                    raise Exception(f"Database error: {str(db_error)}. Please try again.")
             
             # Generate custom authentication token
             try:
-                custom_token = create_custom_token(
+                custom_token = await self.firebase.create_custom_token(
                     firebase_user.uid,
                     {"user_type": UserType.PROVIDER.value}
                 )
@@ -271,13 +338,15 @@ class AuthService:
             
             # Get Firebase user by email
             try:
-                firebase_user = get_user_by_email(request.email.strip())
+                firebase_user = await self.firebase.get_user_by_email(request.email.strip())
+            except FirebaseUnavailableError:
+                raise
             except Exception as fe:
                 # Don't reveal if email exists or not for security
                 raise Exception("Invalid email or password. Please check your credentials and try again.")
             
             # Get user profile from Neo4j database
-            user_data = self.user_repo.get_user_by_uid(firebase_user.uid)
+            user_data = await self._get_user(firebase_user.uid)
             
             if not user_data:
                 raise Exception("User profile not found. Please contact support if this persists.")
@@ -315,7 +384,7 @@ class AuthService:
             
             # Generate custom authentication token
             try:
-                custom_token = create_custom_token(
+                custom_token = await self.firebase.create_custom_token(
                     firebase_user.uid,
                     {"user_type": user_type}
                 )
@@ -335,21 +404,59 @@ class AuthService:
                 raise
             raise Exception(f"Login failed: {error_msg}")
     
+    async def start_session(self, id_token: str) -> Dict[str, Any]:
+        """
+        Issue API session tokens to the holder of a Firebase ID token
+        
+        The ID token is what proves the user signed in with Firebase
+        (password or another provider); login only looks the email up, so
+        sessions are issued here and never from login.
+        
+        Args:
+            id_token: Firebase ID token from signing in with the Firebase SDK
+        
+        Returns:
+            dict: access_token, refresh_token and expires_in
+        
+        Raises:
+            Exception: If session tokens are off, or the token or account is not valid
+        """
+        if not session_tokens_enabled():
+            raise Exception("Session tokens are not enabled")
+        
+        decoded = await self.firebase.verify_token(id_token)
+        if not await account_active(decoded["uid"], decoded.get("iat", 0)):
+            raise Exception("This account has been disabled or signed out. Please sign in again.")
+        
+        user_data = await self._get_user(decoded["uid"])
+        if not user_data:
+            raise Exception("User profile not found. Please contact support if this persists.")
+        
+        labels = user_data.get("labels", [])
+        if "Seeker" in labels:
+            user_type = UserType.SEEKER.value
+        elif "Provider" in labels:
+            user_type = UserType.PROVIDER.value
+        else:
+            raise Exception("Invalid user account type. Please contact support.")
+        
+        return get_session_tokens().issue(decoded["uid"], user_type)
+    
     async def verify_firebase_token(self, id_token: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
         """
-        Verify Firebase ID token
+        Verify Firebase ID token (or an API session token, when enabled)
         
         Args:
-            id_token: Firebase ID token from client
+            id_token: Firebase ID token or session access token from client
         
         Returns:
             tuple: (is_valid, user_data)
         """
         try:
-            decoded_token = verify_token(id_token)
+            decoded_token = await authenticate(id_token)
             
             # Get user data from Neo4j
-            user_data = self.user_repo.get_user_by_uid(decoded_token["uid"])
+            user_data = await self._get_user(decoded_token["uid"])
             
             if user_data:
                 # Determine user type
@@ -380,7 +487,7 @@ class AuthService:
             dict: User profile data
         """
         try:
-            user_data = self.user_repo.get_user_by_uid(uid)
+            user_data = await self._get_user(uid)
             
             if not user_data:
                 return None
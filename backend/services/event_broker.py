@@ -0,0 +1,282 @@
+"""
+Event Broker
+In-process async pub/sub feeding the GraphQL subscriptions
+
+Mutations publish change events under string topic keys; every subscription
+holds a small asyncio queue registered under exactly one key, so a publish
+costs O(matching subscribers) no matter how many idle subscribers exist.
+
+Delivery to the local subscriptions goes through a BrokerBackend. The
+default MemoryBackend delivers straight back into this process; a shared
+backend (RedisBackend, or any BrokerBackend subclass) relays every event to
+all workers so a mutation handled by one worker reaches subscribers
+connected to another.
+"""
+
+import asyncio
+import json
+from typing import Optional, Dict, Any, Set, AsyncIterator, Callable, List
+
+from config.settings import settings
+
+
+# Topics
+SERVICE_CHANGED = "service_changed"
+VEHICLE_AVAILABILITY_CHANGED = "vehicle_availability_changed"
+PROFILE_UPDATED = "profile_updated"
+SESSION_REVOKED = "session_revoked"  # Internal: session token deny-list entries (services.session_tokens)
+
+# Placeholder for "any value" in a topic key
+ANY = "*"
+
+Deliver = Callable[[str, Dict[str, Any]], None]
+
+
+def topic_key(topic: str, *parts: Optional[str]) -> str:
+    """Build the key a subscription registers under, e.g. service_changed:Crane:*"""
+    return ":".join([topic] + [ANY if part is None else str(part) for part in parts])
+
+
+# ==================== BACKENDS ====================
+
+class BrokerBackend:
+    """
+    Transport between publishers and the local fan-out
+    
+    Subclasses must eventually call the deliver callback passed to start()
+    once for every event published by any process sharing the backend,
+    including this one.
+    """
+    
+    async def start(self, deliver: Deliver) -> None:
+        raise NotImplementedError
+    
+    async def publish(self, key: str, payload: Dict[str, Any]) -> None:
+        raise NotImplementedError
+    
+    async def stop(self) -> None:
+        pass
+
+
+class MemoryBackend(BrokerBackend):
+    """Single-process backend: publish delivers directly"""
+    
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+    
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+    
+    async def publish(self, key: str, payload: Dict[str, Any]) -> None:
+        if self._deliver is not None:
+            self._deliver(key, payload)
+
+
+class RedisBackend(BrokerBackend):
+    """
+    Shares events between workers over one Redis pub/sub channel
+    
+    Requires the optional `redis` package (redis.asyncio).
+    """
+    
+    def __init__(self, url: str, channel: str = "haulistry:events"):
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("EVENT_BROKER_BACKEND=redis requires the 'redis' package") from e
+        self._redis = redis_asyncio.from_url(url)
+        self._channel = channel
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+    
+    async def start(self, deliver: Deliver) -> None:
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self._channel)
+        
+        async def read_loop():
+            async for message in self._pubsub.listen():
+                try:
+                    event = json.loads(message["data"])
+                    deliver(event["key"], event["payload"])
+                except Exception as e:
+                    print(f"⚠️  Dropped malformed broker message: {str(e)}")
+        
+        self._reader = asyncio.create_task(read_loop())
+    
+    async def publish(self, key: str, payload: Dict[str, Any]) -> None:
+        await self._redis.publish(self._channel, json.dumps({"key": key, "payload": payload}, default=str))
+    
+    async def stop(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(self._channel)
+            await self._pubsub.close()
+        await self._redis.close()
+
+
+# ==================== BROKER ====================
+
+class EventBroker:
+    """Local subscription registry and fan-out"""
+    
+    def __init__(self, backend: Optional[BrokerBackend] = None, queue_size: int = 64):
+        self.backend = backend or MemoryBackend()
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._started = False
+        self.stats = {"published": 0, "delivered": 0, "dropped": 0}
+    
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+    
+    async def start(self) -> None:
+        if not self._started:
+            await self.backend.start(self._deliver)
+            self._started = True
+    
+    async def stop(self) -> None:
+        if self._started:
+            await self.backend.stop()
+            self._started = False
+    
+    def _deliver(self, key: str, payload: Dict[str, Any]) -> None:
+        """Put the event on the queue of every subscription under key"""
+        for queue in self._subscribers.get(key, ()):
+            if queue.full():
+                # Slow consumer: drop its oldest event rather than block everyone
+                queue.get_nowait()
+                self.stats["dropped"] += 1
+            queue.put_nowait(payload)
+            self.stats["delivered"] += 1
+    
+    async def publish(self, keys: List[str], payload: Dict[str, Any]) -> None:
+        """
+        Publish one event under several keys
+        
+        Args:
+            keys: Topic keys whose subscribers should receive the event
+            payload: JSON-serializable event data
+        """
+        await self.start()
+        self.stats["published"] += 1
+        for key in keys:
+            await self.backend.publish(key, payload)
+    
+    async def subscribe(self, key: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield events published under key until the consumer goes away
+        
+        Args:
+            key: Topic key built with topic_key()
+        """
+        await self.start()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(key, set()).add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            queues = self._subscribers.get(key)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[key]
+
+
+_broker: Optional[EventBroker] = None
+
+
+def get_event_broker() -> EventBroker:
+    """Return the process-wide broker, creating it from settings on first use"""
+    global _broker
+    if _broker is None:
+        if settings.EVENT_BROKER_BACKEND == "redis":
+            backend = RedisBackend(settings.EVENT_BROKER_REDIS_URL)
+        else:
+            backend = MemoryBackend()
+        _broker = EventBroker(backend, queue_size=settings.EVENT_BROKER_QUEUE_SIZE)
+    return _broker
+
+
+# ==================== PUBLISH HELPERS (used by mutations) ====================
+
+async def _safe_publish(keys: List[str], payload: Dict[str, Any]) -> None:
+    # A broker outage must never fail the mutation that already committed
+    try:
+        await get_event_broker().publish(keys, payload)
+    except Exception as e:
+        print(f"⚠️  Could not publish {keys[0]}: {str(e)}")
+
+
+async def publish_service_changed(action: str, service: Dict[str, Any]) -> None:
+    """
+    Notify service_changed subscribers
+    
+    Published under every (category, area) combination a subscription can
+    filter on, so subscribers never have to filter events themselves.
+    
+    Args:
+        action: created, updated or deleted
+        service: Service data (for deletes, as it was before deletion)
+    """
+    category = service.get("service_category")
+    area = service.get("service_area")
+    keys = [
+        topic_key(SERVICE_CHANGED, None, None),
+        topic_key(SERVICE_CHANGED, category, None),
+        topic_key(SERVICE_CHANGED, None, area),
+        topic_key(SERVICE_CHANGED, category, area),
+    ]
+    payload = {
+        "action": action,
+        "service_id": service.get("service_id"),
+        "provider_uid": service.get("provider_uid"),
+        "service": service if action != "deleted" else None,
+    }
+    await _safe_publish(list(dict.fromkeys(keys)), payload)
+
+
+async def publish_vehicle_availability_changed(
+    action: str,
+    provider_uid: str,
+    vehicle_id: str,
+    is_available: Optional[bool] = None,
+    booking_id: Optional[str] = None
+) -> None:
+    """
+    Notify vehicle_availability_changed subscribers of a provider
+    
+    Args:
+        action: created, updated, deleted, booked or booking_cancelled
+        provider_uid: Vehicle owner
+        vehicle_id: Vehicle ID
+        is_available: Current global availability switch, when known
+        booking_id: Booking that changed the vehicle's schedule, if any
+    """
+    payload = {
+        "action": action,
+        "provider_uid": provider_uid,
+        "vehicle_id": vehicle_id,
+        "is_available": is_available,
+        "booking_id": booking_id,
+    }
+    await _safe_publish([topic_key(VEHICLE_AVAILABILITY_CHANGED, provider_uid)], payload)
+
+
+async def publish_profile_updated(uid: str, user_type: str, changed_fields: List[str]) -> None:
+    """
+    Notify profile_updated subscribers of a user
+    
+    Args:
+        uid: User UID
+        user_type: seeker or provider
+        changed_fields: Names of the updated profile fields
+    """
+    payload = {
+        "uid": uid,
+        "user_type": user_type,
+        "changed_fields": changed_fields,
+    }
+    await _safe_publish([topic_key(PROFILE_UPDATED, uid)], payload)
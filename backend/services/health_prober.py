@@ -0,0 +1,195 @@
+"""
+Health Prober
+Background dependency checks behind /readyz
+
+Load balancers poll readiness far more often than dependencies change, so
+the endpoint never touches Neo4j or Firebase itself. A background task
+probes them every HEALTH_PROBE_INTERVAL seconds and stores a snapshot:
+
+- neo4j: RETURN 1 latency through the existing pool, plus pool in-use/idle
+  counts (no reconnect; the next request's get_neo4j_driver() does that)
+- firebase: whether the app is initialized, whether the Admin SDK's
+  cached public keys for verifying ID tokens are fresh (the prober
+  refetches them into that cache one interval before their Cache-Control
+  max-age runs out), the last refetch error and the client's circuit state
+
+readiness() answers from the snapshot: pre-serialized JSON and a status
+decided when the probe ran, plus one staleness comparison per request.
+"""
+
+import asyncio
+import re
+import time
+from typing import Optional, Dict, Any, Tuple
+
+from config.settings import settings
+from config.firebase import is_firebase_initialized, refresh_id_token_keys
+from config.firebase_async import get_async_firebase, CircuitBreaker
+from config.neo4j_config import current_neo4j_driver, get_neo4j_driver, pool_stats
+from graphql_api.serialization import dumps
+from monitoring.metrics import refresh_pool_gauges
+
+
+# Snapshots older than this many intervals mean the prober itself is stuck
+STALE_INTERVALS = 3
+
+LIVENESS_BODY = dumps({"status": "alive"})
+
+
+class HealthProber:
+    """Periodic Neo4j/Firebase probe with a cached readiness snapshot"""
+    
+    def __init__(self, interval: float = 5.0, timeout: float = 3.0):
+        self.interval = interval
+        self.timeout = timeout
+        self._task: Optional[asyncio.Task] = None
+        self._keys_fetched_at: Optional[float] = None
+        self._keys_expire_at: float = 0.0
+        self._keys_error: Optional[str] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        
+        # (checked_at monotonic, ready, body)
+        self._snapshot: Tuple[float, bool, bytes] = (
+            0.0, False, dumps({"status": "starting", "ready": False})
+        )
+        self.last_report: Dict[str, Any] = {}
+    
+    async def start(self) -> None:
+        """Run the first probe now, then keep probing in the background"""
+        await self.probe()
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.probe()
+            except Exception as e:
+                print(f"⚠️  Health probe failed: {str(e)}")
+    
+    async def probe(self) -> Dict[str, Any]:
+        """
+        Probe every dependency once and replace the snapshot
+        
+        Returns:
+            dict: The report /readyz now serves
+        """
+        neo4j_task = self._submit("neo4j", self._probe_neo4j)
+        firebase_task = self._submit("firebase", self._probe_firebase)
+        
+        neo4j = await self._bounded(neo4j_task, "neo4j")
+        firebase = await self._bounded(firebase_task, "firebase")
+        
+        ready = neo4j["ok"]
+        report = {
+            "status": ("ready" if firebase["ok"] else "degraded") if ready else "unavailable",
+            "ready": ready,
+            "checked_at": time.time(),
+            "neo4j": neo4j,
+            "firebase": firebase,
+        }
+        self.last_report = report
+        self._snapshot = (time.monotonic(), ready, dumps(report))
+        return report
+    
+    def _submit(self, name: str, check) -> asyncio.Future:
+        """
+        Run a blocking check in the default executor
+        
+        A check that outlived the previous probe's timeout is awaited again
+        instead of starting another one, so a hung dependency ties up one
+        thread, not one per interval.
+        """
+        pending = self._pending.get(name)
+        if pending is None or pending.done():
+            pending = self._pending[name] = asyncio.get_running_loop().run_in_executor(None, check)
+        return pending
+    
+    async def _bounded(self, future, name: str) -> Dict[str, Any]:
+        """Wait for one dependency probe, failing it after the probe timeout"""
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            return {"ok": False, "error": f"{name} probe timed out after {self.timeout:.1f}s"}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+    
+    def _probe_neo4j(self) -> Dict[str, Any]:
+        driver = current_neo4j_driver()
+        if driver is None:
+            # Startup never connected; try once so readiness can recover
+            driver = get_neo4j_driver()
+        
+        start = time.perf_counter()
+        with driver.session() as session:
+            session.run("RETURN 1 AS test").single()
+        latency_ms = (time.perf_counter() - start) * 1000
+        
+        # Keeps the pool gauges current in every worker, not just the scraped one
+        refresh_pool_gauges()
+        return {"ok": True, "latency_ms": round(latency_ms, 2), "pool": pool_stats(driver)}
+    
+    def _probe_firebase(self) -> Dict[str, Any]:
+        now = time.time()
+        if is_firebase_initialized() and now >= self._keys_expire_at - self.interval:
+            # One interval early, so keys never expire between two probes
+            self._refresh_keys(now)
+        
+        keys_fresh = now < self._keys_expire_at
+        circuit = get_async_firebase().breaker.state
+        result = {
+            "ok": is_firebase_initialized() and keys_fresh and circuit != CircuitBreaker.OPEN,
+            "initialized": is_firebase_initialized(),
+            "circuit": circuit,
+            "keys_fresh": keys_fresh,
+            "keys_age_s": round(now - self._keys_fetched_at, 1) if self._keys_fetched_at else None,
+            "keys_expire_in_s": round(max(0.0, self._keys_expire_at - now), 1),
+            "keys_error": self._keys_error,
+        }
+        return result
+    
+    def _refresh_keys(self, now: float) -> None:
+        """Refetch the SDK's ID token public keys and note how long they stay valid"""
+        try:
+            cache_control = refresh_id_token_keys()
+            match = re.search(r"max-age=(\d+)", cache_control)
+            self._keys_fetched_at = now
+            self._keys_expire_at = now + (int(match.group(1)) if match else self.interval)
+            self._keys_error = None
+        except Exception as e:
+            # Keys fetched earlier stay usable until their own expiry
+            self._keys_error = f"Could not fetch Firebase public keys: {str(e)}"
+    
+    def readiness(self) -> Tuple[bool, bytes]:
+        """
+        Cached readiness, without any I/O
+        
+        Returns:
+            tuple: (ready, JSON body)
+        """
+        checked_at, ready, body = self._snapshot
+        if time.monotonic() - checked_at > self.interval * STALE_INTERVALS:
+            return False, dumps({"status": "stale", "ready": False, "report": self.last_report})
+        return ready, body
+
+
+# ==================== MODULE-LEVEL PROBER ====================
+
+_prober: Optional[HealthProber] = None
+
+
+def get_health_prober() -> HealthProber:
+    """Return the process-wide prober, creating it on first use"""
+    global _prober
+    if _prober is None:
+        _prober = HealthProber(settings.HEALTH_PROBE_INTERVAL, settings.HEALTH_PROBE_TIMEOUT)
+    return _prober
@@ -0,0 +1,333 @@
+"""
+Ranking Service
+Scores a candidate set of services and returns the top-K
+
+Cypher fetches a bounded candidate pool (filters, geo radius); this stage
+turns the candidates into NumPy columns, computes one normalized feature per
+ranking signal and combines them with per-query weights. Top-K selection uses
+argpartition, so only the K winners are fully sorted.
+
+Features are pluggable: register_feature() adds a new signal that can then be
+weighted by name like the built-in ones.
+"""
+
+import math
+import time
+from typing import Dict, Any, List, Optional, Callable
+
+import numpy as np
+
+
+# Built-in feature weights used when a query does not override them
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "distance": 0.30,
+    "rating": 0.30,
+    "reviews": 0.10,
+    "price": 0.15,
+    "freshness": 0.05,
+    "verified": 0.10,
+}
+
+# Bayesian prior for ratings: a service with few reviews is pulled towards
+# PRIOR_RATING as if it had PRIOR_REVIEWS extra reviews at that value
+PRIOR_RATING = 3.0
+PRIOR_REVIEWS = 5.0
+
+FRESHNESS_HALF_LIFE_DAYS = 30.0
+
+# Feature value used for candidates missing the underlying column
+NEUTRAL = 0.5
+
+FeatureFn = Callable[[Dict[str, np.ndarray], Dict[str, Any]], np.ndarray]
+
+
+def _build_columns(candidates: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Extract the numeric ranking columns from the candidate dictionaries
+    
+    Missing values become NaN so the features can treat them explicitly.
+    """
+    n = len(candidates)
+    distance = np.full(n, np.nan)
+    rating = np.zeros(n)
+    rating_sum = np.zeros(n)
+    rating_count = np.zeros(n)
+    price = np.full(n, np.nan)
+    touched = np.full(n, np.nan)
+    verified = np.zeros(n)
+    
+    for i, candidate in enumerate(candidates):
+        service = candidate["service"]
+        if candidate.get("distance_km") is not None:
+            distance[i] = candidate["distance_km"]
+        rating[i] = service.get("rating") or 0.0
+        rating_sum[i] = service.get("rating_sum") or 0.0
+        rating_count[i] = service.get("rating_count") or 0
+        if service.get("price_per_hour") is not None:
+            price[i] = service["price_per_hour"]
+        if candidate.get("touched_epoch") is not None:
+            touched[i] = candidate["touched_epoch"]
+        verified[i] = 1.0 if candidate.get("provider_verified") else 0.0
+    
+    return {
+        "distance": distance,
+        "rating": rating,
+        "rating_sum": rating_sum,
+        "rating_count": rating_count,
+        "price": price,
+        "touched": touched,
+        "verified": verified,
+    }
+
+
+def _lower_is_better(values: np.ndarray, upper: Optional[float] = None) -> np.ndarray:
+    """Min-max normalize so the smallest value scores 1.0; NaN scores NEUTRAL"""
+    known = ~np.isnan(values)
+    scores = np.full(values.shape, NEUTRAL)
+    if not known.any():
+        return scores
+    low = values[known].min()
+    high = upper if upper is not None else values[known].max()
+    if high <= low:
+        scores[known] = 1.0
+        return scores
+    scores[known] = 1.0 - np.clip((values[known] - low) / (high - low), 0.0, 1.0)
+    return scores
+
+
+def _distance_feature(columns: Dict[str, np.ndarray], params: Dict[str, Any]) -> np.ndarray:
+    distance = columns["distance"]
+    known = ~np.isnan(distance)
+    scores = np.full(distance.shape, NEUTRAL)
+    radius_km = params.get("radius_km")
+    if not known.any():
+        return scores
+    reach = radius_km if radius_km else distance[known].max()
+    if reach <= 0:
+        scores[known] = 1.0
+        return scores
+    scores[known] = 1.0 - np.clip(distance[known] / reach, 0.0, 1.0)
+    return scores
+
+
+def _rating_feature(columns: Dict[str, np.ndarray], params: Dict[str, Any]) -> np.ndarray:
+    count = columns["rating_count"]
+    # Services created before rating aggregates existed only carry `rating`
+    total = np.where(count > 0, columns["rating_sum"], columns["rating"])
+    count = np.where(count > 0, count, (columns["rating"] > 0).astype(float))
+    smoothed = (total + PRIOR_RATING * PRIOR_REVIEWS) / (count + PRIOR_REVIEWS)
+    return np.clip(smoothed / 5.0, 0.0, 1.0)
+
+
+def _reviews_feature(columns: Dict[str, np.ndarray], params: Dict[str, Any]) -> np.ndarray:
+    volume = np.log1p(columns["rating_count"])
+    top = volume.max() if volume.size else 0.0
+    if top <= 0:
+        return np.zeros(volume.shape)
+    return volume / top
+
+
+def _price_feature(columns: Dict[str, np.ndarray], params: Dict[str, Any]) -> np.ndarray:
+    return _lower_is_better(columns["price"])
+
+
+def _freshness_feature(columns: Dict[str, np.ndarray], params: Dict[str, Any]) -> np.ndarray:
+    touched = columns["touched"]
+    now = params.get("now") or time.time()
+    age_days = np.maximum(now - touched, 0.0) / 86400.0
+    scores = np.power(0.5, age_days / FRESHNESS_HALF_LIFE_DAYS)
+    return np.where(np.isnan(touched), NEUTRAL, scores)
+
+
+def _verified_feature(columns: Dict[str, np.ndarray], params: Dict[str, Any]) -> np.ndarray:
+    return columns["verified"]
+
+
+class RankingService:
+    """Weighted multi-signal ranking over service candidates"""
+    
+    _features: Dict[str, FeatureFn] = {
+        "distance": _distance_feature,
+        "rating": _rating_feature,
+        "reviews": _reviews_feature,
+        "price": _price_feature,
+        "freshness": _freshness_feature,
+        "verified": _verified_feature,
+    }
+    _default_weights: Dict[str, float] = dict(DEFAULT_WEIGHTS)
+    
+    @classmethod
+    def register_feature(cls, name: str, feature: FeatureFn, default_weight: float = 0.0) -> None:
+        """
+        Register an additional ranking signal
+        
+        Args:
+            name: Weight key used to refer to the feature in queries
+            feature: fn(columns, params) -> array of scores in [0, 1], one per candidate
+            default_weight: Weight applied when a query does not set one
+        """
+        cls._features[name] = feature
+        cls._default_weights[name] = default_weight
+    
+    @classmethod
+    def resolve_weights(cls, overrides: Optional[Dict[str, Optional[float]]] = None) -> Dict[str, float]:
+        """
+        Merge per-query weight overrides into the defaults
+        
+        Args:
+            overrides: Feature name -> weight; None values keep the default
+        
+        Returns:
+            dict: Complete weight map
+        
+        Raises:
+            ValueError: Unknown feature name, negative weight or all weights zero
+        """
+        weights = dict(cls._default_weights)
+        for name, weight in (overrides or {}).items():
+            if weight is None:
+                continue
+            if name not in cls._features:
+                raise ValueError(f"Unknown ranking feature: {name}")
+            if weight < 0 or math.isnan(weight):
+                raise ValueError(f"Ranking weight for {name} must be >= 0")
+            weights[name] = float(weight)
+        
+        if sum(weights.values()) <= 0:
+            raise ValueError("At least one ranking weight must be positive")
+        return weights
+    
+    def score(
+        self,
+        candidates: List[Dict[str, Any]],
+        weights: Optional[Dict[str, Optional[float]]] = None,
+        radius_km: Optional[float] = None,
+        now: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Compute the weighted score of every candidate
+        
+        Args:
+            candidates: [{"service", "distance_km", "provider_verified", "touched_epoch"}]
+            weights: Per-query weight overrides
+            radius_km: Search radius, used to normalize distance
+            now: Reference epoch seconds for freshness (default: current time)
+        
+        Returns:
+            np.ndarray: Scores in [0, 1], aligned with candidates
+        """
+        resolved = self.resolve_weights(weights)
+        if not candidates:
+            return np.zeros(0)
+        
+        columns = _build_columns(candidates)
+        params = {"radius_km": radius_km, "now": now}
+        
+        total_weight = sum(resolved.values())
+        scores = np.zeros(len(candidates))
+        for name, weight in resolved.items():
+            if weight == 0:
+                continue
+            scores += weight * self._features[name](columns, params)
+        return scores / total_weight
+    
+    def rank(
+        self,
+        candidates: List[Dict[str, Any]],
+        top_k: int,
+        weights: Optional[Dict[str, Optional[float]]] = None,
+        radius_km: Optional[float] = None,
+        now: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the top_k candidates ordered by weighted score
+        
+        Args:
+            candidates: Candidate dictionaries from the repository
+            top_k: Number of results to return
+            weights: Per-query weight overrides
+            radius_km: Search radius, used to normalize distance
+            now: Reference epoch seconds for freshness
+        
+        Returns:
+            List of candidates (best first), each with a "score" key added
+        """
+        scores = self.score(candidates, weights=weights, radius_km=radius_km, now=now)
+        n = len(candidates)
+        k = min(max(top_k, 0), n)
+        if k == 0:
+            return []
+        
+        if k < n:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(n)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        
+        ranked = []
+        for index in top:
+            candidate = dict(candidates[index])
+            candidate["score"] = round(float(scores[index]), 4)
+            ranked.append(candidate)
+        return ranked
+    
+    def get_ranked_services(
+        self,
+        top_k: int,
+        weights: Optional[Dict[str, Optional[float]]] = None,
+        category: Optional[str] = None,
+        service_area: Optional[str] = None,
+        min_rating: Optional[float] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius_km: Optional[float] = None,
+        candidate_limit: Optional[int] = None,
+        available_during: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch candidates from Neo4j and return the top_k ranked services
+        
+        Args:
+            top_k: Number of services to return
+            weights: Per-query weight overrides
+            category: Filter by service category
+            service_area: Filter by service area
+            min_rating: Minimum rating filter
+            latitude: Optional center latitude
+            longitude: Optional center longitude
+            radius_km: Search radius in kilometers
+            candidate_limit: Candidate pool size (default: settings.RANKING_CANDIDATE_LIMIT)
+            available_during: 7-day availability mask the service must cover
+        
+        Returns:
+            List of service dictionaries with distance_km and ranking_score set
+        """
+        from config.settings import settings
+        from repositories.backend import get_user_repository
+        
+        # Validate before touching the database
+        self.resolve_weights(weights)
+        
+        pool_size = max(candidate_limit or settings.RANKING_CANDIDATE_LIMIT, top_k)
+        candidates = get_user_repository().get_ranking_candidates(
+            category=category,
+            service_area=service_area,
+            min_rating=min_rating,
+            latitude=latitude,
+            longitude=longitude,
+            radius_km=radius_km,
+            limit=pool_size,
+            available_during=available_during
+        )
+        
+        ranked = self.rank(candidates, top_k, weights=weights, radius_km=radius_km)
+        
+        services = []
+        for candidate in ranked:
+            service_data = dict(candidate["service"])
+            service_data["distance_km"] = candidate["distance_km"]
+            service_data["ranking_score"] = candidate["score"]
+            services.append(service_data)
+        
+        print(f"🏁 Ranked {len(candidates)} candidates, returning top {len(services)}")
+        return services
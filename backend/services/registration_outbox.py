@@ -0,0 +1,344 @@
+"""
+Registration Outbox
+Deferred creation of user profiles after signup
+
+With REGISTRATION_MODE=outbox, registration stops once the Firebase user
+and its custom token exist. The Seeker/Provider profile goes into a local
+SQLite outbox in the same step, and RegistrationWorker creates the node in
+the user store afterwards, so signup latency no longer includes the
+database write and a database failure no longer deletes the Firebase user.
+
+- The outbox row is the only copy of the profile until the worker creates
+  the node. Rows are keyed by Firebase UID and deleted once the node exists.
+- Every attempt first looks the UID up and skips the write when the node is
+  already there. A retry after a write whose answer was lost therefore
+  never creates a second node.
+- Failed attempts back off exponentially. After
+  REGISTRATION_OUTBOX_MAX_ATTEMPTS the row is marked failed and kept for an
+  operator (retry_failed() requeues it).
+- Server workers share the file. A row is leased to one worker at a time
+  while it is processed.
+- Login and token verification call flush() for a UID whose profile is
+  still pending, so a user who signs in straight away is not kept waiting
+  for the next poll.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any, List
+
+from config.settings import settings
+from models.user import UserType, SeekerNode, ProviderNode
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_registrations (
+    uid TEXT PRIMARY KEY,
+    user_type TEXT NOT NULL,
+    email TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    leased_until REAL NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS pending_registrations_due ON pending_registrations (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS pending_registrations_email ON pending_registrations (email);
+"""
+
+PENDING = "pending"
+FAILED = "failed"
+
+# Longest wait between two attempts for one registration
+MAX_RETRY_DELAY = 300.0
+
+NODE_CLASSES = {UserType.SEEKER.value: SeekerNode, UserType.PROVIDER.value: ProviderNode}
+LABELS = {UserType.SEEKER.value: "Seeker", UserType.PROVIDER.value: "Provider"}
+
+
+class RegistrationOutbox:
+    """Pending profile creations in a SQLite file shared by the server workers"""
+    
+    def __init__(self, path: str = ":memory:", lease_seconds: float = 60.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10.0)
+        self.connection.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode=WAL")
+        # FULL: a registration the client was told succeeded survives a power loss
+        self.connection.execute("PRAGMA synchronous=FULL")
+        self.connection.executescript(_SCHEMA)
+    
+    def add(self, uid: str, user_type: str, profile: Dict[str, Any]) -> None:
+        """
+        Record a profile to create
+        
+        Args:
+            uid: Firebase UID of the new user
+            user_type: "seeker" or "provider"
+            profile: The node model's to_dict()
+        """
+        now = time.time()
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO pending_registrations (uid, user_type, email, profile, created_at, next_attempt_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (uid, user_type, profile["email"], json.dumps(profile), now, now)
+            )
+    
+    def get(self, uid: str) -> Optional[Dict[str, Any]]:
+        """The pending (or failed) registration of a UID, profile decoded"""
+        with self._lock:
+            row = self.connection.execute("SELECT * FROM pending_registrations WHERE uid = ?", (uid,)).fetchone()
+        return self._record(row) if row else None
+    
+    def has_email(self, email: str) -> bool:
+        """Whether a registration for this email is still waiting for its profile"""
+        with self._lock:
+            row = self.connection.execute("SELECT 1 FROM pending_registrations WHERE email = ? LIMIT 1", (email,)).fetchone()
+        return row is not None
+    
+    def claim(self, limit: int = 50, uid: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Lease due registrations to the caller
+        
+        Args:
+            limit: Maximum number of rows
+            uid: Claim this registration only, due or not (flush)
+        
+        Returns:
+            list: Claimed records, oldest first
+        """
+        now = time.time()
+        with self._lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                if uid is None:
+                    rows = self.connection.execute(
+                        "SELECT * FROM pending_registrations WHERE status = ? AND next_attempt_at <= ? AND leased_until <= ? "
+                        "ORDER BY created_at LIMIT ?",
+                        (PENDING, now, now, limit)
+                    ).fetchall()
+                else:
+                    rows = self.connection.execute(
+                        "SELECT * FROM pending_registrations WHERE uid = ? AND status = ? AND leased_until <= ?",
+                        (uid, PENDING, now)
+                    ).fetchall()
+                self.connection.executemany(
+                    "UPDATE pending_registrations SET leased_until = ? WHERE uid = ?",
+                    [(now + self.lease_seconds, row["uid"]) for row in rows]
+                )
+                self.connection.execute("COMMIT")
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+        return [self._record(row) for row in rows]
+    
+    def complete(self, uid: str) -> None:
+        """The profile exists; drop the row"""
+        with self._lock:
+            self.connection.execute("DELETE FROM pending_registrations WHERE uid = ?", (uid,))
+    
+    def retry_later(self, uid: str, error: str, delay: float) -> None:
+        """Count a failed attempt and release the lease until `delay` seconds from now"""
+        with self._lock:
+            self.connection.execute(
+                "UPDATE pending_registrations SET attempts = attempts + 1, next_attempt_at = ?, leased_until = 0, last_error = ? "
+                "WHERE uid = ?",
+                (time.time() + delay, error, uid)
+            )
+    
+    def fail(self, uid: str, error: str) -> None:
+        """Give up on a registration; it stays in the outbox as failed"""
+        with self._lock:
+            self.connection.execute(
+                "UPDATE pending_registrations SET attempts = attempts + 1, status = ?, leased_until = 0, last_error = ? "
+                "WHERE uid = ?",
+                (FAILED, error, uid)
+            )
+    
+    def retry_failed(self) -> int:
+        """Requeue every failed registration; returns how many"""
+        with self._lock:
+            cursor = self.connection.execute(
+                "UPDATE pending_registrations SET status = ?, attempts = 0, next_attempt_at = ?, leased_until = 0 WHERE status = ?",
+                (PENDING, time.time(), FAILED)
+            )
+        return cursor.rowcount
+    
+    def stats(self) -> Dict[str, Any]:
+        """Row counts by status and the age of the oldest pending row"""
+        with self._lock:
+            counts = dict(self.connection.execute(
+                "SELECT status, count(*) FROM pending_registrations GROUP BY status"
+            ).fetchall())
+            oldest = self.connection.execute(
+                "SELECT min(created_at) FROM pending_registrations WHERE status = ?", (PENDING,)
+            ).fetchone()[0]
+        return {
+            "pending": counts.get(PENDING, 0),
+            "failed": counts.get(FAILED, 0),
+            "oldest_pending_age_s": round(time.time() - oldest, 1) if oldest else None,
+        }
+    
+    def close(self) -> None:
+        with self._lock:
+            self.connection.close()
+    
+    @staticmethod
+    def _record(row: sqlite3.Row) -> Dict[str, Any]:
+        record = dict(row)
+        record["profile"] = json.loads(record["profile"])
+        return record
+
+
+def pending_profile(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The user as get_user_by_uid will return it once created (labels
+    included), built from an outbox record
+    """
+    profile = dict(record["profile"])
+    profile["name"] = profile.get("full_name")
+    profile["labels"] = [LABELS[record["user_type"]]]
+    return profile
+
+
+class RegistrationWorker:
+    """Background task creating the profiles waiting in the outbox"""
+    
+    def __init__(self, outbox: RegistrationOutbox, interval: float = 5.0, max_attempts: int = 20, batch_size: int = 50):
+        self.outbox = outbox
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+    
+    async def start(self) -> None:
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def notify(self) -> None:
+        """A registration was just added; process it without waiting for the next poll"""
+        if self._wake is not None:
+            self._wake.set()
+    
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                # Keep draining while full batches come back
+                while await self.process_due() == self.batch_size:
+                    pass
+            except Exception as e:
+                print(f"⚠️  Registration outbox pass failed: {str(e)}")
+    
+    async def process_due(self) -> int:
+        """
+        Create the profiles that are due
+        
+        Returns:
+            int: Registrations claimed in this pass
+        """
+        loop = asyncio.get_running_loop()
+        records = await loop.run_in_executor(None, self.outbox.claim, self.batch_size)
+        for record in records:
+            await loop.run_in_executor(None, self._process, record)
+        return len(records)
+    
+    async def flush(self, uid: str) -> bool:
+        """
+        Create one pending profile now, if no other worker holds it
+        
+        Returns:
+            bool: Whether the profile exists afterwards
+        """
+        loop = asyncio.get_running_loop()
+        records = await loop.run_in_executor(None, lambda: self.outbox.claim(uid=uid))
+        if not records:
+            return False
+        return await loop.run_in_executor(None, self._process, records[0])
+    
+    def _process(self, record: Dict[str, Any]) -> bool:
+        """One attempt at one registration (blocking; runs in the executor)"""
+        from repositories.backend import get_user_repository
+        
+        uid = record["uid"]
+        try:
+            user_repo = get_user_repository()
+            # Idempotence: an earlier attempt may have committed without us hearing back
+            if user_repo.get_user_by_uid(uid) is None:
+                node = NODE_CLASSES[record["user_type"]].from_dict(record["profile"])
+                if record["user_type"] == UserType.SEEKER.value:
+                    created = user_repo.create_seeker(node)
+                else:
+                    created = user_repo.create_provider(node)
+                if not created:
+                    raise Exception("create returned no node")
+            self.outbox.complete(uid)
+            print(f"✅ Profile created from the registration outbox: {uid} ({record['user_type']})")
+            return True
+        except Exception as e:
+            attempts = record["attempts"] + 1
+            if attempts >= self.max_attempts:
+                self.outbox.fail(uid, str(e))
+                print(f"❌ Registration {uid} failed {attempts} times, giving up: {str(e)}")
+            else:
+                delay = min(self.interval * 2 ** record["attempts"], MAX_RETRY_DELAY)
+                self.outbox.retry_later(uid, str(e), delay)
+                print(f"⏳ Registration {uid} attempt {attempts} failed ({str(e)}), retrying in {delay:.0f}s")
+            return False
+
+
+# ==================== MODULE-LEVEL OUTBOX ====================
+
+_outbox: Optional[RegistrationOutbox] = None
+_worker: Optional[RegistrationWorker] = None
+
+
+def outbox_enabled() -> bool:
+    """Whether registrations go through the outbox (REGISTRATION_MODE)"""
+    return settings.REGISTRATION_MODE == "outbox"
+
+
+def get_registration_outbox() -> RegistrationOutbox:
+    """Return the process-wide outbox, opening its file on first use"""
+    global _outbox
+    if _outbox is None:
+        _outbox = RegistrationOutbox(settings.REGISTRATION_OUTBOX_PATH)
+    return _outbox
+
+
+def get_registration_worker() -> RegistrationWorker:
+    """Return the process-wide worker, creating it on first use"""
+    global _worker
+    if _worker is None:
+        _worker = RegistrationWorker(
+            get_registration_outbox(),
+            interval=settings.REGISTRATION_OUTBOX_POLL_INTERVAL,
+            max_attempts=settings.REGISTRATION_OUTBOX_MAX_ATTEMPTS
+        )
+    return _worker
@@ -0,0 +1,406 @@
+"""
+Session Tokens
+API-issued access and refresh tokens, verified without Firebase or Neo4j
+
+With SESSION_TOKENS enabled, a client that has signed in with Firebase
+exchanges its Firebase ID token (startSession) for a short-lived access token
+(ACCESS_TOKEN_EXPIRE_MINUTES) and a refresh token (REFRESH_TOKEN_EXPIRE_DAYS).
+The email-only login mutation never issues them: it proves no password.
+Both are HMAC-signed with SECRET_KEY/ALGORITHM and carry the uid (sub) and
+user_type. An authenticated request then costs one signature check and one
+dictionary lookup instead of a Firebase ID token verification.
+
+- refresh() rotates the refresh token: the presented token is denied and a
+  new pair is issued. It is the one step that asks Firebase, so disabled
+  accounts and revoke_refresh_tokens() end sessions within one access
+  token lifetime.
+- Revocation (logout, revoke_user) goes through a compact deny-list: one
+  entry per revoked token ID (jti) or user, dropped once every token it can
+  match has expired anyway. The list is a SQLite file
+  (SESSION_DENY_LIST_PATH), so the workers of a host share it and it
+  survives restarts. Revocations are also published on the event broker,
+  so with EVENT_BROKER_BACKEND=redis other hosts apply them too.
+- A refresh token is claimed in the deny-list before it is rotated, so it
+  is exchanged once even when two workers receive it at the same time.
+- authenticate() accepts both session tokens and Firebase ID tokens (told
+  apart by the signing algorithm in the header), so clients can move over
+  one at a time.
+"""
+
+import base64
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any
+
+import jwt
+
+from config.settings import settings
+from services.event_broker import get_event_broker, topic_key, SESSION_REVOKED
+
+
+ACCESS = "access"
+REFRESH = "refresh"
+
+HMAC_ALGORITHMS = ("HS256", "HS384", "HS512")
+
+# Deny-list entries are swept at most this often (seconds)
+PURGE_INTERVAL = 60.0
+
+# Shortest SECRET_KEY accepted for signing session tokens (HS256 wants a 256-bit key)
+MIN_SECRET_LENGTH = 32
+DEFAULT_SECRET_KEY = "change-this-secret-key"
+
+
+class SessionTokenError(Exception):
+    """A session token is malformed, expired, of the wrong kind or revoked"""
+
+
+_DENY_LIST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS denied_tokens (
+    jti TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS denied_users (
+    uid TEXT PRIMARY KEY,
+    issued_before REAL NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class DenyList:
+    """
+    Revoked token IDs and per-user revocation times, in a SQLite file
+    
+    Entries carry the expiry of the latest token they can match, so the
+    list only ever holds revocations that still matter. Every worker of a
+    host opens the same file, so a revocation made by one is seen by the
+    others on their next lookup, and a restart keeps them.
+    """
+    
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10.0)
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode=WAL")
+        # FULL: a logout the client was told succeeded survives a power loss
+        self.connection.execute("PRAGMA synchronous=FULL")
+        self.connection.executescript(_DENY_LIST_SCHEMA)
+        self._next_purge = time.time() + PURGE_INTERVAL
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self.connection.execute(
+                "SELECT (SELECT count(*) FROM denied_tokens) + (SELECT count(*) FROM denied_users)"
+            ).fetchone()[0]
+    
+    def deny(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self.connection.execute(
+                "INSERT INTO denied_tokens (jti, expires_at) VALUES (?, ?) "
+                "ON CONFLICT (jti) DO UPDATE SET expires_at = max(expires_at, excluded.expires_at)",
+                (jti, expires_at)
+            )
+        self._maybe_purge()
+    
+    def claim(self, jti: str, expires_at: float) -> bool:
+        """Deny a token ID unless it already is; True when this call denied it"""
+        with self._lock:
+            cursor = self.connection.execute(
+                "INSERT OR IGNORE INTO denied_tokens (jti, expires_at) VALUES (?, ?)", (jti, expires_at)
+            )
+        self._maybe_purge()
+        return cursor.rowcount == 1
+    
+    def deny_user(self, uid: str, issued_before: float, expires_at: float) -> None:
+        with self._lock:
+            self.connection.execute(
+                "INSERT INTO denied_users (uid, issued_before, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (uid) DO UPDATE SET issued_before = max(issued_before, excluded.issued_before), "
+                "expires_at = max(expires_at, excluded.expires_at)",
+                (uid, issued_before, expires_at)
+            )
+        self._maybe_purge()
+    
+    def is_denied(self, claims: Dict[str, Any]) -> bool:
+        with self._lock:
+            return bool(self.connection.execute(
+                "SELECT EXISTS (SELECT 1 FROM denied_tokens WHERE jti = ?) "
+                "OR EXISTS (SELECT 1 FROM denied_users WHERE uid = ? AND issued_before > ?)",
+                (claims["jti"], claims["sub"], claims["iat"])
+            ).fetchone()[0])
+    
+    def close(self) -> None:
+        with self._lock:
+            self.connection.close()
+    
+    def _maybe_purge(self) -> None:
+        now = time.time()
+        if now < self._next_purge:
+            return
+        self._next_purge = now + PURGE_INTERVAL
+        with self._lock:
+            self.connection.execute("DELETE FROM denied_tokens WHERE expires_at <= ?", (now,))
+            self.connection.execute("DELETE FROM denied_users WHERE expires_at <= ?", (now,))
+
+
+class SessionTokens:
+    """Issues, verifies, rotates and revokes session tokens"""
+    
+    def __init__(
+        self,
+        secret: str,
+        algorithm: str = "HS256",
+        access_ttl: float = 3600.0,
+        refresh_ttl: float = 30 * 86400.0,
+        deny_list: Optional[DenyList] = None
+    ):
+        if algorithm not in HMAC_ALGORITHMS:
+            raise ValueError(f"Session tokens need an HMAC ALGORITHM ({', '.join(HMAC_ALGORITHMS)}), not {algorithm!r}")
+        self.secret = secret
+        self.algorithm = algorithm
+        self.access_ttl = access_ttl
+        self.refresh_ttl = refresh_ttl
+        self.deny_list = deny_list if deny_list is not None else DenyList()
+    
+    def _encode(self, uid: str, user_type: str, token_type: str, issued_at: int, ttl: float) -> str:
+        claims = {
+            "sub": uid,
+            "user_type": user_type,
+            "typ": token_type,
+            "iat": issued_at,
+            "exp": issued_at + int(ttl),
+            "jti": secrets.token_urlsafe(9),
+        }
+        return jwt.encode(claims, self.secret, algorithm=self.algorithm)
+    
+    def issue(self, uid: str, user_type: str) -> Dict[str, Any]:
+        """
+        Issue an access/refresh token pair
+        
+        Args:
+            uid: Firebase UID of the user
+            user_type: seeker or provider
+        
+        Returns:
+            dict: access_token, refresh_token and expires_in (seconds)
+        """
+        now = int(time.time())
+        return {
+            "access_token": self._encode(uid, user_type, ACCESS, now, self.access_ttl),
+            "refresh_token": self._encode(uid, user_type, REFRESH, now, self.refresh_ttl),
+            "expires_in": int(self.access_ttl),
+        }
+    
+    def verify(self, token: str, token_type: str = ACCESS) -> Dict[str, Any]:
+        """
+        Check a token's signature, expiry, kind and the deny-list
+        
+        Args:
+            token: Encoded token
+            token_type: access or refresh
+        
+        Returns:
+            dict: The token's claims (sub is the uid)
+        
+        Raises:
+            SessionTokenError: If the token is not currently valid
+        """
+        try:
+            claims = jwt.decode(
+                token, self.secret, algorithms=[self.algorithm],
+                options={"require": ["sub", "typ", "iat", "exp", "jti"]}
+            )
+        except jwt.ExpiredSignatureError:
+            raise SessionTokenError("Session expired. Please refresh or log in again.")
+        except jwt.InvalidTokenError as e:
+            raise SessionTokenError(f"Invalid session token: {str(e)}")
+        if claims["typ"] != token_type:
+            raise SessionTokenError(f"Expected a {token_type} token, got a {claims['typ']} token")
+        if self.deny_list.is_denied(claims):
+            raise SessionTokenError("Session has been revoked. Please log in again.")
+        return claims
+    
+    def rotate(self, refresh_token: str) -> tuple:
+        """
+        Exchange a refresh token for a new pair, revoking the old one
+        
+        Returns:
+            tuple: (claims of the old refresh token, new token pair)
+        """
+        claims = self.verify(refresh_token, REFRESH)
+        # Whoever claims the jti first rotates; a concurrent second use is a replay
+        if not self.deny_list.claim(claims["jti"], claims["exp"]):
+            raise SessionTokenError("Session has been revoked. Please log in again.")
+        return claims, self.issue(claims["sub"], claims.get("user_type"))
+    
+    def revoke(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Deny one token (access or refresh) until it expires
+        
+        Returns:
+            dict: The deny-list entry to replicate, or None when the token is
+            invalid or already expired
+        """
+        try:
+            claims = jwt.decode(token, self.secret, algorithms=[self.algorithm])
+        except jwt.InvalidTokenError:
+            return None
+        self.deny_list.deny(claims["jti"], claims["exp"])
+        return {"jti": claims["jti"], "expires_at": claims["exp"]}
+    
+    def revoke_user(self, uid: str) -> Dict[str, Any]:
+        """
+        Deny every token issued to a user until now
+        
+        Returns:
+            dict: The deny-list entry to replicate
+        """
+        now = time.time()
+        # iat has whole-second resolution: tokens issued in this second are revoked too
+        issued_before = int(now) + 1
+        expires_at = now + max(self.access_ttl, self.refresh_ttl)
+        self.deny_list.deny_user(uid, issued_before, expires_at)
+        return {"uid": uid, "issued_before": issued_before, "expires_at": expires_at}
+    
+    def apply(self, entry: Dict[str, Any]) -> None:
+        """Apply a deny-list entry published by another worker"""
+        if "jti" in entry:
+            self.deny_list.deny(entry["jti"], entry["expires_at"])
+        else:
+            self.deny_list.deny_user(entry["uid"], entry["issued_before"], entry["expires_at"])
+
+
+def is_session_token(token: str) -> bool:
+    """Whether a bearer token was signed by this API (not a Firebase ID token)"""
+    try:
+        header = token.split(".", 1)[0]
+        header = json.loads(base64.urlsafe_b64decode(header + "=" * (-len(header) % 4)))
+    except Exception:
+        return False
+    return header.get("alg") == settings.ALGORITHM
+
+
+# ==================== MODULE-LEVEL TOKENS ====================
+
+_tokens: Optional[SessionTokens] = None
+
+
+def session_tokens_enabled() -> bool:
+    return settings.SESSION_TOKENS
+
+
+def get_session_tokens() -> SessionTokens:
+    """
+    Return the process-wide token service, creating it from settings on first use
+    
+    Raises:
+        ValueError: If SECRET_KEY is the default or shorter than
+            MIN_SECRET_LENGTH; anyone knowing it could sign sessions for any uid
+    """
+    global _tokens
+    if _tokens is None:
+        if settings.SECRET_KEY == DEFAULT_SECRET_KEY or len(settings.SECRET_KEY) < MIN_SECRET_LENGTH:
+            raise ValueError(
+                f"SESSION_TOKENS needs a random SECRET_KEY of at least {MIN_SECRET_LENGTH} characters, "
+                f"e.g. python -c \"import secrets; print(secrets.token_urlsafe(48))\""
+            )
+        _tokens = SessionTokens(
+            settings.SECRET_KEY,
+            settings.ALGORITHM,
+            access_ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            refresh_ttl=settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+            deny_list=DenyList(settings.SESSION_DENY_LIST_PATH),
+        )
+    return _tokens
+
+
+async def publish_revocation(entry: Optional[Dict[str, Any]]) -> None:
+    """Share a deny-list entry with the other workers"""
+    if entry is None:
+        return
+    try:
+        await get_event_broker().publish([topic_key(SESSION_REVOKED)], entry)
+    except Exception as e:
+        print(f"⚠️  Could not publish session revocation: {str(e)}")
+
+
+async def replicate_revocations() -> None:
+    """Apply revocations published by every worker (run as a background task)"""
+    tokens = get_session_tokens()
+    async for entry in get_event_broker().subscribe(topic_key(SESSION_REVOKED)):
+        try:
+            tokens.apply(entry)
+        except Exception as e:
+            print(f"⚠️  Dropped malformed session revocation: {str(e)}")
+
+
+async def authenticate(token: str, firebase=None) -> Dict[str, Any]:
+    """
+    Identify the caller behind a bearer token
+    
+    Session tokens are verified locally; anything else is verified by
+    Firebase as an ID token.
+    
+    Args:
+        token: The bearer token
+        firebase: AsyncFirebase client to verify ID tokens with (default:
+            the process-wide one)
+    
+    Returns:
+        dict: uid, user_type (None when the Firebase token has no such
+        claim) and email (Firebase tokens only)
+    
+    Raises:
+        Exception: If the token is not valid
+    """
+    if session_tokens_enabled() and is_session_token(token):
+        claims = get_session_tokens().verify(token, ACCESS)
+        return {"uid": claims["sub"], "user_type": claims.get("user_type"), "email": None}
+    
+    from config.firebase_async import get_async_firebase
+    decoded = await (firebase or get_async_firebase()).verify_token(token)
+    return {"uid": decoded["uid"], "user_type": decoded.get("user_type"), "email": decoded.get("email")}
+
+
+async def account_active(uid: str, issued_at: float) -> bool:
+    """
+    Whether a Firebase account is enabled and its refresh tokens were not
+    revoked after issued_at (epoch seconds)
+    """
+    from config.firebase_async import get_async_firebase
+    firebase_user = await get_async_firebase().get_user_by_uid(uid)
+    valid_after = (firebase_user.tokens_valid_after_timestamp or 0) / 1000
+    return not firebase_user.disabled and issued_at >= valid_after
+
+
+async def refresh_session(refresh_token: str) -> Dict[str, Any]:
+    """
+    Rotate a refresh token after checking the account with Firebase
+    
+    A disabled account, or one whose refresh tokens were revoked in
+    Firebase after this session started, loses all its session tokens.
+    
+    Returns:
+        dict: The new token pair
+    
+    Raises:
+        SessionTokenError: If the session cannot be refreshed
+    """
+    tokens = get_session_tokens()
+    claims = tokens.verify(refresh_token, REFRESH)
+    
+    if not await account_active(claims["sub"], claims["iat"]):
+        await publish_revocation(tokens.revoke_user(claims["sub"]))
+        raise SessionTokenError("Session has been revoked. Please log in again.")
+    
+    _, pair = tokens.rotate(refresh_token)
+    await publish_revocation({"jti": claims["jti"], "expires_at": claims["exp"]})
+    return pair
@@ -0,0 +1,132 @@
+"""
+Single-flight reads
+Identical concurrent repository reads share one query and its result
+
+When many seekers in one city open the app at once, the same
+activeServices/nearbyServices read arrives many times within a few
+milliseconds. SingleFlight.do() runs the first call (the leader) on a
+worker thread; calls with the same function and normalized arguments that
+arrive while it is running (followers) await the same result instead of
+querying again.
+
+- Nothing is cached: once the query finishes, the next call runs a new
+  one, so results are never older than the query a caller waited for.
+- An error is shared the same way, and the next call retries.
+- Followers receive the leader's result objects; callers must not mutate
+  them (the resolvers only map them to GraphQL types).
+- Running the query on a thread also keeps the event loop free while it
+  runs, which is what lets concurrent requests meet in the first place.
+
+Calls per operation and role are counted in
+haulistry_single_flight_calls_total; the coalescing ratio is followers
+over all calls (see stats() and /stats/single_flight).
+"""
+
+import asyncio
+import contextvars
+import functools
+from typing import Optional, Dict, Any, Callable, Hashable
+
+from config.settings import settings
+from monitoring.metrics import record_single_flight
+
+
+def normalize(value: Any) -> Hashable:
+    """
+    Hashable form of an argument, equal for arguments that select the same rows
+    
+    Empty strings are no filter (like None) in the repositories, lists of
+    masks or windows become tuples, and dictionaries (ranking weights)
+    become sorted item tuples.
+    """
+    if value == "":
+        return None
+    if isinstance(value, dict):
+        return tuple(sorted((key, normalize(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize(item) for item in value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with equal keys into one execution"""
+    
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        # operation -> {"calls": n, "executions": n}
+        self._stats: Dict[str, Dict[str, int]] = {}
+    
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+    
+    async def do(self, func: Callable, **kwargs) -> Any:
+        """
+        Run func(**kwargs) on a worker thread, or join an identical call already running
+        
+        Args:
+            func: Blocking read, e.g. a repository method; bound methods of
+                different repository instances count as the same function
+            **kwargs: Its arguments (keywords only, so they can be keyed)
+        
+        Returns:
+            func's result, shared with every caller that joined it
+        """
+        operation = func.__qualname__
+        if not settings.SINGLE_FLIGHT_READS:
+            return func(**kwargs)
+        
+        key = (operation, tuple(sorted((name, normalize(value)) for name, value in kwargs.items())))
+        stats = self._stats.setdefault(operation, {"calls": 0, "executions": 0})
+        stats["calls"] += 1
+        
+        future = self._inflight.get(key)
+        if future is None:
+            stats["executions"] += 1
+            record_single_flight(operation, "leader")
+            # Copied context: the query's spans stay under the leader's request span
+            context = contextvars.copy_context()
+            future = asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(context.run, func, **kwargs)
+            )
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            record_single_flight(operation, "follower")
+        
+        # A cancelled caller must not cancel the query the others are waiting for
+        return await asyncio.shield(future)
+    
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.exception()  # Retrieved here, so an error nobody awaited is not logged as lost
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Calls, queries run and coalescing ratio per operation"""
+        report = {}
+        for operation, entry in self._stats.items():
+            coalesced = entry["calls"] - entry["executions"]
+            report[operation] = {
+                **entry,
+                "coalesced": coalesced,
+                "coalescing_ratio": round(coalesced / entry["calls"], 3) if entry["calls"] else 0.0,
+            }
+        return report
+    
+    def reset_stats(self) -> None:
+        self._stats.clear()
+
+
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Return the process-wide SingleFlight"""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
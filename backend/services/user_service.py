@@ -4,7 +4,7 @@ Handles user-related business logic
 """
 
 from typing import Dict, Any, Optional, List
-from repositories.user_repository import UserRepository
+from repositories.backend import get_user_repository
 from models.user import UserType
 
 
@@ -12,7 +12,7 @@ class UserService:
     """Service for user-related operations"""
     
     def __init__(self):
-        self.user_repo = UserRepository()
+        self.user_repo = get_user_repository()
     
     async def get_user_by_uid(self, uid: str) -> Optional[Dict[str, Any]]:
         """Get user by UID"""
@@ -56,7 +56,10 @@ class UserService:
     async def update_provider_profile(self, uid: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Update provider profile"""
         # Remove fields that shouldn't be updated directly
-        protected_fields = ["uid", "email", "user_type", "created_at", "rating", "total_bookings"]
+        protected_fields = [
+            "uid", "email", "user_type", "created_at",
+            "rating", "rating_sum", "rating_count", "total_bookings"
+        ]
         for field in protected_fields:
             updates.pop(field, None)
         
@@ -94,7 +97,12 @@ class UserService:
         return self.user_repo.update_provider(uid, {"is_verified": True})
     
     async def update_provider_rating(self, uid: str, new_rating: float) -> Optional[Dict[str, Any]]:
-        """Update provider rating"""
+        """
+        Overwrite provider rating
+        
+        Ratings are normally maintained from reviews by ReviewRepository;
+        a manual value is replaced on the next review write or rebuild.
+        """
         return self.user_repo.update_provider(uid, {"rating": new_rating})
     
     async def increment_provider_bookings(self, uid: str) -> Optional[Dict[str, Any]]: